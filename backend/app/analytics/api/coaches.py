@@ -6,18 +6,26 @@ refreshed nightly by ``app/analytics/workers/refresh_views.py``.
 
 Final paths: ``/api/v1/analytics/coaches/...``
 
-  * GET /clubs/{id}/popularity — coach leaderboard ranked by ?sort
+  * GET /clubs/{id}/popularity — coach leaderboard ranked by ?sort (pages with
+    ?cursor=, the previous page's ``next_cursor``, or ?offset=)
+
+Responses carry an ETag and are cached until the view's next successful
+refresh — see ``response_cache.py``.
 """
 from __future__ import annotations
 
 import uuid
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.analytics.api.response_cache import cached_response
 from app.analytics.schemas.coach import CoachPopularityLeaderboard, CoachSort
 from app.analytics.services.coach_popularity_service import CoachPopularityService
+from app.analytics.services.generations import get_data_generations
+from app.analytics.services.keyset import InvalidCursor
 from app.api.v1.dependencies.auth import require_staff
 from app.api.v1.dependencies.tenant import get_tenant
 from app.db.models.club import Club
@@ -26,6 +34,8 @@ from app.db.session import get_read_db
 
 router = APIRouter(prefix="/coaches", tags=["analytics-coaches"])
 
+_VIEW = "mv_coach_popularity"
+
 
 async def _load_club(db: AsyncSession, club_id: uuid.UUID, tenant: Tenant) -> Club:
     """Load a club, enforcing tenant isolation. 404 if it isn't this tenant's."""
@@ -43,10 +53,12 @@ async def _load_club(db: AsyncSession, club_id: uuid.UUID, tenant: Tenant) -> Cl
 
 @router.get("/clubs/{club_id}/popularity", response_model=CoachPopularityLeaderboard)
 async def club_coach_popularity(
+    request: Request,
     club_id: uuid.UUID,
     sort: CoachSort = Query(CoachSort.sessions),
     limit: int = Query(50, ge=1, le=500),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces offset"),
     _staff=Depends(require_staff),
     tenant: Tenant = Depends(get_tenant),
     db: AsyncSession = Depends(get_read_db),
@@ -54,4 +66,13 @@ async def club_coach_popularity(
     """Coaches ranked by lesson volume, reach, repeat business, or revenue.
     Each row carries ``return_rate`` (``repeat_players / distinct_players``)."""
     await _load_club(db, club_id, tenant)
-    return await CoachPopularityService(db).leaderboard(club_id, sort, limit, offset)
+    generation = await get_data_generations().view(db, _VIEW)
+    try:
+        return await cached_response(
+            request, tenant.id, generation,
+            lambda: CoachPopularityService(db).leaderboard(club_id, sort, limit, offset, cursor),
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)
+        ) from exc
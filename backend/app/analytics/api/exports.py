@@ -10,6 +10,8 @@ GCS, and emails a signed download URL.
 """
 from __future__ import annotations
 
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -54,20 +56,22 @@ async def request_export(
             detail="A verified email is required to receive the export link",
         )
 
-    publish_analytics_export(
+    # The 202 promises the export is queued, so wait for the ack — on the loop.
+    await asyncio.wrap_future(publish_analytics_export(
         "analytics.export_requested",
         {
             "tenant_id": str(tenant.id),
             "club_id": str(body.club_id),
             "report_type": body.report_type.value,
             "format": body.format.value,
+            "gzip": body.gzip,
             "basis": body.basis.value,
             "date_from": body.date_from.isoformat() if body.date_from else None,
             "date_to": body.date_to.isoformat() if body.date_to else None,
             "requested_by_user_id": str(current_user.id),
             "recipient_email": current_user.email,
         },
-    )
+    ))
 
     return ExportAccepted(
         report_type=body.report_type,
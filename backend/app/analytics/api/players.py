@@ -12,19 +12,28 @@ Per-player reports (workstream B) off ``mv_player_value``:
   * GET /clubs/{id}/most-active       — most-active players (?window_days=30|90)
   * GET /clubs/{id}/inactive-members  — paid members idle >= ?inactive_days
 
+These page with ``?cursor=`` (the previous page's ``next_cursor``), which seeks
+rather than skips, so deep pages cost the same as the first. ``?offset=`` still
+works without a cursor.
+
 Club-level flow reports (workstream A) off ``mv_club_active_player_day`` /
 ``mv_club_signups_day``:
   * GET /clubs/{id}/active            — active-players KPI (trailing window)
   * GET /clubs/{id}/active/timeseries — active players per calendar bucket
   * GET /clubs/{id}/signups           — new paid-member sign-ups over time
+
+Responses carry an ETag and are cached until their view's next successful
+refresh (see ``response_cache.py``) — except inactive-members, whose cutoff
+moves with the clock.
 """
 from __future__ import annotations
 
 import uuid
+from contextlib import contextmanager
 from datetime import date, datetime, timedelta, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -42,6 +51,9 @@ from app.analytics.schemas.player_flow import (
     FlowGranularity,
     SignupsTimeseries,
 )
+from app.analytics.api.response_cache import cached_response
+from app.analytics.services.generations import get_data_generations
+from app.analytics.services.keyset import InvalidCursor
 from app.analytics.services.player_flow_service import PlayerFlowService
 from app.analytics.services.player_value_service import PlayerValueService
 from app.api.v1.dependencies.auth import require_staff
@@ -55,6 +67,11 @@ router = APIRouter(prefix="/players", tags=["analytics-players"])
 _MAX_RANGE_DAYS = 366
 _DEFAULT_RANGE_DAYS = 30
 
+_PLAYER_VALUE_VIEW = "mv_player_value"
+_PLAYER_RFV_VIEW = "mv_player_rfv"
+_ACTIVE_VIEW = "mv_club_active_player_day"
+_SIGNUPS_VIEW = "mv_club_signups_day"
+
 
 def _resolve_range(date_from: date | None, date_to: date | None) -> tuple[date, date]:
     today = datetime.now(timezone.utc).date()
@@ -87,13 +104,41 @@ async def _load_club(db: AsyncSession, club_id: uuid.UUID, tenant: Tenant) -> Cl
     return club
 
 
+async def _view_generation(db: AsyncSession, view_name: str) -> Optional[datetime]:
+    return await get_data_generations().view(db, view_name)
+
+
+async def _player_rows_generation(db: AsyncSession) -> Optional[tuple[datetime, datetime]]:
+    """Generation of the per-player rows: ``mv_player_value`` LEFT JOIN
+    ``mv_player_rfv``. The RFV view refreshes after the value view, so keying
+    on the value view alone would cache new values with old RFV scores."""
+    value = await _view_generation(db, _PLAYER_VALUE_VIEW)
+    rfv = await _view_generation(db, _PLAYER_RFV_VIEW)
+    if value is None or rfv is None:
+        return None
+    return value, rfv
+
+
+@contextmanager
+def _cursor_errors():
+    """A cursor from another sort/filter (or a mangled one) is a client error."""
+    try:
+        yield
+    except InvalidCursor as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)
+        ) from exc
+
+
 @router.get("/clubs/{club_id}/value", response_model=PlayerValueLeaderboard)
 async def club_player_value(
+    request: Request,
     club_id: uuid.UUID,
     members_only: bool = Query(False),
     sort: PlayerSort = Query(PlayerSort.lifetime_spend),
     limit: int = Query(50, ge=1, le=500),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces offset"),
     _staff=Depends(require_staff),
     tenant: Tenant = Depends(get_tenant),
     db: AsyncSession = Depends(get_read_db),
@@ -101,17 +146,23 @@ async def club_player_value(
     """Per-player lifetime value (net realised spend), highest first.
     ``?members_only=true`` restricts to paid members (the per-member LTV view)."""
     await _load_club(db, club_id, tenant)
-    return await PlayerValueService(db).leaderboard(
-        club_id, members_only, sort, limit, offset
-    )
+    with _cursor_errors():
+        return await cached_response(
+            request, tenant.id, await _player_rows_generation(db),
+            lambda: PlayerValueService(db).leaderboard(
+                club_id, members_only, sort, limit, offset, cursor
+            ),
+        )
 
 
 @router.get("/clubs/{club_id}/most-active", response_model=PlayerActivityLeaderboard)
 async def club_most_active_players(
+    request: Request,
     club_id: uuid.UUID,
     window_days: int = Query(30),
     limit: int = Query(50, ge=1, le=500),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces offset"),
     _staff=Depends(require_staff),
     tenant: Tenant = Depends(get_tenant),
     db: AsyncSession = Depends(get_read_db),
@@ -123,9 +174,13 @@ async def club_most_active_players(
             detail="window_days must be 30 or 90",
         )
     await _load_club(db, club_id, tenant)
-    return await PlayerValueService(db).most_active(
-        club_id, window_days, limit, offset
-    )
+    with _cursor_errors():
+        return await cached_response(
+            request, tenant.id, await _player_rows_generation(db),
+            lambda: PlayerValueService(db).most_active(
+                club_id, window_days, limit, offset, cursor
+            ),
+        )
 
 
 @router.get("/clubs/{club_id}/inactive-members", response_model=InactiveMembersReport)
@@ -134,6 +189,7 @@ async def club_inactive_members(
     inactive_days: int = Query(30, ge=1, le=365),
     limit: int = Query(50, ge=1, le=500),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces offset"),
     _staff=Depends(require_staff),
     tenant: Tenant = Depends(get_tenant),
     db: AsyncSession = Depends(get_read_db),
@@ -141,13 +197,15 @@ async def club_inactive_members(
     """Paid members who have not played within ``inactive_days`` (including those
     who never played) — the non-AI churn-risk list. Longest-gone first."""
     await _load_club(db, club_id, tenant)
-    return await PlayerValueService(db).inactive_members(
-        club_id, inactive_days, limit, offset
-    )
+    with _cursor_errors():
+        return await PlayerValueService(db).inactive_members(
+            club_id, inactive_days, limit, offset, cursor
+        )
 
 
 @router.get("/clubs/{club_id}/value/by-group", response_model=GroupValueReport)
 async def club_player_value_by_group(
+    request: Request,
     club_id: uuid.UUID,
     dimension: GroupDimension = Query(GroupDimension.membership_tier),
     inactive_days: int = Query(30, ge=1, le=365),
@@ -159,8 +217,11 @@ async def club_player_value_by_group(
     group of members". ``inactive_days`` only applies to the ``activity_status``
     dimension (active/lapsed split)."""
     club = await _load_club(db, club_id, tenant)
-    return await PlayerValueService(db).group_value(
-        club_id, dimension, inactive_days, club.currency
+    return await cached_response(
+        request, tenant.id, await _view_generation(db, _PLAYER_VALUE_VIEW),
+        lambda: PlayerValueService(db).group_value(
+            club_id, dimension, inactive_days, club.currency
+        ),
     )
 
 
@@ -171,6 +232,7 @@ async def club_player_value_by_group(
 
 @router.get("/clubs/{club_id}/active", response_model=ActivePlayersKpi)
 async def club_active_players(
+    request: Request,
     club_id: uuid.UUID,
     window_days: int = Query(30, ge=1, le=365),
     as_of: Optional[date] = Query(None),
@@ -182,11 +244,15 @@ async def club_active_players(
     (default today) — the "active players over the last N days" headline."""
     as_of = as_of or datetime.now(timezone.utc).date()
     await _load_club(db, club_id, tenant)
-    return await PlayerFlowService(db).active_kpi(club_id, as_of, window_days)
+    return await cached_response(
+        request, tenant.id, await _view_generation(db, _ACTIVE_VIEW),
+        lambda: PlayerFlowService(db).active_kpi(club_id, as_of, window_days),
+    )
 
 
 @router.get("/clubs/{club_id}/active/timeseries", response_model=ActivePlayersTimeseries)
 async def club_active_players_timeseries(
+    request: Request,
     club_id: uuid.UUID,
     granularity: FlowGranularity = Query(FlowGranularity.week),
     date_from: Optional[date] = Query(None),
@@ -199,13 +265,15 @@ async def club_active_players_timeseries(
     calendar periods, not a trailing window."""
     start, end = _resolve_range(date_from, date_to)
     await _load_club(db, club_id, tenant)
-    return await PlayerFlowService(db).active_timeseries(
-        club_id, granularity, start, end
+    return await cached_response(
+        request, tenant.id, await _view_generation(db, _ACTIVE_VIEW),
+        lambda: PlayerFlowService(db).active_timeseries(club_id, granularity, start, end),
     )
 
 
 @router.get("/clubs/{club_id}/signups", response_model=SignupsTimeseries)
 async def club_member_signups(
+    request: Request,
     club_id: uuid.UUID,
     granularity: FlowGranularity = Query(FlowGranularity.month),
     date_from: Optional[date] = Query(None),
@@ -217,6 +285,7 @@ async def club_member_signups(
     """New paid-member sign-ups over time, plus the range total."""
     start, end = _resolve_range(date_from, date_to)
     await _load_club(db, club_id, tenant)
-    return await PlayerFlowService(db).signups_timeseries(
-        club_id, granularity, start, end
+    return await cached_response(
+        request, tenant.id, await _view_generation(db, _SIGNUPS_VIEW),
+        lambda: PlayerFlowService(db).signups_timeseries(club_id, granularity, start, end),
     )
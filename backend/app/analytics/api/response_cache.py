@@ -0,0 +1,108 @@
+"""
+Response cache and conditional GETs for the analytics read endpoints.
+
+An analytics response is a pure function of the request and its data's
+generation (``app/analytics/services/generations.py``), so both are folded
+into an ETag. A request whose ``If-None-Match`` still matches gets a 304
+without its report being rebuilt; otherwise the serialized body is served
+from a per-process LRU keyed by that ETag, and only a miss runs the queries.
+A refresh, rollup apply or snapshot write moves the generation, which changes
+every affected ETag — earlier entries simply stop matching and age out.
+
+The key also carries the tenant and the current UTC date, since defaulted
+date ranges and ``as_of`` resolve against today. Tenant isolation is still
+checked on every request before the cache is consulted. Display names joined
+in at read time (clubs, players, coaches) can trail a rename until the data's
+next generation.
+
+Responses are marked ``Cache-Control: private, no-cache`` so browsers keep
+them but revalidate with the ETag each time. ``ANALYTICS_RESPONSE_CACHE_MAX_ENTRIES
+= 0`` disables caching and ETags.
+"""
+from __future__ import annotations
+
+import hashlib
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Awaitable, Callable, Hashable, Optional
+
+from fastapi import Request, Response, status
+from pydantic import BaseModel
+
+from app.core.config import get_settings
+
+_CACHE_CONTROL = "private, no-cache"
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._bodies: OrderedDict[str, bytes] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0
+
+    def get(self, etag: str) -> Optional[bytes]:
+        body = self._bodies.get(etag)
+        if body is not None:
+            self._bodies.move_to_end(etag)
+        return body
+
+    def put(self, etag: str, body: bytes) -> None:
+        self._bodies[etag] = body
+        self._bodies.move_to_end(etag)
+        while len(self._bodies) > self._max_entries:
+            self._bodies.popitem(last=False)
+
+    def clear(self) -> None:
+        self._bodies.clear()
+
+
+@lru_cache
+def get_response_cache() -> ResponseCache:
+    return ResponseCache(get_settings().ANALYTICS_RESPONSE_CACHE_MAX_ENTRIES)
+
+
+def response_etag(request: Request, tenant_id: uuid.UUID, generation: Hashable) -> str:
+    key = (
+        str(tenant_id),
+        request.url.path,
+        sorted(request.query_params.multi_items()),
+        datetime.now(timezone.utc).date().isoformat(),
+        generation,
+    )
+    return '"' + hashlib.sha256(repr(key).encode()).hexdigest()[:32] + '"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # Weak comparison, as If-None-Match requires.
+    return any(tag.strip().removeprefix("W/") in ("*", etag) for tag in header.split(","))
+
+
+async def cached_response(
+    request: Request,
+    tenant_id: uuid.UUID,
+    generation: Optional[Hashable],
+    build: Callable[[], Awaitable[BaseModel]],
+) -> Response | BaseModel:
+    """``build()``'s response, or a 304 / cached copy while ``generation``
+    holds. A None generation (data never written) is built and not cached."""
+    cache = get_response_cache()
+    if generation is None or not cache.enabled:
+        return await build()
+
+    etag = response_etag(request, tenant_id, generation)
+    headers = {"ETag": etag, "Cache-Control": _CACHE_CONTROL}
+    if _not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    body = cache.get(etag)
+    if body is None:
+        body = (await build()).model_dump_json().encode()
+        cache.put(etag, body)
+    return Response(content=body, media_type="application/json", headers=headers)
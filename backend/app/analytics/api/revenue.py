@@ -17,7 +17,7 @@ import uuid
 from datetime import date, datetime, timedelta, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -29,6 +29,8 @@ from app.analytics.schemas.revenue import (
     RevenueBasis,
     TenantRevenueComparison,
 )
+from app.analytics.api.response_cache import cached_response
+from app.analytics.services.generations import REVENUE_ROLLUPS, get_data_generations
 from app.analytics.services.revenue_service import RevenueService
 from app.api.v1.dependencies.auth import require_staff
 from app.api.v1.dependencies.tenant import get_tenant
@@ -73,8 +75,13 @@ async def _load_club(db: AsyncSession, club_id: uuid.UUID, tenant: Tenant) -> Cl
     return club
 
 
+async def _club_generation(db: AsyncSession, club_id: uuid.UUID) -> int:
+    return await get_data_generations().club(db, REVENUE_ROLLUPS, club_id)
+
+
 @router.get("/clubs/{club_id}/timeseries", response_model=ClubRevenueTimeseries)
 async def club_revenue_timeseries(
+    request: Request,
     club_id: uuid.UUID,
     granularity: Granularity = Query(Granularity.day),
     basis: RevenueBasis = Query(RevenueBasis.service),
@@ -87,13 +94,15 @@ async def club_revenue_timeseries(
     """Net/gross/refund revenue over time for a club, bucketed by granularity."""
     start, end = _resolve_range(date_from, date_to)
     await _load_club(db, club_id, tenant)
-    return await RevenueService(db).timeseries(
-        club_id, basis, granularity, start, end
+    return await cached_response(
+        request, tenant.id, await _club_generation(db, club_id),
+        lambda: RevenueService(db).timeseries(club_id, basis, granularity, start, end),
     )
 
 
 @router.get("/clubs/{club_id}/by-type", response_model=ClubRevenueByType)
 async def club_revenue_by_type(
+    request: Request,
     club_id: uuid.UUID,
     basis: RevenueBasis = Query(RevenueBasis.service),
     date_from: Optional[date] = Query(None),
@@ -105,11 +114,15 @@ async def club_revenue_by_type(
     """Revenue split across the six revenue types over the date range."""
     start, end = _resolve_range(date_from, date_to)
     await _load_club(db, club_id, tenant)
-    return await RevenueService(db).by_type(club_id, basis, start, end)
+    return await cached_response(
+        request, tenant.id, await _club_generation(db, club_id),
+        lambda: RevenueService(db).by_type(club_id, basis, start, end),
+    )
 
 
 @router.get("/clubs/{club_id}/summary", response_model=ClubRevenueSummary)
 async def club_revenue_summary(
+    request: Request,
     club_id: uuid.UUID,
     basis: RevenueBasis = Query(RevenueBasis.service),
     date_from: Optional[date] = Query(None),
@@ -121,11 +134,15 @@ async def club_revenue_summary(
     """KPI block for a club: gross / refunds / net / per-type / avg-per-transaction."""
     start, end = _resolve_range(date_from, date_to)
     await _load_club(db, club_id, tenant)
-    return await RevenueService(db).summary(club_id, basis, start, end)
+    return await cached_response(
+        request, tenant.id, await _club_generation(db, club_id),
+        lambda: RevenueService(db).summary(club_id, basis, start, end),
+    )
 
 
 @router.get("/clubs", response_model=TenantRevenueComparison)
 async def tenant_revenue_comparison(
+    request: Request,
     basis: RevenueBasis = Query(RevenueBasis.service),
     date_from: Optional[date] = Query(None),
     date_to: Optional[date] = Query(None),
@@ -136,4 +153,7 @@ async def tenant_revenue_comparison(
     """Tenant-wide per-club comparison — the multi-site ROI view. Clubs with no
     revenue in the window still appear with zeroed totals."""
     start, end = _resolve_range(date_from, date_to)
-    return await RevenueService(db).cross_club(tenant.id, basis, start, end)
+    return await cached_response(
+        request, tenant.id, await get_data_generations().tenant(db, REVENUE_ROLLUPS, tenant.id),
+        lambda: RevenueService(db).cross_club(tenant.id, basis, start, end),
+    )
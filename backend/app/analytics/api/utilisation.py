@@ -1,8 +1,8 @@
 """
 Court-utilisation analytics endpoints (Sprint 7 / G7).
 
-All routes read ``court_utilisation_snapshots`` only — never live ``bookings`` —
-off the read replica, and are scoped to the caller's tenant. The snapshot table
+All routes read ``court_utilisation_snapshots`` (and its rollups) only — never
+live ``bookings`` — off the read replica, and are scoped to the caller's tenant. The snapshot table
 is populated by ``app/analytics/workers/snapshot_court_utilisation.py``.
 
 Final paths: ``/api/v1/analytics/utilisation/...``
@@ -10,6 +10,15 @@ Final paths: ``/api/v1/analytics/utilisation/...``
 Aggregation note: percentages are always recomputed as ``SUM(booked)/SUM(total)``
 over the grouped rows, never averaged from per-row percentages — averaging
 percentages across windows of different sizes is wrong (Simpson's paradox).
+
+The courts report and heatmap answer the whole months / ISO weeks of a range
+from ``court_utilisation_court_months`` / ``court_utilisation_week_hours`` and
+only the partial periods at its edges from raw snapshot rows, so a year reads
+one row per court-month (courts) or week-hour (heatmap) instead of every
+court's daily or hourly snapshot.
+
+Responses carry an ETag and are cached until the snapshot worker next changes
+the club's rows — see ``response_cache.py``.
 """
 from __future__ import annotations
 
@@ -17,8 +26,8 @@ import uuid
 from datetime import date, datetime, timedelta, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import Numeric, cast, func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import Numeric, Select, Subquery, cast, func, select, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.analytics.schemas.utilisation import (
@@ -29,9 +38,22 @@ from app.analytics.schemas.utilisation import (
     DailyUtilisationPoint,
     HeatmapCell,
 )
+from app.analytics.api.response_cache import cached_response
+from app.analytics.services.generations import COURT_UTILISATION, get_data_generations
+from app.analytics.services.utilisation_rollups import (
+    month_end,
+    month_start,
+    split_range,
+    week_end,
+    week_start,
+)
 from app.api.v1.dependencies.auth import require_staff
 from app.api.v1.dependencies.tenant import get_tenant
-from app.db.models.analytics import CourtUtilisationSnapshot
+from app.db.models.analytics import (
+    CourtUtilisationCourtMonth,
+    CourtUtilisationSnapshot,
+    CourtUtilisationWeekHour,
+)
 from app.db.models.club import Club
 from app.db.models.court import Court
 from app.db.models.tenant import Tenant
@@ -51,6 +73,12 @@ def _pct(booked, total):
     )
 
 
+def _stitched(parts: list[Select]) -> Subquery:
+    """The rows of every part as one relation: whole periods from a rollup
+    plus the edge days from raw snapshots (see ``utilisation_rollups``)."""
+    return (parts[0] if len(parts) == 1 else union_all(*parts)).subquery()
+
+
 def _resolve_range(date_from: date | None, date_to: date | None) -> tuple[date, date]:
     today = datetime.now(timezone.utc).date()
     end = date_to or today
@@ -82,8 +110,13 @@ async def _load_club(db: AsyncSession, club_id: uuid.UUID, tenant: Tenant) -> Cl
     return club
 
 
+async def _club_generation(db: AsyncSession, club_id: uuid.UUID) -> int:
+    return await get_data_generations().club(db, COURT_UTILISATION, club_id)
+
+
 @router.get("/clubs/{club_id}/daily", response_model=ClubDailyUtilisation)
 async def club_daily_utilisation(
+    request: Request,
     club_id: uuid.UUID,
     date_from: Optional[date] = Query(None),
     date_to: Optional[date] = Query(None),
@@ -94,7 +127,15 @@ async def club_daily_utilisation(
     """Daily utilisation for a club, summed across its courts (one point per day)."""
     start, end = _resolve_range(date_from, date_to)
     await _load_club(db, club_id, tenant)
+    return await cached_response(
+        request, tenant.id, await _club_generation(db, club_id),
+        lambda: _daily(db, club_id, start, end),
+    )
 
+
+async def _daily(
+    db: AsyncSession, club_id: uuid.UUID, start: date, end: date
+) -> ClubDailyUtilisation:
     snap = CourtUtilisationSnapshot
     rows = (
         await db.execute(
@@ -135,6 +176,7 @@ async def club_daily_utilisation(
 
 @router.get("/clubs/{club_id}/courts", response_model=ClubCourtsUtilisation)
 async def club_courts_utilisation(
+    request: Request,
     club_id: uuid.UUID,
     date_from: Optional[date] = Query(None),
     date_to: Optional[date] = Query(None),
@@ -146,28 +188,62 @@ async def club_courts_utilisation(
     busiest and most underused courts at a glance."""
     start, end = _resolve_range(date_from, date_to)
     await _load_club(db, club_id, tenant)
+    return await cached_response(
+        request, tenant.id, await _club_generation(db, club_id),
+        lambda: _courts(db, club_id, start, end),
+    )
 
+
+async def _courts(
+    db: AsyncSession, club_id: uuid.UUID, start: date, end: date
+) -> ClubCourtsUtilisation:
     snap = CourtUtilisationSnapshot
+    months = CourtUtilisationCourtMonth
+    split = split_range(start, end, month_start, month_end)
+    parts = [
+        select(
+            snap.court_id,
+            snap.total_slots,
+            snap.booked_slots,
+            snap.revenue_actual,
+            snap.revenue_potential,
+        ).where(
+            snap.club_id == club_id,
+            snap.hour_of_day.is_(None),
+            snap.snapshot_date >= edge_from,
+            snap.snapshot_date <= edge_to,
+        )
+        for edge_from, edge_to in split.edges
+    ]
+    if split.periods:
+        parts.append(
+            select(
+                months.court_id,
+                months.total_slots,
+                months.booked_slots,
+                months.revenue_actual,
+                months.revenue_potential,
+            ).where(
+                months.club_id == club_id,
+                months.month_start >= split.periods[0],
+                months.month_start <= split.periods[1],
+            )
+        )
+    u = _stitched(parts)
     rows = (
         await db.execute(
             select(
                 Court.id,
                 Court.name,
-                func.sum(snap.total_slots),
-                func.sum(snap.booked_slots),
-                func.sum(snap.revenue_actual),
-                func.sum(snap.revenue_potential),
-                _pct(snap.booked_slots, snap.total_slots),
-            )
-            .join(snap, snap.court_id == Court.id)
-            .where(
-                snap.club_id == club_id,
-                snap.hour_of_day.is_(None),
-                snap.snapshot_date >= start,
-                snap.snapshot_date <= end,
+                func.sum(u.c.total_slots),
+                func.sum(u.c.booked_slots),
+                func.sum(u.c.revenue_actual),
+                func.sum(u.c.revenue_potential),
+                _pct(u.c.booked_slots, u.c.total_slots),
             )
+            .join(u, u.c.court_id == Court.id)
             .group_by(Court.id, Court.name)
-            .order_by(func.sum(snap.booked_slots).desc())
+            .order_by(func.sum(u.c.booked_slots).desc())
         )
     ).all()
 
@@ -190,6 +266,7 @@ async def club_courts_utilisation(
 
 @router.get("/clubs/{club_id}/heatmap", response_model=ClubUtilisationHeatmap)
 async def club_utilisation_heatmap(
+    request: Request,
     club_id: uuid.UUID,
     date_from: Optional[date] = Query(None),
     date_to: Optional[date] = Query(None),
@@ -201,25 +278,51 @@ async def club_utilisation_heatmap(
     booking heatmap that reveals peak and dead hours."""
     start, end = _resolve_range(date_from, date_to)
     await _load_club(db, club_id, tenant)
+    return await cached_response(
+        request, tenant.id, await _club_generation(db, club_id),
+        lambda: _heatmap(db, club_id, start, end),
+    )
+
 
+async def _heatmap(
+    db: AsyncSession, club_id: uuid.UUID, start: date, end: date
+) -> ClubUtilisationHeatmap:
     snap = CourtUtilisationSnapshot
+    weeks = CourtUtilisationWeekHour
+    split = split_range(start, end, week_start, week_end)
+    parts = [
+        select(
+            snap.day_of_week, snap.hour_of_day, snap.total_slots, snap.booked_slots
+        ).where(
+            snap.club_id == club_id,
+            snap.hour_of_day.is_not(None),  # hourly rows only
+            snap.snapshot_date >= edge_from,
+            snap.snapshot_date <= edge_to,
+        )
+        for edge_from, edge_to in split.edges
+    ]
+    if split.periods:
+        parts.append(
+            select(
+                weeks.day_of_week, weeks.hour_of_day, weeks.total_slots, weeks.booked_slots
+            ).where(
+                weeks.club_id == club_id,
+                weeks.week_start >= split.periods[0],
+                weeks.week_start <= split.periods[1],
+            )
+        )
+    u = _stitched(parts)
     rows = (
         await db.execute(
             select(
-                snap.day_of_week,
-                snap.hour_of_day,
-                func.sum(snap.total_slots),
-                func.sum(snap.booked_slots),
-                _pct(snap.booked_slots, snap.total_slots),
-            )
-            .where(
-                snap.club_id == club_id,
-                snap.hour_of_day.is_not(None),  # hourly rows only
-                snap.snapshot_date >= start,
-                snap.snapshot_date <= end,
+                u.c.day_of_week,
+                u.c.hour_of_day,
+                func.sum(u.c.total_slots),
+                func.sum(u.c.booked_slots),
+                _pct(u.c.booked_slots, u.c.total_slots),
             )
-            .group_by(snap.day_of_week, snap.hour_of_day)
-            .order_by(snap.day_of_week, snap.hour_of_day)
+            .group_by(u.c.day_of_week, u.c.hour_of_day)
+            .order_by(u.c.day_of_week, u.c.hour_of_day)
         )
     ).all()
 
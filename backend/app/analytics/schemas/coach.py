@@ -60,3 +60,5 @@ class CoachPopularityLeaderboard(BaseModel):
     offset: int
     total_records: int  # total coaches with at least one session (pre-pagination)
     rows: list[CoachPopularityRow]
+    # Pass as ?cursor= for the next page; None on the last page.
+    next_cursor: Optional[str] = None
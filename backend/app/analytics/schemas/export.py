@@ -53,6 +53,8 @@ class ExportRequest(BaseModel):
     date_from: Optional[date] = None
     date_to: Optional[date] = None
     basis: RevenueBasis = RevenueBasis.service
+    # CSV only: deliver a .csv.gz. XLSX files are already zip-compressed.
+    gzip: bool = False
 
 
 class ExportAccepted(BaseModel):
@@ -89,6 +89,8 @@ class PlayerValueLeaderboard(BaseModel):
     offset: int
     total_records: int  # total players matching the filter (pre-pagination)
     rows: list[PlayerValueRow]
+    # Pass as ?cursor= for the next page; None on the last page.
+    next_cursor: Optional[str] = None
 
 
 class PlayerActivityLeaderboard(BaseModel):
@@ -100,6 +102,8 @@ class PlayerActivityLeaderboard(BaseModel):
     offset: int
     total_records: int  # total active players in the window (pre-pagination)
     rows: list[PlayerValueRow]
+    # Pass as ?cursor= for the next page; None on the last page.
+    next_cursor: Optional[str] = None
 
 
 class InactiveMembersReport(BaseModel):
@@ -116,6 +120,8 @@ class InactiveMembersReport(BaseModel):
     limit: int
     offset: int
     rows: list[PlayerValueRow]
+    # Pass as ?cursor= for the next page; None on the last page.
+    next_cursor: Optional[str] = None
 
 
 class GroupValueRow(BaseModel):
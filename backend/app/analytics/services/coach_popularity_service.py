@@ -17,14 +17,13 @@ from __future__ import annotations
 
 import uuid
 from decimal import Decimal
+from typing import Optional
 
 from sqlalchemy import (
     Float,
     cast,
     column,
-    desc,
     func,
-    nullslast,
     select,
     table,
 )
@@ -35,9 +34,13 @@ from app.analytics.schemas.coach import (
     CoachPopularityRow,
     CoachSort,
 )
+from app.analytics.services.keyset import SortKey, fetch_page
+from app.analytics.services.totals_cache import get_totals_cache
 from app.db.models.staff import StaffProfile
 from app.db.models.user import User
 
+_VIEW = "mv_coach_popularity"
+
 _COLUMNS = (
     "club_id",
     "staff_profile_id",
@@ -57,7 +60,7 @@ _COLUMNS = (
 def _mv():
     """Lightweight read-only handle on the materialized view. Uses ``table()``
     (not an ORM model) so Alembic autogenerate never tries to manage the view."""
-    return table("mv_coach_popularity", *(column(c) for c in _COLUMNS))
+    return table(_VIEW, *(column(c) for c in _COLUMNS))
 
 
 def _d(value) -> Decimal:
@@ -129,38 +132,40 @@ class CoachPopularityService:
         club_id: uuid.UUID,
         sort: CoachSort,
         limit: int,
-        offset: int,
+        offset: int = 0,
+        cursor: Optional[str] = None,
     ) -> CoachPopularityLeaderboard:
         """Coaches ranked by the chosen metric, highest first."""
         mv = self.mv
-        order = {
-            CoachSort.sessions: desc(mv.c.sessions),
-            CoachSort.distinct_players: desc(mv.c.distinct_players),
-            CoachSort.repeat_players: desc(mv.c.repeat_players),
-            CoachSort.return_rate: nullslast(desc(self._return_rate_expr())),
-            CoachSort.lesson_revenue: desc(mv.c.lesson_revenue),
-            CoachSort.last_session_at: nullslast(desc(mv.c.last_session_at)),
+        key = {
+            CoachSort.sessions: SortKey(mv.c.sessions),
+            CoachSort.distinct_players: SortKey(mv.c.distinct_players),
+            CoachSort.repeat_players: SortKey(mv.c.repeat_players),
+            CoachSort.return_rate: SortKey(self._return_rate_expr(), nulls_first=False),
+            CoachSort.lesson_revenue: SortKey(mv.c.lesson_revenue),
+            CoachSort.last_session_at: SortKey(mv.c.last_session_at, nulls_first=False),
         }[sort]
 
-        total_records = (
-            await self.db.execute(
-                select(func.count()).select_from(mv).where(mv.c.club_id == club_id)
-            )
-        ).scalar_one()
-
-        stmt = (
-            self._select_row()
-            .where(mv.c.club_id == club_id)
-            .order_by(order, mv.c.staff_profile_id)
-            .limit(limit)
-            .offset(offset)
+        total_records = await get_totals_cache().total(
+            self.db, _VIEW, (club_id,),
+            select(func.count()).select_from(mv).where(mv.c.club_id == club_id),
+        )
+        rows, next_cursor = await fetch_page(
+            self.db,
+            self._select_row().where(mv.c.club_id == club_id),
+            key,
+            mv.c.staff_profile_id,
+            scope=f"coaches.popularity:{sort.value}",
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
         )
-        rows = (await self.db.execute(stmt)).all()
         return CoachPopularityLeaderboard(
             club_id=club_id,
             sort=sort,
             limit=limit,
             offset=offset,
-            total_records=int(total_records or 0),
+            total_records=total_records,
             rows=[self._to_row(r) for r in rows],
+            next_cursor=next_cursor,
         )
@@ -6,7 +6,9 @@ Two layers live here:
 1. A **pure** computation core (``compute_court_day_snapshots``) that turns a
    day's bookings, operating hours, pricing rules and calendar reservations into
    ``court_utilisation_snapshots`` rows. It touches no database, so it is unit
-   testable without fixtures.
+   testable without fixtures. ``compute_club_range_snapshots`` is its batch
+   form for a club's whole date range (what the worker runs); the per-day
+   function is kept as the reference the batch form is tested against.
 
 2. ``CourtUtilisationService`` — an async wrapper that fetches the inputs from
    the **read replica**, calls the pure core, and exposes read queries for the
@@ -29,10 +31,12 @@ Design notes
 """
 from __future__ import annotations
 
+from bisect import bisect_left
 from dataclasses import dataclass
 from datetime import date as DateType, datetime, time as TimeType, timedelta
 from decimal import Decimal
-from typing import Iterable, Iterator, Optional, Sequence
+from itertools import accumulate
+from typing import Iterable, Iterator, Mapping, Optional, Sequence
 from uuid import UUID
 from zoneinfo import ZoneInfo
 
@@ -40,8 +44,9 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.booking import Booking, BookingStatus
-from app.db.models.club import Club, OperatingHours, PricingRule
+from app.db.models.club import Club, OperatingHours
 from app.db.models.court import CalendarReservation, Court
+from app.services.pricing_table import PricingTable, load_pricing_table
 
 # A slot is "occupied" by a revenue-bearing booking in these states. Pending
 # holds expire and cancelled slots are free again, so neither counts.
@@ -50,6 +55,9 @@ OCCUPYING_STATUSES: frozenset[BookingStatus] = frozenset(
 )
 
 _ZERO = Decimal("0")
+_UTC = ZoneInfo("UTC")
+_WALL_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
 
 
 # ---------------------------------------------------------------------------
@@ -65,6 +73,9 @@ class OperatingWindow:
 
 @dataclass(frozen=True)
 class PricingWindow:
+    """A bare ``regular`` rule, valid all year — ``PricingTable.compile`` input
+    for callers without ``PricingRule`` rows (tests, the activity seeder)."""
+
     day_of_week: int
     start_time: TimeType
     end_time: TimeType
@@ -104,15 +115,11 @@ def _utilisation_pct(booked: int, total: int) -> Decimal:
     return (Decimal(booked) / Decimal(total) * Decimal(100)).quantize(Decimal("0.01"))
 
 
-def _price_for(slot_start: datetime, pricing: Sequence[PricingWindow]) -> Decimal:
-    """Base ``price_per_slot`` for the slot's local start time, or 0 if no rule
-    matches. Mirrors PricingService rule selection (day_of_week + start<=t<end)."""
-    dow = slot_start.weekday()
-    t = slot_start.time()
-    for rule in pricing:
-        if rule.day_of_week == dow and rule.start_time <= t < rule.end_time:
-            return Decimal(str(rule.price_per_slot))
-    return _ZERO
+def _price_for(slot_start: datetime, pricing: PricingTable) -> Decimal:
+    """Base ``price_per_slot`` for the slot's local start, or 0 if no rule
+    matches — the same compiled lookup quotes and availability use."""
+    slot = pricing.lookup(slot_start)
+    return slot.base_price if slot is not None else _ZERO
 
 
 def iter_bookable_slots(
@@ -151,70 +158,25 @@ def iter_bookable_slots(
             slot_start = slot_end
 
 
-def compute_court_day_snapshots(
-    *,
-    snapshot_date: DateType,
-    tz: ZoneInfo,
-    booking_duration_minutes: int,
-    windows: Iterable[OperatingWindow],
-    pricing: Sequence[PricingWindow],
-    bookings: Sequence[BookingInput],
-    reservations: Sequence[ReservationInput],
-) -> list[SnapshotRow]:
-    """Compute hourly + daily-rollup snapshot rows for one court on one day.
-
-    Returns an empty list when the club is closed that day (no operating
-    window) — there is nothing to snapshot.
-    """
-    day_of_week = snapshot_date.weekday()
-
-    # Bucket accumulators keyed by hour-of-day.
-    @dataclass
-    class _Bucket:
-        total_slots: int = 0
-        booked_slots: int = 0
-        revenue_actual: Decimal = _ZERO
-        revenue_potential: Decimal = _ZERO
-        lead_time_sum: Decimal = _ZERO
-        lead_time_n: int = 0
-
-    buckets: dict[int, _Bucket] = {}
-
-    # Index bookings by the hour their (occupying) start falls in.
-    occupying = [b for b in bookings if b.status in OCCUPYING_STATUSES]
+@dataclass
+class _Bucket:
+    """Accumulator for one hour of one court-day."""
 
-    for slot_start, slot_end in iter_bookable_slots(
-        snapshot_date=snapshot_date,
-        tz=tz,
-        booking_duration_minutes=booking_duration_minutes,
-        windows=windows,
-        reservations=reservations,
-    ):
-        bucket = buckets.setdefault(slot_start.hour, _Bucket())
-        bucket.total_slots += 1
-        bucket.revenue_potential += _price_for(slot_start, pricing)
+    total_slots: int = 0
+    booked_slots: int = 0
+    revenue_actual: Decimal = _ZERO
+    revenue_potential: Decimal = _ZERO
+    lead_time_sum: Decimal = _ZERO
+    lead_time_n: int = 0
 
-        # Slot-anchored: a booking belongs to the slot its start falls in.
-        slot_bookings = [
-            b for b in occupying if slot_start <= b.start_local < slot_end
-        ]
-        if slot_bookings:
-            bucket.booked_slots += 1
-            for b in slot_bookings:
-                if b.total_price is not None:
-                    bucket.revenue_actual += Decimal(str(b.total_price))
-                if b.created_at is not None:
-                    lead_h = (
-                        b.start_local.astimezone(b.created_at.tzinfo)
-                        - b.created_at
-                    ).total_seconds() / 3600.0
-                    if lead_h >= 0:
-                        bucket.lead_time_sum += Decimal(str(lead_h))
-                        bucket.lead_time_n += 1
 
+def _rows_for_day(snapshot_date: DateType, buckets: dict[int, _Bucket]) -> list[SnapshotRow]:
+    """Hourly rows in hour order, then the daily rollup. Empty when no slot
+    was bookable (closed, or fully reserved) — there is nothing to snapshot."""
     if not buckets:
         return []
 
+    day_of_week = snapshot_date.weekday()
     rows: list[SnapshotRow] = []
     day = _Bucket()
     for hour in sorted(buckets):
@@ -264,6 +226,175 @@ def compute_court_day_snapshots(
     return rows
 
 
+def compute_court_day_snapshots(
+    *,
+    snapshot_date: DateType,
+    tz: ZoneInfo,
+    booking_duration_minutes: int,
+    windows: Iterable[OperatingWindow],
+    pricing: PricingTable,
+    bookings: Sequence[BookingInput],
+    reservations: Sequence[ReservationInput],
+) -> list[SnapshotRow]:
+    """Compute hourly + daily-rollup snapshot rows for one court on one day.
+
+    Returns an empty list when the club is closed that day (no operating
+    window) — there is nothing to snapshot.
+    """
+    buckets: dict[int, _Bucket] = {}
+
+    # Index bookings by the hour their (occupying) start falls in.
+    occupying = [b for b in bookings if b.status in OCCUPYING_STATUSES]
+
+    for slot_start, slot_end in iter_bookable_slots(
+        snapshot_date=snapshot_date,
+        tz=tz,
+        booking_duration_minutes=booking_duration_minutes,
+        windows=windows,
+        reservations=reservations,
+    ):
+        bucket = buckets.setdefault(slot_start.hour, _Bucket())
+        bucket.total_slots += 1
+        bucket.revenue_potential += _price_for(slot_start, pricing)
+
+        # Slot-anchored: a booking belongs to the slot its start falls in.
+        slot_bookings = [
+            b for b in occupying if slot_start <= b.start_local < slot_end
+        ]
+        if slot_bookings:
+            bucket.booked_slots += 1
+            for b in slot_bookings:
+                if b.total_price is not None:
+                    bucket.revenue_actual += Decimal(str(b.total_price))
+                if b.created_at is not None:
+                    lead_h = (
+                        b.start_local.astimezone(b.created_at.tzinfo)
+                        - b.created_at
+                    ).total_seconds() / 3600.0
+                    if lead_h >= 0:
+                        bucket.lead_time_sum += Decimal(str(lead_h))
+                        bucket.lead_time_n += 1
+
+    return _rows_for_day(snapshot_date, buckets)
+
+
+def compute_club_range_snapshots(
+    *,
+    tz: ZoneInfo,
+    booking_duration_minutes: int,
+    windows_by_day: Mapping[DateType, Sequence[OperatingWindow]],
+    pricing: PricingTable,
+    court_ids: Sequence[UUID],
+    bookings_by_court: Mapping[UUID, Sequence[BookingInput]],
+    reservations_by_court: Mapping[Optional[UUID], Sequence[ReservationInput]],
+) -> dict[UUID, list[SnapshotRow]]:
+    """Batch form of ``compute_court_day_snapshots`` for a club's date range.
+
+    Returns, per court, exactly the rows ``compute_court_day_snapshots`` gives
+    for each day in ``windows_by_day`` (in date order). Bookings and
+    reservations are per court for the whole range, not per day; reservations
+    under the ``None`` key are club-wide and block every court.
+
+    The slot grid is generated and priced once for all courts. Bookings and
+    reservations are sorted by wall-clock key and matched to slots by
+    bisection, so a court's range costs O((slots + bookings) log n) rather
+    than rescanning every booking and reservation for every slot.
+    ``compute_court_day_snapshots`` stays the reference implementation; the
+    two are property-tested against each other.
+    """
+    # (day, hour, start key, end key, price) per slot, before reservations.
+    grid = []
+    for day in sorted(windows_by_day):
+        for slot_start, slot_end in iter_bookable_slots(
+            snapshot_date=day,
+            tz=tz,
+            booking_duration_minutes=booking_duration_minutes,
+            windows=windows_by_day[day],
+            reservations=(),
+        ):
+            grid.append((
+                day,
+                slot_start.hour,
+                _wall_key(slot_start, tz),
+                _wall_key(slot_end, tz),
+                _price_for(slot_start, pricing),
+            ))
+
+    club_wide = list(reservations_by_court.get(None, ()))
+    by_court: dict[UUID, list[SnapshotRow]] = {}
+    for court_id in court_ids:
+        # A slot [s, e) is blocked when some reservation starts before e and
+        # ends after s: bisect the starts, then check the furthest end so far.
+        reservations = sorted(
+            (_wall_key(r.start_local, tz), _wall_key(r.end_local, tz))
+            for r in [*reservations_by_court.get(court_id, ()), *club_wide]
+        )
+        reservation_starts = [start for start, _ in reservations]
+        reach = list(accumulate((end for _, end in reservations), max))
+
+        occupying = sorted(
+            (
+                (_wall_key(b.start_local, tz), b)
+                for b in bookings_by_court.get(court_id, ())
+                if b.status in OCCUPYING_STATUSES
+            ),
+            key=lambda keyed: keyed[0],
+        )
+        booking_starts = [key for key, _ in occupying]
+        revenue = [
+            Decimal(str(b.total_price)) if b.total_price is not None else None
+            for _, b in occupying
+        ]
+        lead_times = [_lead_time_h(b) for _, b in occupying]
+
+        days: dict[DateType, dict[int, _Bucket]] = {}
+        for day, hour, start, end, price in grid:
+            blocked = bisect_left(reservation_starts, end)
+            if blocked and reach[blocked - 1] > start:
+                continue
+            bucket = days.setdefault(day, {}).setdefault(hour, _Bucket())
+            bucket.total_slots += 1
+            bucket.revenue_potential += price
+
+            first = bisect_left(booking_starts, start)
+            last = bisect_left(booking_starts, end, first)
+            if first < last:
+                bucket.booked_slots += 1
+                for i in range(first, last):
+                    if revenue[i] is not None:
+                        bucket.revenue_actual += revenue[i]
+                    if lead_times[i] is not None:
+                        bucket.lead_time_sum += lead_times[i]
+                        bucket.lead_time_n += 1
+
+        by_court[court_id] = [
+            row for day, buckets in days.items() for row in _rows_for_day(day, buckets)
+        ]
+    return by_court
+
+
+def _wall_key(dt: datetime, tz: ZoneInfo) -> int:
+    """``dt``'s wall-clock time in ``tz`` as integer microseconds.
+
+    Aware datetimes sharing a tzinfo compare by wall clock, which is how the
+    per-day path compares slots, bookings and reservations; these keys order
+    the same way.
+    """
+    if dt.tzinfo is not tz:
+        dt = dt.astimezone(tz)
+    return (dt.replace(tzinfo=None) - _WALL_EPOCH) // _MICROSECOND
+
+
+def _lead_time_h(booking: BookingInput) -> Optional[Decimal]:
+    if booking.created_at is None:
+        return None
+    lead_h = (
+        booking.start_local.astimezone(booking.created_at.tzinfo)
+        - booking.created_at
+    ).total_seconds() / 3600.0
+    return Decimal(str(lead_h)) if lead_h >= 0 else None
+
+
 # ---------------------------------------------------------------------------
 # Async service — fetches inputs from the read replica, exposes read queries
 # ---------------------------------------------------------------------------
@@ -285,79 +416,106 @@ class CourtUtilisationService:
     ) -> list[SnapshotRow]:
         """Fetch this court's inputs for ``snapshot_date`` and compute rows.
 
-        Used by the worker. ``club`` carries ``timezone`` and
-        ``booking_duration_minutes``; both are read here, not re-queried.
+        ``club`` carries ``timezone`` and ``booking_duration_minutes``; both
+        are read here, not re-queried.
         """
-        tz = ZoneInfo(club.timezone)
-        day_of_week = snapshot_date.weekday()
-
-        # Day boundaries in club-local time, expressed as UTC for the query.
-        day_start_local = datetime.combine(snapshot_date, TimeType.min, tzinfo=tz)
-        day_end_local = day_start_local + timedelta(days=1)
-        day_start_utc = day_start_local.astimezone(ZoneInfo("UTC"))
-        day_end_utc = day_end_local.astimezone(ZoneInfo("UTC"))
-
-        windows = [
-            OperatingWindow(oh.open_time, oh.close_time)
-            for oh in await self._operating_hours(club.id, snapshot_date, day_of_week)
-        ]
-        if not windows:
-            return []
+        by_court = await self.gather_club_range(
+            club=club,
+            date_from=snapshot_date,
+            date_to=snapshot_date,
+            court_ids=[court_id],
+        )
+        return by_court[court_id]
 
-        pricing = [
-            PricingWindow(pr.day_of_week, pr.start_time, pr.end_time,
-                          Decimal(str(pr.price_per_slot)))
-            for pr in await self._pricing_rules(club.id, snapshot_date, day_of_week)
-        ]
+    async def gather_club_range(
+        self,
+        *,
+        club: Club,
+        date_from: DateType,
+        date_to: DateType,
+        court_ids: Optional[Sequence[UUID]] = None,
+    ) -> dict[UUID, list[SnapshotRow]]:
+        """Compute rows for every court (default: the club's active courts) on
+        every date in ``date_from..date_to``, keyed by court.
+
+        Used by the worker. Inputs for the whole range are fetched with one
+        query each — operating hours, pricing, bookings, reservations — and
+        computed in one pass by ``compute_club_range_snapshots``, so the query
+        count does not grow with the number of courts or days.
+        """
+        if court_ids is None:
+            court_ids = [court.id for court in await self.active_courts(club.id)]
+        by_court: dict[UUID, list[SnapshotRow]] = {court_id: [] for court_id in court_ids}
+        if not court_ids or date_to < date_from:
+            return by_court
 
-        booking_rows = (
-            await self.db.execute(
-                select(Booking).where(
-                    Booking.court_id == court_id,
-                    Booking.start_datetime >= day_start_utc,
-                    Booking.start_datetime < day_end_utc,
-                )
+        tz = ZoneInfo(club.timezone)
+        days = [date_from + timedelta(days=n) for n in range((date_to - date_from).days + 1)]
+        # Range boundaries in club-local time, expressed as UTC for the queries.
+        range_start_utc = datetime.combine(date_from, TimeType.min, tzinfo=tz).astimezone(_UTC)
+        range_end_utc = datetime.combine(
+            date_to + timedelta(days=1), TimeType.min, tzinfo=tz
+        ).astimezone(_UTC)
+
+        hours = await self._operating_hours_between(club.id, date_from, date_to)
+        windows_by_day = {day: _windows_on(hours, day) for day in days}
+        if not any(windows_by_day.values()):
+            return by_court
+
+        pricing = await load_pricing_table(self.db, club.id)
+
+        bookings: dict[UUID, list[BookingInput]] = {}
+        booking_rows = await self.db.execute(
+            select(
+                Booking.court_id,
+                Booking.start_datetime,
+                Booking.status,
+                Booking.total_price,
+                Booking.created_at,
+            ).where(
+                Booking.court_id.in_(court_ids),
+                Booking.start_datetime >= range_start_utc,
+                Booking.start_datetime < range_end_utc,
             )
-        ).scalars().all()
-        bookings = [
-            BookingInput(
-                start_local=b.start_datetime.astimezone(tz),
-                status=b.status,
-                total_price=b.total_price,
-                created_at=b.created_at,
+        )
+        for court_id, start, booking_status, total_price, created_at in booking_rows.all():
+            bookings.setdefault(court_id, []).append(
+                BookingInput(
+                    start_local=start.astimezone(tz),
+                    status=booking_status,
+                    total_price=total_price,
+                    created_at=created_at,
+                )
             )
-            for b in booking_rows
-        ]
 
-        # Court-specific reservations + club-wide ones (court_id NULL) that
-        # overlap the day.
-        reservation_rows = (
-            await self.db.execute(
-                select(CalendarReservation).where(
-                    CalendarReservation.club_id == club.id,
-                    (CalendarReservation.court_id == court_id)
-                    | (CalendarReservation.court_id.is_(None)),
-                    CalendarReservation.start_datetime < day_end_utc,
-                    CalendarReservation.end_datetime > day_start_utc,
-                )
+        # Court-specific reservations + club-wide ones (court_id NULL).
+        reservations: dict[Optional[UUID], list[ReservationInput]] = {}
+        reservation_rows = await self.db.execute(
+            select(
+                CalendarReservation.court_id,
+                CalendarReservation.start_datetime,
+                CalendarReservation.end_datetime,
+            ).where(
+                CalendarReservation.club_id == club.id,
+                CalendarReservation.court_id.in_(court_ids)
+                | CalendarReservation.court_id.is_(None),
+                CalendarReservation.start_datetime < range_end_utc,
+                CalendarReservation.end_datetime > range_start_utc,
             )
-        ).scalars().all()
-        reservations = [
-            ReservationInput(
-                start_local=r.start_datetime.astimezone(tz),
-                end_local=r.end_datetime.astimezone(tz),
+        )
+        for court_id, start, end in reservation_rows.all():
+            reservations.setdefault(court_id, []).append(
+                ReservationInput(start_local=start.astimezone(tz), end_local=end.astimezone(tz))
             )
-            for r in reservation_rows
-        ]
 
-        return compute_court_day_snapshots(
-            snapshot_date=snapshot_date,
+        return compute_club_range_snapshots(
             tz=tz,
             booking_duration_minutes=club.booking_duration_minutes,
-            windows=windows,
+            windows_by_day=windows_by_day,
             pricing=pricing,
-            bookings=bookings,
-            reservations=reservations,
+            court_ids=court_ids,
+            bookings_by_court=bookings,
+            reservations_by_court=reservations,
         )
 
     async def active_courts(self, club_id: UUID) -> list[Court]:
@@ -371,35 +529,29 @@ class CourtUtilisationService:
             ).scalars().all()
         )
 
-    async def _operating_hours(
-        self, club_id: UUID, on: DateType, day_of_week: int
+    async def _operating_hours_between(
+        self, club_id: UUID, date_from: DateType, date_to: DateType
     ) -> Sequence[OperatingHours]:
+        """Every operating-hours row valid on some date in the range."""
         return (
             await self.db.execute(
                 select(OperatingHours).where(
                     OperatingHours.club_id == club_id,
-                    OperatingHours.day_of_week == day_of_week,
                     (OperatingHours.valid_from.is_(None))
-                    | (OperatingHours.valid_from <= on),
+                    | (OperatingHours.valid_from <= date_to),
                     (OperatingHours.valid_until.is_(None))
-                    | (OperatingHours.valid_until >= on),
+                    | (OperatingHours.valid_until >= date_from),
                 )
             )
         ).scalars().all()
 
-    async def _pricing_rules(
-        self, club_id: UUID, on: DateType, day_of_week: int
-    ) -> Sequence[PricingRule]:
-        return (
-            await self.db.execute(
-                select(PricingRule).where(
-                    PricingRule.club_id == club_id,
-                    PricingRule.day_of_week == day_of_week,
-                    PricingRule.is_active.is_(True),
-                    (PricingRule.valid_from.is_(None))
-                    | (PricingRule.valid_from <= on),
-                    (PricingRule.valid_until.is_(None))
-                    | (PricingRule.valid_until >= on),
-                )
-            )
-        ).scalars().all()
+
+def _windows_on(hours: Iterable[OperatingHours], on: DateType) -> list[OperatingWindow]:
+    day_of_week = on.weekday()
+    return [
+        OperatingWindow(oh.open_time, oh.close_time)
+        for oh in hours
+        if oh.day_of_week == day_of_week
+        and (oh.valid_from is None or oh.valid_from <= on)
+        and (oh.valid_until is None or oh.valid_until >= on)
+    ]
@@ -0,0 +1,144 @@
+"""
+Data generations: cheap "has this changed?" markers for analytics data.
+
+Every analytics read is answered from data that only changes when a worker
+writes it, so a cached answer stays valid for as long as its source's
+generation does:
+
+  * materialized views — the ``started_at`` of the view's latest successful
+    refresh in ``analytics_refresh_log`` (a skipped refresh keeps it);
+  * revenue rollups and court-utilisation snapshots — the club's counter in
+    ``analytics_data_generations``, bumped by ``bump_generations`` in the
+    writer's own transaction.
+
+Both markers are written on the primary after (or with) the data they cover,
+so reading them from the same replica session as the data can never pair a
+new generation with old rows. Lookups are memoised per process for
+``ANALYTICS_GENERATION_TTL_SECONDS``, so a cached answer can trail a write by
+that long.
+"""
+from __future__ import annotations
+
+import time
+import uuid
+from datetime import datetime
+from functools import lru_cache
+from typing import Awaitable, Callable, Hashable, Iterable, Optional
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.models.analytics import AnalyticsDataGeneration, AnalyticsRefreshLog, RefreshStatus
+from app.db.models.club import Club
+
+# ``analytics_data_generations.source`` values.
+REVENUE_ROLLUPS = "revenue_rollups"
+COURT_UTILISATION = "court_utilisation_snapshots"
+
+
+async def bump_generations(
+    db: AsyncSession, source: str, club_ids: Optional[Iterable[uuid.UUID]] = None
+) -> None:
+    """Advance ``source``'s generation for ``club_ids`` (default: every club).
+    Call inside the transaction that changed their data; does not commit."""
+    table = AnalyticsDataGeneration.__table__
+    if club_ids is None:
+        stmt = pg_insert(table).from_select(
+            ["source", "club_id", "generation"], select(literal(source), Club.id, literal(1))
+        )
+    else:
+        club_ids = sorted(set(club_ids), key=str)  # consistent lock order
+        if not club_ids:
+            return
+        stmt = pg_insert(table).values(
+            [{"source": source, "club_id": club_id, "generation": 1} for club_id in club_ids]
+        )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["source", "club_id"],
+            set_={"generation": table.c.generation + 1, "updated_at": func.now()},
+        )
+    )
+
+
+class DataGenerations:
+    """Memoised generation lookups. ``view`` is None for a view that has never
+    refreshed successfully; nothing derived from it should be cached then."""
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self._ttl = ttl_seconds
+        self._memo: dict[Hashable, tuple[Optional[Hashable], float]] = {}
+
+    async def view(self, db: AsyncSession, view_name: str) -> Optional[datetime]:
+        """The materialized view's latest successful refresh."""
+
+        async def load() -> Optional[datetime]:
+            return (
+                await db.execute(
+                    select(func.max(AnalyticsRefreshLog.started_at)).where(
+                        AnalyticsRefreshLog.view_name == view_name,
+                        AnalyticsRefreshLog.status == RefreshStatus.success,
+                    )
+                )
+            ).scalar_one()
+
+        return await self._memoised(("view", view_name), load)
+
+    async def club(self, db: AsyncSession, source: str, club_id: uuid.UUID) -> int:
+        """``source``'s generation for one club (0 before its first write)."""
+
+        async def load() -> int:
+            generation = (
+                await db.execute(
+                    select(AnalyticsDataGeneration.generation).where(
+                        AnalyticsDataGeneration.source == source,
+                        AnalyticsDataGeneration.club_id == club_id,
+                    )
+                )
+            ).scalar_one_or_none()
+            return generation or 0
+
+        return await self._memoised(("club", source, club_id), load)
+
+    async def tenant(self, db: AsyncSession, source: str, tenant_id: uuid.UUID) -> tuple[int, int]:
+        """``(club count, summed generation)`` over the tenant's clubs. Each
+        club's counter only grows, so the sum moves whenever any club's data
+        does; the count catches a club being added."""
+
+        async def load() -> tuple[int, int]:
+            clubs, generations = (
+                await db.execute(
+                    select(
+                        func.count(Club.id),
+                        func.coalesce(func.sum(AnalyticsDataGeneration.generation), 0),
+                    )
+                    .select_from(Club)
+                    .outerjoin(
+                        AnalyticsDataGeneration,
+                        (AnalyticsDataGeneration.club_id == Club.id)
+                        & (AnalyticsDataGeneration.source == source),
+                    )
+                    .where(Club.tenant_id == tenant_id)
+                )
+            ).one()
+            return int(clubs), int(generations)
+
+        return await self._memoised(("tenant", source, tenant_id), load)
+
+    def clear(self) -> None:
+        self._memo.clear()
+
+    async def _memoised(self, key: Hashable, load: Callable[[], Awaitable]) -> Optional[Hashable]:
+        cached = self._memo.get(key)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        value = await load()
+        self._memo[key] = (value, time.monotonic() + self._ttl)
+        return value
+
+
+@lru_cache
+def get_data_generations() -> DataGenerations:
+    return DataGenerations(get_settings().ANALYTICS_GENERATION_TTL_SECONDS)
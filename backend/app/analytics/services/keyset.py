@@ -0,0 +1,151 @@
+"""Keyset (seek) pagination for the analytics leaderboards.
+
+A leaderboard is ordered by one sort key plus a unique tiebreak (``user_id`` /
+``staff_profile_id``). Instead of ``OFFSET n`` — which makes the database
+produce and discard every earlier row, so page k costs O(k) — the next page
+starts *after* the last row returned: ``WHERE (key, id) > (last_key, last_id)``
+in the leaderboard's own order. Every page then costs the same, and an index
+on ``(club_id, key, id)`` lets Postgres seek straight to it.
+
+The position travels to the client as an opaque ``next_cursor``: the last
+row's sort value and id, plus a ``scope`` naming the report, sort and filters
+it belongs to, so a cursor cannot be replayed against a different ordering.
+Cursors are not signed — they only ever reach bound parameters, and the club
+is authorised separately on every request.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Optional
+
+from sqlalchemy import Row, Select, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+
+class InvalidCursor(ValueError):
+    """The cursor is malformed or belongs to a different report/sort/filter."""
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """One leaderboard ordering: ``expr`` in the given direction, with NULLs
+    placed as Postgres does by default (first when descending) unless
+    ``nulls_first`` says otherwise."""
+
+    expr: ColumnElement
+    descending: bool = True
+    nulls_first: Optional[bool] = None
+
+    @property
+    def _nulls_first(self) -> bool:
+        return self.descending if self.nulls_first is None else self.nulls_first
+
+    def order_by(self, tiebreak: ColumnElement) -> tuple:
+        key = self.expr.desc() if self.descending else self.expr.asc()
+        key = key.nulls_first() if self._nulls_first else key.nulls_last()
+        return key, tiebreak.asc()
+
+    def after(self, tiebreak: ColumnElement, last_value: Any, last_id: Any) -> ColumnElement:
+        """Rows strictly after ``(last_value, last_id)`` in ``order_by`` order."""
+        key = self.expr
+        if last_value is None:
+            later_nulls = and_(key.is_(None), tiebreak > last_id)
+            # NULLS FIRST: every non-null row is still ahead.
+            return or_(later_nulls, key.is_not(None)) if self._nulls_first else later_nulls
+        # The redundant bound lets an index range scan start at the seek point.
+        bound = key <= last_value if self.descending else key >= last_value
+        beyond = key < last_value if self.descending else key > last_value
+        seek = and_(bound, or_(beyond, tiebreak > last_id))
+        # NULLS LAST: the null block still follows every non-null row.
+        return seek if self._nulls_first else or_(seek, key.is_(None))
+
+
+# ---------------------------------------------------------------------------
+# Opaque cursor encoding
+# ---------------------------------------------------------------------------
+
+
+def _encode_value(value: Any) -> list:
+    if value is None:
+        return ["n", None]
+    if isinstance(value, bool):
+        return ["b", value]
+    if isinstance(value, Decimal):
+        return ["d", str(value)]
+    if isinstance(value, datetime):
+        return ["t", value.isoformat()]
+    if isinstance(value, uuid.UUID):
+        return ["u", str(value)]
+    if isinstance(value, float):
+        return ["f", repr(value)]
+    if isinstance(value, int):
+        return ["i", value]
+    raise TypeError(f"cannot encode {type(value).__name__} in a cursor")
+
+
+_DECODERS = {
+    "n": lambda v: None,
+    "b": bool,
+    "d": Decimal,
+    "t": datetime.fromisoformat,
+    "u": uuid.UUID,
+    "f": float,
+    "i": int,
+}
+
+
+def encode_cursor(scope: str, last_value: Any, last_id: Any) -> str:
+    raw = json.dumps([scope, _encode_value(last_value), _encode_value(last_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, scope: str) -> tuple[Any, Any]:
+    """``(last_value, last_id)`` from a cursor issued for ``scope``."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_scope, value, last_id = json.loads(raw)
+        decoded = tuple(_DECODERS[tag](v) for tag, v in (value, last_id))
+    except (ValueError, TypeError, KeyError, ArithmeticError) as exc:
+        raise InvalidCursor("malformed cursor") from exc
+    if cursor_scope != scope:
+        raise InvalidCursor("cursor was issued for a different sort or filter")
+    return decoded
+
+
+# ---------------------------------------------------------------------------
+# Page fetch
+# ---------------------------------------------------------------------------
+
+
+async def fetch_page(
+    db: AsyncSession,
+    stmt: Select,
+    key: SortKey,
+    tiebreak: ColumnElement,
+    scope: str,
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+) -> tuple[list[Row], Optional[str]]:
+    """One page of ``stmt`` in ``key`` order plus the cursor for the next page
+    (None on the last page). ``cursor`` seeks past the previous page; without
+    one, ``offset`` is applied as before. Result rows carry the sort value as
+    an extra trailing column."""
+    stmt = stmt.add_columns(key.expr.label("_sort_key")).order_by(*key.order_by(tiebreak))
+    if cursor:
+        stmt = stmt.where(key.after(tiebreak, *decode_cursor(cursor, scope)))
+    elif offset:
+        stmt = stmt.offset(offset)
+    # One extra row says whether another page exists without a COUNT.
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(scope, last._sort_key, last._mapping[tiebreak])
@@ -20,18 +20,16 @@ from __future__ import annotations
 import uuid
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
+from typing import AsyncIterator, Optional
 
 from sqlalchemy import (
     Integer,
-    asc,
     case,
     cast,
     column,
     desc,
     func,
     literal,
-    nullsfirst,
-    nullslast,
     select,
     table,
 )
@@ -47,8 +45,12 @@ from app.analytics.schemas.player import (
     PlayerValueLeaderboard,
     PlayerValueRow,
 )
+from app.analytics.services.keyset import SortKey, fetch_page
+from app.analytics.services.totals_cache import get_totals_cache
 from app.db.models.user import User
 
+_VIEW = "mv_player_value"
+
 _NON_MEMBER_LABEL = "Non-member"
 
 # Static labels for the two enumerable dimensions; membership_tier labels are the
@@ -97,7 +99,7 @@ _RFV_COLUMNS = (
 def _mv():
     """Lightweight read-only handle on the materialized view. Uses ``table()``
     (not an ORM model) so Alembic autogenerate never tries to manage the view."""
-    return table("mv_player_value", *(column(c) for c in _COLUMNS))
+    return table(_VIEW, *(column(c) for c in _COLUMNS))
 
 
 def _rfv():
@@ -181,77 +183,109 @@ class PlayerValueService:
             rfv_cell=r[19],
         )
 
+    def _leaderboard_key(self, sort: PlayerSort) -> SortKey:
+        mv = self.mv
+        return {
+            PlayerSort.lifetime_spend: SortKey(mv.c.lifetime_spend),
+            PlayerSort.bookings_played: SortKey(mv.c.bookings_played),
+            PlayerSort.last_played_at: SortKey(mv.c.last_played_at, nulls_first=False),
+        }[sort]
+
+    def _leaderboard_where(self, stmt, club_id: uuid.UUID, members_only: bool):
+        mv = self.mv
+        stmt = stmt.where(mv.c.club_id == club_id)
+        if members_only:
+            stmt = stmt.where(mv.c.is_paid_member.is_(True))
+        return stmt
+
     async def leaderboard(
         self,
         club_id: uuid.UUID,
         members_only: bool,
         sort: PlayerSort,
         limit: int,
-        offset: int,
+        offset: int = 0,
+        cursor: Optional[str] = None,
     ) -> PlayerValueLeaderboard:
         """Per-player lifetime value, highest first (the LTV view)."""
         mv = self.mv
-        order = {
-            PlayerSort.lifetime_spend: desc(mv.c.lifetime_spend),
-            PlayerSort.bookings_played: desc(mv.c.bookings_played),
-            PlayerSort.last_played_at: nullslast(desc(mv.c.last_played_at)),
-        }[sort]
-
-        count_stmt = select(func.count()).select_from(mv).where(mv.c.club_id == club_id)
-        if members_only:
-            count_stmt = count_stmt.where(mv.c.is_paid_member.is_(True))
-        total_records = (await self.db.execute(count_stmt)).scalar_one()
-
-        stmt = self._select_row().where(mv.c.club_id == club_id)
-        if members_only:
-            stmt = stmt.where(mv.c.is_paid_member.is_(True))
-        stmt = stmt.order_by(order, asc(mv.c.user_id)).limit(limit).offset(offset)
-
-        rows = (await self.db.execute(stmt)).all()
+        total_records = await get_totals_cache().total(
+            self.db, _VIEW, (club_id, "value", members_only),
+            self._leaderboard_where(select(func.count()).select_from(mv), club_id, members_only),
+        )
+        rows, next_cursor = await fetch_page(
+            self.db,
+            self._leaderboard_where(self._select_row(), club_id, members_only),
+            self._leaderboard_key(sort),
+            mv.c.user_id,
+            scope=f"players.value:{sort.value}:{int(members_only)}",
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
         return PlayerValueLeaderboard(
             club_id=club_id,
             members_only=members_only,
             sort=sort,
             limit=limit,
             offset=offset,
-            total_records=int(total_records or 0),
+            total_records=total_records,
             rows=[self._to_row(r) for r in rows],
+            next_cursor=next_cursor,
+        )
+
+    async def stream_leaderboard(
+        self,
+        club_id: uuid.UUID,
+        members_only: bool,
+        sort: PlayerSort,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[PlayerValueRow]:
+        """Every leaderboard row, in leaderboard order, from a server-side
+        cursor fetched ``batch_size`` rows at a time — for exports, where the
+        whole club is read in one pass and must not be held in memory."""
+        stmt = self._leaderboard_where(self._select_row(), club_id, members_only).order_by(
+            *self._leaderboard_key(sort).order_by(self.mv.c.user_id)
         )
+        result = await self.db.stream(stmt.execution_options(yield_per=batch_size))
+        async for r in result:
+            yield self._to_row(r)
 
     async def most_active(
         self,
         club_id: uuid.UUID,
         window_days: int,
         limit: int,
-        offset: int,
+        offset: int = 0,
+        cursor: Optional[str] = None,
     ) -> PlayerActivityLeaderboard:
         """Most-active players, ranked by bookings in the chosen window."""
         mv = self.mv
         window_col = mv.c[_WINDOW_COLUMN[window_days]]
+        filters = (mv.c.club_id == club_id, window_col > 0)
 
-        total_records = (
-            await self.db.execute(
-                select(func.count())
-                .select_from(mv)
-                .where(mv.c.club_id == club_id, window_col > 0)
-            )
-        ).scalar_one()
-
-        stmt = (
-            self._select_row()
-            .where(mv.c.club_id == club_id, window_col > 0)
-            .order_by(desc(window_col), asc(mv.c.user_id))
-            .limit(limit)
-            .offset(offset)
+        total_records = await get_totals_cache().total(
+            self.db, _VIEW, (club_id, "most_active", window_days),
+            select(func.count()).select_from(mv).where(*filters),
+        )
+        rows, next_cursor = await fetch_page(
+            self.db,
+            self._select_row().where(*filters),
+            SortKey(window_col),
+            mv.c.user_id,
+            scope=f"players.most_active:{window_days}",
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
         )
-        rows = (await self.db.execute(stmt)).all()
         return PlayerActivityLeaderboard(
             club_id=club_id,
             window_days=window_days,
             limit=limit,
             offset=offset,
-            total_records=int(total_records or 0),
+            total_records=total_records,
             rows=[self._to_row(r) for r in rows],
+            next_cursor=next_cursor,
         )
 
     async def inactive_members(
@@ -259,22 +293,23 @@ class PlayerValueService:
         club_id: uuid.UUID,
         inactive_days: int,
         limit: int,
-        offset: int,
+        offset: int = 0,
+        cursor: Optional[str] = None,
     ) -> InactiveMembersReport:
         """Paid members who have not played since ``now - inactive_days``
-        (never-played members included). Longest-gone first."""
+        (never-played members included). Longest-gone first.
+
+        Only the member count is cached: the cutoff moves with the clock, so
+        the inactive count changes between refreshes."""
         mv = self.mv
         cutoff = datetime.now(timezone.utc) - timedelta(days=inactive_days)
         inactive_pred = mv.c.last_played_at.is_(None) | (mv.c.last_played_at < cutoff)
         member_pred = mv.c.is_paid_member.is_(True)
 
-        member_count = (
-            await self.db.execute(
-                select(func.count())
-                .select_from(mv)
-                .where(mv.c.club_id == club_id, member_pred)
-            )
-        ).scalar_one()
+        member_count = await get_totals_cache().total(
+            self.db, _VIEW, (club_id, "value", True),
+            select(func.count()).select_from(mv).where(mv.c.club_id == club_id, member_pred),
+        )
         inactive_count = (
             await self.db.execute(
                 select(func.count())
@@ -283,25 +318,28 @@ class PlayerValueService:
             )
         ).scalar_one()
 
-        stmt = (
-            self._select_row()
-            .where(mv.c.club_id == club_id, member_pred, inactive_pred)
+        rows, next_cursor = await fetch_page(
+            self.db,
+            self._select_row().where(mv.c.club_id == club_id, member_pred, inactive_pred),
             # never-played (NULL) are the most inactive -> first
-            .order_by(nullsfirst(asc(mv.c.last_played_at)), asc(mv.c.user_id))
-            .limit(limit)
-            .offset(offset)
+            SortKey(mv.c.last_played_at, descending=False, nulls_first=True),
+            mv.c.user_id,
+            scope=f"players.inactive:{inactive_days}",
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
         )
-        rows = (await self.db.execute(stmt)).all()
         return InactiveMembersReport(
             club_id=club_id,
             inactive_days=inactive_days,
             cutoff=cutoff,
-            member_count=int(member_count or 0),
+            member_count=member_count,
             inactive_count=int(inactive_count or 0),
             total_records=int(inactive_count or 0),
             limit=limit,
             offset=offset,
             rows=[self._to_row(r) for r in rows],
+            next_cursor=next_cursor,
         )
 
     def _group_expr(self, dimension: GroupDimension, inactive_days: int):
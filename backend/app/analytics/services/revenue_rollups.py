@@ -0,0 +1,373 @@
+"""
+Incrementally maintained revenue rollups (G7 — "Financials by club").
+
+``revenue_by_club_day_service`` / ``revenue_by_club_day_cash`` hold the same
+grain and figures the nightly-rebuilt revenue materialized views did, but are
+kept current within about a minute of each payment change:
+
+  * Triggers on ``payments``, ``bookings``, ``equipment_rentals`` and
+    ``clubs`` append the affected payment ids to ``revenue_dirty_payments``
+    in the writer's own transaction, so no write path can be missed.
+  * ``apply_dirty_batch`` claims a batch, recomputes each payment's
+    ``PaymentFact`` from the live tables and applies (new − stored) to both
+    rollups, then replaces the stored facts — all in one transaction, so a
+    re-run of the same payment is a zero delta. Only the queued payments are
+    read; history is never rescanned. Clubs whose rows changed get their
+    ``revenue_rollups`` data generation bumped in the same transaction.
+  * ``reconcile_revenue_rollups`` drains the queue, recomputes both rollups
+    from scratch and reports every club whose stored rows differ; with
+    ``repair`` it rebuilds those clubs' facts and rollups.
+
+Appliers and the reconciler serialize on one advisory lock. Attribution is the
+subtract-embedded rule the views used (see REPORT_CATALOG.md → "Revenue by
+club, period"): a payment splits into a court portion under its booking type
+and an ``equipment`` portion, and refunds land on the court portion.
+"""
+from __future__ import annotations
+
+import asyncio
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from sqlalchemy import bindparam, delete, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.analytics.schemas.revenue import RevenueBasis
+from app.analytics.services.generations import REVENUE_ROLLUPS, bump_generations
+from app.core.drain import drain_until
+from app.db.models.analytics import (
+    RevenueByClubDayCash,
+    RevenueByClubDayService,
+    RevenuePaymentFact,
+)
+
+ROLLUP_TABLES = {
+    RevenueBasis.service: RevenueByClubDayService.__table__,
+    RevenueBasis.cash: RevenueByClubDayCash.__table__,
+}
+_DATE_COLUMN = {RevenueBasis.service: "service_date", RevenueBasis.cash: "cash_date"}
+
+# pg_advisory_xact_lock key shared by appliers and the reconciler.
+_ROLLUP_LOCK_KEY = 0x52455645  # "REVE"
+
+_ZERO = Decimal("0")
+
+# One row per revenue-bearing payment. {scope} is a trusted SQL fragment.
+_PAYMENT_FACTS_SQL = """
+SELECT
+    p.id                                              AS payment_id,
+    p.club_id                                         AS club_id,
+    p.currency                                        AS currency,
+    b.booking_type::text                              AS booking_type,
+    (b.start_datetime AT TIME ZONE c.timezone)::date  AS service_date,
+    (p.created_at AT TIME ZONE c.timezone)::date      AS cash_date,
+    p.amount                                          AS amount,
+    COALESCE(p.refund_amount, 0)                      AS refund_amount,
+    COALESCE((
+        SELECT SUM(er.charge)
+        FROM equipment_rentals er
+        WHERE er.payment_id = p.id
+           OR (er.payment_id IS NULL
+               AND er.booking_id = p.booking_id
+               AND er.user_id = p.user_id)
+    ), 0)                                             AS equipment_amount
+FROM payments p
+JOIN bookings b ON b.id = p.booking_id
+JOIN clubs    c ON c.id = p.club_id
+WHERE p.state IN ('succeeded', 'refunded', 'partially_refunded')
+  AND {scope}
+"""
+
+# Rollup rows aggregated from a ``facts`` relation — the views' typed_rows.
+_ROLLUP_SQL = """
+WITH facts AS ({facts})
+SELECT
+    club_id,
+    {date_column}                       AS revenue_date,
+    revenue_type,
+    currency,
+    SUM(gross_amount)::numeric(12, 2)   AS gross_amount,
+    SUM(refund_amount)::numeric(12, 2)  AS refund_amount,
+    SUM(net_amount)::numeric(12, 2)     AS net_amount,
+    SUM(transaction_count)::bigint      AS transaction_count
+FROM (
+    SELECT
+        club_id, {date_column}, booking_type AS revenue_type, currency,
+        GREATEST(amount - equipment_amount, 0)                  AS gross_amount,
+        refund_amount                                           AS refund_amount,
+        GREATEST(amount - equipment_amount, 0) - refund_amount  AS net_amount,
+        1                                                       AS transaction_count
+    FROM facts
+    UNION ALL
+    SELECT
+        club_id, {date_column}, 'equipment', currency,
+        equipment_amount, 0, equipment_amount, 1
+    FROM facts
+    WHERE equipment_amount > 0
+) typed
+GROUP BY club_id, {date_column}, revenue_type, currency
+"""
+
+_KEY_COLUMNS = ("club_id", "revenue_date", "revenue_type", "currency")
+_MEASURE_COLUMNS = ("gross_amount", "refund_amount", "net_amount", "transaction_count")
+
+_CLAIM_SQL = text(
+    "DELETE FROM revenue_dirty_payments WHERE id IN ("
+    "SELECT id FROM revenue_dirty_payments ORDER BY id LIMIT :limit FOR UPDATE SKIP LOCKED"
+    ") RETURNING payment_id"
+)
+
+
+@dataclass(frozen=True)
+class PaymentFact:
+    payment_id: uuid.UUID
+    club_id: uuid.UUID
+    currency: str
+    booking_type: str
+    service_date: date
+    cash_date: date
+    amount: Decimal
+    refund_amount: Decimal
+    equipment_amount: Decimal
+
+
+@dataclass
+class RollupDelta:
+    gross_amount: Decimal = _ZERO
+    refund_amount: Decimal = _ZERO
+    net_amount: Decimal = _ZERO
+    transaction_count: int = 0
+
+    def is_zero(self) -> bool:
+        return not (self.gross_amount or self.refund_amount or self.net_amount or self.transaction_count)
+
+
+RollupKey = tuple[uuid.UUID, date, str, str]
+
+
+def _typed_rows(fact: PaymentFact) -> list[tuple[str, Decimal, Decimal, Decimal]]:
+    """(revenue_type, gross, refund, net) portions of one payment."""
+    court = max(fact.amount - fact.equipment_amount, _ZERO)
+    rows = [(fact.booking_type, court, fact.refund_amount, court - fact.refund_amount)]
+    if fact.equipment_amount > 0:
+        rows.append(("equipment", fact.equipment_amount, _ZERO, fact.equipment_amount))
+    return rows
+
+
+def rollup_deltas(
+    old: Iterable[PaymentFact], new: Iterable[PaymentFact]
+) -> dict[RevenueBasis, dict[RollupKey, RollupDelta]]:
+    """Per-basis changes to apply when the ``old`` facts become ``new``.
+
+    Keys whose contributions cancel out are dropped.
+    """
+    deltas: dict[RevenueBasis, dict[RollupKey, RollupDelta]] = {
+        basis: defaultdict(RollupDelta) for basis in ROLLUP_TABLES
+    }
+    for facts, sign in ((old, -1), (new, 1)):
+        for fact in facts:
+            for revenue_type, gross, refund, net in _typed_rows(fact):
+                for basis, day in (
+                    (RevenueBasis.service, fact.service_date),
+                    (RevenueBasis.cash, fact.cash_date),
+                ):
+                    delta = deltas[basis][(fact.club_id, day, revenue_type, fact.currency)]
+                    delta.gross_amount += sign * gross
+                    delta.refund_amount += sign * refund
+                    delta.net_amount += sign * net
+                    delta.transaction_count += sign
+    return {
+        basis: {key: delta for key, delta in by_key.items() if not delta.is_zero()}
+        for basis, by_key in deltas.items()
+    }
+
+
+# ---------------------------------------------------------------------------
+# Incremental apply
+# ---------------------------------------------------------------------------
+
+
+async def apply_dirty_batch(db: AsyncSession, batch_size: int) -> dict:
+    """Fold one batch of queued payments into the rollups and commit."""
+    await _lock(db)
+    result = await _fold_dirty_batch(db, batch_size)
+    await db.commit()
+    return result
+
+
+async def _fold_dirty_batch(db: AsyncSession, batch_size: int) -> dict:
+    """Claim and fold one batch under the caller's lock; the caller commits."""
+    claimed = (await db.execute(_CLAIM_SQL, {"limit": batch_size})).scalars().all()
+    if not claimed:
+        return {"claimed": 0, "payments": 0, "keys_changed": 0}
+
+    payment_ids = sorted(set(claimed))
+    old = await _stored_facts(db, payment_ids)
+    new = await _current_facts(db, "p.id IN :payment_ids", payment_ids=payment_ids)
+    deltas = rollup_deltas(old, new)
+    for basis, by_key in deltas.items():
+        await _apply_deltas(db, ROLLUP_TABLES[basis], by_key)
+    await bump_generations(
+        db, REVENUE_ROLLUPS, {key[0] for by_key in deltas.values() for key in by_key}
+    )
+
+    await db.execute(delete(RevenuePaymentFact).where(RevenuePaymentFact.payment_id.in_(payment_ids)))
+    if new:
+        await db.execute(pg_insert(RevenuePaymentFact), [vars(fact) for fact in new])
+    return {
+        "claimed": len(claimed),
+        "payments": len(payment_ids),
+        "keys_changed": sum(len(by_key) for by_key in deltas.values()),
+    }
+
+
+async def apply_revenue_changes(
+    session_factory, batch_size: int, run_seconds: float, poll_seconds: float
+) -> dict:
+    """Apply batches until ``run_seconds`` elapse, polling while the queue is empty."""
+    totals = {"batches": 0, "payments": 0, "keys_changed": 0}
+
+    async def run_batch() -> bool:
+        async with session_factory() as db:
+            batch = await apply_dirty_batch(db, batch_size)
+        if batch["claimed"]:
+            totals["batches"] += 1
+            totals["payments"] += batch["payments"]
+            totals["keys_changed"] += batch["keys_changed"]
+        return batch["claimed"] == batch_size
+
+    await drain_until(asyncio.get_running_loop().time() + run_seconds, run_batch, poll_seconds)
+    return totals
+
+
+async def _apply_deltas(db: AsyncSession, rollup, by_key: dict[RollupKey, RollupDelta]) -> None:
+    if not by_key:
+        return
+    # Sorted so concurrent transactions lock rollup rows in the same order.
+    rows = [
+        {**dict(zip(_KEY_COLUMNS, key)), **vars(delta)}
+        for key, delta in sorted(by_key.items(), key=lambda item: tuple(map(str, item[0])))
+    ]
+    stmt = pg_insert(rollup)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=list(_KEY_COLUMNS),
+            set_={c: rollup.c[c] + stmt.excluded[c] for c in _MEASURE_COLUMNS},
+        ),
+        rows,
+    )
+    # A key with no contributing payments left has no row, as in a full rebuild.
+    await db.execute(
+        delete(rollup).where(
+            *(rollup.c[c] == bindparam(f"k_{c}") for c in _KEY_COLUMNS),
+            rollup.c.transaction_count == 0,
+        ),
+        [{f"k_{c}": row[c] for c in _KEY_COLUMNS} for row in rows],
+    )
+
+
+async def _stored_facts(db: AsyncSession, payment_ids: list[uuid.UUID]) -> list[PaymentFact]:
+    result = await db.execute(
+        select(RevenuePaymentFact).where(RevenuePaymentFact.payment_id.in_(payment_ids))
+    )
+    return [
+        PaymentFact(**{f: getattr(row, f) for f in PaymentFact.__dataclass_fields__})
+        for row in result.scalars().all()
+    ]
+
+
+async def _current_facts(db: AsyncSession, scope: str, **params) -> list[PaymentFact]:
+    stmt = text(_PAYMENT_FACTS_SQL.format(scope=scope)).bindparams(
+        *(bindparam(name, expanding=True) for name in params)
+    )
+    result = await db.execute(stmt, params)
+    return [PaymentFact(**row) for row in result.mappings().all()]
+
+
+async def _lock(db: AsyncSession) -> None:
+    await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _ROLLUP_LOCK_KEY})
+
+
+# ---------------------------------------------------------------------------
+# Reconciliation
+# ---------------------------------------------------------------------------
+
+
+async def reconcile_revenue_rollups(
+    db: AsyncSession, repair: bool = False, batch_size: int = 500
+) -> dict:
+    """Compare both rollups with a full recompute from the live tables.
+
+    Payments still queued are folded in first, under the same lock, so changes
+    the applier simply has not reached yet are not reported as drift.
+
+    Returns the number of differing (club, day, type, currency) keys per basis
+    and the clubs they belong to. With ``repair``, those clubs' facts and
+    rollup rows are rebuilt from scratch in the same transaction.
+    """
+    await _lock(db)
+    while (await _fold_dirty_batch(db, batch_size))["claimed"]:
+        pass
+    mismatched: dict[str, int] = {}
+    clubs: set[uuid.UUID] = set()
+    for basis, rollup in ROLLUP_TABLES.items():
+        expected = _ROLLUP_SQL.format(
+            facts=_PAYMENT_FACTS_SQL.format(scope="TRUE"),
+            date_column=_DATE_COLUMN[basis],
+        )
+        differs = " OR ".join(f"e.{c} IS DISTINCT FROM r.{c}" for c in _MEASURE_COLUMNS)
+        result = await db.execute(
+            text(
+                f"SELECT club_id, count(*) FROM ({expected}) e "
+                f"FULL JOIN {rollup.name} r USING ({', '.join(_KEY_COLUMNS)}) "
+                f"WHERE {differs} GROUP BY club_id"
+            )
+        )
+        counts = dict(result.all())
+        mismatched[basis.value] = sum(counts.values())
+        clubs.update(counts)
+
+    if repair and clubs:
+        await rebuild_clubs(db, sorted(clubs))
+    await db.commit()
+    return {
+        "mismatched_keys": mismatched,
+        "clubs": [str(club_id) for club_id in sorted(clubs, key=str)],
+        "repaired": bool(repair and clubs),
+    }
+
+
+async def rebuild_clubs(db: AsyncSession, club_ids: Optional[list[uuid.UUID]] = None) -> None:
+    """Rebuild facts and rollups for ``club_ids`` (default: every club) from
+    the live tables. The caller commits."""
+    await _lock(db)
+    scope = "TRUE" if club_ids is None else "p.club_id IN :club_ids"
+    fact_scope = "TRUE" if club_ids is None else "club_id IN :club_ids"
+    params = {} if club_ids is None else {"club_ids": club_ids}
+
+    def stmt(sql: str):
+        return text(sql).bindparams(*(bindparam(name, expanding=True) for name in params))
+
+    facts_table = RevenuePaymentFact.__table__
+    await db.execute(stmt(f"DELETE FROM {facts_table.name} WHERE {fact_scope}"), params)
+    columns = ", ".join(PaymentFact.__dataclass_fields__)
+    await db.execute(
+        stmt(f"INSERT INTO {facts_table.name} ({columns}) {_PAYMENT_FACTS_SQL.format(scope=scope)}"),
+        params,
+    )
+    for basis, rollup in ROLLUP_TABLES.items():
+        await db.execute(stmt(f"DELETE FROM {rollup.name} WHERE {fact_scope}"), params)
+        rollup_sql = _ROLLUP_SQL.format(
+            facts=f"SELECT * FROM {facts_table.name} WHERE {fact_scope}",
+            date_column=_DATE_COLUMN[basis],
+        )
+        await db.execute(
+            stmt(f"INSERT INTO {rollup.name} ({', '.join(_KEY_COLUMNS + _MEASURE_COLUMNS)}) {rollup_sql}"),
+            params,
+        )
+    await bump_generations(db, REVENUE_ROLLUPS, club_ids)
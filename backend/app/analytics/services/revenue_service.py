@@ -1,17 +1,18 @@
 """
 Revenue-by-club analytics service (Sprint 7 / G7 — "Financials by club").
 
-Reads the two revenue materialized views off the **read replica** and rolls
-them up for the API. The views already collapse ``payments`` ⋈ ``bookings`` ∪
-embedded equipment into one row per (club, day, revenue_type, currency); this
-service only ever SUMs over that pre-aggregated grain — it never averages a
-per-row figure and never touches live operational tables.
-
-Two parallel views, selected by ``basis``:
-  * service -> mv_revenue_by_club_day_service  (bucketed by booking start)
-  * cash    -> mv_revenue_by_club_day_cash      (bucketed by payment created_at)
-
-Tenant isolation: the views carry ``club_id`` but not ``tenant_id``. Club-scoped
+Reads the two revenue rollup tables off the **read replica** and rolls them up
+for the API. The rollups already collapse ``payments`` ⋈ ``bookings`` ∪
+embedded equipment into one row per (club, day, revenue_type, currency), and
+are kept current incrementally (``revenue_rollups.py``); this service only
+ever SUMs over that pre-aggregated grain — it never averages a per-row figure
+and never touches live operational tables.
+
+Two parallel rollups, selected by ``basis``:
+  * service -> revenue_by_club_day_service  (bucketed by booking start)
+  * cash    -> revenue_by_club_day_cash     (bucketed by payment created_at)
+
+Tenant isolation: the rollups carry ``club_id`` but not ``tenant_id``. Club-scoped
 callers must pass a ``club_id`` they have already authorized; the cross-club
 method joins ``clubs`` and filters on ``tenant_id``.
 """
@@ -21,7 +22,7 @@ import uuid
 from datetime import date
 from decimal import Decimal
 
-from sqlalchemy import Date, asc, cast, column, desc, func, select, table
+from sqlalchemy import Date, asc, cast, desc, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.analytics.schemas.revenue import (
@@ -35,32 +36,9 @@ from app.analytics.schemas.revenue import (
     RevenueTimeseriesPoint,
     TenantRevenueComparison,
 )
+from app.analytics.services.revenue_rollups import ROLLUP_TABLES
 from app.db.models.club import Club
 
-_COLUMNS = (
-    "club_id",
-    "revenue_date",
-    "revenue_type",
-    "currency",
-    "gross_amount",
-    "refund_amount",
-    "net_amount",
-    "transaction_count",
-)
-
-
-def _mv(name: str):
-    """Lightweight read-only handle on a materialized view. Uses ``table()`` (not
-    an ORM model) so Alembic autogenerate never tries to manage the view."""
-    return table(name, *(column(c) for c in _COLUMNS))
-
-
-_MV_BY_BASIS = {
-    RevenueBasis.service: _mv("mv_revenue_by_club_day_service"),
-    RevenueBasis.cash: _mv("mv_revenue_by_club_day_cash"),
-}
-
-
 def _d(value) -> Decimal:
     return Decimal(value) if value is not None else Decimal("0")
 
@@ -69,8 +47,8 @@ class RevenueService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    def _view(self, basis: RevenueBasis):
-        return _MV_BY_BASIS[basis]
+    def _rollup(self, basis: RevenueBasis):
+        return ROLLUP_TABLES[basis]
 
     async def timeseries(
         self,
@@ -80,23 +58,23 @@ class RevenueService:
         date_from: date,
         date_to: date,
     ) -> ClubRevenueTimeseries:
-        mv = self._view(basis)
+        rollup = self._rollup(basis)
         # date_trunc needs a timestamp; PG casts date implicitly, then back to date.
-        bucket = cast(func.date_trunc(granularity.value, mv.c.revenue_date), Date)
+        bucket = cast(func.date_trunc(granularity.value, rollup.c.revenue_date), Date)
         rows = (
             await self.db.execute(
                 select(
                     bucket.label("period_start"),
-                    func.sum(mv.c.gross_amount),
-                    func.sum(mv.c.refund_amount),
-                    func.sum(mv.c.net_amount),
-                    func.sum(mv.c.transaction_count),
-                    func.min(mv.c.currency),
+                    func.sum(rollup.c.gross_amount),
+                    func.sum(rollup.c.refund_amount),
+                    func.sum(rollup.c.net_amount),
+                    func.sum(rollup.c.transaction_count),
+                    func.min(rollup.c.currency),
                 )
                 .where(
-                    mv.c.club_id == club_id,
-                    mv.c.revenue_date >= date_from,
-                    mv.c.revenue_date <= date_to,
+                    rollup.c.club_id == club_id,
+                    rollup.c.revenue_date >= date_from,
+                    rollup.c.revenue_date <= date_to,
                 )
                 .group_by(bucket)
                 .order_by(asc(bucket))
@@ -182,24 +160,24 @@ class RevenueService:
         LEFT JOIN from clubs so a club with zero revenue in the window still
         appears (with zeroed totals), not silently dropped.
         """
-        mv = self._view(basis)
-        date_pred = (mv.c.revenue_date >= date_from) & (mv.c.revenue_date <= date_to)
+        rollup = self._rollup(basis)
+        date_pred = (rollup.c.revenue_date >= date_from) & (rollup.c.revenue_date <= date_to)
         rows = (
             await self.db.execute(
                 select(
                     Club.id,
                     Club.name,
                     func.min(Club.currency),
-                    func.coalesce(func.sum(mv.c.gross_amount), 0),
-                    func.coalesce(func.sum(mv.c.refund_amount), 0),
-                    func.coalesce(func.sum(mv.c.net_amount), 0),
-                    func.coalesce(func.sum(mv.c.transaction_count), 0),
+                    func.coalesce(func.sum(rollup.c.gross_amount), 0),
+                    func.coalesce(func.sum(rollup.c.refund_amount), 0),
+                    func.coalesce(func.sum(rollup.c.net_amount), 0),
+                    func.coalesce(func.sum(rollup.c.transaction_count), 0),
                 )
                 .select_from(Club)
-                .outerjoin(mv, (mv.c.club_id == Club.id) & date_pred)
+                .outerjoin(rollup, (rollup.c.club_id == Club.id) & date_pred)
                 .where(Club.tenant_id == tenant_id)
                 .group_by(Club.id, Club.name)
-                .order_by(desc(func.coalesce(func.sum(mv.c.net_amount), 0)))
+                .order_by(desc(func.coalesce(func.sum(rollup.c.net_amount), 0)))
             )
         ).all()
 
@@ -228,23 +206,23 @@ class RevenueService:
         date_from: date,
         date_to: date,
     ) -> list[RevenueByTypeRow]:
-        mv = self._view(basis)
+        rollup = self._rollup(basis)
         rows = (
             await self.db.execute(
                 select(
-                    mv.c.revenue_type,
-                    func.sum(mv.c.gross_amount),
-                    func.sum(mv.c.refund_amount),
-                    func.sum(mv.c.net_amount),
-                    func.sum(mv.c.transaction_count),
+                    rollup.c.revenue_type,
+                    func.sum(rollup.c.gross_amount),
+                    func.sum(rollup.c.refund_amount),
+                    func.sum(rollup.c.net_amount),
+                    func.sum(rollup.c.transaction_count),
                 )
                 .where(
-                    mv.c.club_id == club_id,
-                    mv.c.revenue_date >= date_from,
-                    mv.c.revenue_date <= date_to,
+                    rollup.c.club_id == club_id,
+                    rollup.c.revenue_date >= date_from,
+                    rollup.c.revenue_date <= date_to,
                 )
-                .group_by(mv.c.revenue_type)
-                .order_by(desc(func.sum(mv.c.net_amount)))
+                .group_by(rollup.c.revenue_type)
+                .order_by(desc(func.sum(rollup.c.net_amount)))
             )
         ).all()
         return [
@@ -265,13 +243,13 @@ class RevenueService:
         date_from: date,
         date_to: date,
     ) -> str | None:
-        mv = self._view(basis)
+        rollup = self._rollup(basis)
         return (
             await self.db.execute(
-                select(func.min(mv.c.currency)).where(
-                    mv.c.club_id == club_id,
-                    mv.c.revenue_date >= date_from,
-                    mv.c.revenue_date <= date_to,
+                select(func.min(rollup.c.currency)).where(
+                    rollup.c.club_id == club_id,
+                    rollup.c.revenue_date >= date_from,
+                    rollup.c.revenue_date <= date_to,
                 )
             )
         ).scalar_one_or_none()
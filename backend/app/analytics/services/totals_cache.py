@@ -0,0 +1,69 @@
+"""
+In-process cache of leaderboard ``total_records`` for materialized views.
+
+Each leaderboard page used to run a ``COUNT(*)`` over the club's rows in the
+view, even though the answer only changes when the view is refreshed. Totals
+are cached per ``(view, refresh id, club, filter)``, where the refresh id is
+the ``started_at`` of the view's latest successful refresh in
+``analytics_refresh_log``. When ``refresh_views`` completes a refresh the id
+moves on, so every earlier total stops matching and ages out of the LRU —
+nothing has to be deleted.
+
+The refresh id is the view's generation (``generations.py``), looked up at
+most once per ``ANALYTICS_GENERATION_TTL_SECONDS``, so a total can trail a
+refresh by that long. A view with no logged refresh (freshly created) is never
+cached. Per process, like the tenant cache. ``ANALYTICS_TOTALS_CACHE_MAX_ENTRIES
+= 0`` disables it.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Hashable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.analytics.services.generations import DataGenerations, get_data_generations
+from app.core.config import get_settings
+
+
+class TotalsCache:
+    def __init__(self, generations: DataGenerations, max_entries: int) -> None:
+        self._generations = generations
+        self._max_entries = max_entries
+        self._totals: OrderedDict[tuple, int] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0
+
+    async def total(self, db: AsyncSession, view: str, key: Hashable, count_stmt: Select) -> int:
+        """``count_stmt``'s scalar for ``key``, reused until ``view`` next refreshes."""
+        if not self.enabled:
+            return await _count(db, count_stmt)
+        refresh_id = await self._generations.view(db, view)
+        if refresh_id is None:
+            return await _count(db, count_stmt)
+        cache_key = (view, refresh_id, key)
+        total = self._totals.get(cache_key)
+        if total is not None:
+            self._totals.move_to_end(cache_key)
+            return total
+        total = await _count(db, count_stmt)
+        self._totals[cache_key] = total
+        while len(self._totals) > self._max_entries:
+            self._totals.popitem(last=False)
+        return total
+
+    def clear(self) -> None:
+        self._totals.clear()
+
+
+async def _count(db: AsyncSession, count_stmt: Select) -> int:
+    return int((await db.execute(count_stmt)).scalar_one() or 0)
+
+
+@lru_cache
+def get_totals_cache() -> TotalsCache:
+    return TotalsCache(get_data_generations(), get_settings().ANALYTICS_TOTALS_CACHE_MAX_ENTRIES)
@@ -0,0 +1,123 @@
+"""
+Coarse-grain rollups of ``court_utilisation_snapshots`` for long ranges.
+
+The courts and heatmap reports group raw snapshot rows — hourly rows for the
+heatmap, per-court daily rows for the courts report — so a year-long request
+for a 20-court club reads ~100k rows. Two rollups answer whole periods
+instead:
+
+  * ``court_utilisation_week_hours`` — (club, ISO week, day-of-week, hour),
+    hourly rows summed across courts: the heatmap's grain.
+  * ``court_utilisation_court_months`` — (club, month, court), daily-rollup
+    rows summed over the month: the courts report's grain.
+
+Both hold sums only; percentages are recomputed from them exactly as from the
+raw rows. ``refresh_club_rollups`` rebuilds a club's weeks and months around a
+snapshot write in the writer's transaction, so a rollup always equals the sum
+of the snapshot rows it covers. Readers use ``split_range`` to answer the
+whole weeks/months of a range from a rollup and stitch the partial periods at
+either edge from the snapshot rows themselves.
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import date, timedelta
+from typing import Callable, NamedTuple, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def week_start(day: date) -> date:
+    """The ISO week's Monday — ``date_trunc('week', day)``."""
+    return day - timedelta(days=day.weekday())
+
+
+def week_end(day: date) -> date:
+    return week_start(day) + timedelta(days=6)
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def month_end(day: date) -> date:
+    next_month = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return next_month - timedelta(days=1)
+
+
+class RangeSplit(NamedTuple):
+    """``start..end`` as whole periods ``periods`` (first and last period
+    start, or None) plus the leftover ``edges`` day ranges."""
+
+    periods: Optional[tuple[date, date]]
+    edges: list[tuple[date, date]]
+
+
+def split_range(
+    start: date,
+    end: date,
+    period_start: Callable[[date], date],
+    period_end: Callable[[date], date],
+) -> RangeSplit:
+    first = start if period_start(start) == start else period_end(start) + timedelta(days=1)
+    last = end if period_end(end) == end else period_start(end) - timedelta(days=1)
+    if first > last:
+        return RangeSplit(None, [(start, end)])
+    edges = []
+    if start < first:
+        edges.append((start, first - timedelta(days=1)))
+    if last < end:
+        edges.append((last + timedelta(days=1), end))
+    return RangeSplit((first, period_start(last)), edges)
+
+
+# Rebuilds for one club over whole periods. :period_from / :period_to are the
+# first and last period starts; the snapshot scan runs to the last period's end.
+_WEEK_HOURS_DELETE = text(
+    "DELETE FROM court_utilisation_week_hours "
+    "WHERE club_id = :club_id AND week_start BETWEEN :period_from AND :period_to"
+)
+_WEEK_HOURS_INSERT = text(
+    "INSERT INTO court_utilisation_week_hours "
+    "(club_id, week_start, day_of_week, hour_of_day, total_slots, booked_slots) "
+    "SELECT club_id, date_trunc('week', snapshot_date::timestamp)::date, day_of_week, hour_of_day, "
+    "sum(total_slots), sum(booked_slots) "
+    "FROM court_utilisation_snapshots "
+    "WHERE club_id = :club_id AND hour_of_day IS NOT NULL "
+    "AND snapshot_date BETWEEN :period_from AND :scan_to "
+    "GROUP BY 1, 2, 3, 4"
+)
+_COURT_MONTHS_DELETE = text(
+    "DELETE FROM court_utilisation_court_months "
+    "WHERE club_id = :club_id AND month_start BETWEEN :period_from AND :period_to"
+)
+_COURT_MONTHS_INSERT = text(
+    "INSERT INTO court_utilisation_court_months "
+    "(club_id, month_start, court_id, total_slots, booked_slots, revenue_actual, revenue_potential) "
+    "SELECT club_id, date_trunc('month', snapshot_date::timestamp)::date, court_id, "
+    "sum(total_slots), sum(booked_slots), sum(revenue_actual), sum(revenue_potential) "
+    "FROM court_utilisation_snapshots "
+    "WHERE club_id = :club_id AND hour_of_day IS NULL "
+    "AND snapshot_date BETWEEN :period_from AND :scan_to "
+    "GROUP BY 1, 2, 3"
+)
+
+
+async def refresh_club_rollups(
+    db: AsyncSession, club_id: uuid.UUID, date_from: date, date_to: date
+) -> None:
+    """Rebuild the club's weeks and months touching ``date_from..date_to`` from
+    its snapshot rows. Does not commit."""
+    for delete, insert, period_start, period_end in (
+        (_WEEK_HOURS_DELETE, _WEEK_HOURS_INSERT, week_start, week_end),
+        (_COURT_MONTHS_DELETE, _COURT_MONTHS_INSERT, month_start, month_end),
+    ):
+        params = {
+            "club_id": club_id,
+            "period_from": period_start(date_from),
+            "period_to": period_start(date_to),
+            "scan_to": period_end(date_to),
+        }
+        await db.execute(delete, params)
+        await db.execute(insert, params)
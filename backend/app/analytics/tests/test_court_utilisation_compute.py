@@ -15,6 +15,7 @@ from app.analytics.services.court_utilisation_service import (
     compute_court_day_snapshots,
 )
 from app.db.models.booking import BookingStatus
+from app.services.pricing_table import PricingTable
 
 LONDON = ZoneInfo("Europe/London")
 UTC = ZoneInfo("UTC")
@@ -27,7 +28,7 @@ def _rows(**overrides):
         tz=LONDON,
         booking_duration_minutes=90,
         windows=[OperatingWindow(time(9, 0), time(12, 0))],  # 2 × 90-min slots
-        pricing=[PricingWindow(0, time(0, 0), time(23, 59), Decimal("20"))],
+        pricing=PricingTable.compile([PricingWindow(0, time(0, 0), time(23, 59), Decimal("20"))]),
         bookings=[],
         reservations=[],
     )
@@ -0,0 +1,138 @@
+"""Unit tests for the streaming export pipeline.
+
+Builders are faked as async generators and the upload goes to the local
+filesystem stand-in (``EXPORT_STORAGE = "local"``), so these pin the encoders,
+the chunked hand-off and the cleanup of a failed export without GCS.
+"""
+import csv
+import gzip
+import io
+import tempfile
+import uuid
+from unittest.mock import MagicMock, patch
+
+from openpyxl import load_workbook
+
+from app.analytics.workers import export_report as worker
+from app.core.config import get_settings
+from app.services.storage_service import LocalReportExportUpload
+
+HEADER = ["user_id", "lifetime_spend"]
+
+
+async def _rows(n):
+    yield HEADER
+    for i in range(n):
+        yield [f"user-{i}", f"{i}.50"]
+
+
+class _Uploads(list):
+    """Records each chunk handed to the upload."""
+
+    def __init__(self, path):
+        super().__init__()
+        self.target = LocalReportExportUpload(path)
+
+    def write(self, data):
+        self.append(len(data))
+        self.target.write(data)
+
+
+async def test_csv_is_handed_off_in_chunks(tmp_path):
+    upload = _Uploads(tmp_path / "out.csv")
+
+    with patch.object(worker, "_FLUSH_BYTES", 1024):
+        written = await worker._write_export(_rows(2000), worker._CsvEncoder(), upload)
+    upload.target.close()
+
+    assert written == 2000
+    assert len(upload) > 10 and max(upload) < 2 * 1024
+    with open(tmp_path / "out.csv", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == HEADER
+    assert rows[-1] == ["user-1999", "1999.50"]
+
+
+async def test_gzip_csv_decompresses_to_the_plain_file(tmp_path):
+    upload = LocalReportExportUpload(tmp_path / "out.csv.gz")
+    encoder = worker._CsvEncoder(gzip=True)
+
+    with patch.object(worker, "_FLUSH_BYTES", 512):
+        await worker._write_export(_rows(500), encoder, upload)
+    upload.close()
+
+    assert encoder.extension == "csv.gz"
+    text = gzip.decompress((tmp_path / "out.csv.gz").read_bytes()).decode()
+    assert list(csv.reader(io.StringIO(text)))[1] == ["user-0", "0.50"]
+
+
+async def test_xlsx_rolls_over_to_a_new_sheet_with_the_header(tmp_path):
+    upload = LocalReportExportUpload(tmp_path / "out.xlsx")
+
+    with patch.object(worker, "_XLSX_MAX_ROWS", 4):
+        written = await worker._write_export(_rows(5), worker._XlsxEncoder(), upload)
+    upload.close()
+
+    assert written == 5
+    sheets = [list(ws.values) for ws in load_workbook(tmp_path / "out.xlsx").worksheets]
+    assert [len(rows) for rows in sheets] == [4, 3]
+    assert sheets[1][0] == tuple(HEADER)
+    assert sheets[1][-1] == ("user-4", "4.50")
+
+
+async def test_run_export_streams_to_local_storage_and_emails_the_link(tmp_path):
+    settings = get_settings()
+    session = MagicMock()
+    session.__aenter__.return_value = MagicMock()
+    session.__aexit__.return_value = False
+
+    async def builder(db, club_id, payload):
+        async for row in _rows(3):
+            yield row
+
+    club_id = str(uuid.uuid4())
+    with patch.object(settings, "EXPORT_STORAGE", "local"), \
+         patch.object(settings, "EXPORT_LOCAL_DIR", str(tmp_path)), \
+         patch.object(worker, "AsyncReadSessionLocal", MagicMock(return_value=session)), \
+         patch.dict(worker.REPORT_BUILDERS, {"player_value": builder}), \
+         patch.object(worker, "_email_export") as email:
+        result = await worker.run_export(
+            {"report_type": "player_value", "club_id": club_id, "format": "csv", "gzip": True}
+        )
+
+    assert result["status"] == "ok" and result["rows"] == 3
+    assert result["filename"].endswith(".csv.gz")
+    path = tmp_path / club_id / "player_value" / result["filename"]
+    assert email.call_args.args[2] == path.resolve().as_uri()
+    assert gzip.decompress(path.read_bytes()).decode().splitlines()[0] == ",".join(HEADER)
+
+
+async def test_failed_export_discards_the_partial_file(tmp_path):
+    settings = get_settings()
+    session = MagicMock()
+    session.__aenter__.return_value = MagicMock()
+    session.__aexit__.return_value = False
+
+    async def builder(db, club_id, payload):
+        yield HEADER
+        raise RuntimeError("replica went away")
+
+    spool_dir = tmp_path / "spool"
+    spool_dir.mkdir()
+    exports_dir = tmp_path / "exports"
+    with patch.object(tempfile, "tempdir", str(spool_dir)), \
+         patch.object(settings, "EXPORT_STORAGE", "local"), \
+         patch.object(settings, "EXPORT_LOCAL_DIR", str(exports_dir)), \
+         patch.object(worker, "AsyncReadSessionLocal", MagicMock(return_value=session)), \
+         patch.dict(worker.REPORT_BUILDERS, {"player_value": builder}), \
+         patch.object(worker, "publish_analytics_alert") as alert, \
+         patch.object(worker, "_email_export") as email:
+        result = await worker.run_export(
+            {"report_type": "player_value", "club_id": str(uuid.uuid4()), "format": "xlsx"}
+        )
+
+    assert result == {"status": "failed", "error": "replica went away"}
+    assert alert.call_args.args[0] == "analytics.export_failed"
+    email.assert_not_called()
+    assert not [p for p in exports_dir.rglob("*") if p.is_file()]
+    assert not list(spool_dir.iterdir())  # the half-built sheet's temp file is gone
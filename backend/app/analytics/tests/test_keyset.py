@@ -0,0 +1,180 @@
+"""Unit tests for leaderboard keyset pagination and the totals cache.
+
+No database: cursors are pure, seek predicates are checked as compiled
+Postgres SQL, and ``fetch_page`` / ``TotalsCache`` run over a mocked session.
+Walking real pages across NULL sort keys is covered in
+tests/integration/test_player_value.py.
+"""
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import column, func, select, table
+from sqlalchemy.dialects import postgresql
+
+from app.analytics.services.keyset import (
+    InvalidCursor,
+    SortKey,
+    decode_cursor,
+    encode_cursor,
+    fetch_page,
+)
+from app.analytics.services.generations import DataGenerations
+from app.analytics.services.totals_cache import TotalsCache
+
+MV = table("mv", column("club_id"), column("user_id"), column("spend"), column("last_at"))
+USER = uuid.UUID("00000000-0000-0000-0000-000000000007")
+
+
+def _sql(clause) -> str:
+    return str(clause.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+@pytest.mark.parametrize("value", [
+    Decimal("12.50"), 3, 0.4166666666666667, None,
+    datetime(2026, 5, 20, 10, 30, tzinfo=timezone.utc),
+])
+def test_cursor_round_trips_typed_values(value):
+    cursor = encode_cursor("players.value:lifetime_spend:0", value, USER)
+    assert decode_cursor(cursor, "players.value:lifetime_spend:0") == (value, USER)
+
+
+def test_cursor_for_another_scope_is_rejected():
+    cursor = encode_cursor("players.value:lifetime_spend:0", Decimal("1"), USER)
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, "players.value:lifetime_spend:1")
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "e30", encode_cursor("s", Decimal("1"), USER)[:-3]])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, "s")
+
+
+def test_descending_seek_bounds_the_key_for_an_index_range_scan():
+    sql = _sql(SortKey(MV.c.spend).after(MV.c.user_id, Decimal("12.50"), 7))
+    assert sql == "mv.spend <= 12.50 AND (mv.spend < 12.50 OR mv.user_id > 7)"
+
+
+def test_nulls_last_seek_keeps_the_trailing_null_block():
+    key = SortKey(MV.c.last_at, nulls_first=False)
+    assert _sql(key.after(MV.c.user_id, 5, 7)) == (
+        "mv.last_at <= 5 AND (mv.last_at < 5 OR mv.user_id > 7) OR mv.last_at IS NULL"
+    )
+    # Inside the null block only later ids remain.
+    assert _sql(key.after(MV.c.user_id, None, 7)) == "mv.last_at IS NULL AND mv.user_id > 7"
+
+
+def test_nulls_first_seek_from_the_null_block_includes_every_value():
+    key = SortKey(MV.c.last_at, descending=False, nulls_first=True)
+    assert _sql(key.after(MV.c.user_id, None, 7)) == (
+        "mv.last_at IS NULL AND mv.user_id > 7 OR mv.last_at IS NOT NULL"
+    )
+    assert [_sql(c) for c in key.order_by(MV.c.user_id)] == [
+        "mv.last_at ASC NULLS FIRST", "mv.user_id ASC",
+    ]
+
+
+def _page_db(rows):
+    result = MagicMock()
+    result.all.return_value = rows
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+    return db
+
+
+def _rows(n):
+    rows = []
+    for i in range(n):
+        row = MagicMock()
+        row._sort_key = Decimal(100 - i)
+        row._mapping = {MV.c.user_id: i}
+        rows.append(row)
+    return rows
+
+
+async def test_fetch_page_reads_one_extra_row_to_issue_a_cursor():
+    db = _page_db(_rows(3))
+
+    rows, cursor = await fetch_page(db, select(MV.c.user_id), SortKey(MV.c.spend), MV.c.user_id, "s", limit=2)
+
+    assert len(rows) == 2
+    assert decode_cursor(cursor, "s") == (Decimal(99), 1)
+    stmt = db.execute.await_args.args[0]
+    assert stmt._limit == 3
+
+
+async def test_fetch_page_seeks_instead_of_offsetting_when_given_a_cursor():
+    db = _page_db(_rows(1))
+    cursor = encode_cursor("s", Decimal(99), 1)
+
+    rows, next_cursor = await fetch_page(
+        db, select(MV.c.user_id), SortKey(MV.c.spend), MV.c.user_id, "s",
+        limit=2, offset=40, cursor=cursor,
+    )
+
+    assert next_cursor is None
+    sql = _sql(db.execute.await_args.args[0])
+    assert "OFFSET" not in sql
+    assert "mv.spend <= 99 AND (mv.spend < 99 OR mv.user_id > 1)" in sql
+
+
+# ---------------------------------------------------------------------------
+# Totals cache
+# ---------------------------------------------------------------------------
+
+
+def _totals_db(refresh_ids, totals):
+    """Each execute returns the next refresh id (a max(started_at) query) or
+    the next total (anything else)."""
+    refresh_ids, totals = iter(refresh_ids), iter(totals)
+
+    async def execute(stmt):
+        result = MagicMock()
+        source = refresh_ids if "analytics_refresh_log" in str(stmt) else totals
+        result.scalar_one.return_value = next(source)
+        return result
+
+    return MagicMock(execute=AsyncMock(side_effect=execute))
+
+
+COUNT = select(func.count()).select_from(MV)
+REFRESH_1 = datetime(2026, 10, 18, 3, 0, tzinfo=timezone.utc)
+REFRESH_2 = datetime(2026, 10, 19, 3, 0, tzinfo=timezone.utc)
+
+
+async def test_total_is_reused_until_the_view_refreshes():
+    cache = TotalsCache(DataGenerations(ttl_seconds=0), max_entries=10)
+    db = _totals_db([REFRESH_1, REFRESH_1, REFRESH_2], [40, 41])
+
+    assert await cache.total(db, "mv", ("club", 1), COUNT) == 40
+    assert await cache.total(db, "mv", ("club", 1), COUNT) == 40
+    assert await cache.total(db, "mv", ("club", 1), COUNT) == 41  # new refresh id
+
+
+async def test_refresh_id_is_looked_up_once_per_ttl():
+    cache = TotalsCache(DataGenerations(ttl_seconds=60), max_entries=10)
+    db = _totals_db([REFRESH_1], [40, 12])
+
+    await cache.total(db, "mv", ("club", 1), COUNT)
+    assert await cache.total(db, "mv", ("club", 2), COUNT) == 12
+    assert db.execute.await_count == 3
+
+
+async def test_never_refreshed_view_is_not_cached():
+    cache = TotalsCache(DataGenerations(ttl_seconds=0), max_entries=10)
+    db = _totals_db([None, None], [5, 6])
+
+    assert await cache.total(db, "mv", "k", COUNT) == 5
+    assert await cache.total(db, "mv", "k", COUNT) == 6
+
+
+async def test_lru_evicts_beyond_max_entries():
+    cache = TotalsCache(DataGenerations(ttl_seconds=60), max_entries=1)
+    db = _totals_db([REFRESH_1], [1, 2, 3])
+
+    await cache.total(db, "mv", "a", COUNT)
+    await cache.total(db, "mv", "b", COUNT)
+    assert await cache.total(db, "mv", "a", COUNT) == 3  # recounted after eviction
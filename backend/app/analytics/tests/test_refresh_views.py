@@ -0,0 +1,163 @@
+"""Unit tests for the materialized-view refresh planner.
+
+No database: the change check is a pure function, the orchestration tests
+patch out ``_refresh_one`` to observe ordering and parallelism, and the
+single-view tests drive ``_refresh_one`` over a mocked AUTOCOMMIT connection.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.analytics.workers import refresh_views as worker
+from app.analytics.workers.refresh_views import REFRESH_VIEWS, RefreshView, needs_refresh
+from app.db.models.analytics import RefreshStatus
+
+REVENUE = RefreshView("mv_revenue", ("payments", "bookings"))
+RFV = RefreshView("mv_rfv", (), depends_on=("mv_value",))
+
+
+def test_registry_lists_every_view_upstream_first():
+    assert len(REFRESH_VIEWS) == len(set(REFRESH_VIEWS)) == 5
+    assert REFRESH_VIEWS.index("mv_player_value") < REFRESH_VIEWS.index("mv_player_rfv")
+
+
+def test_unchanged_sources_skip_the_view():
+    counts = {"payments": 10, "bookings": 4}
+    assert not needs_refresh(REVENUE, counts, dict(counts))
+
+
+def test_any_changed_or_unrecorded_source_refreshes():
+    assert needs_refresh(REVENUE, {"payments": 11, "bookings": 4}, {"payments": 10, "bookings": 4})
+    assert needs_refresh(REVENUE, {"payments": 10, "bookings": 4}, {"payments": 10})
+    # Stats reset: the counter went backwards — still a change.
+    assert needs_refresh(REVENUE, {"payments": 0, "bookings": 0}, {"payments": 10, "bookings": 4})
+
+
+def test_upstream_view_counts_as_a_source():
+    assert not needs_refresh(RFV, {"mv_value": 7}, {"mv_value": 7})
+    assert needs_refresh(RFV, {"mv_value": 9}, {"mv_value": 7})
+
+
+def test_time_relative_views_always_refresh():
+    view = RefreshView("mv_recent", ("bookings",), time_relative=True)
+    assert needs_refresh(view, {"bookings": 1}, {"bookings": 1})
+
+
+# ---------------------------------------------------------------------------
+# Orchestration
+# ---------------------------------------------------------------------------
+
+
+async def test_independent_views_run_in_parallel_and_dependents_wait():
+    running = 0
+    peak = 0
+    finished: list[str] = []
+    started_after: dict[str, list[str]] = {}
+    forced: dict[str, bool] = {}
+
+    async def fake_refresh_one(view, triggered_by, force=False):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        started_after[view.name] = list(finished)
+        forced[view.name] = force
+        await asyncio.sleep(0.01)
+        running -= 1
+        finished.append(view.name)
+        return {"view_name": view.name, "status": RefreshStatus.success.value}
+
+    with patch.object(worker.settings, "ANALYTICS_REFRESH_CONCURRENCY", 3), \
+         patch.object(worker, "_refresh_one", fake_refresh_one):
+        result = await worker.refresh_views()
+
+    assert peak == 3
+    assert "mv_player_value" in started_after["mv_player_rfv"]
+    assert forced["mv_player_rfv"] is True       # upstream refreshed this run
+    assert forced["mv_club_signups_day"] is False
+    assert result["views_succeeded"] == 5
+
+
+async def test_skipped_upstream_leaves_dependent_to_its_own_check():
+    forced: dict[str, bool] = {}
+
+    async def fake_refresh_one(view, triggered_by, force=False):
+        forced[view.name] = force
+        return {"view_name": view.name, "status": RefreshStatus.skipped.value}
+
+    with patch.object(worker, "_refresh_one", fake_refresh_one):
+        result = await worker.refresh_views(requested=["mv_player_rfv", "mv_player_value", "nope"])
+
+    assert forced == {"mv_player_value": False, "mv_player_rfv": False}
+    assert result["views_requested"] == 2
+    assert result["views_skipped"] == 2
+
+
+# ---------------------------------------------------------------------------
+# Single view
+# ---------------------------------------------------------------------------
+
+
+def _result(*, rows=None, scalar=None):
+    result = MagicMock()
+    result.all.return_value = rows or []
+    result.scalar_one.return_value = scalar
+    return result
+
+
+def _engine(conn):
+    raw = MagicMock()
+    raw.execution_options = AsyncMock(return_value=conn)
+    connect = MagicMock()
+    connect.__aenter__ = AsyncMock(return_value=raw)
+    connect.__aexit__ = AsyncMock(return_value=False)
+    return MagicMock(connect=MagicMock(return_value=connect))
+
+
+def _statements(conn):
+    return [str(call.args[0]) for call in conn.execute.await_args_list]
+
+
+async def test_unchanged_view_is_logged_as_skipped_without_refreshing():
+    conn = MagicMock()
+    conn.execute = AsyncMock(side_effect=[
+        _result(rows=[("payments", 10), ("bookings", 4)]),   # change counts
+        _result(rows=[("payments", 10), ("bookings", 4)]),   # watermarks
+    ])
+    write_log = AsyncMock()
+
+    with patch.object(worker, "engine", _engine(conn)), \
+         patch.object(worker, "_write_log", write_log):
+        result = await worker._refresh_one(REVENUE, "manual")
+
+    assert result["status"] == RefreshStatus.skipped.value
+    assert not any("REFRESH" in s for s in _statements(conn))
+    assert write_log.await_args.kwargs["status"] is RefreshStatus.skipped
+
+
+async def test_changed_view_refreshes_and_records_the_pre_refresh_counts():
+    conn = MagicMock()
+    conn.execute = AsyncMock(side_effect=[
+        _result(rows=[("payments", 11), ("bookings", 4)]),   # change counts
+        _result(rows=[("payments", 10), ("bookings", 4)]),   # watermarks
+        _result(),                                           # REFRESH
+        _result(),                                           # ANALYZE
+        _result(scalar=1234),                                # reltuples
+        _result(),                                           # watermark upsert
+    ])
+    write_log = AsyncMock()
+
+    with patch.object(worker, "engine", _engine(conn)), \
+         patch.object(worker, "_write_log", write_log):
+        result = await worker._refresh_one(REVENUE, "manual")
+
+    statements = _statements(conn)
+    assert statements[2] == "REFRESH MATERIALIZED VIEW CONCURRENTLY mv_revenue"
+    assert statements[3] == "ANALYZE mv_revenue"
+    assert not any("count(*)" in s for s in statements)
+    assert result == {
+        "view_name": "mv_revenue", "status": "success",
+        "duration_ms": result["duration_ms"], "row_count": 1234,
+    }
+    assert conn.execute.await_args_list[5].args[1] == [
+        {"view_name": "mv_revenue", "source_table": "payments", "change_count": 11},
+        {"view_name": "mv_revenue", "source_table": "bookings", "change_count": 4},
+    ]
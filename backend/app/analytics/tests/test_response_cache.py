@@ -0,0 +1,218 @@
+"""Unit tests for the analytics response cache and data-generation bumps.
+
+Requests are built from bare ASGI scopes and the builder is a mock, so these
+pin when a report is rebuilt, served from cache or answered with a 304, and
+which generations the player leaderboards are keyed on.
+Generations moving with real rollup/snapshot writes are covered in
+tests/integration/test_revenue.py.
+"""
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import Request
+from pydantic import BaseModel
+from sqlalchemy.dialects import postgresql
+
+from app.analytics.api import players, response_cache
+from app.analytics.api.response_cache import ResponseCache, cached_response
+from app.analytics.schemas.player import PlayerSort
+from app.analytics.services.generations import REVENUE_ROLLUPS, bump_generations
+
+TENANT = uuid.UUID("00000000-0000-0000-0000-00000000000a")
+OTHER_TENANT = uuid.UUID("00000000-0000-0000-0000-00000000000b")
+CLUB = uuid.UUID("00000000-0000-0000-0000-000000000001")
+
+
+class Report(BaseModel):
+    day: date
+    total: int
+
+
+def _request(query: str = "basis=cash", if_none_match: str | None = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": f"/api/v1/analytics/revenue/clubs/{CLUB}/summary",
+        "query_string": query.encode(),
+        "headers": headers,
+    })
+
+
+@pytest.fixture
+def cache():
+    cache = ResponseCache(max_entries=10)
+    with patch.object(response_cache, "get_response_cache", return_value=cache):
+        yield cache
+
+
+def _build(total: int = 3) -> AsyncMock:
+    return AsyncMock(return_value=Report(day=date(2026, 10, 18), total=total))
+
+
+async def test_first_request_builds_and_later_ones_are_served_from_cache(cache):
+    build = _build()
+
+    first = await cached_response(_request(), TENANT, 7, build)
+    second = await cached_response(_request(), TENANT, 7, build)
+
+    build.assert_awaited_once()
+    assert first.body == second.body == b'{"day":"2026-10-18","total":3}'
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+
+@pytest.mark.parametrize("header", ["{etag}", "W/{etag}", '"stale", {etag}', "*"])
+async def test_matching_if_none_match_is_a_304_without_building(cache, header):
+    etag = (await cached_response(_request(), TENANT, 7, _build())).headers["etag"]
+    build = _build()
+
+    response = await cached_response(_request(if_none_match=header.format(etag=etag)), TENANT, 7, build)
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    build.assert_not_awaited()
+
+
+async def test_a_new_generation_rebuilds_under_a_new_etag(cache):
+    before = await cached_response(_request(), TENANT, 7, _build(3))
+    build = _build(4)
+
+    after = await cached_response(_request(if_none_match=before.headers["etag"]), TENANT, 8, build)
+
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    assert b'"total":4' in after.body
+
+
+async def test_tenant_and_query_are_part_of_the_key(cache):
+    base = await cached_response(_request(), TENANT, 7, _build())
+    other_tenant = await cached_response(_request(), OTHER_TENANT, 7, _build())
+    other_query = await cached_response(_request("basis=service"), TENANT, 7, _build())
+
+    assert len({base.headers["etag"], other_tenant.headers["etag"], other_query.headers["etag"]}) == 3
+
+
+async def test_data_never_written_is_neither_cached_nor_tagged(cache):
+    build = _build()
+
+    result = await cached_response(_request(), TENANT, None, build)
+    await cached_response(_request(), TENANT, None, build)
+
+    assert isinstance(result, Report)
+    assert build.await_count == 2
+
+
+async def test_disabled_cache_passes_straight_through():
+    build = _build()
+    with patch.object(response_cache, "get_response_cache", return_value=ResponseCache(0)):
+        result = await cached_response(_request(), TENANT, 7, build)
+
+    assert isinstance(result, Report)
+
+
+def test_lru_keeps_the_most_recently_used_bodies():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    cache.get("a")
+    cache.put("c", b"3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+
+
+# ---------------------------------------------------------------------------
+# bump_generations
+# ---------------------------------------------------------------------------
+
+
+def _sql(db) -> str:
+    stmt = db.execute.await_args.args[0]
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+async def test_bump_upserts_each_club_once():
+    db = AsyncMock()
+
+    await bump_generations(db, REVENUE_ROLLUPS, [CLUB, CLUB])
+
+    sql = _sql(db)
+    assert sql.startswith("INSERT INTO analytics_data_generations")
+    assert "ON CONFLICT (source, club_id) DO UPDATE SET generation = " \
+           "(analytics_data_generations.generation + %(generation_1)s)" in sql
+    params = db.execute.await_args.args[0].compile().params
+    assert [v for k, v in params.items() if k.startswith("club_id")] == [CLUB]
+
+
+async def test_bump_with_no_clubs_is_a_no_op():
+    db = AsyncMock()
+
+    await bump_generations(db, REVENUE_ROLLUPS, [])
+
+    db.execute.assert_not_awaited()
+
+
+async def test_bump_without_clubs_covers_every_club():
+    db = AsyncMock()
+
+    await bump_generations(db, REVENUE_ROLLUPS)
+
+    assert "SELECT %(param_1)s AS anon_1, clubs.id" in _sql(db)
+
+
+# ---------------------------------------------------------------------------
+# Player leaderboards (mv_player_value LEFT JOIN mv_player_rfv)
+# ---------------------------------------------------------------------------
+
+
+class _Generations:
+    def __init__(self, **views):
+        self.views = views
+
+    async def view(self, db, view_name):
+        return self.views[view_name]
+
+
+async def _player_value(generations, build):
+    request = Request({
+        "type": "http",
+        "method": "GET",
+        "path": f"/api/v1/analytics/players/clubs/{CLUB}/value",
+        "query_string": b"",
+        "headers": [],
+    })
+    service = MagicMock()
+    service.return_value.leaderboard = build
+    with patch.object(players, "get_data_generations", return_value=generations), \
+         patch.object(players, "_load_club", AsyncMock()), \
+         patch.object(players, "PlayerValueService", service):
+        return await players.club_player_value(
+            request, CLUB, members_only=False, sort=PlayerSort.lifetime_spend,
+            limit=50, offset=0, cursor=None, _staff=None,
+            tenant=SimpleNamespace(id=TENANT), db=AsyncMock(),
+        )
+
+
+async def test_player_value_is_rebuilt_when_only_rfv_refreshes(cache):
+    refreshed = datetime(2026, 10, 18, 2, 0, tzinfo=timezone.utc)
+    generations = _Generations(mv_player_value=refreshed, mv_player_rfv=refreshed - timedelta(days=1))
+    before = await _player_value(generations, _build(3))
+
+    generations.views["mv_player_rfv"] = refreshed + timedelta(minutes=1)
+    build = _build(4)
+    after = await _player_value(generations, build)
+
+    build.assert_awaited_once()
+    assert after.headers["etag"] != before.headers["etag"]
+
+
+async def test_player_value_is_not_cached_before_rfv_first_refreshes(cache):
+    generations = _Generations(mv_player_value=datetime(2026, 10, 18, tzinfo=timezone.utc), mv_player_rfv=None)
+
+    result = await _player_value(generations, _build())
+
+    assert isinstance(result, Report)
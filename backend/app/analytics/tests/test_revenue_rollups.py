@@ -0,0 +1,88 @@
+"""Unit tests for the incremental revenue-rollup delta logic.
+
+``rollup_deltas`` is pure, so these pin the attribution and sign handling;
+the triggers, queue claiming and reconciliation run against Postgres in
+tests/integration/test_revenue.py.
+"""
+import uuid
+from dataclasses import replace
+from datetime import date
+from decimal import Decimal
+
+from app.analytics.schemas.revenue import RevenueBasis
+from app.analytics.services.revenue_rollups import PaymentFact, RollupDelta, rollup_deltas
+
+CLUB_ID = uuid.uuid4()
+SERVICE_DAY = date(2026, 6, 3)
+CASH_DAY = date(2026, 6, 1)
+
+
+def _fact(**overrides):
+    fields = dict(
+        payment_id=uuid.uuid4(), club_id=CLUB_ID, currency="GBP", booking_type="regular",
+        service_date=SERVICE_DAY, cash_date=CASH_DAY, amount=Decimal("30.00"),
+        refund_amount=Decimal("0"), equipment_amount=Decimal("0"),
+    )
+    fields.update(overrides)
+    return PaymentFact(**fields)
+
+
+def _key(day, revenue_type="regular"):
+    return (CLUB_ID, day, revenue_type, "GBP")
+
+
+def test_new_payment_adds_to_both_bases():
+    deltas = rollup_deltas([], [_fact()])
+
+    expected = RollupDelta(Decimal("30.00"), Decimal("0"), Decimal("30.00"), 1)
+    assert deltas[RevenueBasis.service] == {_key(SERVICE_DAY): expected}
+    assert deltas[RevenueBasis.cash] == {_key(CASH_DAY): expected}
+
+
+def test_embedded_equipment_is_split_off_the_court_portion():
+    fact = _fact(amount=Decimal("38.00"), refund_amount=Decimal("5.00"), equipment_amount=Decimal("8.00"))
+
+    service = rollup_deltas([], [fact])[RevenueBasis.service]
+
+    assert service[_key(SERVICE_DAY)] == RollupDelta(Decimal("30.00"), Decimal("5.00"), Decimal("25.00"), 1)
+    assert service[_key(SERVICE_DAY, "equipment")] == RollupDelta(Decimal("8.00"), Decimal("0"), Decimal("8.00"), 1)
+
+
+def test_refund_changes_only_refund_and_net():
+    before = _fact()
+    after = replace(before, refund_amount=Decimal("10.00"))
+
+    deltas = rollup_deltas([before], [after])
+
+    assert deltas[RevenueBasis.service] == {
+        _key(SERVICE_DAY): RollupDelta(Decimal("0.00"), Decimal("10.00"), Decimal("-10.00"), 0)
+    }
+
+
+def test_unchanged_payment_is_a_zero_delta():
+    fact = _fact(equipment_amount=Decimal("4.00"))
+    assert rollup_deltas([fact], [fact]) == {RevenueBasis.service: {}, RevenueBasis.cash: {}}
+
+
+def test_payment_leaving_the_rollups_is_subtracted():
+    deltas = rollup_deltas([_fact()], [])
+
+    assert deltas[RevenueBasis.cash] == {
+        _key(CASH_DAY): RollupDelta(Decimal("-30.00"), Decimal("0"), Decimal("-30.00"), -1)
+    }
+
+
+def test_rescheduled_booking_moves_service_revenue_between_days():
+    before = _fact()
+    after = replace(before, service_date=date(2026, 6, 10), booking_type="lesson_individual")
+
+    deltas = rollup_deltas([before], [after])
+
+    assert deltas[RevenueBasis.service] == {
+        _key(SERVICE_DAY): RollupDelta(Decimal("-30.00"), Decimal("0"), Decimal("-30.00"), -1),
+        _key(date(2026, 6, 10), "lesson_individual"): RollupDelta(
+            Decimal("30.00"), Decimal("0"), Decimal("30.00"), 1
+        ),
+    }
+    # Cash day unchanged, but the booking type moved the key.
+    assert set(deltas[RevenueBasis.cash]) == {_key(CASH_DAY), _key(CASH_DAY, "lesson_individual")}
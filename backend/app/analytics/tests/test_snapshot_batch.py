@@ -0,0 +1,147 @@
+"""Property tests: ``compute_club_range_snapshots`` vs the per-day reference.
+
+Each case draws a random club range — timezone (DST transitions included),
+booking duration, operating windows, pricing, bookings and reservations — and
+checks the batch rows are identical, down to ``repr``, to calling
+``compute_court_day_snapshots`` for every court and day.
+"""
+import random
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.analytics.services.court_utilisation_service import (
+    BookingInput,
+    OperatingWindow,
+    PricingWindow,
+    ReservationInput,
+    compute_club_range_snapshots,
+    compute_court_day_snapshots,
+)
+from app.db.models.booking import BookingStatus
+from app.services.pricing_table import PricingTable
+
+UTC = ZoneInfo("UTC")
+ZONES = [ZoneInfo(name) for name in ("Europe/London", "America/New_York", "Australia/Sydney", "UTC")]
+# Ranges starting just before the 2026 DST transitions, and one quiet week.
+RANGE_STARTS = [date(2026, 3, 27), date(2026, 10, 23), date(2026, 4, 3), date(2026, 6, 1)]
+COURTS = [uuid.uuid4(), uuid.uuid4(), uuid.uuid4()]
+
+
+def _local(rng, tz, day):
+    wall = datetime.combine(day, time(rng.randrange(24), rng.choice([0, 15, 30, 45, rng.randrange(60)])))
+    local = wall.replace(tzinfo=tz, fold=rng.randrange(2))
+    # Half the time round-trip through UTC, as rows read from the database are.
+    return local.astimezone(UTC).astimezone(tz) if rng.random() < 0.5 else local
+
+
+def _case(seed):
+    rng = random.Random(seed)
+    tz = rng.choice(ZONES)
+    date_from = rng.choice(RANGE_STARTS)
+    days = [date_from + timedelta(days=n) for n in range(rng.randint(1, 5))]
+
+    windows_by_day = {}
+    for day in days:
+        windows = []
+        for _ in range(rng.choice([0, 1, 1, 2])):
+            open_h = rng.randrange(20)
+            windows.append(OperatingWindow(
+                time(open_h, rng.choice([0, 30])),
+                time(min(open_h + rng.randint(1, 10), 23), rng.choice([0, 30, 59])),
+            ))
+        windows_by_day[day] = windows
+
+    pricing = PricingTable.compile([
+        PricingWindow(
+            rng.randrange(7), time(h), time(min(h + rng.randint(1, 12), 23), 59),
+            Decimal(rng.randint(500, 5000)) / 100,
+        )
+        for h in (rng.randrange(20) for _ in range(rng.randint(0, 6)))
+    ])
+
+    spread = [days[0] - timedelta(days=1), *days, days[-1] + timedelta(days=1)]
+    bookings = {}
+    for court_id in COURTS:
+        bookings[court_id] = []
+        for _ in range(rng.randint(0, 25)):
+            start_local = _local(rng, tz, rng.choice(spread))
+            created_at = None
+            if rng.random() < 0.8:
+                created_at = start_local.astimezone(UTC) - timedelta(minutes=rng.randint(-600, 20000))
+            bookings[court_id].append(BookingInput(
+                start_local=start_local,
+                status=rng.choice(list(BookingStatus)),
+                total_price=rng.choice([None, Decimal(rng.randint(0, 9000)) / 100]),
+                created_at=created_at,
+            ))
+
+    reservations = {}
+    for court_id in [None, *COURTS]:
+        reservations[court_id] = []
+        for _ in range(rng.choice([0, 0, 1, 2, 3])):
+            start_local = _local(rng, tz, rng.choice(spread))
+            # Mostly a few hours; sometimes multi-day or inverted (end first).
+            length = timedelta(minutes=rng.choice([rng.randint(15, 300), rng.randint(600, 3000), -rng.randint(15, 300)]))
+            reservations[court_id].append(
+                ReservationInput(start_local=start_local, end_local=(start_local + length).astimezone(tz))
+            )
+
+    return dict(
+        tz=tz,
+        booking_duration_minutes=rng.choice([30, 45, 60, 90, 120]),
+        windows_by_day=windows_by_day,
+        pricing=pricing,
+        bookings_by_court=bookings,
+        reservations_by_court=reservations,
+    )
+
+
+def _reference(case):
+    by_court = {}
+    for court_id in COURTS:
+        by_court[court_id] = []
+        for day in sorted(case["windows_by_day"]):
+            by_court[court_id].extend(compute_court_day_snapshots(
+                snapshot_date=day,
+                tz=case["tz"],
+                booking_duration_minutes=case["booking_duration_minutes"],
+                windows=case["windows_by_day"][day],
+                pricing=case["pricing"],
+                bookings=case["bookings_by_court"][court_id],
+                reservations=case["reservations_by_court"][court_id] + case["reservations_by_court"][None],
+            ))
+    return by_court
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_batch_matches_per_day_reference(seed):
+    case = _case(seed)
+
+    batch = compute_club_range_snapshots(court_ids=COURTS, **case)
+
+    assert repr(batch) == repr(_reference(case))
+
+
+def test_courts_without_inputs_get_unblocked_empty_rows():
+    tz = ZoneInfo("Europe/London")
+    day = date(2026, 6, 1)
+    pricing = PricingTable.compile([PricingWindow(0, time(0), time(23, 59), Decimal("20"))])
+
+    batch = compute_club_range_snapshots(
+        tz=tz,
+        booking_duration_minutes=90,
+        windows_by_day={day: [OperatingWindow(time(9), time(12))], day + timedelta(days=1): []},
+        pricing=pricing,
+        court_ids=COURTS[:1],
+        bookings_by_court={},
+        reservations_by_court={},
+    )
+
+    rows = batch[COURTS[0]]
+    assert [r.hour_of_day for r in rows] == [9, 10, None]
+    assert rows[-1].total_slots == 2
+    assert rows[-1].revenue_potential == Decimal("40")
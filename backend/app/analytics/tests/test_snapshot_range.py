@@ -0,0 +1,192 @@
+"""Unit tests for the range-based snapshot gather and the concurrent worker.
+
+The database is mocked: ``gather_club_range`` is fed one result per query and
+must partition them per court-day exactly as computing each day on its own
+would. The worker tests patch out the per-club write to check the concurrency
+bound and per-club failure isolation.
+"""
+import asyncio
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from zoneinfo import ZoneInfo
+
+from app.analytics.services.court_utilisation_service import (
+    BookingInput,
+    CourtUtilisationService,
+    OperatingWindow,
+    ReservationInput,
+    compute_court_day_snapshots,
+)
+from app.analytics.workers import snapshot_court_utilisation as worker
+from app.db.models.booking import BookingStatus
+from app.services.pricing_table import PricingTable
+
+LONDON = ZoneInfo("Europe/London")
+UTC = ZoneInfo("UTC")
+MONDAY = date(2026, 6, 1)
+COURT_A, COURT_B = uuid.uuid4(), uuid.uuid4()
+CLUB = SimpleNamespace(id=uuid.uuid4(), timezone="Europe/London", booking_duration_minutes=90)
+
+
+def _hours(day_of_week, open_h, close_h, valid_from=None, valid_until=None):
+    return SimpleNamespace(
+        day_of_week=day_of_week,
+        open_time=time(open_h),
+        close_time=time(close_h),
+        valid_from=valid_from,
+        valid_until=valid_until,
+    )
+
+
+def _result(*, scalars=None, rows=None):
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = scalars or []
+    result.all.return_value = rows or []
+    return result
+
+
+def _local(day, hour):
+    return datetime.combine(day, time(hour), tzinfo=LONDON)
+
+
+def _utc(day, hour):
+    return _local(day, hour).astimezone(UTC)
+
+
+async def _gather(hours, bookings, reservations, date_from=MONDAY, date_to=date(2026, 6, 3)):
+    db = AsyncMock()
+    db.execute = AsyncMock(side_effect=[
+        _result(scalars=hours),
+        _result(rows=bookings),
+        _result(rows=reservations),
+    ])
+    pricing = PricingTable.compile([])
+    with patch(
+        "app.analytics.services.court_utilisation_service.load_pricing_table",
+        AsyncMock(return_value=pricing),
+    ):
+        by_court = await CourtUtilisationService(db).gather_club_range(
+            club=CLUB, date_from=date_from, date_to=date_to, court_ids=[COURT_A, COURT_B],
+        )
+    return by_court, pricing, db
+
+
+def _daily(rows, day):
+    return next(r for r in rows if r.snapshot_date == day and r.hour_of_day is None)
+
+
+async def test_range_matches_computing_each_day_on_its_own():
+    hours = [_hours(d, 9, 12) for d in range(7)]
+    booking = (COURT_A, _utc(MONDAY, 9), BookingStatus.confirmed, Decimal("20"), _utc(MONDAY, 6))
+    # Club-wide, 10:30 Tuesday → 10:30 Wednesday: blocks both courts on both days.
+    club_wide = (
+        None,
+        _utc(date(2026, 6, 2), 10).replace(minute=30),
+        _utc(date(2026, 6, 3), 10).replace(minute=30),
+    )
+    court_b_only = (COURT_B, _utc(MONDAY, 9), _utc(MONDAY, 10))
+
+    by_court, pricing, db = await _gather(hours, [booking], [club_wide, court_b_only])
+
+    windows = [OperatingWindow(time(9), time(12))]
+    tuesday, wednesday = date(2026, 6, 2), date(2026, 6, 3)
+    club_wide_input = ReservationInput(club_wide[1].astimezone(LONDON), club_wide[2].astimezone(LONDON))
+    expected_inputs = {
+        (COURT_A, MONDAY): ([BookingInput(_local(MONDAY, 9), *booking[2:])], []),
+        (COURT_B, MONDAY): ([], [ReservationInput(_local(MONDAY, 9), _local(MONDAY, 10))]),
+        (COURT_A, tuesday): ([], [club_wide_input]),
+        (COURT_B, tuesday): ([], [club_wide_input]),
+        (COURT_A, wednesday): ([], [club_wide_input]),
+        (COURT_B, wednesday): ([], [club_wide_input]),
+    }
+    for (court_id, day), (bookings, reservations) in expected_inputs.items():
+        expected = compute_court_day_snapshots(
+            snapshot_date=day, tz=LONDON, booking_duration_minutes=90, windows=windows,
+            pricing=pricing, bookings=bookings, reservations=reservations,
+        )
+        assert [r for r in by_court[court_id] if r.snapshot_date == day] == expected
+
+    assert _daily(by_court[COURT_A], MONDAY).booked_slots == 1
+    assert _daily(by_court[COURT_B], MONDAY).total_slots == 1
+    assert db.execute.await_count == 3  # hours, bookings, reservations — not per day
+
+
+async def test_closed_days_and_expired_hours_produce_no_rows():
+    hours = [
+        _hours(0, 9, 12),                                  # Mondays only
+        _hours(1, 9, 12, valid_until=date(2026, 5, 31)),   # Tuesdays, expired
+    ]
+    by_court, _, _ = await _gather(hours, [], [])
+
+    assert {r.snapshot_date for r in by_court[COURT_A]} == {MONDAY}
+    assert {r.snapshot_date for r in by_court[COURT_B]} == {MONDAY}
+
+
+async def test_no_windows_in_range_skips_remaining_queries():
+    db = AsyncMock()
+    db.execute = AsyncMock(return_value=_result(scalars=[]))
+
+    by_court = await CourtUtilisationService(db).gather_club_range(
+        club=CLUB, date_from=MONDAY, date_to=MONDAY, court_ids=[COURT_A],
+    )
+
+    assert by_court == {COURT_A: []}
+    assert db.execute.await_count == 1
+
+
+# ---------------------------------------------------------------------------
+# Worker orchestration
+# ---------------------------------------------------------------------------
+
+
+def _club(tz="Europe/London"):
+    return SimpleNamespace(id=uuid.uuid4(), timezone=tz, booking_duration_minutes=90)
+
+
+async def test_backfill_runs_clubs_concurrently_within_the_bound():
+    clubs = [_club() for _ in range(6)]
+    running = 0
+    peak = 0
+    ranges = []
+
+    async def fake_snapshot_club(club, date_from, date_to):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        ranges.append((date_from, date_to))
+        await asyncio.sleep(0.01)
+        running -= 1
+        return 10
+
+    with patch.object(worker, "_all_clubs", AsyncMock(return_value=clubs)), \
+         patch.object(worker, "AsyncReadSessionLocal", MagicMock()), \
+         patch.object(worker, "_snapshot_club", fake_snapshot_club):
+        result = await worker.backfill(days=30, concurrency=2)
+
+    assert peak == 2
+    assert all((end - start).days == 29 for start, end in ranges)
+    assert result["clubs_processed"] == 6
+    assert result["club_days"] == 180
+    assert result["rows_written"] == 60
+    assert result["rows_per_second"] > 0
+
+
+async def test_failing_club_is_counted_and_others_complete():
+    clubs = [_club(), _club()]
+
+    async def fake_snapshot_club(club, date_from, date_to):
+        if club is clubs[0]:
+            raise RuntimeError("replica went away")
+        return 5
+
+    with patch.object(worker, "_all_clubs", AsyncMock(return_value=clubs)), \
+         patch.object(worker, "AsyncReadSessionLocal", MagicMock()), \
+         patch.object(worker, "_snapshot_club", fake_snapshot_club):
+        result = await worker.run_daily(snapshot_date=MONDAY)
+
+    assert result["clubs_processed"] == 1
+    assert result["clubs_failed"] == 1
+    assert result["rows_written"] == 5
@@ -0,0 +1,96 @@
+"""Unit tests for the COPY-staged snapshot write path.
+
+The session is mocked, so these pin the statement sequence and the staged
+records; the set-based swap itself is exercised against Postgres in
+tests/integration/test_court_snapshot_writes.py.
+"""
+import uuid
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+from app.analytics.services.court_utilisation_service import SnapshotRow
+from app.analytics.workers.snapshot_court_utilisation import write_club_snapshots
+
+CLUB_ID, COURT_ID = uuid.uuid4(), uuid.uuid4()
+DAY = date(2026, 6, 1)
+
+
+def _row(hour, booked=1):
+    return SnapshotRow(
+        snapshot_date=DAY, hour_of_day=hour, day_of_week=0, total_slots=2,
+        booked_slots=booked, utilisation_pct=Decimal("50.00"),
+        revenue_actual=Decimal("20"), revenue_potential=Decimal("40"),
+        avg_booking_lead_time_h=None,
+    )
+
+
+def _write_db(rowcount=0):
+    copy = AsyncMock()
+    raw = MagicMock()
+    raw.driver_connection.copy_records_to_table = copy
+    connection = MagicMock()
+    connection.get_raw_connection = AsyncMock(return_value=raw)
+    db = AsyncMock()
+    db.connection = AsyncMock(return_value=connection)
+    db.execute.return_value = MagicMock(rowcount=rowcount)
+    return db, copy
+
+
+def _statements(db):
+    return [str(call.args[0]) for call in db.execute.await_args_list]
+
+
+async def test_rows_are_copied_to_the_stage_then_swapped_in():
+    db, copy = _write_db()
+
+    written = await write_club_snapshots(db, CLUB_ID, {COURT_ID: [_row(9), _row(None)]}, DAY, DAY)
+
+    assert written == 2
+    table = copy.await_args.args[0]
+    records = copy.await_args.kwargs["records"]
+    columns = copy.await_args.kwargs["columns"]
+    assert table == "court_utilisation_snapshots_stage"
+    staged = [dict(zip(columns, record)) for record in records]
+    assert [r["hour_of_day"] for r in staged] == [9, None]
+    assert {r["court_id"] for r in staged} == {COURT_ID}
+    assert {r["club_id"] for r in staged} == {CLUB_ID}
+
+    # Nothing differed from the stored rows, so no generation bump follows.
+    create, truncate, analyze, delete, insert = _statements(db)
+    assert create.startswith("CREATE TEMP TABLE") and "ON COMMIT DROP" in create
+    assert truncate.startswith("TRUNCATE")
+    assert analyze.startswith("ANALYZE")
+    assert delete.startswith("DELETE FROM court_utilisation_snapshots")
+    assert insert.startswith("INSERT INTO court_utilisation_snapshots")
+    # The daily rollup (NULL hour) must match its stored twin, not duplicate it.
+    assert "t.hour_of_day IS NOT DISTINCT FROM s.hour_of_day" in delete
+    assert "t.hour_of_day IS NOT DISTINCT FROM s.hour_of_day" in insert
+    assert db.execute.await_args_list[3].args[1] == {
+        "court_ids": [COURT_ID], "date_from": DAY, "date_to": DAY,
+    }
+    db.commit.assert_not_called()
+
+
+async def test_courts_with_no_rows_still_clear_their_range():
+    # Closed every day in the range: nothing to stage, stale rows must go.
+    db, copy = _write_db()
+
+    written = await write_club_snapshots(db, CLUB_ID, {COURT_ID: []}, DAY, DAY)
+
+    assert written == 0
+    copy.assert_not_called()
+    assert any(s.startswith("DELETE FROM") for s in _statements(db))
+
+
+async def test_a_swap_that_changed_rows_rebuilds_rollups_and_bumps_the_generation():
+    db, _ = _write_db(rowcount=1)
+
+    await write_club_snapshots(db, CLUB_ID, {COURT_ID: [_row(9)]}, DAY, DAY)
+
+    statements = _statements(db)
+    assert any(s.startswith("INSERT INTO court_utilisation_week_hours") for s in statements)
+    assert any(s.startswith("INSERT INTO court_utilisation_court_months") for s in statements)
+    bump = db.execute.await_args_list[-1].args[0]
+    assert "INSERT INTO analytics_data_generations" in str(bump)
+    assert bump.compile().params["club_id_m0"] == CLUB_ID
@@ -0,0 +1,96 @@
+"""Unit tests for the weekly/monthly court-utilisation rollups.
+
+``split_range`` decides which days a report reads from a rollup and which
+from raw snapshots, so its edges are pinned here; the rollup SQL itself runs
+against Postgres in tests/integration/test_court_utilisation.py.
+"""
+import uuid
+from datetime import date
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.analytics.services.utilisation_rollups import (
+    RangeSplit,
+    month_end,
+    month_start,
+    refresh_club_rollups,
+    split_range,
+    week_end,
+    week_start,
+)
+
+
+@pytest.mark.parametrize("day, expected", [
+    (date(2026, 2, 10), date(2026, 2, 28)),
+    (date(2028, 2, 1), date(2028, 2, 29)),
+    (date(2026, 12, 31), date(2026, 12, 31)),
+    (date(2026, 1, 31), date(2026, 1, 31)),
+])
+def test_month_end(day, expected):
+    assert month_end(day) == expected
+
+
+def test_iso_weeks_run_monday_to_sunday():
+    # 2026-05-20 is a Wednesday.
+    assert week_start(date(2026, 5, 20)) == date(2026, 5, 18)
+    assert week_end(date(2026, 5, 20)) == date(2026, 5, 24)
+    assert week_start(date(2026, 5, 18)) == date(2026, 5, 18)
+
+
+def test_aligned_range_is_whole_periods_only():
+    assert split_range(date(2026, 1, 1), date(2026, 12, 31), month_start, month_end) == RangeSplit(
+        (date(2026, 1, 1), date(2026, 12, 1)), []
+    )
+
+
+def test_partial_periods_become_edges():
+    split = split_range(date(2026, 1, 15), date(2026, 4, 10), month_start, month_end)
+
+    assert split.periods == (date(2026, 2, 1), date(2026, 3, 1))
+    assert split.edges == [
+        (date(2026, 1, 15), date(2026, 1, 31)),
+        (date(2026, 4, 1), date(2026, 4, 10)),
+    ]
+
+
+def test_week_split_keeps_one_leading_edge():
+    # Wed 2026-05-20 .. Sun 2026-06-07: two whole weeks after a partial one.
+    split = split_range(date(2026, 5, 20), date(2026, 6, 7), week_start, week_end)
+
+    assert split.periods == (date(2026, 5, 25), date(2026, 6, 1))
+    assert split.edges == [(date(2026, 5, 20), date(2026, 5, 24))]
+
+
+@pytest.mark.parametrize("start, end", [
+    (date(2026, 5, 20), date(2026, 5, 22)),   # inside one week
+    (date(2026, 5, 20), date(2026, 5, 26)),   # straddles two, covers neither
+])
+def test_range_without_a_whole_period_is_all_edge(start, end):
+    assert split_range(start, end, week_start, week_end) == RangeSplit(None, [(start, end)])
+
+
+async def test_refresh_rebuilds_every_week_and_month_the_range_touches():
+    db = AsyncMock()
+    club_id = uuid.uuid4()
+
+    await refresh_club_rollups(db, club_id, date(2026, 5, 31), date(2026, 6, 2))
+
+    calls = db.execute.await_args_list
+    statements = [str(call.args[0]) for call in calls]
+    assert [s.split()[0] + " " + s.split()[2] for s in statements] == [
+        "DELETE court_utilisation_week_hours",
+        "INSERT court_utilisation_week_hours",
+        "DELETE court_utilisation_court_months",
+        "INSERT court_utilisation_court_months",
+    ]
+    weeks, months = calls[0].args[1], calls[2].args[1]
+    assert weeks == {
+        "club_id": club_id,
+        "period_from": date(2026, 5, 25),
+        "period_to": date(2026, 6, 1),
+        "scan_to": date(2026, 6, 7),
+    }
+    assert (months["period_from"], months["period_to"], months["scan_to"]) == (
+        date(2026, 5, 1), date(2026, 6, 1), date(2026, 6, 30),
+    )
@@ -4,12 +4,18 @@ Consumes ``analytics.export_requested`` events published by
 ``app/analytics/api/exports.py``. For each request it:
 
 1. resolves the report type to a builder (``REPORT_BUILDERS``),
-2. runs the builder against the **read replica** (`AsyncReadSessionLocal`),
-3. serialises the rows to CSV or XLSX,
-4. uploads the file to ``GCS_BUCKET_EXPORTS`` (1-hour signed URL, 7-day GCS
-   lifecycle delete — see ``StorageService.upload_report_export``), and
+2. streams the builder's rows off the **read replica** (`AsyncReadSessionLocal`),
+3. encodes them incrementally to CSV (optionally gzipped) or XLSX,
+4. uploads the file to ``GCS_BUCKET_EXPORTS`` as it is produced, in resumable
+   chunks (1-hour signed URL, 7-day GCS lifecycle delete — see
+   ``StorageService.open_report_export``), and
 5. emails the signed download URL to the requesting staff member.
 
+No stage holds the whole report: builders are async generators over
+server-side cursors, the CSV encoder hands off a few hundred KiB at a time and
+the XLSX encoder spools to a temporary file, so worker memory stays flat
+however large the club is.
+
 Deployed as a separate Cloud Run service from the same image
 (``Dockerfile.worker``), subscribed to its own ``analytics-export-events`` topic
 (one topic per worker, mirroring the snapshot/refresh split, so this worker never
@@ -24,14 +30,18 @@ owner of export delivery. On any failure the worker logs and publishes to
 """
 from __future__ import annotations
 
+import asyncio
 import base64
 import csv
 import io
 import json
 import logging
+import tempfile
 import uuid
+import zlib
 from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
+from typing import AsyncIterator, Iterator
 
 import sendgrid
 from fastapi import FastAPI, Request
@@ -42,18 +52,22 @@ from app.analytics.schemas.revenue import Granularity, RevenueBasis
 from app.analytics.services.player_value_service import PlayerValueService
 from app.analytics.services.revenue_service import RevenueService
 from app.core.config import get_settings
-from app.core.pubsub import publish_analytics_alert
+from app.core.pubsub import publish_analytics_alert, pubsub_lifespan
 from app.db.session import AsyncReadSessionLocal
-from app.services.storage_service import StorageService
+from app.services.storage_service import ReportExportUpload, StorageService
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+app = FastAPI(lifespan=pubsub_lifespan)
 
 _DEFAULT_RANGE_DAYS = 30
-# Hard cap so a runaway club can't materialise an unbounded export in memory.
-_MAX_PLAYER_ROWS = 50_000
-_PLAYER_PAGE = 500
+# Rows fetched per round trip from the server-side cursor.
+_PLAYER_BATCH = 1000
+# Encoded bytes accumulated before a hand-off to the upload.
+_FLUSH_BYTES = 256 * 1024
+# Rows per XLSX worksheet (the format's limit); longer reports continue on a
+# new sheet with the header repeated.
+_XLSX_MAX_ROWS = 1_048_576
 
 
 @app.get("/healthz")
@@ -107,21 +121,27 @@ async def run_export(payload: dict) -> dict:
     try:
         club_id = uuid.UUID(club_id_raw)
         fmt = (payload.get("format") or "csv").lower()
-        async with AsyncReadSessionLocal() as db:
-            headers, rows = await builder(db, club_id, payload)
-
-        file_bytes = _to_csv(headers, rows) if fmt == "csv" else _to_xlsx(headers, rows)
-        filename = f"{report_type}_{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.{fmt}"
+        encoder = _CsvEncoder(gzip=bool(payload.get("gzip"))) if fmt == "csv" else _XlsxEncoder()
+        filename = f"{report_type}_{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.{encoder.extension}"
 
-        signed_url = StorageService.upload_report_export(
-            file_bytes=file_bytes,
+        upload = await asyncio.to_thread(
+            StorageService.open_report_export,
             club_id=str(club_id),
             report_type=report_type,
             filename=filename,
+            content_type=encoder.content_type,
         )
+        try:
+            async with AsyncReadSessionLocal() as db:
+                rows = await _write_export(builder(db, club_id, payload), encoder, upload)
+            signed_url = await asyncio.to_thread(upload.close)
+        except Exception:
+            encoder.discard()
+            await asyncio.to_thread(upload.abort)
+            raise
 
         _email_export(recipient, report_type, signed_url)
-        return {"status": "ok", "rows": len(rows), "filename": filename}
+        return {"status": "ok", "rows": rows, "filename": filename}
     except Exception as exc:  # noqa: BLE001 - record + alert on any failure
         logger.exception("export failed report_type=%s", report_type)
         publish_analytics_alert(
@@ -131,8 +151,26 @@ async def run_export(payload: dict) -> dict:
         return {"status": "failed", "error": str(exc)}
 
 
+async def _write_export(
+    rows: AsyncIterator[list], encoder: "_CsvEncoder | _XlsxEncoder", upload: ReportExportUpload
+) -> int:
+    """Encode ``rows`` into ``upload`` as they arrive; returns the data-row count."""
+    written = 0
+    async for row in rows:
+        encoder.write_row(row)
+        written += 1
+        if encoder.buffered >= _FLUSH_BYTES:
+            await asyncio.to_thread(upload.write, encoder.drain())
+    # Finishing can be CPU-heavy (XLSX zips its sheets), so step it off the loop.
+    chunks = encoder.finish()
+    while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+        await asyncio.to_thread(upload.write, chunk)
+    return max(written - 1, 0)  # less the header row
+
+
 # ---------------------------------------------------------------------------
-# Report builders -> (headers, rows). Rows are lists of CSV-safe scalars.
+# Report builders: async generators yielding the header row, then data rows.
+# Rows are lists of CSV-safe scalars.
 # ---------------------------------------------------------------------------
 
 
@@ -150,72 +188,54 @@ async def _build_revenue_by_type(db, club_id, payload):
     basis = RevenueBasis(payload.get("basis") or "service")
     start, end = _resolve_range(payload.get("date_from"), payload.get("date_to"))
     result = await RevenueService(db).by_type(club_id, basis, start, end)
-    headers = ["revenue_type", "gross_amount", "refund_amount", "net_amount", "transaction_count"]
-    rows = [
-        [_cell(r.revenue_type), _cell(r.gross_amount), _cell(r.refund_amount), _cell(r.net_amount), _cell(r.transaction_count)]
-        for r in result.rows
-    ]
-    return headers, rows
+    yield ["revenue_type", "gross_amount", "refund_amount", "net_amount", "transaction_count"]
+    for r in result.rows:
+        yield [_cell(r.revenue_type), _cell(r.gross_amount), _cell(r.refund_amount), _cell(r.net_amount), _cell(r.transaction_count)]
 
 
 async def _build_revenue_summary(db, club_id, payload):
     basis = RevenueBasis(payload.get("basis") or "service")
     start, end = _resolve_range(payload.get("date_from"), payload.get("date_to"))
     s = await RevenueService(db).summary(club_id, basis, start, end)
-    headers = ["revenue_type", "gross_amount", "refund_amount", "net_amount", "transaction_count"]
-    rows = [
-        [_cell(r.revenue_type), _cell(r.gross_amount), _cell(r.refund_amount), _cell(r.net_amount), _cell(r.transaction_count)]
-        for r in s.by_type
-    ]
+    yield ["revenue_type", "gross_amount", "refund_amount", "net_amount", "transaction_count"]
+    for r in s.by_type:
+        yield [_cell(r.revenue_type), _cell(r.gross_amount), _cell(r.refund_amount), _cell(r.net_amount), _cell(r.transaction_count)]
     # Trailing TOTAL row so the file is self-summarising.
-    rows.append(["TOTAL", _cell(s.gross_amount), _cell(s.refund_amount), _cell(s.net_amount), _cell(s.transaction_count)])
-    return headers, rows
+    yield ["TOTAL", _cell(s.gross_amount), _cell(s.refund_amount), _cell(s.net_amount), _cell(s.transaction_count)]
 
 
 async def _build_revenue_timeseries(db, club_id, payload):
     basis = RevenueBasis(payload.get("basis") or "service")
     start, end = _resolve_range(payload.get("date_from"), payload.get("date_to"))
     ts = await RevenueService(db).timeseries(club_id, basis, Granularity.day, start, end)
-    headers = ["period_start", "gross_amount", "refund_amount", "net_amount", "transaction_count"]
-    rows = [
-        [_cell(p.period_start), _cell(p.gross_amount), _cell(p.refund_amount), _cell(p.net_amount), _cell(p.transaction_count)]
-        for p in ts.points
-    ]
-    return headers, rows
+    yield ["period_start", "gross_amount", "refund_amount", "net_amount", "transaction_count"]
+    for p in ts.points:
+        yield [_cell(p.period_start), _cell(p.gross_amount), _cell(p.refund_amount), _cell(p.net_amount), _cell(p.transaction_count)]
 
 
 async def _build_player_value(db, club_id, payload):
-    svc = PlayerValueService(db)
-    headers = [
+    yield [
         "user_id", "full_name", "email", "is_paid_member", "membership_plan_name",
         "first_played_at", "last_played_at", "bookings_played", "played_last_30d",
         "played_last_90d", "lifetime_gross", "lifetime_refunds", "lifetime_spend",
         "payments_count", "currency",
         "recency_score", "frequency_score", "value_score", "rfv_total", "rfv_cell",
     ]
-    rows: list[list] = []
-    offset = 0
-    while offset < _MAX_PLAYER_ROWS:
-        page = await svc.leaderboard(
-            club_id, members_only=False, sort=PlayerSort.lifetime_spend,
-            limit=_PLAYER_PAGE, offset=offset,
-        )
-        for r in page.rows:
-            rows.append([
-                _cell(r.user_id), _cell(r.full_name), _cell(r.email),
-                _cell(r.is_paid_member), _cell(r.membership_plan_name),
-                _cell(r.first_played_at), _cell(r.last_played_at),
-                _cell(r.bookings_played), _cell(r.played_last_30d),
-                _cell(r.played_last_90d), _cell(r.lifetime_gross),
-                _cell(r.lifetime_refunds), _cell(r.lifetime_spend),
-                _cell(r.payments_count), _cell(r.currency),
-                _cell(r.recency_score), _cell(r.frequency_score),
-                _cell(r.value_score), _cell(r.rfv_total), _cell(r.rfv_cell),
-            ])
-        if len(page.rows) < _PLAYER_PAGE:
-            break
-        offset += _PLAYER_PAGE
-    return headers, rows
+    rows = PlayerValueService(db).stream_leaderboard(
+        club_id, members_only=False, sort=PlayerSort.lifetime_spend, batch_size=_PLAYER_BATCH,
+    )
+    async for r in rows:
+        yield [
+            _cell(r.user_id), _cell(r.full_name), _cell(r.email),
+            _cell(r.is_paid_member), _cell(r.membership_plan_name),
+            _cell(r.first_played_at), _cell(r.last_played_at),
+            _cell(r.bookings_played), _cell(r.played_last_30d),
+            _cell(r.played_last_90d), _cell(r.lifetime_gross),
+            _cell(r.lifetime_refunds), _cell(r.lifetime_spend),
+            _cell(r.payments_count), _cell(r.currency),
+            _cell(r.recency_score), _cell(r.frequency_score),
+            _cell(r.value_score), _cell(r.rfv_total), _cell(r.rfv_cell),
+        ]
 
 
 REPORT_BUILDERS = {
@@ -231,25 +251,104 @@ REPORT_BUILDERS = {
 # ---------------------------------------------------------------------------
 
 
-def _to_csv(headers: list[str], rows: list[list]) -> bytes:
-    buf = io.StringIO()
-    writer = csv.writer(buf)
-    writer.writerow(headers)
-    writer.writerows(rows)
-    return buf.getvalue().encode("utf-8")
-
-
-def _to_xlsx(headers: list[str], rows: list[list]) -> bytes:
-    from openpyxl import Workbook  # lazy: only needed for the xlsx path
-
-    wb = Workbook(write_only=True)
-    ws = wb.create_sheet()
-    ws.append(headers)
-    for row in rows:
-        ws.append(row)
-    buf = io.BytesIO()
-    wb.save(buf)
-    return buf.getvalue()
+class _CsvEncoder:
+    """Incremental CSV writer. ``drain`` returns the bytes encoded (and, with
+    ``gzip``, compressed) since the last call, so only the rows between two
+    drains are ever buffered."""
+
+    content_type = "text/csv"
+    extension = "csv"
+
+    def __init__(self, gzip: bool = False):
+        self._text = io.StringIO()
+        self._writer = csv.writer(self._text)
+        self._gzip = zlib.compressobj(wbits=31) if gzip else None  # 31: gzip container
+        if gzip:
+            self.content_type = "application/gzip"
+            self.extension = "csv.gz"
+
+    @property
+    def buffered(self) -> int:
+        return self._text.tell()
+
+    def write_row(self, row: list) -> None:
+        self._writer.writerow(row)
+
+    def drain(self) -> bytes:
+        data = self._text.getvalue().encode("utf-8")
+        self._text.seek(0)
+        self._text.truncate()
+        return self._gzip.compress(data) if self._gzip else data
+
+    def finish(self) -> Iterator[bytes]:
+        yield self.drain()
+        if self._gzip:
+            yield self._gzip.flush()
+
+    def discard(self) -> None:
+        pass
+
+
+class _XlsxEncoder:
+    """Write-only openpyxl workbook. openpyxl streams each sheet's XML to a
+    temporary file as rows are appended; ``finish`` zips the workbook into
+    another one and reads it back in upload-sized chunks."""
+
+    content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    extension = "xlsx"
+    buffered = 0  # nothing to drain until the workbook is saved
+
+    def __init__(self):
+        from openpyxl import Workbook  # lazy: only needed for the xlsx path
+
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet()
+        self._sheet_rows = 0
+        self._header: list | None = None
+
+    def write_row(self, row: list) -> None:
+        if self._header is None:
+            self._header = row
+        elif self._sheet_rows == _XLSX_MAX_ROWS:
+            self._sheet = self._workbook.create_sheet()
+            self._sheet.append(self._header)
+            self._sheet_rows = 1
+        self._sheet.append(row)
+        self._sheet_rows += 1
+
+    def drain(self) -> bytes:
+        return b""
+
+    def finish(self) -> Iterator[bytes]:
+        with tempfile.TemporaryFile() as spool:
+            self._workbook.save(spool)
+            spool.seek(0)
+            while chunk := spool.read(_FLUSH_BYTES):
+                yield chunk
+
+    def discard(self) -> None:
+        """Close and delete the sheets' temporary files after a failed build
+        (``save`` does this on success)."""
+        for sheet in self._workbook.worksheets:
+            if not sheet.closed:
+                sheet.close()
+                _remove_sheet_spool(sheet)
+
+
+def _remove_sheet_spool(sheet) -> None:
+    """Delete a closed write-only sheet's temporary file.
+
+    openpyxl shim — the only place this module touches openpyxl internals.
+    openpyxl has no public call for this: only ``Workbook.save`` removes the
+    files, through the private ``WorksheetWriter.cleanup`` used here.
+    requirements.txt pins openpyxl; if an upgrade drops the method, the file
+    is left for the OS to clear from the temp dir and a warning is logged,
+    rather than the failed export raising a second error.
+    """
+    try:
+        sheet._writer.cleanup()
+    except (AttributeError, OSError, ValueError):
+        logger.warning("export: could not remove an xlsx sheet's temporary file", exc_info=True)
 
 
 def _email_export(recipient: str | None, report_type: str, signed_url: str) -> None:
@@ -3,9 +3,10 @@ Pub/Sub subscriber: materialized-view refresh worker (Sprint 7 / G7).
 
 The first MV-refresh infrastructure in the system. ``snapshot_court_utilisation``
 is a *physical snapshot* worker; this one runs ``REFRESH MATERIALIZED VIEW
-CONCURRENTLY`` over the views that back report queries (the two revenue-by-club
-views, ``mv_player_value``, and the two club player-flow views) and records every
-attempt in ``analytics_refresh_log``.
+CONCURRENTLY`` over the views that back report queries (the player-value
+views, the two club player-flow views and ``mv_coach_popularity``) and records
+every attempt in ``analytics_refresh_log``. Revenue by club is not a view: its
+rollup tables are maintained incrementally by the ``revenue_rollups`` worker.
 
 Deployed as a separate Cloud Run service from the same image
 (``Dockerfile.worker``), triggered by **Cloud Scheduler → Pub/Sub** (default:
@@ -13,47 +14,83 @@ nightly 03:00 UTC, per MATERIALIZED_VIEWS.md). The push payload may request:
 
     {"event_type": "analytics.refresh_views"}                      # all views
     {"event_type": "analytics.refresh_views",
-     "payload": {"views": ["mv_revenue_by_club_day_cash"]}}        # a subset
-
-Each view is refreshed independently: one view failing does not abort the rest.
-On failure the worker writes a ``failed`` log row AND publishes to the
-``analytics-alerts`` topic.
+     "payload": {"views": ["mv_club_signups_day"]}}                # a subset
+    {"event_type": "analytics.refresh_views",
+     "payload": {"force": true}}                                   # even if unchanged
+
+Views form a dependency DAG (``mv_player_rfv`` is built on ``mv_player_value``).
+Independent views refresh in parallel, at most ``ANALYTICS_REFRESH_CONCURRENCY``
+at once, each on its own connection; a view starts only once every view it
+reads from has finished. One view failing does not abort the rest. On failure
+the worker writes a ``failed`` log row AND publishes to the ``analytics-alerts``
+topic.
+
+Refreshes are incremental at view granularity: a view is skipped (and logged as
+``skipped``) when none of its sources has changed since its last successful
+refresh. Change is detected from the cumulative insert/update/delete counters
+in ``pg_stat_user_tables``, compared against the per-source watermark recorded
+in ``analytics_refresh_watermarks``. The counters are read *before* the refresh
+starts, so a write that lands during it shows up as a change next run. Views
+defined against ``now()`` change as time passes even without writes, so they
+are always refreshed; ``"force": true`` in the payload refreshes everything.
+The logged ``row_count`` is ``pg_class.reltuples`` after an ``ANALYZE`` of the
+view (which also keeps planner stats fresh for the report queries) rather
+than a ``count(*)`` over the whole view.
 
 ``REFRESH MATERIALIZED VIEW CONCURRENTLY`` cannot run inside a transaction
-block, so the refresh runs on a dedicated AUTOCOMMIT connection. The log write
+block, so each refresh runs on a dedicated AUTOCOMMIT connection. The log write
 goes through a normal session on the primary.
 """
 from __future__ import annotations
 
+import asyncio
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from graphlib import TopologicalSorter
 
 from fastapi import FastAPI, Request
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
+from sqlalchemy.ext.asyncio import AsyncConnection
 
-from app.core.pubsub import publish_analytics_alert
+from app.core.config import get_settings
+from app.core.pubsub import publish_analytics_alert, pubsub_lifespan
 from app.db.models.analytics import AnalyticsRefreshLog, RefreshStatus
 from app.db.session import AsyncSessionLocal, engine
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class RefreshView:
+    name: str
+    sources: tuple[str, ...]            # tables the view definition reads
+    depends_on: tuple[str, ...] = ()    # materialized views it reads
+    time_relative: bool = False         # defined against now(): refresh every run
+
 
 # Registry of refreshable views. Refresh requests are intersected with this list,
 # so an arbitrary string from the payload can never reach the SQL string.
-#
-# Order matters: views are refreshed sequentially in this order, and
-# ``mv_player_rfv`` is defined ON TOP OF ``mv_player_value``, so it must come
-# after it to score against the freshly-refreshed values.
-REFRESH_VIEWS: list[str] = [
-    "mv_revenue_by_club_day_service",
-    "mv_revenue_by_club_day_cash",
-    "mv_player_value",
-    "mv_player_rfv",
-    "mv_club_active_player_day",
-    "mv_club_signups_day",
-    "mv_coach_popularity",
-]
-
-app = FastAPI()
+VIEWS: tuple[RefreshView, ...] = (
+    RefreshView(
+        "mv_player_value",
+        ("booking_players", "bookings", "payments", "membership_subscriptions", "membership_plans"),
+        time_relative=True,
+    ),
+    RefreshView("mv_player_rfv", (), depends_on=("mv_player_value",)),
+    RefreshView("mv_club_active_player_day", ("booking_players", "bookings", "clubs"), time_relative=True),
+    RefreshView("mv_club_signups_day", ("membership_subscriptions", "membership_plans", "clubs")),
+    RefreshView("mv_coach_popularity", ("bookings", "booking_players", "payments"), time_relative=True),
+)
+_VIEWS_BY_NAME = {view.name: view for view in VIEWS}
+
+# Every registered view, dependencies first.
+REFRESH_VIEWS: list[str] = list(
+    TopologicalSorter({view.name: view.depends_on for view in VIEWS}).static_order()
+)
+
+app = FastAPI(lifespan=pubsub_lifespan)
 
 
 @app.get("/healthz")
@@ -74,8 +111,9 @@ async def process_refresh_event(request: Request):
     event_type = data.get("event_type") or "analytics.refresh_views"
     payload = data.get("payload", {}) or {}
     requested = payload.get("views")
+    force = bool(payload.get("force", False))
 
-    result = await refresh_views(requested=requested, triggered_by=event_type)
+    result = await refresh_views(requested=requested, triggered_by=event_type, force=force)
     return {"status": "ok", **result}
 
 
@@ -87,30 +125,76 @@ async def process_refresh_event(request: Request):
 async def refresh_views(
     requested: list[str] | None = None,
     triggered_by: str = "manual",
+    force: bool = False,
 ) -> dict:
     """Refresh the requested views (default: all registered views).
 
     Unknown view names are ignored — only names in ``REFRESH_VIEWS`` are ever
     executed. Each view is refreshed independently; a failure is logged and
-    alerted but does not stop the others.
+    alerted but does not stop the others. A view whose upstream is also
+    requested waits for it, and is refreshed whenever that upstream was.
     """
     if requested:
-        targets = [v for v in requested if v in REFRESH_VIEWS]
+        targets = [v for v in REFRESH_VIEWS if v in requested]
     else:
         targets = list(REFRESH_VIEWS)
 
-    results = [await _refresh_one(view, triggered_by) for view in targets]
-    succeeded = sum(1 for r in results if r["status"] == RefreshStatus.success.value)
+    slots = asyncio.Semaphore(settings.ANALYTICS_REFRESH_CONCURRENCY)
+    tasks: dict[str, asyncio.Task] = {}
+
+    async def run(view: RefreshView) -> dict:
+        upstream = await asyncio.gather(*(tasks[d] for d in view.depends_on if d in tasks))
+        upstream_refreshed = any(r["status"] == RefreshStatus.success.value for r in upstream)
+        async with slots:
+            return await _refresh_one(
+                view, triggered_by, force=force or upstream_refreshed
+            )
+
+    # REFRESH_VIEWS is in dependency order, so upstream tasks always exist first.
+    for name in targets:
+        tasks[name] = asyncio.create_task(run(_VIEWS_BY_NAME[name]))
+    results = list(await asyncio.gather(*tasks.values()))
+
+    def count(status: RefreshStatus) -> int:
+        return sum(1 for r in results if r["status"] == status.value)
+
     return {
         "views_requested": len(targets),
-        "views_succeeded": succeeded,
-        "views_failed": len(targets) - succeeded,
+        "views_succeeded": count(RefreshStatus.success),
+        "views_skipped": count(RefreshStatus.skipped),
+        "views_failed": count(RefreshStatus.failed),
         "results": results,
     }
 
 
-async def _refresh_one(view_name: str, triggered_by: str) -> dict:
-    """Refresh a single view, time it, capture the row count, and log the run."""
+def needs_refresh(
+    view: RefreshView,
+    change_counts: dict[str, int],
+    watermarks: dict[str, int],
+) -> bool:
+    """True unless every source still reports the change count recorded at
+    the view's last successful refresh.
+
+    Upstream views count as sources: ``REFRESH ... CONCURRENTLY`` applies its
+    diff as row changes, so their counters move only when their contents do.
+    A source missing from either side (never refreshed, stats reset) counts
+    as changed.
+    """
+    if view.time_relative:
+        return True
+    sources = view.sources + view.depends_on
+    return not sources or any(
+        source not in change_counts
+        or source not in watermarks
+        or change_counts[source] != watermarks[source]
+        for source in sources
+    )
+
+
+async def _refresh_one(view: RefreshView, triggered_by: str, force: bool = False) -> dict:
+    """Refresh a single view unless its sources are unchanged, time it,
+    capture the row count, and log the run."""
+    view_name = view.name
     started_at = datetime.now(timezone.utc)
     status = RefreshStatus.success
     row_count: int | None = None
@@ -120,12 +204,18 @@ async def _refresh_one(view_name: str, triggered_by: str) -> dict:
         # CONCURRENTLY must run outside a transaction block -> AUTOCOMMIT.
         async with engine.connect() as raw:
             conn = await raw.execution_options(isolation_level="AUTOCOMMIT")
-            await conn.execute(
-                text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view_name}")
-            )
-            row_count = (
-                await conn.execute(text(f"SELECT count(*) FROM {view_name}"))
-            ).scalar_one()
+            # Read before refreshing: writes that race the refresh must look
+            # like changes next run, not be folded into this watermark.
+            change_counts = await _change_counts(conn, view.sources + view.depends_on)
+            if not force and not needs_refresh(view, change_counts, await _watermarks(conn, view_name)):
+                status = RefreshStatus.skipped
+            else:
+                await conn.execute(
+                    text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view_name}")
+                )
+                await conn.execute(text(f"ANALYZE {view_name}"))
+                row_count = await _estimated_rows(conn, view_name)
+                await _record_watermarks(conn, view_name, change_counts)
     except Exception as exc:  # noqa: BLE001 - we record and alert on any failure
         status = RefreshStatus.failed
         error = str(exc)
@@ -162,6 +252,64 @@ async def _refresh_one(view_name: str, triggered_by: str) -> dict:
     }
 
 
+async def _change_counts(conn: AsyncConnection, relations: tuple[str, ...]) -> dict[str, int]:
+    """Cumulative rows inserted + updated + deleted per relation, from the
+    statistics collector. Matviews are included in ``pg_stat_user_tables``."""
+    if not relations:
+        return {}
+    result = await conn.execute(
+        text(
+            "SELECT relname, n_tup_ins + n_tup_upd + n_tup_del "
+            "FROM pg_stat_user_tables "
+            "WHERE schemaname = current_schema() AND relname IN :relations"
+        ).bindparams(bindparam("relations", expanding=True)),
+        {"relations": list(relations)},
+    )
+    return {relname: changes for relname, changes in result.all()}
+
+
+async def _watermarks(conn: AsyncConnection, view_name: str) -> dict[str, int]:
+    result = await conn.execute(
+        text(
+            "SELECT source_table, change_count FROM analytics_refresh_watermarks "
+            "WHERE view_name = :view_name"
+        ),
+        {"view_name": view_name},
+    )
+    return {source: change_count for source, change_count in result.all()}
+
+
+async def _record_watermarks(
+    conn: AsyncConnection, view_name: str, change_counts: dict[str, int]
+) -> None:
+    if not change_counts:
+        return
+    await conn.execute(
+        text(
+            "INSERT INTO analytics_refresh_watermarks (view_name, source_table, change_count) "
+            "VALUES (:view_name, :source_table, :change_count) "
+            "ON CONFLICT (view_name, source_table) DO UPDATE "
+            "SET change_count = EXCLUDED.change_count, updated_at = now()"
+        ),
+        [
+            {"view_name": view_name, "source_table": source, "change_count": changes}
+            for source, changes in change_counts.items()
+        ],
+    )
+
+
+async def _estimated_rows(conn: AsyncConnection, view_name: str) -> int | None:
+    """Row count from the planner statistics the ANALYZE just wrote; -1
+    means the view has never been analyzed."""
+    reltuples = (
+        await conn.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:view_name AS regclass)"),
+            {"view_name": view_name},
+        )
+    ).scalar_one()
+    return reltuples if reltuples >= 0 else None
+
+
 async def _write_log(**kwargs) -> None:
     async with AsyncSessionLocal() as db:
         db.add(AnalyticsRefreshLog(**kwargs))
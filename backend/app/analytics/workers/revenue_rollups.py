@@ -0,0 +1,101 @@
+"""
+Pub/Sub subscriber: revenue rollup worker (G7 — "Financials by club").
+
+Keeps ``revenue_by_club_day_service`` / ``revenue_by_club_day_cash`` current
+(see ``app/analytics/services/revenue_rollups.py``). Deployed as a separate
+Cloud Run service from the same image (``Dockerfile.worker``), triggered by
+**Cloud Scheduler → Pub/Sub**:
+
+    {"event_type": "analytics.apply_revenue"}          # every minute
+    {"event_type": "analytics.reconcile_revenue"}      # nightly
+    {"event_type": "analytics.reconcile_revenue",
+     "payload": {"repair": true}}                      # rebuild drifted clubs
+
+Each apply run drains queued payment changes for ``REVENUE_ROLLUP_RUN_SECONDS``,
+so revenue reports trail payments by about ``REVENUE_ROLLUP_POLL_SECONDS``.
+Reconciliation recomputes both rollups in full and, when any club differs,
+publishes ``analytics.revenue_rollup_mismatch`` to the ``analytics-alerts``
+topic. Both read and write the **primary**; overlapping runs serialize on an
+advisory lock.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import logging
+
+from fastapi import FastAPI, Request
+
+from app.analytics.services.revenue_rollups import (
+    apply_revenue_changes,
+    reconcile_revenue_rollups,
+)
+from app.core.config import get_settings
+from app.core.pubsub import publish_analytics_alert, pubsub_lifespan
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+app = FastAPI(lifespan=pubsub_lifespan)
+
+
+@app.get("/healthz")
+async def health():
+    return {"status": "ok"}
+
+
+@app.post("/pubsub")
+async def process_revenue_event(request: Request):
+    """Receive a Pub/Sub push delivery for revenue-rollup events."""
+    envelope = await request.json()
+    message = envelope.get("message", {})
+    data = json.loads(base64.b64decode(message.get("data", "")).decode())
+
+    event_type = data.get("event_type")
+    payload = data.get("payload", {}) or {}
+
+    if event_type == "analytics.apply_revenue":
+        result = await apply()
+    elif event_type == "analytics.reconcile_revenue":
+        result = await reconcile(repair=bool(payload.get("repair", False)))
+    else:
+        # Unknown event on this subscription — ack so Pub/Sub does not redeliver.
+        logger.warning("revenue_rollups: ignoring unexpected event_type=%s", event_type)
+        return {"status": "ignored", "event_type": event_type}
+    return {"status": "ok", **result}
+
+
+async def apply() -> dict:
+    """Fold queued payment changes into the rollups for one scheduled run."""
+    settings = get_settings()
+    result = await apply_revenue_changes(
+        AsyncSessionLocal,
+        batch_size=settings.REVENUE_ROLLUP_BATCH_SIZE,
+        run_seconds=settings.REVENUE_ROLLUP_RUN_SECONDS,
+        poll_seconds=settings.REVENUE_ROLLUP_POLL_SECONDS,
+    )
+    logger.info(
+        "revenue_rollups: %s batch(es), %s payment(s), %s key(s) changed",
+        result["batches"], result["payments"], result["keys_changed"],
+    )
+    return result
+
+
+async def reconcile(repair: bool = False) -> dict:
+    """Verify the rollups against a full recompute; alert on any drift."""
+    settings = get_settings()
+    async with AsyncSessionLocal() as db:
+        result = await reconcile_revenue_rollups(
+            db, repair=repair, batch_size=settings.REVENUE_ROLLUP_BATCH_SIZE
+        )
+
+    if result["clubs"]:
+        logger.error(
+            "revenue_rollups: rollups differ from a full recompute for %s club(s): %s",
+            len(result["clubs"]), result["mismatched_keys"],
+        )
+        try:
+            publish_analytics_alert("analytics.revenue_rollup_mismatch", result)
+        except Exception:  # noqa: BLE001 - alerting must not mask the result
+            logger.exception("failed to publish analytics-alerts for revenue rollups")
+    return result
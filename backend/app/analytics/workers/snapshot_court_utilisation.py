@@ -16,28 +16,53 @@ club's timezone). The push payload may request:
     {"event_type": "analytics.snapshot_backfill",
      "payload": {"days": 90}}                                  # trailing-N-day backfill
 
-Reads come from the **read replica**; writes go to the **primary**. Each
-(court, date) is written with a delete-then-insert so re-runs are idempotent —
-important because the daily-rollup row has ``hour_of_day = NULL`` and a
-``UNIQUE(court_id, snapshot_date, hour_of_day)`` constraint treats NULLs as
-distinct, so plain upsert would duplicate the rollup row.
+Clubs are processed concurrently, at most ``ANALYTICS_SNAPSHOT_CONCURRENCY``
+at a time, each on its own pair of sessions: reads come from the **read
+replica**, writes go to the **primary**, and each club's range is committed on
+its own, so one failing club doesn't lose the others' work. A club's inputs for
+the whole date range are fetched in one query per table and partitioned per
+court-day in memory (``CourtUtilisationService.gather_club_range``). Progress
+is logged per club; the result carries throughput totals.
+
+The club's courts × dates are written with a delete-then-insert so re-runs are
+idempotent — important because the daily-rollup row has ``hour_of_day = NULL``
+and a ``UNIQUE(court_id, snapshot_date, hour_of_day)`` constraint treats NULLs
+as distinct, so plain upsert would duplicate the rollup row. Rows are staged
+with ``COPY`` and swapped in with one set-based DELETE + INSERT per club
+(``write_club_snapshots``), which also rebuilds the club's weekly heatmap and
+monthly per-court rollups for the weeks/months it touched
+(``app/analytics/services/utilisation_rollups.py``).
 """
 from __future__ import annotations
 
+import asyncio
 import base64
 import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
 from datetime import date as DateType, datetime, timedelta
+from typing import Callable
+from uuid import UUID
 from zoneinfo import ZoneInfo
 
 from fastapi import FastAPI, Request
-from sqlalchemy import delete, select
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.analytics.services.court_utilisation_service import CourtUtilisationService
+from app.analytics.services.court_utilisation_service import CourtUtilisationService, SnapshotRow
+from app.analytics.services.generations import COURT_UTILISATION, bump_generations
+from app.analytics.services.utilisation_rollups import refresh_club_rollups
+from app.core.config import get_settings
 from app.db.models.analytics import CourtUtilisationSnapshot
 from app.db.models.club import Club
 from app.db.session import AsyncReadSessionLocal, AsyncSessionLocal
 
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
 DEFAULT_BACKFILL_DAYS = 90
 
 app = FastAPI()
@@ -74,81 +99,237 @@ async def process_snapshot_event(request: Request):
 # ---------------------------------------------------------------------------
 
 
-async def run_daily(snapshot_date: DateType | None = None) -> dict:
+async def run_daily(snapshot_date: DateType | None = None, concurrency: int | None = None) -> dict:
     """Snapshot one day for every club.
 
     With no ``snapshot_date``, each club gets *its own* local yesterday — clubs
     in different timezones roll over at different UTC instants. With an explicit
     date, that calendar date is used for every club.
     """
-    written = 0
-    async with AsyncReadSessionLocal() as read_db, AsyncSessionLocal() as write_db:
-        for club in await _all_clubs(read_db):
-            target = snapshot_date or _yesterday_local(club.timezone)
-            written += await snapshot_club_day(read_db, write_db, club, target)
-        await write_db.commit()
-    return {"clubs_processed": "all", "rows_written": written}
+    def club_range(club: Club) -> tuple[DateType, DateType]:
+        target = snapshot_date or _yesterday_local(club.timezone)
+        return target, target
 
+    return await _snapshot_clubs(club_range, concurrency)
 
-async def backfill(days: int = DEFAULT_BACKFILL_DAYS) -> dict:
+
+async def backfill(days: int = DEFAULT_BACKFILL_DAYS, concurrency: int | None = None) -> dict:
     """Snapshot the trailing ``days`` days (excluding today) for every club.
 
     Pre-snapshot history is approximate: operating-hours / pricing config may
     have drifted since, and only the *current* config is available to read.
     """
-    written = 0
+    def club_range(club: Club) -> tuple[DateType, DateType]:
+        end = _yesterday_local(club.timezone)
+        return end - timedelta(days=days - 1), end
+
+    return {"backfill_days": days, **await _snapshot_clubs(club_range, concurrency)}
+
+
+async def _snapshot_clubs(
+    club_range: Callable[[Club], tuple[DateType, DateType]],
+    concurrency: int | None,
+) -> dict:
+    async with AsyncReadSessionLocal() as read_db:
+        clubs = await _all_clubs(read_db)
+    progress = _Progress(clubs_total=len(clubs))
+    slots = asyncio.Semaphore(concurrency or settings.ANALYTICS_SNAPSHOT_CONCURRENCY)
+
+    async def run(club: Club) -> None:
+        date_from, date_to = club_range(club)
+        if date_to < date_from:
+            return
+        async with slots:
+            started = time.perf_counter()
+            try:
+                written = await _snapshot_club(club, date_from, date_to)
+            except Exception:
+                progress.clubs_failed += 1
+                logger.exception(
+                    "snapshot: club %s failed for %s..%s", club.id, date_from, date_to
+                )
+                return
+            progress.record(club, (date_to - date_from).days + 1, written, time.perf_counter() - started)
+
+    await asyncio.gather(*(run(club) for club in clubs))
+    return progress.summary()
+
+
+async def _snapshot_club(club: Club, date_from: DateType, date_to: DateType) -> int:
+    """One club's range on its own sessions, committed as one transaction."""
     async with AsyncReadSessionLocal() as read_db, AsyncSessionLocal() as write_db:
-        for club in await _all_clubs(read_db):
-            end = _yesterday_local(club.timezone)
-            for offset in range(days):
-                target = end - timedelta(days=offset)
-                written += await snapshot_club_day(read_db, write_db, club, target)
-            await write_db.commit()  # commit per club to bound transaction size
-    return {"backfill_days": days, "rows_written": written}
+        written = await snapshot_club_range(read_db, write_db, club, date_from, date_to)
+        await write_db.commit()
+    return written
 
 
-async def snapshot_club_day(
+async def snapshot_club_range(
     read_db: AsyncSession,
     write_db: AsyncSession,
     club: Club,
-    snapshot_date: DateType,
+    date_from: DateType,
+    date_to: DateType,
 ) -> int:
-    """Compute + persist snapshots for every active court of one club on one day.
+    """Compute + persist snapshots for every active court of one club on every
+    date in ``date_from..date_to``.
 
     Returns the number of rows written. Does not commit — callers control the
     transaction boundary.
     """
-    service = CourtUtilisationService(read_db)
-    written = 0
-    for court in await service.active_courts(club.id):
-        rows = await service.gather_court_day(
-            club=club, court_id=court.id, snapshot_date=snapshot_date
+    by_court = await CourtUtilisationService(read_db).gather_club_range(
+        club=club, date_from=date_from, date_to=date_to
+    )
+    if not by_court:
+        return 0
+    return await write_club_snapshots(write_db, club.id, by_court, date_from, date_to)
+
+
+# Staged columns, in COPY record order; ``created_at`` takes its default.
+_SNAPSHOT_COLUMNS = (
+    "id",
+    "club_id",
+    "court_id",
+    "snapshot_date",
+    "hour_of_day",
+    "day_of_week",
+    "total_slots",
+    "booked_slots",
+    "utilisation_pct",
+    "revenue_actual",
+    "revenue_potential",
+    "avg_booking_lead_time_h",
+)
+_STAGE_TABLE = "court_utilisation_snapshots_stage"
+_SNAPSHOT_TABLE = CourtUtilisationSnapshot.__tablename__
+
+_NULLABLE_COLUMNS = frozenset({"hour_of_day", "avg_booking_lead_time_h"})
+
+# A stored row ``s`` equals a staged row ``t``: same key — NULL hour_of_day
+# (the daily rollup) matching NULL — and same figures. NOT NULL columns use
+# ``=`` so the anti-joins can hash and use the (court_id, snapshot_date, ...)
+# unique index; only the nullable ones need IS NOT DISTINCT FROM.
+_SAME_ROW = " AND ".join(
+    f"t.{column} IS NOT DISTINCT FROM s.{column}"
+    if column in _NULLABLE_COLUMNS
+    else f"t.{column} = s.{column}"
+    for column in _SNAPSHOT_COLUMNS[1:]
+)
+
+
+async def write_club_snapshots(
+    write_db: AsyncSession,
+    club_id: UUID,
+    by_court: dict[UUID, list[SnapshotRow]],
+    date_from: DateType,
+    date_to: DateType,
+) -> int:
+    """Replace the stored snapshots of ``by_court``'s courts on ``date_from..date_to``.
+
+    The rows are streamed with ``COPY`` into a temp table dropped at commit,
+    then swapped in with one set-based DELETE and one INSERT. Stored rows
+    identical to a staged row are left alone, so a re-run over unchanged days
+    rewrites (and logs to WAL) only what changed. When anything did, the
+    club's weekly/monthly rollups around the range are rebuilt and its data
+    generation bumped. Does not commit.
+    """
+    records = [
+        (
+            uuid.uuid4(),
+            club_id,
+            court_id,
+            row.snapshot_date,
+            row.hour_of_day,
+            row.day_of_week,
+            row.total_slots,
+            row.booked_slots,
+            row.utilisation_pct,
+            row.revenue_actual,
+            row.revenue_potential,
+            row.avg_booking_lead_time_h,
         )
-        # Idempotent: clear any prior rows for this court/date before inserting.
-        await write_db.execute(
-            delete(CourtUtilisationSnapshot).where(
-                CourtUtilisationSnapshot.court_id == court.id,
-                CourtUtilisationSnapshot.snapshot_date == snapshot_date,
-            )
+        for court_id, rows in by_court.items()
+        for row in rows
+    ]
+
+    await write_db.execute(text(
+        f"CREATE TEMP TABLE IF NOT EXISTS {_STAGE_TABLE} "
+        f"(LIKE {_SNAPSHOT_TABLE} INCLUDING DEFAULTS) ON COMMIT DROP"
+    ))
+    # Empty if an earlier call in this transaction already staged rows.
+    await write_db.execute(text(f"TRUNCATE {_STAGE_TABLE}"))
+    if records:
+        connection = await write_db.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            _STAGE_TABLE, records=records, columns=_SNAPSHOT_COLUMNS
         )
-        for row in rows:
-            write_db.add(
-                CourtUtilisationSnapshot(
-                    club_id=club.id,
-                    court_id=court.id,
-                    snapshot_date=row.snapshot_date,
-                    hour_of_day=row.hour_of_day,
-                    day_of_week=row.day_of_week,
-                    total_slots=row.total_slots,
-                    booked_slots=row.booked_slots,
-                    utilisation_pct=row.utilisation_pct,
-                    revenue_actual=row.revenue_actual,
-                    revenue_potential=row.revenue_potential,
-                    avg_booking_lead_time_h=row.avg_booking_lead_time_h,
-                )
-            )
-            written += 1
-    return written
+        # Temp tables are never auto-analyzed; give the planner real row counts.
+        await write_db.execute(text(f"ANALYZE {_STAGE_TABLE}"))
+
+    scope = {"court_ids": list(by_court), "date_from": date_from, "date_to": date_to}
+    # Stored rows in range with no identical staged row: stale or changed.
+    deleted = await write_db.execute(
+        text(
+            f"DELETE FROM {_SNAPSHOT_TABLE} s "
+            "WHERE s.court_id = ANY(:court_ids) "
+            "AND s.snapshot_date BETWEEN :date_from AND :date_to "
+            f"AND NOT EXISTS (SELECT 1 FROM {_STAGE_TABLE} t WHERE {_SAME_ROW})"
+        ),
+        scope,
+    )
+    # Staged rows with no identical stored row: new or changed.
+    columns = ", ".join(_SNAPSHOT_COLUMNS)
+    inserted = await write_db.execute(
+        text(
+            f"INSERT INTO {_SNAPSHOT_TABLE} ({columns}) "
+            f"SELECT {columns} FROM {_STAGE_TABLE} t "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {_SNAPSHOT_TABLE} s WHERE {_SAME_ROW})"
+        )
+    )
+    if deleted.rowcount or inserted.rowcount:
+        await refresh_club_rollups(write_db, club_id, date_from, date_to)
+        await bump_generations(write_db, COURT_UTILISATION, [club_id])
+    return len(records)
+
+
+@dataclass
+class _Progress:
+    """Running totals for one run, logged as each club finishes."""
+
+    clubs_total: int
+    clubs_processed: int = 0
+    clubs_failed: int = 0
+    club_days: int = 0
+    rows_written: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    def record(self, club: Club, days: int, rows: int, seconds: float) -> None:
+        self.clubs_processed += 1
+        self.club_days += days
+        self.rows_written += rows
+        logger.info(
+            "snapshot: club %s done (%d/%d) — %d day(s), %d row(s) in %.2fs",
+            club.id, self.clubs_processed + self.clubs_failed, self.clubs_total,
+            days, rows, seconds,
+        )
+
+    def summary(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+
+        def per_second(n: int) -> float:
+            return round(n / elapsed, 1) if elapsed > 0 else 0.0
+
+        summary = {
+            "clubs_processed": self.clubs_processed,
+            "clubs_failed": self.clubs_failed,
+            "club_days": self.club_days,
+            "rows_written": self.rows_written,
+            "elapsed_seconds": round(elapsed, 2),
+            "club_days_per_second": per_second(self.club_days),
+            "rows_per_second": per_second(self.rows_written),
+        }
+        logger.info("snapshot: finished %s", summary)
+        return summary
 
 
 def _yesterday_local(tz_name: str) -> DateType:
@@ -1,25 +1,39 @@
+import time
+import uuid
+from typing import Optional
+
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
+from app.core.config import get_settings
 from app.core.permissions import Capability, can
+from app.core.principal_cache import get_principal_cache
 from app.core.security import decode_token
 from app.db.models.user import User
 
 security = HTTPBearer()
 
+_SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
 
 async def get_current_user(
     request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
 ) -> User:
     payload = decode_token(credentials.credentials)
     if not payload or payload.get("type") != "access":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    user = await db.get(User, payload.get("sub"))
+    # Read-only requests resolve the principal on the replica session they
+    # already use, so a cache hit or a found active user never checks out a
+    # primary connection. Both sessions are lazy: the unused one never touches
+    # the pool.
+    use_replica = get_settings().PRINCIPAL_FROM_READ_REPLICA and request.method in _SAFE_METHODS
+    user = await _load_principal(payload, db, read_db if use_replica else None)
     if not user or not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or inactive")
 
@@ -45,6 +59,38 @@ async def get_current_user(
     return user
 
 
+async def _load_principal(
+    payload: dict, db: AsyncSession, read_db: Optional[AsyncSession] = None,
+) -> Optional[User]:
+    """The token's user, from the principal cache when possible.
+
+    With ``read_db`` a miss is read from the replica, unless this process
+    changed the user within the replica-lag grace window. A replica that has
+    no row, or an inactive one, is not trusted: the row may not have
+    replicated yet (a user who just signed up) or may have been reactivated,
+    so the primary ``db`` decides.
+    """
+    try:
+        user_id = uuid.UUID(str(payload.get("sub")))
+    except ValueError:
+        return None
+    iat = payload.get("iat")
+    cache = get_principal_cache()
+    session = read_db if read_db is not None and not cache.replica_may_lag(user_id) else db
+    cached = cache.get(user_id, iat)
+    if cached is not None:
+        return await session.merge(cached, load=False)
+    loaded_at = time.monotonic()
+    user = await session.get(User, user_id)
+    if session is not db and (user is None or not user.is_active):
+        session = db
+        loaded_at = time.monotonic()
+        user = await db.get(User, user_id)
+    if user is not None:
+        cache.put(iat, user, loaded_at, from_replica=session is not db)
+    return user
+
+
 def _require_capability(user: User, capability: Capability) -> User:
     if not can(user.role, capability):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
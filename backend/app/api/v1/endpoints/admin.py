@@ -24,7 +24,8 @@ from sqlalchemy import func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
+from app.core.tenant_cache import mark_tenant_dirty
 from app.db.models.club import Club
 from app.db.models.tenant import SubscriptionPlan, SubscriptionStatus, Tenant
 from app.db.models.user import TenantUserRole, User
@@ -159,6 +160,8 @@ async def onboard_tenant(
     )
     db.add(tenant)
     await db.flush()
+    # Its subdomains may be cached as unknown by TenantMiddleware.
+    mark_tenant_dirty(db, tenant.id)
 
     # --- clubs ---
     clubs = [
@@ -178,7 +181,7 @@ async def onboard_tenant(
         tenant_id=tenant.id,
         email=body.owner.email,
         full_name=body.owner.full_name,
-        hashed_password=get_password_hash(body.owner.password),
+        hashed_password=await get_password_hash_async(body.owner.password),
         role=TenantUserRole.owner,
         is_active=True,
     )
@@ -499,6 +502,7 @@ async def update_tenant(
 
     await db.flush()
     await db.refresh(tenant)
+    mark_tenant_dirty(db, tenant.id)
     return _tenant_detail_row(tenant, plan.name, club_count, owner)
 
 
@@ -583,6 +587,7 @@ async def activate_tenant(
 
     await db.flush()
     await db.refresh(tenant)
+    mark_tenant_dirty(db, tenant.id)
     return _tenant_detail_row(tenant, plan.name, club_count, owner)
 
 
@@ -623,6 +628,7 @@ async def suspend_tenant(
 
     await db.flush()
     await db.refresh(tenant)
+    mark_tenant_dirty(db, tenant.id)
     return _tenant_detail_row(tenant, plan.name, club_count, owner)
 
 
@@ -673,4 +679,5 @@ async def change_tenant_plan(
 
     await db.flush()
     await db.refresh(tenant)
+    mark_tenant_dirty(db, tenant.id)
     return _tenant_detail_row(tenant, new_plan.name, club_count, owner)
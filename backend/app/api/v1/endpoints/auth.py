@@ -11,12 +11,12 @@ from app.db.session import get_db
 from app.core.config import get_settings
 from app.core.pubsub import publish_notification_event
 from app.core.security import (
-    verify_password,
     create_access_token,
     create_refresh_token,
     create_reset_token,
     create_verify_token,
-    get_password_hash,
+    get_password_hash_async,
+    verify_and_update_password_async,
     decode_token,
 )
 from app.db.models.club import Club
@@ -46,6 +46,7 @@ from app.schemas.user import (
     UserLogin,
     UserRegister,
 )
+from app.services.membership_service import adjust_active_member_count
 from app.services.staff_invitation_service import StaffInvitationService
 
 logger = logging.getLogger(__name__)
@@ -122,7 +123,7 @@ async def register(body: UserRegister, db: AsyncSession = Depends(get_db)):
         tenant_id=tenant.id,
         email=body.email,
         full_name=body.full_name,
-        hashed_password=get_password_hash(body.password),
+        hashed_password=await get_password_hash_async(body.password),
         role=TenantUserRole.player,
         skill_level=club.skill_level_min,
         email_verified_at=None,
@@ -220,6 +221,7 @@ async def verify_email(body: EmailVerifyRequest, db: AsyncSession = Depends(get_
         )
         db.add(subscription)
         await db.flush()
+        await adjust_active_member_count(db, plan.id, 1)
 
     if user.email_verified_at is None:
         user.email_verified_at = datetime.now(tz=timezone.utc)
@@ -319,8 +321,9 @@ async def complete_invitation(body: CompleteInvitationRequest, db: AsyncSession
         )
         db.add(subscription)
         await db.flush()
+        await adjust_active_member_count(db, plan.id, 1)
 
-    user.hashed_password = get_password_hash(body.password)
+    user.hashed_password = await get_password_hash_async(body.password)
     user.email_verified_at = datetime.now(tz=timezone.utc)
     db.add(user)
 
@@ -447,9 +450,16 @@ async def login(body: UserLogin, db: AsyncSession = Depends(get_db)):
         select(User).where(User.email == body.email, User.tenant_id == tenant.id)
     )
     user = result.scalar_one_or_none()
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
-    if not user or not verify_password(body.password, user.hashed_password):
+    verified, new_hash = await verify_and_update_password_async(body.password, user.hashed_password)
+    if not verified:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    if new_hash:
+        # Stored hash predates the current cost settings — upgrade it transparently.
+        user.hashed_password = new_hash
+        db.add(user)
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Account is inactive")
     if user.email_verified_at is None:
@@ -537,4 +547,4 @@ async def confirm_password_reset(body: PasswordResetConfirm, db: AsyncSession =
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or expired reset token"
         )
 
-    user.hashed_password = get_password_hash(body.new_password)
+    user.hashed_password = await get_password_hash_async(body.new_password)
@@ -21,6 +21,7 @@ from app.schemas.court import (
     CalendarReservationResponse,
     CalendarReservationUpdate,
 )
+from app.services.availability_cache import mark_availability_dirty
 
 router = APIRouter(prefix="/calendar-reservations", tags=["calendar-reservations"])
 
@@ -153,6 +154,7 @@ async def create_reservation(
     )
     db.add(reservation)
     await db.flush()
+    mark_availability_dirty(db, reservation.club_id, start_utc, end_utc)
     return _to_response(reservation, tz)
 
 
@@ -249,6 +251,8 @@ async def update_reservation(
             detail="recurrence_rule is required when is_recurring is true",
         )
 
+    mark_availability_dirty(db, reservation.club_id, reservation.start_datetime, reservation.end_datetime)
+    mark_availability_dirty(db, reservation.club_id, new_start, new_end)
     for field, value in updates.items():
         setattr(reservation, field, value)
 
@@ -266,4 +270,5 @@ async def delete_reservation(
 ):
     """Staff: delete a calendar reservation."""
     reservation = await _get_reservation(db, reservation_id, tenant)
+    mark_availability_dirty(db, reservation.club_id, reservation.start_datetime, reservation.end_datetime)
     await db.delete(reservation)
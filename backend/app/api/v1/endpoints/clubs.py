@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.v1.dependencies.auth import get_current_user, require_admin
 from app.api.v1.dependencies.tenant import get_tenant
 from app.core.config import get_settings
+from app.core.stripe_clients import configure_platform_stripe
 from app.db.models.club import Club, OperatingHours, PricingRule
 from app.db.models.court import SurfaceType
 from app.db.models.tenant import SubscriptionPlan, Tenant
@@ -35,11 +36,13 @@ from app.schemas.court import (
     AvailabilitySlotCourt,
     ClubAvailabilityResponse,
 )
+from app.services.availability_cache import mark_club_availability_dirty
 from app.services.court_service import CourtService
+from app.services.pricing_table import mark_pricing_rules_dirty
 
 router = APIRouter(prefix="/clubs", tags=["clubs"])
 
-stripe.api_key = get_settings().STRIPE_SECRET_KEY
+configure_platform_stripe()
 
 
 @router.post("", response_model=ClubResponse, status_code=status.HTTP_201_CREATED)
@@ -114,6 +117,7 @@ async def update_club(
         setattr(club, field, value)
 
     await db.flush()
+    mark_club_availability_dirty(db, club.id)
     return club
 
 
@@ -219,6 +223,7 @@ async def update_club_settings(
         setattr(club, field, value)
 
     await db.flush()
+    mark_club_availability_dirty(db, club.id)
     return club
 
 
@@ -265,6 +270,7 @@ async def update_operating_hours(
     ]
     db.add_all(new_hours)
     await db.flush()
+    mark_club_availability_dirty(db, club_id)
     return new_hours
 
 
@@ -315,6 +321,7 @@ async def update_pricing_rules(
     ]
     db.add_all(new_rules)
     await db.flush()
+    mark_pricing_rules_dirty(db, club_id)
     return new_rules
 
 
@@ -9,7 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.v1.dependencies.auth import require_staff
 from app.api.v1.dependencies.tenant import get_tenant
 from app.db.models.booking import Booking, BookingStatus
-from app.db.models.club import Club, OperatingHours, PricingRule
+from app.db.models.club import Club, OperatingHours
 from app.db.models.court import CalendarReservation, CalendarReservationType, Court
 from app.db.models.tenant import SubscriptionPlan, Tenant
 from app.core.timezones import club_tz, local_walltime_to_utc, utc_to_local
@@ -21,6 +21,7 @@ from app.schemas.court import (
     CourtUpdate,
     TimeSlot,
 )
+from app.services.pricing_table import load_pricing_table
 
 router = APIRouter(prefix="/courts", tags=["courts"])
 
@@ -181,16 +182,7 @@ async def get_court_availability(
     )
     reservation_blocks = reservation_result.scalars().all()
 
-    pricing_result = await db.execute(
-        select(PricingRule).where(
-            PricingRule.club_id == club.id,
-            PricingRule.day_of_week == day_of_week,
-            PricingRule.is_active,
-            or_(PricingRule.valid_from.is_(None), PricingRule.valid_from <= query_date),
-            or_(PricingRule.valid_until.is_(None), PricingRule.valid_until >= query_date),
-        )
-    )
-    pricing_rules = pricing_result.scalars().all()
+    pricing = await load_pricing_table(db, club.id)
 
     now = datetime.now(tz=timezone.utc)
     notice_cutoff = now + timedelta(hours=club.min_booking_notice_hours)
@@ -211,20 +203,9 @@ async def get_court_availability(
         # displayed time and pricing-rule windows are club-local wall-clock.
         local_start = utc_to_local(slot_start, tz)
         local_end = utc_to_local(slot_end, tz)
-        slot_time = local_start.time()
-        price = None
-        price_label = None
-        for rule in pricing_rules:
-            if rule.start_time <= slot_time < rule.end_time:
-                if rule.incentive_price and (
-                    rule.incentive_expires_at is None or rule.incentive_expires_at > now
-                ):
-                    price = rule.incentive_price
-                    price_label = rule.incentive_label or rule.label
-                else:
-                    price = rule.price_per_slot
-                    price_label = rule.label
-                break
+        priced = pricing.lookup(local_start)
+        price = priced.price if priced else None
+        price_label = priced.label if priced else None
 
         slots.append(TimeSlot(
             start_time=local_start.strftime("%H:%M"),
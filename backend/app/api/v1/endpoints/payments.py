@@ -1,3 +1,5 @@
+import json
+
 import stripe
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy import select as sa_select
@@ -27,6 +29,7 @@ from app.schemas.payment_method import (
 )
 from app.services.membership_service import MembershipService
 from app.services.payment_service import PaymentService
+from app.services.stripe_events import record_event
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 settings = get_settings()
@@ -35,9 +38,11 @@ settings = get_settings()
 @router.post("/stripe/webhook")
 async def stripe_webhook(request: Request, db=Depends(get_db)):
     """
-    Verify Stripe signature and dispatch to the appropriate service method.
-    Handles: payment_intent.succeeded, payment_intent.payment_failed,
-    payout.paid, payout.failed, payout.canceled
+    Verify the Stripe signature and queue the event for the Stripe event
+    worker (``app/services/stripe_events.py``). Handled types:
+    payment_intent.succeeded, payment_intent.payment_failed, payout.paid,
+    payout.failed, payout.canceled, customer.subscription.updated/deleted,
+    invoice.payment_succeeded/failed. A redelivered event id is a no-op.
     """
     payload = await request.body()
     sig_header = request.headers.get("stripe-signature")
@@ -60,28 +65,9 @@ async def stripe_webhook(request: Request, db=Depends(get_db)):
     if event is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Stripe signature")
 
-    payment_svc = PaymentService(db)
-    membership_svc = MembershipService(db)
-    event_type = event["type"]
-
-    if event_type == "payment_intent.succeeded":
-        await payment_svc.confirm_payment(event)
-    elif event_type == "payment_intent.payment_failed":
-        await payment_svc.handle_payment_failed(event)
-    elif event_type == "payout.paid":
-        await payment_svc.handle_payout_paid(event)
-    elif event_type == "payout.failed":
-        await payment_svc.handle_payout_failed(event)
-    elif event_type == "payout.canceled":
-        await payment_svc.handle_payout_canceled(event)
-    elif event_type == "customer.subscription.updated":
-        await membership_svc.handle_subscription_updated(event)
-    elif event_type == "customer.subscription.deleted":
-        await membership_svc.handle_subscription_deleted(event)
-    elif event_type == "invoice.payment_succeeded":
-        await membership_svc.handle_invoice_payment_succeeded(event)
-    elif event_type == "invoice.payment_failed":
-        await membership_svc.handle_invoice_payment_failed(event)
+    # Queue the raw body Stripe signed rather than the parsed StripeObject.
+    if await record_event(db, json.loads(payload)):
+        await db.commit()
 
     return {"received": True}
 
@@ -10,7 +10,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import get_settings
 from app.core.pubsub import publish_notification_event
-from app.core.security import create_invite_token, get_password_hash
+from app.core.security import create_invite_token, get_password_hash_async
 from app.db.session import get_db, get_read_db
 from app.api.v1.dependencies.auth import get_current_user, require_staff
 from app.api.v1.dependencies.tenant import get_tenant
@@ -154,7 +154,7 @@ async def invite_player(
     # Placeholder hash — bcrypt of an unknown random secret. The format is valid (so
     # login's verify_password call won't raise), but the underlying password is
     # unrecoverable. The real password is set at /auth/complete-invitation.
-    placeholder_password = get_password_hash(secrets.token_urlsafe(32))
+    placeholder_password = await get_password_hash_async(secrets.token_urlsafe(32))
 
     user = User(
         tenant_id=current_user.tenant_id,
@@ -19,6 +19,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.dependencies.auth import require_owner
 from app.api.v1.dependencies.tenant import get_tenant
+from app.core.tenant_cache import mark_tenant_dirty
 from app.db.models.club import Club
 from app.db.models.court import Court
 from app.db.models.tenant import SubscriptionPlan, Tenant
@@ -229,6 +230,7 @@ async def create_setup_intent(
         db_tenant.stripe_customer_id = customer_id
         tenant.stripe_customer_id = customer_id
         await db.flush()
+        mark_tenant_dirty(db, tenant.id)
 
     try:
         intent = await stripe_billing.create_setup_intent(
@@ -30,6 +30,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
+from app.core.tenant_cache import mark_tenant_dirty
 from app.db.models.tenant import SubscriptionStatus, Tenant
 from app.db.session import get_db
 from app.services import stripe_billing_service as stripe_billing
@@ -83,6 +84,7 @@ async def stripe_billing_webhook(
     event_type = event["type"]
     obj = event["data"]["object"]
 
+    tenant = None
     if event_type == "invoice.payment_succeeded":
         customer_id = obj.get("customer")
         if customer_id:
@@ -125,6 +127,10 @@ async def stripe_billing_webhook(
                 tenant.is_active = False
             tenant.stripe_subscription_id = None
 
+    if tenant is not None:
+        # TenantMiddleware caches tenant rows (is_active gates every request).
+        mark_tenant_dirty(db, tenant.id)
+
     # Stripe expects a 2xx for any unhandled event types too. Returning the
     # event id makes log correlation simple.
     return {"received": True, "event_id": event.get("id")}
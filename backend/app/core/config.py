@@ -11,11 +11,46 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # Password hashing (app/core/security.py). Raising BCRYPT_ROUNDS rehashes
+    # each user's password at their next login. Async hashing runs on a pool
+    # of PASSWORD_HASH_WORKERS threads — size it to the cores you can spare.
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
 
     # Database - Cloud SQL (Postgres)
     DATABASE_URL: str                        # Primary (read/write) — always required
     DATABASE_READ_REPLICA_URL: str = ""      # Falls back to primary if empty
 
+    # Availability occupancy cache (per club-day bitmaps, see
+    # app/services/availability_cache.py). 0 disables it. Without a Redis URL
+    # the cache is process-local, so other instances see a write only once
+    # their entry's TTL lapses.
+    AVAILABILITY_CACHE_TTL_SECONDS: int = 60
+    AVAILABILITY_CACHE_MAX_ENTRIES: int = 4096
+    AVAILABILITY_CACHE_REDIS_URL: str = ""
+
+    # Tenant resolution cache for TenantMiddleware (app/core/tenant_cache.py).
+    # 0 disables it. Per process: other instances see tenant edits once their
+    # entry's TTL lapses. Unknown hosts are cached for the negative TTL.
+    TENANT_CACHE_TTL_SECONDS: int = 30
+    TENANT_CACHE_NEGATIVE_TTL_SECONDS: int = 5
+    TENANT_CACHE_MAX_ENTRIES: int = 1024
+
+    # Authenticated-principal cache for get_current_user
+    # (app/core/principal_cache.py). 0 disables it. Per process, like the
+    # tenant cache. With PRINCIPAL_FROM_READ_REPLICA, GET/HEAD requests load
+    # the principal on a miss from the read replica instead of the primary
+    # (falling back to the primary if the replica has no active row for it).
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    PRINCIPAL_FROM_READ_REPLICA: bool = True
+
+    # Compiled per-club pricing tables (app/services/pricing_table.py). 0
+    # disables the cache. Per process: other instances see a pricing-rules
+    # update once their entry's TTL lapses.
+    PRICING_TABLE_CACHE_TTL_SECONDS: int = 60
+    PRICING_TABLE_CACHE_MAX_ENTRIES: int = 1024
+
     # Pub/Sub
     PUBSUB_PROJECT_ID: str = ""
     PUBSUB_TOPIC_BOOKING_EVENTS: str = "booking-events"
@@ -28,6 +63,69 @@ class Settings(BaseSettings):
     PUBSUB_TOPIC_ANALYTICS_EXPORTS: str = "analytics-export-events"
     # Materialized-view refresh failures publish here for alerting.
     PUBSUB_TOPIC_ANALYTICS_ALERTS: str = "analytics-alerts"
+    # Publishing (app/core/pubsub.py) never waits for the ack on the caller's
+    # thread. Messages are batched client-side; once PUBSUB_MAX_IN_FLIGHT await
+    # their ack, further publishes fail at once, while publish_async (the outbox
+    # relay) waits on the loop for up to the backpressure timeout and then fails.
+    # "memory" swaps in the in-process transport (tests, benchmarks).
+    PUBSUB_TRANSPORT: str = "gcp"
+    PUBSUB_BATCH_MAX_MESSAGES: int = 100
+    PUBSUB_BATCH_MAX_BYTES: int = 1_000_000
+    PUBSUB_BATCH_MAX_LATENCY_SECONDS: float = 0.01
+    PUBSUB_MAX_IN_FLIGHT: int = 1000
+    PUBSUB_BACKPRESSURE_TIMEOUT_SECONDS: float = 5.0
+    PUBSUB_SHUTDOWN_FLUSH_SECONDS: float = 10.0
+    # Transactional outbox (app/services/event_outbox.py). Each scheduled run
+    # of the relay worker drains for RUN_SECONDS, polling every POLL_SECONDS
+    # while the outbox is empty; sent rows are kept for RETENTION_DAYS. A row
+    # whose publish fails is retried with exponential backoff from
+    # RETRY_BASE_SECONDS and given up after MAX_ATTEMPTS.
+    OUTBOX_RELAY_BATCH_SIZE: int = 500
+    OUTBOX_RELAY_RUN_SECONDS: float = 55.0
+    OUTBOX_RELAY_POLL_SECONDS: float = 1.0
+    OUTBOX_RETENTION_DAYS: int = 7
+    OUTBOX_RETRY_BASE_SECONDS: float = 10.0
+    OUTBOX_MAX_ATTEMPTS: int = 10
+
+    # Stripe webhook inbox (app/services/stripe_events.py). The webhook only
+    # records verified events; each scheduled run of the Stripe event worker
+    # processes them for RUN_SECONDS, polling every POLL_SECONDS while idle,
+    # with up to CONCURRENCY ordering keys in flight. A claimed event is leased
+    # for LEASE_SECONDS; a failing one is retried with exponential backoff from
+    # RETRY_BASE_SECONDS and given up after MAX_ATTEMPTS. Processed rows are
+    # kept for RETENTION_DAYS — longer than Stripe's 3-day retry window, so
+    # late redeliveries still de-duplicate.
+    STRIPE_EVENT_BATCH_SIZE: int = 100
+    STRIPE_EVENT_CONCURRENCY: int = 10
+    STRIPE_EVENT_RUN_SECONDS: float = 55.0
+    STRIPE_EVENT_POLL_SECONDS: float = 1.0
+    STRIPE_EVENT_LEASE_SECONDS: float = 300.0
+    STRIPE_EVENT_RETRY_BASE_SECONDS: float = 30.0
+    STRIPE_EVENT_MAX_ATTEMPTS: int = 10
+    STRIPE_EVENT_RETENTION_DAYS: int = 30
+
+    # Court-utilisation snapshot worker (app/analytics/workers/
+    # snapshot_court_utilisation.py): clubs processed at once. Each club holds
+    # one read-replica and one primary connection, so keep this within the
+    # engines' pool_size + max_overflow.
+    ANALYTICS_SNAPSHOT_CONCURRENCY: int = 8
+    # Materialized-view refresh worker (app/analytics/workers/refresh_views.py):
+    # independent views refreshed at once, each on its own primary connection.
+    ANALYTICS_REFRESH_CONCURRENCY: int = 3
+    # Analytics read caches, per process. Cached leaderboard totals
+    # (app/analytics/services/totals_cache.py) and whole responses
+    # (app/analytics/api/response_cache.py) are reused until their data's
+    # generation moves — a view refresh, rollup apply or snapshot write —
+    # noticed within GENERATION_TTL_SECONDS. MAX_ENTRIES = 0 disables a cache.
+    ANALYTICS_TOTALS_CACHE_MAX_ENTRIES: int = 10000
+    ANALYTICS_RESPONSE_CACHE_MAX_ENTRIES: int = 2000
+    ANALYTICS_GENERATION_TTL_SECONDS: float = 30.0
+    # Revenue rollups (app/analytics/services/revenue_rollups.py). Each
+    # scheduled run of the applier drains queued payment changes for
+    # RUN_SECONDS, polling every POLL_SECONDS while the queue is empty.
+    REVENUE_ROLLUP_BATCH_SIZE: int = 500
+    REVENUE_ROLLUP_RUN_SECONDS: float = 55.0
+    REVENUE_ROLLUP_POLL_SECONDS: float = 1.0
 
     # Cloud Storage
     GCS_BUCKET_VIDEOS: str = ""
@@ -36,6 +134,13 @@ class Settings(BaseSettings):
     # and auto-deleted by a GCS lifecycle rule after 7 days (see storage_service).
     GCS_BUCKET_EXPORTS: str = ""
     GCS_PROJECT_ID: str = ""
+    # Exports stream to storage as they are built: a resumable GCS upload sent
+    # in EXPORT_UPLOAD_CHUNK_BYTES pieces (a multiple of 256 KiB), so worker
+    # memory does not grow with the report. "local" writes the file under
+    # EXPORT_LOCAL_DIR instead (tests, local development).
+    EXPORT_STORAGE: str = "gcs"
+    EXPORT_LOCAL_DIR: str = "/tmp/smashbook-exports"
+    EXPORT_UPLOAD_CHUNK_BYTES: int = 8 * 1024 * 1024
 
     # Stripe — two-account model. Today STRIPE_BILLING_SECRET_KEY may point at
     # the same Stripe account as STRIPE_SECRET_KEY; when SmashBook Corporate
@@ -53,6 +158,18 @@ class Settings(BaseSettings):
     STRIPE_BILLING_SECRET_KEY: str = "placeholder-not-used-in-migrations"
     STRIPE_BILLING_WEBHOOK_SECRET: str = "placeholder-not-used-in-migrations"
     STRIPE_API_VERSION: str = "2024-12-18.acacia"
+    # Shared Stripe HTTP client (app/core/stripe_clients.py). Connections are
+    # pooled across requests; failed calls are retried with the same
+    # idempotency key. Requests are paced per Stripe account (platform or
+    # connected) to STRIPE_REQUESTS_PER_SECOND_PER_ACCOUNT with bursts of up
+    # to STRIPE_BURST; 0 disables pacing. Cron sweeps fan out over at most
+    # STRIPE_CLUB_CONCURRENCY clubs at a time.
+    STRIPE_TIMEOUT_SECONDS: float = 30.0
+    STRIPE_MAX_NETWORK_RETRIES: int = 2
+    STRIPE_MAX_CONNECTIONS: int = 50
+    STRIPE_REQUESTS_PER_SECOND_PER_ACCOUNT: float = 20.0
+    STRIPE_BURST: int = 10
+    STRIPE_CLUB_CONCURRENCY: int = 8
 
     # Platform admin
     PLATFORM_API_KEY: str = "placeholder-not-used-in-migrations"
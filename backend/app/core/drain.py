@@ -0,0 +1,31 @@
+"""
+Time-boxed queue draining for the scheduled workers.
+
+The outbox relay, the revenue-rollup applier and the Stripe event worker each
+run for a fixed time per Pub/Sub push: they process batches back-to-back while
+work is waiting and poll while the queue is idle. ``drain_until`` is that loop;
+the callers keep their own batch function and totals.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable
+
+
+async def drain_until(
+    deadline: float, run_batch: Callable[[], Awaitable[bool]], poll_seconds: float
+) -> None:
+    """Call ``run_batch`` until the loop clock passes ``deadline``.
+
+    ``run_batch`` returns True when more work may be waiting (say, it claimed
+    a full batch and all of it went through), and it is called again at once.
+    Otherwise the loop sleeps ``poll_seconds`` first, never past the deadline.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        more = await run_batch()
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return
+        if not more:
+            await asyncio.sleep(min(poll_seconds, remaining))
@@ -0,0 +1,154 @@
+"""
+In-process cache of authenticated principals for ``get_current_user``.
+
+Every authenticated request used to load its ``User`` row from the primary.
+Entries here are keyed by ``(user_id, token iat)`` and hold a column snapshot
+of the user. A hit is merged into the request's session with ``load=False`` —
+no SQL — so the handler still gets a persistent ``User`` it can modify and
+flush exactly as before.
+
+Invalidation
+------------
+Any flushed change to a ``User`` row (role, suspension, deactivation, password
+reset, profile edits) marks it on the session; once that session commits,
+every cached token of that user is dropped. Lookups that began before the
+commit do not store what they read, and lookups served by the read replica are
+refused for a short grace window after an invalidation so replica lag cannot
+re-cache the old row; ``get_current_user`` reads such a user from the primary
+in that window, and falls back to the primary whenever the replica has no row
+or an inactive one. The cache is per process: other instances see a change
+once their entry's TTL lapses. ``PRINCIPAL_CACHE_TTL_SECONDS = 0`` disables it.
+"""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import get_settings
+from app.db.models.user import User
+
+_DIRTY_INFO_KEY = "principal_cache_dirty"
+
+# How long after an invalidation a replica read is assumed to be possibly stale.
+REPLICA_LAG_GRACE_SECONDS = 5.0
+
+PrincipalKey = tuple[UUID, Optional[int]]
+
+
+@dataclass(frozen=True)
+class _Entry:
+    values: dict[str, Any]
+    expires_at: float
+
+
+class PrincipalCache:
+    def __init__(self, ttl_seconds: int, max_entries: int) -> None:
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: OrderedDict[PrincipalKey, _Entry] = OrderedDict()
+        self._invalidated: dict[UUID, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl > 0
+
+    def get(self, user_id: UUID, iat: Optional[int]) -> Optional[User]:
+        """A detached ``User`` rebuilt from the snapshot, or ``None`` on a miss."""
+        if not self.enabled:
+            return None
+        key = (user_id, iat)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        user = User(**entry.values)
+        make_transient_to_detached(user)
+        return user
+
+    def put(
+        self,
+        iat: Optional[int],
+        user: User,
+        loaded_at: float,
+        from_replica: bool = False,
+    ) -> None:
+        """Store ``user`` as loaded at ``loaded_at`` (``time.monotonic()`` before the read)."""
+        if not self.enabled:
+            return
+        invalidated_at = self._invalidated.get(user.id)
+        if invalidated_at is not None:
+            grace = REPLICA_LAG_GRACE_SECONDS if from_replica else 0.0
+            if invalidated_at + grace >= loaded_at:
+                return
+        values = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+        key = (user.id, iat)
+        self._entries.pop(key, None)
+        self._entries[key] = _Entry(values, time.monotonic() + self._ttl)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def replica_may_lag(self, user_id: UUID) -> bool:
+        """True while a replica read of ``user_id`` may predate its last invalidation."""
+        invalidated_at = self._invalidated.get(user_id)
+        return invalidated_at is not None and invalidated_at + REPLICA_LAG_GRACE_SECONDS >= time.monotonic()
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        now = time.monotonic()
+        self._invalidated[user_id] = now
+        for key in [k for k in self._entries if k[0] == user_id]:
+            del self._entries[key]
+        self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        horizon = now - self._ttl - REPLICA_LAG_GRACE_SECONDS
+        for user_id in [u for u, at in self._invalidated.items() if at < horizon]:
+            del self._invalidated[user_id]
+
+
+@lru_cache
+def get_principal_cache() -> PrincipalCache:
+    settings = get_settings()
+    return PrincipalCache(settings.PRINCIPAL_CACHE_TTL_SECONDS, settings.PRINCIPAL_CACHE_MAX_ENTRIES)
+
+
+# ---------------------------------------------------------------------------
+# Write-side hooks — any flushed User change invalidates after commit
+# ---------------------------------------------------------------------------
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_dirty_users(session: Session, flush_context) -> None:
+    if not get_principal_cache().enabled:
+        return
+    changed = [
+        obj.id
+        for obj in (*session.dirty, *session.deleted)
+        if isinstance(obj, User) and obj.id is not None
+    ]
+    if changed:
+        session.info.setdefault(_DIRTY_INFO_KEY, set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    pending = session.info.pop(_DIRTY_INFO_KEY, None)
+    if not pending:
+        return
+    cache = get_principal_cache()
+    for user_id in pending:
+        cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session: Session) -> None:
+    session.info.pop(_DIRTY_INFO_KEY, None)
@@ -1,47 +1,350 @@
+"""
+Event publishing to Pub/Sub.
+
+``publish_event`` used to wait for Pub/Sub to ack every message
+(``future.result()``), so each notification published from an async handler
+held the event loop for a full round-trip. Publishing is now a hand-off:
+
+  * The message is JSON-encoded on the caller's thread and passed to the
+    transport's client-side batcher (``PUBSUB_BATCH_*``), which sends it from
+    its own threads. The caller gets the transport's ``concurrent.futures``
+    future back immediately; code that needs the ack awaits it on the loop
+    with ``asyncio.wrap_future``. Failures nobody waits for are logged.
+  * At most ``PUBSUB_MAX_IN_FLIGHT`` messages await their ack at once, so
+    memory stays bounded if Pub/Sub stalls. Past that ``publish`` raises
+    ``PublishBackpressureError`` straight away — it runs on the event loop and
+    must never wait. ``publish_async`` instead waits on the loop for a slot,
+    for up to ``PUBSUB_BACKPRESSURE_TIMEOUT_SECONDS``, and returns an
+    awaitable for the ack (the outbox relay).
+  * ``pubsub_lifespan`` flushes everything in flight when the app shuts down,
+    so a scale-down does not drop accepted events.
+
+``PUBSUB_TRANSPORT = "memory"`` swaps the Google client for
+``InMemoryTransport``, which records messages in-process (tests, benchmarks,
+local development).
+"""
+from __future__ import annotations
+
+import asyncio
 import json
-from google.cloud import pubsub_v1
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from itertools import count
+from typing import Optional, Protocol
+
 from app.core.config import get_settings
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
 
-_publisher = None
 
-def get_publisher() -> pubsub_v1.PublisherClient:
-    """Lazy-initialise the Pub/Sub publisher — avoids credential errors at import time."""
+class PublishBackpressureError(RuntimeError):
+    """Too many messages are awaiting their ack; the publish was not accepted."""
+
+
+class Transport(Protocol):
+    def topic_path(self, topic_name: str) -> str: ...
+
+    def publish(self, topic_path: str, data: bytes, ordering_key: str = "", **attributes: str) -> Future: ...
+
+    def resume(self, topic_path: str, ordering_key: str) -> None: ...
+
+    def stop(self) -> None: ...
+
+
+class GooglePubSubTransport:
+    """``pubsub_v1.PublisherClient`` with client-side batching from settings.
+
+    Message ordering is enabled so events that share an ordering key are
+    delivered in publish order; unkeyed messages are unaffected.
+    """
+
+    def __init__(self, max_messages: int, max_bytes: int, max_latency: float) -> None:
+        from google.cloud import pubsub_v1
+
+        self._client = pubsub_v1.PublisherClient(
+            batch_settings=pubsub_v1.types.BatchSettings(
+                max_messages=max_messages,
+                max_bytes=max_bytes,
+                max_latency=max_latency,
+            ),
+            publisher_options=pubsub_v1.types.PublisherOptions(enable_message_ordering=True),
+        )
+
+    def topic_path(self, topic_name: str) -> str:
+        return self._client.topic_path(settings.PUBSUB_PROJECT_ID, topic_name)
+
+    def publish(self, topic_path: str, data: bytes, ordering_key: str = "", **attributes: str) -> Future:
+        return self._client.publish(topic_path, data=data, ordering_key=ordering_key, **attributes)
+
+    def resume(self, topic_path: str, ordering_key: str) -> None:
+        # After a failed publish the client pauses the key until resumed.
+        self._client.resume_publish(topic_path, ordering_key)
+
+    def stop(self) -> None:
+        # Sends any partially filled batches and waits for them.
+        self._client.stop()
+
+
+@dataclass(frozen=True)
+class PublishedMessage:
+    topic_path: str
+    data: bytes
+    attributes: dict[str, str]
+    message_id: str
+    ordering_key: str = ""
+
+    @property
+    def event(self) -> dict:
+        """The decoded ``{"event_type", "payload"}`` envelope."""
+        return json.loads(self.data)
+
+
+class InMemoryTransport:
+    """
+    In-process stand-in for Pub/Sub.
+
+    Every publish is recorded on ``messages``. Acks are immediate by default;
+    ``ack_latency`` delays them (benchmarks), and ``auto_ack=False`` leaves
+    them pending until ``ack_pending`` / ``fail_pending`` (tests).
+    """
+
+    def __init__(self, auto_ack: bool = True, ack_latency: float = 0.0) -> None:
+        self.messages: list[PublishedMessage] = []
+        self._auto_ack = auto_ack
+        self._ack_latency = ack_latency
+        self._pending: list[tuple[Future, str]] = []
+        self._ids = count(1)
+        self._lock = threading.Lock()
+
+    def topic_path(self, topic_name: str) -> str:
+        return f"projects/{settings.PUBSUB_PROJECT_ID or 'local'}/topics/{topic_name}"
+
+    def publish(self, topic_path: str, data: bytes, ordering_key: str = "", **attributes: str) -> Future:
+        future: Future = Future()
+        with self._lock:
+            message_id = str(next(self._ids))
+            self.messages.append(PublishedMessage(topic_path, data, attributes, message_id, ordering_key))
+            if not self._auto_ack:
+                self._pending.append((future, message_id))
+                return future
+        if self._ack_latency > 0:
+            timer = threading.Timer(self._ack_latency, future.set_result, (message_id,))
+            timer.daemon = True
+            timer.start()
+        else:
+            future.set_result(message_id)
+        return future
+
+    def ack_pending(self) -> None:
+        for future, message_id in self._take_pending():
+            future.set_result(message_id)
+
+    def fail_pending(self, exc: BaseException) -> None:
+        for future, _ in self._take_pending():
+            future.set_exception(exc)
+
+    def resume(self, topic_path: str, ordering_key: str) -> None:
+        pass
+
+    def stop(self) -> None:
+        self.ack_pending()
+
+    def _take_pending(self) -> list[tuple[Future, str]]:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        return pending
+
+
+class EventPublisher:
+    def __init__(self, transport: Transport, max_in_flight: int, backpressure_timeout: float) -> None:
+        self.transport = transport
+        self._max_in_flight = max_in_flight
+        self._backpressure_timeout = backpressure_timeout
+        self._in_flight = 0
+        # Acks settle on the transport's threads: ``flush`` waits on the
+        # condition, ``publish_async`` callers on loop futures woken by ``_settle``.
+        self._settled = threading.Condition()
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def publish(self, topic_name: str, event_type: str, payload: dict, ordering_key: str = "") -> Future:
+        """Hand one event to the batcher; the returned future resolves to its message id.
+
+        Never waits: raises ``PublishBackpressureError`` if no slot is free.
+        """
+        if not self._try_acquire():
+            raise self._backpressure_error(topic_name, event_type)
+        return self._send(topic_name, event_type, payload, ordering_key)
+
+    async def publish_async(
+        self, topic_name: str, event_type: str, payload: dict, ordering_key: str = ""
+    ) -> asyncio.Future:
+        """Like ``publish``, but waits on the loop for a free slot, for up to the
+        backpressure timeout. Returns an awaitable resolving to the message id."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._backpressure_timeout
+        while True:
+            waiter = loop.create_future()
+            if self._try_acquire((loop, waiter)):
+                break
+            try:
+                await asyncio.wait_for(waiter, max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                with self._settled:
+                    if (loop, waiter) in self._waiters:
+                        self._waiters.remove((loop, waiter))
+                raise self._backpressure_error(topic_name, event_type) from None
+        return asyncio.wrap_future(self._send(topic_name, event_type, payload, ordering_key))
+
+    def _try_acquire(self, waiter: Optional[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = None) -> bool:
+        """Take an in-flight slot; if none is free, register ``waiter`` for ``_settle`` to wake."""
+        with self._settled:
+            if self._in_flight < self._max_in_flight:
+                self._in_flight += 1
+                return True
+            if waiter is not None:
+                self._waiters.append(waiter)
+            return False
+
+    def _send(self, topic_name: str, event_type: str, payload: dict, ordering_key: str) -> Future:
+        try:
+            data = json.dumps({"event_type": event_type, "payload": payload}).encode("utf-8")
+            future = self.transport.publish(
+                self.transport.topic_path(topic_name), data, ordering_key=ordering_key, event_type=event_type,
+            )
+        except BaseException:
+            self._settle()
+            raise
+        future.add_done_callback(lambda f: self._on_done(f, topic_name, event_type))
+        return future
+
+    def _backpressure_error(self, topic_name: str, event_type: str) -> PublishBackpressureError:
+        return PublishBackpressureError(
+            f"{self._in_flight} Pub/Sub messages awaiting ack; dropped {event_type} for {topic_name}"
+        )
+
+    def resume(self, topic_name: str, ordering_key: str) -> None:
+        """Re-open an ordering key after one of its publishes failed."""
+        self.transport.resume(self.transport.topic_path(topic_name), ordering_key)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until nothing is in flight; False if ``timeout`` ran out first.
+
+        Blocks the calling thread — shutdown only (``pubsub_lifespan`` runs it
+        off the loop).
+        """
+        with self._settled:
+            return self._settled.wait_for(lambda: self._in_flight == 0, timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop the transport (sending partial batches), then wait for outstanding acks."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.transport.stop()
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        if not self.flush(remaining):
+            logger.error("pubsub shutdown: %d message(s) still unacknowledged", self._in_flight)
+
+    def _on_done(self, future: Future, topic_name: str, event_type: str) -> None:
+        self._settle()
+        if future.cancelled():
+            logger.error("pubsub publish cancelled topic=%s event_type=%s", topic_name, event_type)
+            return
+        exc = future.exception()
+        if exc is not None:
+            logger.error(
+                "pubsub publish failed topic=%s event_type=%s", topic_name, event_type, exc_info=exc,
+            )
+
+    def _settle(self) -> None:
+        with self._settled:
+            self._in_flight -= 1
+            self._settled.notify_all()
+            waiters, self._waiters = self._waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:  # the waiter's loop has closed
+                pass
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+_publisher: Optional[EventPublisher] = None
+_publisher_lock = threading.Lock()
+
+
+def get_publisher() -> EventPublisher:
+    """Lazy-initialise the publisher — avoids credential errors at import time."""
     global _publisher
     if _publisher is None:
-        _publisher = pubsub_v1.PublisherClient()
+        with _publisher_lock:
+            if _publisher is None:
+                if settings.PUBSUB_TRANSPORT == "memory":
+                    transport: Transport = InMemoryTransport()
+                else:
+                    transport = GooglePubSubTransport(
+                        max_messages=settings.PUBSUB_BATCH_MAX_MESSAGES,
+                        max_bytes=settings.PUBSUB_BATCH_MAX_BYTES,
+                        max_latency=settings.PUBSUB_BATCH_MAX_LATENCY_SECONDS,
+                    )
+                _publisher = EventPublisher(
+                    transport,
+                    max_in_flight=settings.PUBSUB_MAX_IN_FLIGHT,
+                    backpressure_timeout=settings.PUBSUB_BACKPRESSURE_TIMEOUT_SECONDS,
+                )
     return _publisher
 
-def publish_event(topic_name: str, event_type: str, payload: dict) -> None:
-    """Publish an event to a Pub/Sub topic."""
-    publisher = get_publisher()
-    topic_path = publisher.topic_path(settings.PUBSUB_PROJECT_ID, topic_name)
-    message = {
-        "event_type": event_type,
-        "payload": payload,
-    }
-    data = json.dumps(message).encode("utf-8")
-    future = publisher.publish(topic_path, data=data, event_type=event_type)
-    future.result()
 
-def publish_booking_event(event_type: str, payload: dict) -> None:
-    publish_event(settings.PUBSUB_TOPIC_BOOKING_EVENTS, event_type, payload)
+def shutdown_publisher(timeout: Optional[float] = None) -> None:
+    """Flush and stop the publisher, if one was created; the next publish starts a new one."""
+    global _publisher
+    with _publisher_lock:
+        publisher, _publisher = _publisher, None
+    if publisher is not None:
+        publisher.close(settings.PUBSUB_SHUTDOWN_FLUSH_SECONDS if timeout is None else timeout)
+
+
+@asynccontextmanager
+async def pubsub_lifespan(app):
+    """FastAPI lifespan that flushes in-flight events on shutdown."""
+    yield
+    # close() blocks on acks; keep the loop free for other shutdown work.
+    await asyncio.to_thread(shutdown_publisher)
+
+
+def publish_event(topic_name: str, event_type: str, payload: dict) -> Future:
+    """Publish an event to a Pub/Sub topic without waiting for the ack."""
+    return get_publisher().publish(topic_name, event_type, payload)
+
+def publish_booking_event(event_type: str, payload: dict) -> Future:
+    return publish_event(settings.PUBSUB_TOPIC_BOOKING_EVENTS, event_type, payload)
 
-def publish_payment_event(event_type: str, payload: dict) -> None:
-    publish_event(settings.PUBSUB_TOPIC_PAYMENT_EVENTS, event_type, payload)
+def publish_payment_event(event_type: str, payload: dict) -> Future:
+    return publish_event(settings.PUBSUB_TOPIC_PAYMENT_EVENTS, event_type, payload)
 
-def publish_notification_event(event_type: str, payload: dict) -> None:
-    publish_event(settings.PUBSUB_TOPIC_NOTIFICATION_EVENTS, event_type, payload)
+def publish_notification_event(event_type: str, payload: dict) -> Future:
+    return publish_event(settings.PUBSUB_TOPIC_NOTIFICATION_EVENTS, event_type, payload)
 
-def publish_analytics_export(event_type: str, payload: dict) -> None:
+def publish_analytics_export(event_type: str, payload: dict) -> Future:
     """Publish a request-triggered analytics export event.
 
     Dedicated topic (not ``analytics-events``) so the export worker has its own
     subscription and never receives the scheduled snapshot/refresh messages —
     mirroring the snapshot/refresh topic split.
     """
-    publish_event(settings.PUBSUB_TOPIC_ANALYTICS_EXPORTS, event_type, payload)
+    return publish_event(settings.PUBSUB_TOPIC_ANALYTICS_EXPORTS, event_type, payload)
 
-def publish_analytics_alert(event_type: str, payload: dict) -> None:
-    publish_event(settings.PUBSUB_TOPIC_ANALYTICS_ALERTS, event_type, payload)
\ No newline at end of file
+def publish_analytics_alert(event_type: str, payload: dict) -> Future:
+    return publish_event(settings.PUBSUB_TOPIC_ANALYTICS_ALERTS, event_type, payload)
@@ -1,11 +1,14 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from threading import Lock
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from .config import get_settings
 
 settings = get_settings()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -16,10 +19,58 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+# ---------------------------------------------------------------------------
+# Async password hashing — request handlers use these
+#
+# A bcrypt hash or verify is a few hundred ms of CPU. Called inline from an
+# async handler it stalls every other request on the worker. These run it on a
+# dedicated pool of PASSWORD_HASH_WORKERS threads instead (bcrypt releases the
+# GIL while hashing), which also caps how many cores a login burst can take;
+# callers beyond that queue without blocking the event loop.
+# ---------------------------------------------------------------------------
+
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_executor_lock = Lock()
+
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        with _hash_executor_lock:
+            if _hash_executor is None:
+                _hash_executor = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS,
+                    thread_name_prefix="password-hash",
+                )
+    return _hash_executor
+
+
+async def _run_hashing(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(_get_hash_executor(), fn, *args)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hashing(pwd_context.verify, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hashing(pwd_context.hash, password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, Optional[str]]:
+    """Verify, and if the hash uses outdated parameters (e.g. BCRYPT_ROUNDS changed)
+    also return a fresh hash of the same password to store. ``(False, None)`` on mismatch."""
+    return await _run_hashing(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire, "type": "access"})
+    issued_at = datetime.utcnow()
+    expire = issued_at + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
+    # iat keys the principal cache (app/core/principal_cache.py).
+    to_encode.update({"exp": expire, "iat": issued_at, "type": "access"})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
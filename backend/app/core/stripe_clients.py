@@ -4,7 +4,8 @@ The platform serves two distinct Stripe relationships:
 
   - Platform account: Connect, player payments, application fees, payouts.
     Used today by clubs/payment/membership services via the module-level
-    ``stripe.api_key`` global (legacy pattern).
+    ``stripe.api_key`` global (legacy pattern), configured by
+    ``configure_platform_stripe()``.
 
   - Billing account: tenant SaaS subscriptions (clubs paying SmashBook).
     Used exclusively by ``stripe_billing_service`` via ``billing_client()``.
@@ -16,15 +17,123 @@ Today ``STRIPE_BILLING_SECRET_KEY`` may point to the same Stripe account as
 ``STRIPE_SECRET_KEY`` — this is intentional. When the dedicated SmashBook
 Corporate Stripe account is created, the split is a pure secrets/dashboard
 change: no code edits required. See ``docs/runbooks/STRIPE_BILLING_ACCOUNT_SPLIT.md``.
+
+All Stripe traffic goes through one ``StripeHTTPClient`` (``stripe_http_client()``):
+
+  - Services call the SDK's ``*_async`` methods, which run on a pooled
+    ``httpx.AsyncClient`` instead of blocking the event loop on ``requests``.
+  - Failed calls are retried ``STRIPE_MAX_NETWORK_RETRIES`` times. The SDK
+    stamps every POST with an idempotency key (callers may pass their own)
+    and reuses it across retries, so a retried create never duplicates.
+  - Requests are paced per Stripe account — the platform, or the connected
+    account named in ``Stripe-Account`` — so a sweep over many clubs cannot
+    exhaust one account's rate limit and start collecting 429s.
 """
 
+import asyncio
+import ssl
+import threading
+import time
 from functools import lru_cache
+from typing import Optional
 
+import httpx
 import stripe
 
 from app.core.config import get_settings
 
 
+class AccountRateLimiter:
+    """
+    Per-account request pacing (generic cell rate algorithm).
+
+    Each key may send ``burst`` requests back to back, then one every
+    ``1 / rate`` seconds. ``reserve`` books the caller's slot and returns how
+    long to wait for it, so the lock is never held while sleeping and the same
+    limiter serves both the sync and async request paths.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._tolerance = self._interval * max(burst - 1, 0)
+        self._tat: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, key: tuple) -> float:
+        if not self._interval:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            tat = max(self._tat.get(key, now), now)
+            self._tat[key] = tat + self._interval
+        return max(0.0, tat - self._tolerance - now)
+
+
+class StripeHTTPClient(stripe.HTTPXClient):
+    """``stripe.HTTPXClient`` with a bounded connection pool and per-account pacing.
+
+    ``transport`` replaces the network layer of both the sync and async
+    clients — tests pass an ``httpx.MockTransport`` serving a fake Stripe.
+    """
+
+    def __init__(
+        self,
+        timeout: float,
+        max_connections: int,
+        limiter: AccountRateLimiter,
+        transport: Optional[httpx.BaseTransport] = None,
+    ) -> None:
+        super().__init__(timeout=timeout, allow_sync_methods=False)
+        limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_connections,
+        )
+        # Same CA bundle as the base class; only the pool sizes differ.
+        verify = ssl.create_default_context(cafile=stripe.ca_bundle_path)
+        self._client_async = httpx.AsyncClient(verify=verify, limits=limits, transport=transport)
+        self._client = httpx.Client(verify=verify, limits=limits, transport=transport)
+        self._limiter = limiter
+
+    def request(self, method, url, headers, post_data=None):
+        delay = self._limiter.reserve(self._account_key(headers))
+        if delay:
+            time.sleep(delay)
+        return super().request(method, url, headers, post_data)
+
+    async def request_async(self, method, url, headers, post_data=None):
+        delay = self._limiter.reserve(self._account_key(headers))
+        if delay:
+            await asyncio.sleep(delay)
+        return await super().request_async(method, url, headers, post_data)
+
+    @staticmethod
+    def _account_key(headers) -> tuple:
+        # The API key tells platform and billing traffic apart; Stripe-Account
+        # names the connected account a platform call acts on.
+        return headers.get("Authorization"), headers.get("Stripe-Account")
+
+
+@lru_cache(maxsize=1)
+def stripe_http_client() -> StripeHTTPClient:
+    """The process-wide pooled Stripe HTTP client."""
+    settings = get_settings()
+    return StripeHTTPClient(
+        timeout=settings.STRIPE_TIMEOUT_SECONDS,
+        max_connections=settings.STRIPE_MAX_CONNECTIONS,
+        limiter=AccountRateLimiter(
+            settings.STRIPE_REQUESTS_PER_SECOND_PER_ACCOUNT, settings.STRIPE_BURST,
+        ),
+    )
+
+
+def configure_platform_stripe() -> None:
+    """Point the module-level ``stripe`` globals at the platform account and shared client."""
+    settings = get_settings()
+    stripe.api_key = settings.STRIPE_SECRET_KEY
+    stripe.api_version = settings.STRIPE_API_VERSION
+    stripe.max_network_retries = settings.STRIPE_MAX_NETWORK_RETRIES
+    stripe.default_http_client = stripe_http_client()
+
+
 @lru_cache(maxsize=1)
 def platform_client() -> stripe.StripeClient:
     """Stripe client for the Connect platform account.
@@ -32,7 +141,12 @@ def platform_client() -> stripe.StripeClient:
     Handles player payments, Connect onboarding, application fees, payouts.
     Reads ``STRIPE_SECRET_KEY``.
     """
-    return stripe.StripeClient(get_settings().STRIPE_SECRET_KEY)
+    settings = get_settings()
+    return stripe.StripeClient(
+        settings.STRIPE_SECRET_KEY,
+        http_client=stripe_http_client(),
+        max_network_retries=settings.STRIPE_MAX_NETWORK_RETRIES,
+    )
 
 
 @lru_cache(maxsize=1)
@@ -41,4 +155,9 @@ def billing_client() -> stripe.StripeClient:
 
     Handles tenant SaaS subscriptions. Reads ``STRIPE_BILLING_SECRET_KEY``.
     """
-    return stripe.StripeClient(get_settings().STRIPE_BILLING_SECRET_KEY)
+    settings = get_settings()
+    return stripe.StripeClient(
+        settings.STRIPE_BILLING_SECRET_KEY,
+        http_client=stripe_http_client(),
+        max_network_retries=settings.STRIPE_MAX_NETWORK_RETRIES,
+    )
@@ -0,0 +1,164 @@
+"""
+In-process cache for TenantMiddleware's tenant resolution.
+
+Every tenant-scoped request resolves its tenant before auth runs. Without a
+cache that is a connection checkout plus a SELECT on ``tenants`` per request,
+for a row that changes a handful of times a year.
+
+Entries are keyed by how the tenant was resolved — ``("id", UUID)``,
+``("subdomain", str)`` or ``("domain", str)`` — and hold a column snapshot of
+the tenant plus the portal the key matched. Each hit rebuilds a fresh,
+session-less ``Tenant`` from the snapshot, so a handler that mutates its copy
+never leaks into other requests. Keys that resolved to nothing are cached too
+(shorter TTL) so unknown hosts and bots don't reach the database every time.
+
+Invalidation
+------------
+Writers call ``mark_tenant_dirty(session, tenant_id)``; once that session
+commits, every key pointing at the tenant is dropped, along with all negative
+entries (a new or renamed tenant may now own a previously-unknown key). A
+generation counter stops a lookup that started before the commit from storing
+what it read. The cache is per process: other instances see a write once their
+entry's TTL lapses. ``TENANT_CACHE_TTL_SECONDS = 0`` disables it.
+"""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Hashable, Optional
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.models.tenant import Tenant
+
+_DIRTY_INFO_KEY = "tenant_cache_dirty"
+
+CacheKey = tuple[str, Hashable]
+
+
+@dataclass(frozen=True)
+class _Entry:
+    values: Optional[dict[str, Any]]  # None == negative entry
+    portal: Optional[str]
+    expires_at: float
+
+
+@dataclass(frozen=True)
+class TenantLookup:
+    """Result of a cache hit: the rebuilt tenant (None for a cached miss) and portal."""
+
+    tenant: Optional[Tenant]
+    portal: Optional[str]
+
+
+class TenantCache:
+    def __init__(self, ttl_seconds: int, negative_ttl_seconds: int, max_entries: int) -> None:
+        self._ttl = ttl_seconds
+        self._negative_ttl = negative_ttl_seconds
+        self._max_entries = max_entries
+        self._entries: OrderedDict[CacheKey, _Entry] = OrderedDict()
+        self._keys_by_tenant: dict[UUID, set[CacheKey]] = {}
+        self._generation = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl > 0
+
+    @property
+    def generation(self) -> int:
+        """Read before a database lookup and hand back to ``put``."""
+        return self._generation
+
+    def get(self, key: CacheKey) -> Optional[TenantLookup]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        tenant = Tenant(**entry.values) if entry.values is not None else None
+        return TenantLookup(tenant, entry.portal)
+
+    def put(
+        self,
+        key: CacheKey,
+        tenant: Optional[Tenant],
+        portal: Optional[str],
+        generation: int,
+    ) -> None:
+        """Store a lookup result unless a tenant write committed since ``generation``."""
+        if not self.enabled or generation != self._generation:
+            return
+        if tenant is None:
+            if self._negative_ttl <= 0:
+                return
+            entry = _Entry(None, None, time.monotonic() + self._negative_ttl)
+        else:
+            values = {attr.key: getattr(tenant, attr.key) for attr in inspect(Tenant).column_attrs}
+            entry = _Entry(values, portal, time.monotonic() + self._ttl)
+            self._keys_by_tenant.setdefault(tenant.id, set()).add(key)
+        self._drop(key)
+        self._entries[key] = entry
+        while len(self._entries) > self._max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def invalidate_tenant(self, tenant_id: UUID) -> None:
+        self._generation += 1
+        for key in self._keys_by_tenant.pop(tenant_id, set()):
+            self._entries.pop(key, None)
+        for key in [k for k, e in self._entries.items() if e.values is None]:
+            del self._entries[key]
+
+    def _drop(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None and entry.values is not None:
+            keys = self._keys_by_tenant.get(entry.values["id"])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tenant[entry.values["id"]]
+
+
+@lru_cache
+def get_tenant_cache() -> TenantCache:
+    settings = get_settings()
+    return TenantCache(
+        settings.TENANT_CACHE_TTL_SECONDS,
+        settings.TENANT_CACHE_NEGATIVE_TTL_SECONDS,
+        settings.TENANT_CACHE_MAX_ENTRIES,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Write-side hooks — invalidate after the writer's transaction commits
+# ---------------------------------------------------------------------------
+
+
+def mark_tenant_dirty(session, tenant_id: UUID) -> None:
+    """Drop cached resolutions of ``tenant_id`` once ``session`` commits."""
+    if not get_tenant_cache().enabled:
+        return
+    session.info.setdefault(_DIRTY_INFO_KEY, set()).add(tenant_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    pending = session.info.pop(_DIRTY_INFO_KEY, None)
+    if not pending:
+        return
+    cache = get_tenant_cache()
+    for tenant_id in pending:
+        cache.invalidate_tenant(tenant_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session: Session) -> None:
+    session.info.pop(_DIRTY_INFO_KEY, None)
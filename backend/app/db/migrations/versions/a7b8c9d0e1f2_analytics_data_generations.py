@@ -0,0 +1,36 @@
+"""analytics data generations
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-18 18:00:00.000000
+
+``analytics_data_generations`` — a per (source, club) counter bumped with
+every revenue-rollup or court-utilisation snapshot write, so the analytics
+response cache can tell when a club's figures changed without re-reading them.
+Rows appear on a club's first write; a missing row reads as generation 0.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "a7b8c9d0e1f2"
+down_revision: Union[str, None] = "f6a7b8c9d0e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('analytics_data_generations',
+    sa.Column('source', sa.String(length=100), nullable=False),
+    sa.Column('club_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('generation', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('source', 'club_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('analytics_data_generations')
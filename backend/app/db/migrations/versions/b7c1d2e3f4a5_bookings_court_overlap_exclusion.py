@@ -0,0 +1,55 @@
+"""bookings court overlap exclusion constraint
+
+Revision ID: b7c1d2e3f4a5
+Revises: 8443a533d9d9
+Create Date: 2026-10-18 09:00:00.000000
+
+Enforces court double-booking prevention in the database: no two pending or
+confirmed bookings may overlap on the same court. Replaces the service-side
+SELECT-then-INSERT conflict check, which two concurrent requests could both
+pass.
+
+Pending bookings whose court hold has already lapsed but which overlap another
+blocking booking are cancelled first — the release sweep would free them anyway,
+and they would otherwise stop the constraint from being built.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "b7c1d2e3f4a5"
+down_revision: Union[str, None] = "8443a533d9d9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.execute(
+        """
+        UPDATE bookings AS lapsed
+        SET status = 'cancelled', hold_expires_at = NULL
+        WHERE lapsed.status = 'pending'
+          AND lapsed.hold_expires_at <= now()
+          AND EXISTS (
+              SELECT 1 FROM bookings AS other
+              WHERE other.id <> lapsed.id
+                AND other.court_id = lapsed.court_id
+                AND other.status IN ('pending', 'confirmed')
+                AND other.start_datetime < lapsed.end_datetime
+                AND other.end_datetime > lapsed.start_datetime
+          )
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE bookings
+        ADD CONSTRAINT ex_bookings_court_no_overlap
+        EXCLUDE USING gist (court_id WITH =, tstzrange(start_datetime, end_datetime) WITH &&)
+        WHERE (status IN ('pending', 'confirmed'))
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE bookings DROP CONSTRAINT ex_bookings_court_no_overlap")
@@ -0,0 +1,73 @@
+"""court utilisation rollups
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-18 19:00:00.000000
+
+Weekly and monthly rollups of ``court_utilisation_snapshots`` so long-range
+courts / heatmap reports read whole periods instead of raw rows (see
+``app/analytics/services/utilisation_rollups.py``):
+
+  1. ``court_utilisation_week_hours`` — (club, ISO week, dow, hour) sums of
+     the hourly rows across courts.
+  2. ``court_utilisation_court_months`` — (club, month, court) sums of the
+     daily-rollup rows.
+
+Both are backfilled from the existing snapshots; from then on the snapshot
+worker rebuilds the affected weeks and months with each write.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "b8c9d0e1f2a3"
+down_revision: Union[str, None] = "a7b8c9d0e1f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('court_utilisation_week_hours',
+    sa.Column('club_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('week_start', sa.Date(), nullable=False),
+    sa.Column('day_of_week', sa.SmallInteger(), nullable=False),
+    sa.Column('hour_of_day', sa.SmallInteger(), nullable=False),
+    sa.Column('total_slots', sa.Integer(), nullable=False),
+    sa.Column('booked_slots', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('club_id', 'week_start', 'day_of_week', 'hour_of_day')
+    )
+    op.create_table('court_utilisation_court_months',
+    sa.Column('club_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('month_start', sa.Date(), nullable=False),
+    sa.Column('court_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('total_slots', sa.Integer(), nullable=False),
+    sa.Column('booked_slots', sa.Integer(), nullable=False),
+    sa.Column('revenue_actual', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('revenue_potential', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.PrimaryKeyConstraint('club_id', 'month_start', 'court_id')
+    )
+
+    op.execute(
+        "INSERT INTO court_utilisation_week_hours "
+        "(club_id, week_start, day_of_week, hour_of_day, total_slots, booked_slots) "
+        "SELECT club_id, date_trunc('week', snapshot_date::timestamp)::date, day_of_week, hour_of_day, "
+        "sum(total_slots), sum(booked_slots) "
+        "FROM court_utilisation_snapshots WHERE hour_of_day IS NOT NULL "
+        "GROUP BY 1, 2, 3, 4"
+    )
+    op.execute(
+        "INSERT INTO court_utilisation_court_months "
+        "(club_id, month_start, court_id, total_slots, booked_slots, revenue_actual, revenue_potential) "
+        "SELECT club_id, date_trunc('month', snapshot_date::timestamp)::date, court_id, "
+        "sum(total_slots), sum(booked_slots), sum(revenue_actual), sum(revenue_potential) "
+        "FROM court_utilisation_snapshots WHERE hour_of_day IS NULL "
+        "GROUP BY 1, 2, 3"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('court_utilisation_court_months')
+    op.drop_table('court_utilisation_week_hours')
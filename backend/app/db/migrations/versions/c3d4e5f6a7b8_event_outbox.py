@@ -0,0 +1,44 @@
+"""event outbox
+
+Revision ID: c3d4e5f6a7b8
+Revises: b7c1d2e3f4a5
+Create Date: 2026-10-18 12:00:00.000000
+
+Transactional outbox for domain events. Services insert rows in the same
+transaction as the change they announce; the outbox relay worker publishes
+them to Pub/Sub and stamps ``sent_at``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "c3d4e5f6a7b8"
+down_revision: Union[str, None] = "b7c1d2e3f4a5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('event_outbox',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('topic', sa.String(length=255), nullable=False),
+    sa.Column('event_type', sa.String(length=100), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('ordering_key', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_event_outbox_pending', 'event_outbox', ['id'], unique=False, postgresql_where=sa.text('sent_at IS NULL'))
+    op.create_index('ix_event_outbox_sent_at', 'event_outbox', ['sent_at'], unique=False, postgresql_where=sa.text('sent_at IS NOT NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_event_outbox_sent_at', table_name='event_outbox', postgresql_where=sa.text('sent_at IS NOT NULL'))
+    op.drop_index('ix_event_outbox_pending', table_name='event_outbox', postgresql_where=sa.text('sent_at IS NULL'))
+    op.drop_table('event_outbox')
@@ -0,0 +1,37 @@
+"""membership plan active_member_count
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-18 20:00:00.000000
+
+Adds ``membership_plans.active_member_count`` — the number of active/trialing
+subscriptions on the plan — and back-fills it from ``membership_subscriptions``.
+``MembershipService`` keeps it current so the capacity check is a single
+conditional UPDATE instead of loading every subscription on the plan.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "c9d0e1f2a3b4"
+down_revision: Union[str, None] = "b8c9d0e1f2a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'membership_plans',
+        sa.Column('active_member_count', sa.Integer(), server_default='0', nullable=False),
+    )
+    op.execute(
+        "UPDATE membership_plans p SET active_member_count = ("
+        "SELECT count(*) FROM membership_subscriptions s "
+        "WHERE s.plan_id = p.id AND s.status IN ('active', 'trialing'))"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('membership_plans', 'active_member_count')
@@ -0,0 +1,48 @@
+"""stripe events
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-18 21:00:00.000000
+
+Inbox for Stripe webhooks. The webhook endpoint inserts each verified event
+keyed by its Stripe event id (redeliveries conflict and are dropped) and
+acknowledges immediately; the Stripe event worker runs the handlers and
+stamps ``processed_at``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "d0e1f2a3b4c5"
+down_revision: Union[str, None] = "c9d0e1f2a3b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('stripe_events',
+    sa.Column('id', sa.String(length=255), nullable=False),
+    sa.Column('seq', sa.BigInteger(), sa.Identity(), nullable=False),
+    sa.Column('event_type', sa.String(length=100), nullable=False),
+    sa.Column('ordering_key', sa.String(length=255), nullable=True),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('received_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('available_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('dead_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('seq')
+    )
+    op.create_index('ix_stripe_events_pending', 'stripe_events', ['seq'], unique=False, postgresql_where=sa.text('processed_at IS NULL AND dead_at IS NULL'))
+    op.create_index('ix_stripe_events_processed_at', 'stripe_events', ['processed_at'], unique=False, postgresql_where=sa.text('processed_at IS NOT NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stripe_events_processed_at', table_name='stripe_events', postgresql_where=sa.text('processed_at IS NOT NULL'))
+    op.drop_index('ix_stripe_events_pending', table_name='stripe_events', postgresql_where=sa.text('processed_at IS NULL AND dead_at IS NULL'))
+    op.drop_table('stripe_events')
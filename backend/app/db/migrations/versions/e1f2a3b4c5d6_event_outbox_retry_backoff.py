@@ -0,0 +1,38 @@
+"""event outbox retry backoff
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-10-18 22:00:00.000000
+
+Adds ``event_outbox.available_at`` (a failed row is not claimed again before
+it) and ``dead_at`` (set after ``OUTBOX_MAX_ATTEMPTS`` failures), and narrows
+``ix_event_outbox_pending`` to live rows, so a row that keeps failing backs
+off instead of heading every relay batch.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "e1f2a3b4c5d6"
+down_revision: Union[str, None] = "d0e1f2a3b4c5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'event_outbox',
+        sa.Column('available_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    )
+    op.add_column('event_outbox', sa.Column('dead_at', sa.DateTime(timezone=True), nullable=True))
+    op.drop_index('ix_event_outbox_pending', table_name='event_outbox', postgresql_where=sa.text('sent_at IS NULL'))
+    op.create_index('ix_event_outbox_pending', 'event_outbox', ['id'], unique=False, postgresql_where=sa.text('sent_at IS NULL AND dead_at IS NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_event_outbox_pending', table_name='event_outbox', postgresql_where=sa.text('sent_at IS NULL AND dead_at IS NULL'))
+    op.create_index('ix_event_outbox_pending', 'event_outbox', ['id'], unique=False, postgresql_where=sa.text('sent_at IS NULL'))
+    op.drop_column('event_outbox', 'dead_at')
+    op.drop_column('event_outbox', 'available_at')
@@ -0,0 +1,287 @@
+"""revenue rollups
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-18 16:00:00.000000
+
+Replaces the nightly-rebuilt mv_revenue_by_club_day_service / _cash
+materialized views with physical rollup tables of the same grain, maintained
+incrementally by app/analytics/services/revenue_rollups.py:
+
+  * revenue_payment_facts        -- each revenue-bearing payment's inputs as
+                                    last folded into the rollups
+  * revenue_by_club_day_service  -- same rows the views produced, bucketed by
+    revenue_by_club_day_cash        bookings.start_datetime / payments.created_at
+  * revenue_dirty_payments       -- queue of payments to re-apply, appended by
+                                    the triggers below in the writer's
+                                    transaction (append-only: writers never
+                                    contend on a shared row)
+
+Triggers queue a payment when its own revenue inputs change, when its
+booking's type or start moves, when an equipment rental attributed to it
+changes, or when its club's timezone changes. Indexes on payments.booking_id
+and equipment_rentals(booking_id, payment_id) keep those lookups and the
+per-payment equipment subquery off sequential scans.
+
+Facts and rollups are backfilled here from the same SQL the views used, so the
+tables are exact at deploy time; the views are then dropped. Downgrade
+recreates them from that SQL.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "e5f6a7b8c9d0"
+down_revision: Union[str, None] = "d4e5f6a7b8c9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_VIEWS = {
+    "mv_revenue_by_club_day_service": "service_date",
+    "mv_revenue_by_club_day_cash": "cash_date",
+}
+_ROLLUPS = {
+    "revenue_by_club_day_service": "service_date",
+    "revenue_by_club_day_cash": "cash_date",
+}
+
+# Frozen copy of the payment-level attribution (subtract-embedded equipment).
+_PAYMENT_FACTS_SQL = """
+SELECT
+    p.id                                              AS payment_id,
+    p.club_id                                         AS club_id,
+    p.currency                                        AS currency,
+    b.booking_type::text                              AS booking_type,
+    (b.start_datetime AT TIME ZONE c.timezone)::date  AS service_date,
+    (p.created_at AT TIME ZONE c.timezone)::date      AS cash_date,
+    p.amount                                          AS amount,
+    COALESCE(p.refund_amount, 0)                      AS refund_amount,
+    COALESCE((
+        SELECT SUM(er.charge)
+        FROM equipment_rentals er
+        WHERE er.payment_id = p.id
+           OR (er.payment_id IS NULL
+               AND er.booking_id = p.booking_id
+               AND er.user_id = p.user_id)
+    ), 0)                                             AS equipment_amount
+FROM payments p
+JOIN bookings b ON b.id = p.booking_id
+JOIN clubs    c ON c.id = p.club_id
+WHERE p.state IN ('succeeded', 'refunded', 'partially_refunded')
+"""
+
+_ROLLUP_SQL = """
+WITH facts AS ({facts})
+SELECT
+    club_id,
+    {date_column}                       AS revenue_date,
+    revenue_type,
+    currency,
+    SUM(gross_amount)::numeric(12, 2)   AS gross_amount,
+    SUM(refund_amount)::numeric(12, 2)  AS refund_amount,
+    SUM(net_amount)::numeric(12, 2)     AS net_amount,
+    SUM(transaction_count)::bigint      AS transaction_count
+FROM (
+    SELECT
+        club_id, {date_column}, booking_type AS revenue_type, currency,
+        GREATEST(amount - equipment_amount, 0)                  AS gross_amount,
+        refund_amount                                           AS refund_amount,
+        GREATEST(amount - equipment_amount, 0) - refund_amount  AS net_amount,
+        1                                                       AS transaction_count
+    FROM facts
+    UNION ALL
+    SELECT
+        club_id, {date_column}, 'equipment', currency,
+        equipment_amount, 0, equipment_amount, 1
+    FROM facts
+    WHERE equipment_amount > 0
+) typed
+GROUP BY club_id, {date_column}, revenue_type, currency
+"""
+
+_FACT_COLUMNS = (
+    "payment_id, club_id, currency, booking_type, service_date, cash_date, "
+    "amount, refund_amount, equipment_amount"
+)
+_ROLLUP_COLUMNS = (
+    "club_id, revenue_date, revenue_type, currency, "
+    "gross_amount, refund_amount, net_amount, transaction_count"
+)
+
+# Trigger DDL, one statement per entry (asyncpg runs one per execute).
+_TRIGGER_SQL = [
+    """
+CREATE OR REPLACE FUNCTION revenue_dirty_from_payment() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO revenue_dirty_payments (payment_id) VALUES (OLD.id);
+    ELSE
+        INSERT INTO revenue_dirty_payments (payment_id) VALUES (NEW.id);
+    END IF;
+    RETURN NULL;
+END
+$$
+""",
+    """
+CREATE TRIGGER trg_payments_revenue_dirty
+AFTER INSERT OR DELETE
+   OR UPDATE OF state, amount, refund_amount, currency, club_id, booking_id, user_id, created_at
+ON payments
+FOR EACH ROW EXECUTE FUNCTION revenue_dirty_from_payment()
+""",
+    """
+CREATE OR REPLACE FUNCTION revenue_dirty_from_booking() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO revenue_dirty_payments (payment_id)
+    SELECT id FROM payments WHERE booking_id = NEW.id;
+    RETURN NULL;
+END
+$$
+""",
+    """
+CREATE TRIGGER trg_bookings_revenue_dirty
+AFTER UPDATE OF booking_type, start_datetime ON bookings
+FOR EACH ROW
+WHEN (OLD.booking_type IS DISTINCT FROM NEW.booking_type
+      OR OLD.start_datetime IS DISTINCT FROM NEW.start_datetime)
+EXECUTE FUNCTION revenue_dirty_from_booking()
+""",
+    """
+CREATE OR REPLACE FUNCTION revenue_dirty_from_rental() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        INSERT INTO revenue_dirty_payments (payment_id)
+        SELECT p.id FROM payments p
+        WHERE p.id = OLD.payment_id
+           OR (OLD.payment_id IS NULL
+               AND p.booking_id = OLD.booking_id
+               AND p.user_id = OLD.user_id);
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        INSERT INTO revenue_dirty_payments (payment_id)
+        SELECT p.id FROM payments p
+        WHERE p.id = NEW.payment_id
+           OR (NEW.payment_id IS NULL
+               AND p.booking_id = NEW.booking_id
+               AND p.user_id = NEW.user_id);
+    END IF;
+    RETURN NULL;
+END
+$$
+""",
+    """
+CREATE TRIGGER trg_equipment_rentals_revenue_dirty
+AFTER INSERT OR DELETE OR UPDATE OF charge, payment_id, booking_id, user_id
+ON equipment_rentals
+FOR EACH ROW EXECUTE FUNCTION revenue_dirty_from_rental()
+""",
+    """
+CREATE OR REPLACE FUNCTION revenue_dirty_from_club() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO revenue_dirty_payments (payment_id)
+    SELECT id FROM payments WHERE club_id = NEW.id;
+    RETURN NULL;
+END
+$$
+""",
+    """
+CREATE TRIGGER trg_clubs_revenue_dirty
+AFTER UPDATE OF timezone ON clubs
+FOR EACH ROW
+WHEN (OLD.timezone IS DISTINCT FROM NEW.timezone)
+EXECUTE FUNCTION revenue_dirty_from_club()
+""",
+]
+
+_DROP_TRIGGER_SQL = [
+    "DROP TRIGGER IF EXISTS trg_clubs_revenue_dirty ON clubs",
+    "DROP TRIGGER IF EXISTS trg_equipment_rentals_revenue_dirty ON equipment_rentals",
+    "DROP TRIGGER IF EXISTS trg_bookings_revenue_dirty ON bookings",
+    "DROP TRIGGER IF EXISTS trg_payments_revenue_dirty ON payments",
+    "DROP FUNCTION IF EXISTS revenue_dirty_from_club()",
+    "DROP FUNCTION IF EXISTS revenue_dirty_from_rental()",
+    "DROP FUNCTION IF EXISTS revenue_dirty_from_booking()",
+    "DROP FUNCTION IF EXISTS revenue_dirty_from_payment()",
+]
+
+
+def _rollup_table(name: str) -> None:
+    op.create_table(name,
+    sa.Column('club_id', sa.UUID(), nullable=False),
+    sa.Column('revenue_date', sa.Date(), nullable=False),
+    sa.Column('revenue_type', sa.String(length=50), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('gross_amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('refund_amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('net_amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('transaction_count', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('club_id', 'revenue_date', 'revenue_type', 'currency')
+    )
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_payments_booking_id'), 'payments', ['booking_id'], unique=False)
+    op.create_index(op.f('ix_equipment_rentals_booking_id'), 'equipment_rentals', ['booking_id'], unique=False)
+    op.create_index(op.f('ix_equipment_rentals_payment_id'), 'equipment_rentals', ['payment_id'], unique=False)
+
+    op.create_table('revenue_payment_facts',
+    sa.Column('payment_id', sa.UUID(), nullable=False),
+    sa.Column('club_id', sa.UUID(), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('booking_type', sa.String(length=50), nullable=False),
+    sa.Column('service_date', sa.Date(), nullable=False),
+    sa.Column('cash_date', sa.Date(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('refund_amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('equipment_amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.PrimaryKeyConstraint('payment_id')
+    )
+    op.create_index('ix_revenue_payment_facts_club', 'revenue_payment_facts', ['club_id'], unique=False)
+    for name in _ROLLUPS:
+        _rollup_table(name)
+    op.create_table('revenue_dirty_payments',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('payment_id', sa.UUID(), nullable=False),
+    sa.Column('queued_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    # Triggers first, then backfill, in one transaction: a payment written
+    # after this commits is queued; one written before is in the backfill.
+    for statement in _TRIGGER_SQL:
+        op.execute(statement)
+    op.execute(f"INSERT INTO revenue_payment_facts ({_FACT_COLUMNS}) {_PAYMENT_FACTS_SQL}")
+    for name, date_column in _ROLLUPS.items():
+        rollup_sql = _ROLLUP_SQL.format(facts="SELECT * FROM revenue_payment_facts", date_column=date_column)
+        op.execute(f"INSERT INTO {name} ({_ROLLUP_COLUMNS}) {rollup_sql}")
+
+    for view_name in _VIEWS:
+        op.execute(f"DROP MATERIALIZED VIEW IF EXISTS {view_name}")
+
+
+def downgrade() -> None:
+    for view_name, date_column in _VIEWS.items():
+        view_sql = _ROLLUP_SQL.format(facts=_PAYMENT_FACTS_SQL, date_column=date_column)
+        op.execute(f"CREATE MATERIALIZED VIEW {view_name} AS {view_sql}")
+        op.execute(
+            f"CREATE UNIQUE INDEX ix_{view_name}_key "
+            f"ON {view_name} (club_id, revenue_date, revenue_type, currency)"
+        )
+
+    for statement in _DROP_TRIGGER_SQL:
+        op.execute(statement)
+    op.drop_table('revenue_dirty_payments')
+    for name in _ROLLUPS:
+        op.drop_table(name)
+    op.drop_index('ix_revenue_payment_facts_club', table_name='revenue_payment_facts')
+    op.drop_table('revenue_payment_facts')
+    op.drop_index(op.f('ix_equipment_rentals_payment_id'), table_name='equipment_rentals')
+    op.drop_index(op.f('ix_equipment_rentals_booking_id'), table_name='equipment_rentals')
+    op.drop_index(op.f('ix_payments_booking_id'), table_name='payments')
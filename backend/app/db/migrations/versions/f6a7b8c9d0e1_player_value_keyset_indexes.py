@@ -0,0 +1,42 @@
+"""player value keyset indexes
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-18 17:00:00.000000
+
+One index per player-value leaderboard ordering, matching the ORDER BY the
+service emits (sort key with its NULLS placement, then ``user_id``), so a
+keyset page seeks straight to ``(club_id, last value, last user)`` and reads
+``limit`` index entries instead of sorting the club's players. The coach view
+is a few rows per club and is left to sort in memory.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "f6a7b8c9d0e1"
+down_revision: Union[str, None] = "e5f6a7b8c9d0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_INDEXES = {
+    "ix_mv_player_value_spend": "club_id, lifetime_spend DESC, user_id",
+    "ix_mv_player_value_bookings": "club_id, bookings_played DESC, user_id",
+    "ix_mv_player_value_last_played": "club_id, last_played_at DESC NULLS LAST, user_id",
+    "ix_mv_player_value_30d": "club_id, played_last_30d DESC, user_id",
+    "ix_mv_player_value_90d": "club_id, played_last_90d DESC, user_id",
+    # Inactive members: never-played first, then longest gone.
+    "ix_mv_player_value_idle": "club_id, last_played_at ASC NULLS FIRST, user_id",
+}
+
+
+def upgrade() -> None:
+    for index_name, columns in _INDEXES.items():
+        op.execute(f"CREATE INDEX {index_name} ON mv_player_value ({columns})")
+
+
+def downgrade() -> None:
+    for index_name in _INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
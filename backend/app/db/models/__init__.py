@@ -13,6 +13,8 @@ from .wallet import Wallet, WalletTransaction, WalletTransactionSource, WalletCl
 from .payment import Payment, PlatformFee, Payout, PayoutStatus, PayoutReconStatus
 from .membership import MembershipPlan, MembershipSubscription, MembershipCreditLog
 from .discount import PromoCode, PromoDiscountType, PromoAppliesTo
+from .outbox import EventOutbox
+from .stripe_event import StripeEvent
 from .support import (
     Announcement,
     SupportTicket,
@@ -39,6 +41,8 @@ __all__ = [
     "Payment", "PlatformFee", "Payout", "PayoutStatus", "PayoutReconStatus",
     "MembershipPlan", "MembershipSubscription", "MembershipCreditLog",
     "PromoCode", "PromoDiscountType", "PromoAppliesTo",
+    "EventOutbox",
+    "StripeEvent",
     "Announcement", "SupportTicket", "SupportMessage",
     "SupportTicketStatus", "SupportTicketPriority", "SupportHandledBy", "MessageSenderType",
 ]
@@ -1,6 +1,7 @@
 import enum
 
 from sqlalchemy import (
+    BigInteger,
     Column,
     Date,
     DateTime,
@@ -57,9 +58,48 @@ class CourtUtilisationSnapshot(Base, UUIDMixin):
     court = relationship("Court")
 
 
+class CourtUtilisationWeekHour(Base):
+    """Heatmap rollup: hourly snapshots per (club, ISO week, day-of-week, hour),
+    summed across the club's courts.
+
+    Derived data, rebuilt per club and week by
+    ``app/analytics/services/utilisation_rollups.py`` whenever the snapshot
+    worker changes that week's rows. Sums only — percentages are recomputed
+    by the reader.
+    """
+
+    __tablename__ = "court_utilisation_week_hours"
+
+    club_id = Column(UUID(as_uuid=True), primary_key=True)
+    week_start = Column(Date, primary_key=True)  # ISO Monday
+    day_of_week = Column(SmallInteger, primary_key=True)  # 0=Mon … 6=Sun
+    hour_of_day = Column(SmallInteger, primary_key=True)
+    total_slots = Column(Integer, nullable=False)
+    booked_slots = Column(Integer, nullable=False)
+
+
+class CourtUtilisationCourtMonth(Base):
+    """Courts-report rollup: daily-rollup snapshots per (club, month, court).
+
+    Maintained alongside ``CourtUtilisationWeekHour``; see
+    ``app/analytics/services/utilisation_rollups.py``.
+    """
+
+    __tablename__ = "court_utilisation_court_months"
+
+    club_id = Column(UUID(as_uuid=True), primary_key=True)
+    month_start = Column(Date, primary_key=True)
+    court_id = Column(UUID(as_uuid=True), primary_key=True)
+    total_slots = Column(Integer, nullable=False)
+    booked_slots = Column(Integer, nullable=False)
+    revenue_actual = Column(Numeric(12, 2), nullable=False)
+    revenue_potential = Column(Numeric(12, 2), nullable=False)
+
+
 class RefreshStatus(str, enum.Enum):
     success = "success"
     failed = "failed"
+    skipped = "skipped"  # sources unchanged since the last successful refresh
 
 
 class AnalyticsRefreshLog(Base, UUIDMixin):
@@ -83,7 +123,114 @@ class AnalyticsRefreshLog(Base, UUIDMixin):
     started_at = Column(DateTime(timezone=True), nullable=False)
     completed_at = Column(DateTime(timezone=True), nullable=True)
     duration_ms = Column(Integer, nullable=True)
-    row_count = Column(Integer, nullable=True)  # rows in the view after refresh
+    row_count = Column(Integer, nullable=True)  # pg_class.reltuples after refresh + ANALYZE
     error = Column(Text, nullable=True)  # exception text on failure
     triggered_by = Column(String(50), nullable=True)  # event_type / "manual"
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class AnalyticsRefreshWatermark(Base):
+    """Per-source change counters a materialized view was last refreshed at.
+
+    One row per (view, source relation), upserted by
+    ``app/analytics/workers/refresh_views.py`` after each successful refresh.
+    ``change_count`` is the source's cumulative ``n_tup_ins + n_tup_upd +
+    n_tup_del`` from ``pg_stat_user_tables``, read just before the refresh
+    began. While every source still reports the same count the view's inputs
+    are unchanged and the worker skips it. Sources are tables or, for views
+    built on another view, the upstream materialized view itself.
+    """
+
+    __tablename__ = "analytics_refresh_watermarks"
+
+    view_name = Column(String(100), primary_key=True)
+    source_table = Column(String(100), primary_key=True)
+    change_count = Column(BigInteger, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class AnalyticsDataGeneration(Base):
+    """Per-club change counter for analytics data written outside a view refresh.
+
+    ``generation`` is bumped in the same transaction as the writes it covers —
+    revenue rollup applies and rebuilds, court-utilisation snapshot swaps that
+    changed rows — so it replicates with them and a read replica never sees
+    the new generation without the new data. The API's response cache keys on
+    it (materialized views use ``analytics_refresh_log`` instead). See
+    ``app/analytics/services/generations.py``.
+    """
+
+    __tablename__ = "analytics_data_generations"
+
+    source = Column(String(100), primary_key=True)
+    club_id = Column(UUID(as_uuid=True), primary_key=True)
+    generation = Column(BigInteger, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class RevenuePaymentFact(Base):
+    """One revenue-bearing payment as last folded into the revenue rollups.
+
+    Maintained by ``app/analytics/services/revenue_rollups.py``. Holds the
+    inputs the rollups were built from — both bucket dates, booking type and
+    the subtract-embedded equipment portion — so a changed payment is applied
+    as (new fact − stored fact) without rescanning history. Payments outside
+    ``succeeded``/``refunded``/``partially_refunded`` have no row. No FK to
+    ``payments``: a deleted payment's fact is what gets subtracted.
+    """
+
+    __tablename__ = "revenue_payment_facts"
+    __table_args__ = (Index("ix_revenue_payment_facts_club", "club_id"),)
+
+    payment_id = Column(UUID(as_uuid=True), primary_key=True)
+    club_id = Column(UUID(as_uuid=True), nullable=False)
+    currency = Column(String(3), nullable=False)
+    booking_type = Column(String(50), nullable=False)
+    service_date = Column(Date, nullable=False)  # club-local bookings.start_datetime
+    cash_date = Column(Date, nullable=False)  # club-local payments.created_at
+    amount = Column(Numeric(10, 2), nullable=False)
+    refund_amount = Column(Numeric(10, 2), nullable=False)
+    equipment_amount = Column(Numeric(10, 2), nullable=False)
+
+
+class _RevenueByClubDay:
+    """Revenue per (club, club-local day, revenue_type, currency) — the grain
+    of the former ``mv_revenue_by_club_day_*`` materialized views, kept
+    current incrementally instead of rebuilt nightly."""
+
+    club_id = Column(UUID(as_uuid=True), primary_key=True)
+    revenue_date = Column(Date, primary_key=True)
+    revenue_type = Column(String(50), primary_key=True)
+    currency = Column(String(3), primary_key=True)
+    gross_amount = Column(Numeric(12, 2), nullable=False)
+    refund_amount = Column(Numeric(12, 2), nullable=False)
+    net_amount = Column(Numeric(12, 2), nullable=False)
+    transaction_count = Column(BigInteger, nullable=False)
+
+
+class RevenueByClubDayService(_RevenueByClubDay, Base):
+    """Service basis: bucketed by ``bookings.start_datetime``."""
+
+    __tablename__ = "revenue_by_club_day_service"
+
+
+class RevenueByClubDayCash(_RevenueByClubDay, Base):
+    """Cash basis: bucketed by ``payments.created_at``."""
+
+    __tablename__ = "revenue_by_club_day_cash"
+
+
+class RevenueDirtyPayment(Base):
+    """Queue of payments whose revenue contribution may have changed.
+
+    Filled by database triggers on ``payments``, ``bookings``,
+    ``equipment_rentals`` and ``clubs`` (see migration ``e5f6a7b8c9d0``), so
+    every writer is covered. Append-only — a payment may be queued many times;
+    the rollup applier claims rows oldest-first and deduplicates.
+    """
+
+    __tablename__ = "revenue_dirty_payments"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    payment_id = Column(UUID(as_uuid=True), nullable=False)
+    queued_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -1,6 +1,6 @@
 import enum
-from sqlalchemy import Column, String, Integer, ForeignKey, Numeric, Text, Boolean, Enum, DateTime, Date, Time, Index, UniqueConstraint, text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import DDL, Column, String, Integer, ForeignKey, Numeric, Text, Boolean, Enum, DateTime, Date, Time, Index, UniqueConstraint, event, text
+from sqlalchemy.dialects.postgresql import UUID, ExcludeConstraint
 from sqlalchemy.orm import relationship
 from .base import Base, UUIDMixin, TimestampMixin
 
@@ -53,9 +53,22 @@ class DiscountSource(str, enum.Enum):
     ai_gap_offer = "ai_gap_offer"
 
 
+# No two blocking (pending/confirmed) bookings may overlap on the same court.
+# A pending booking whose court hold has lapsed still blocks here until it is
+# released — see app/services/court_claims.py.
+COURT_OVERLAP_CONSTRAINT = "ex_bookings_court_no_overlap"
+
+
 class Booking(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "bookings"
     __table_args__ = (
+        ExcludeConstraint(
+            ("court_id", "="),
+            (text("tstzrange(start_datetime, end_datetime)"), "&&"),
+            name=COURT_OVERLAP_CONSTRAINT,
+            using="gist",
+            where=text("status IN ('pending', 'confirmed')"),
+        ),
         Index("ix_bookings_court_window", "court_id", "start_datetime", "end_datetime"),
         Index("ix_bookings_club_status", "club_id", "status"),
         Index("ix_bookings_club_start", "club_id", "start_datetime"),
@@ -98,6 +111,14 @@ class Booking(Base, UUIDMixin, TimestampMixin):
     payments = relationship("Payment", back_populates="booking")
 
 
+# The gist exclusion constraint needs btree_gist for the uuid equality operator.
+event.listen(
+    Booking.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
+
+
 class BookingPlayer(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "booking_players"
     __table_args__ = (
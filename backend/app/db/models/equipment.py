@@ -39,7 +39,7 @@ class EquipmentInventory(Base, UUIDMixin, TimestampMixin):
 class EquipmentRental(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "equipment_rentals"
 
-    booking_id = Column(UUID(as_uuid=True), ForeignKey("bookings.id"), nullable=False)
+    booking_id = Column(UUID(as_uuid=True), ForeignKey("bookings.id"), nullable=False, index=True)
     equipment_id = Column(UUID(as_uuid=True), ForeignKey("equipment_inventory.id"), nullable=False)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     quantity = Column(Integer, nullable=False)
@@ -48,7 +48,7 @@ class EquipmentRental(Base, UUIDMixin, TimestampMixin):
     damage_notes = Column(Text, nullable=True)
     returned_at = Column(DateTime(timezone=True), nullable=True)
     payment_status = Column(Enum(PaymentStatus), nullable=True)
-    payment_id = Column(UUID(as_uuid=True), ForeignKey("payments.id"), nullable=True)
+    payment_id = Column(UUID(as_uuid=True), ForeignKey("payments.id"), nullable=True, index=True)
     damage_charge = Column(Numeric(10, 2), nullable=True)
 
     booking = relationship("Booking", back_populates="equipment_rentals")
@@ -55,6 +55,11 @@ class MembershipPlan(Base, UUIDMixin, TimestampMixin):
 
     # Capacity cap
     max_active_members = Column(Integer, nullable=True)           # NULL = unlimited
+    # Active + trialing subscriptions on this plan. Maintained by
+    # MembershipService with atomic UPDATEs and re-counted by the nightly
+    # membership reconciliation; the capacity check reads it instead of
+    # counting subscriptions.
+    active_member_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Free "basic" plan auto-assigned to a player on email verification.
     # Exactly one per club enforced by uq_membership_plans_one_default_per_club.
@@ -0,0 +1,33 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, Text, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from .base import Base
+
+
+class EventOutbox(Base):
+    """A domain event waiting to be published to Pub/Sub (transactional outbox).
+
+    Services add the row in the same transaction as the change it announces,
+    so the event exists exactly when the change commits. The outbox relay
+    worker (``app/workers/outbox_relay_worker.py``) publishes pending rows and
+    stamps ``sent_at``; delivery is at-least-once. The bigint ``id`` is the
+    publish order, and rows sharing an ``ordering_key`` are delivered in it.
+    A failed row is retried from ``available_at`` with exponential backoff and
+    given up (``dead_at``) after ``OUTBOX_MAX_ATTEMPTS``.
+    """
+    __tablename__ = "event_outbox"
+    __table_args__ = (
+        Index("ix_event_outbox_pending", "id", postgresql_where=text("sent_at IS NULL AND dead_at IS NULL")),
+        Index("ix_event_outbox_sent_at", "sent_at", postgresql_where=text("sent_at IS NOT NULL")),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    topic = Column(String(255), nullable=False)
+    event_type = Column(String(100), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    ordering_key = Column(String(255), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    available_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    dead_at = Column(DateTime(timezone=True), nullable=True)    # gave up after OUTBOX_MAX_ATTEMPTS
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    last_error = Column(Text, nullable=True)
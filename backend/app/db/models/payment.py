@@ -51,7 +51,7 @@ class PayoutReconStatus(str, enum.Enum):
 class Payment(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "payments"
 
-    booking_id = Column(UUID(as_uuid=True), ForeignKey("bookings.id"), nullable=False)
+    booking_id = Column(UUID(as_uuid=True), ForeignKey("bookings.id"), nullable=False, index=True)
     club_id = Column(UUID(as_uuid=True), ForeignKey("clubs.id"), nullable=False)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     stripe_payment_intent_id = Column(String(255), nullable=True)
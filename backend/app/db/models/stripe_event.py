@@ -0,0 +1,37 @@
+from sqlalchemy import BigInteger, Column, DateTime, Identity, Index, Integer, String, Text, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from .base import Base
+
+
+class StripeEvent(Base):
+    """A verified Stripe webhook event waiting to be processed (inbox).
+
+    The webhook endpoint inserts the raw event keyed by Stripe's event id —
+    a redelivery conflicts on the key and is dropped — and acknowledges at
+    once. The Stripe event worker (``app/workers/stripe_event_worker.py``)
+    runs the handlers and stamps ``processed_at`` in the handler's own
+    transaction. ``seq`` is the arrival order; events sharing an
+    ``ordering_key`` (the Stripe object they concern) are processed in it.
+    ``available_at`` is both the claim lease and the retry backoff.
+    """
+    __tablename__ = "stripe_events"
+    __table_args__ = (
+        Index(
+            "ix_stripe_events_pending",
+            "seq",
+            postgresql_where=text("processed_at IS NULL AND dead_at IS NULL"),
+        ),
+        Index("ix_stripe_events_processed_at", "processed_at", postgresql_where=text("processed_at IS NOT NULL")),
+    )
+
+    id = Column(String(255), primary_key=True)                 # Stripe event id (evt_...)
+    seq = Column(BigInteger, Identity(), nullable=False, unique=True)
+    event_type = Column(String(100), nullable=False)
+    ordering_key = Column(String(255), nullable=True)
+    payload = Column(JSONB, nullable=False)
+    received_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    available_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+    dead_at = Column(DateTime(timezone=True), nullable=True)    # gave up after STRIPE_EVENT_MAX_ATTEMPTS
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    last_error = Column(Text, nullable=True)
@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.router import api_router
 from app.core.config import get_settings
+from app.core.pubsub import pubsub_lifespan
 from app.middleware.tenant import TenantMiddleware
 
 settings = get_settings()
@@ -10,6 +11,7 @@ app = FastAPI(
     title=settings.APP_NAME,
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
     docs_url=f"{settings.API_V1_PREFIX}/docs",
+    lifespan=pubsub_lifespan,
 )
 
 # Starlette processes middleware in reverse-registration order (last added = outermost).
@@ -20,13 +20,16 @@ either. When a match is found, ``request.state.tenant_portal`` is set to
 that builds confirmation-email URLs) can pick the right host. UUID-based
 resolution and custom-domain resolution leave ``tenant_portal`` as ``None``.
 
+Resolutions (including misses) are cached in-process — see
+``app.core.tenant_cache`` — so most requests never open a session here.
+
 If no tenant can be resolved the middleware lets the request through
 unchanged.  This keeps auth endpoints (which look up the tenant from the
 request body) working unchanged, and allows the ``get_tenant`` dependency
 to raise a clean 422 if a particular endpoint actually requires a tenant.
 """
 
-from typing import Literal, Optional, Tuple
+from typing import Awaitable, Callable, Literal, Optional, Tuple
 from uuid import UUID
 
 from sqlalchemy import select
@@ -35,10 +38,12 @@ from starlette.requests import Request
 from starlette.responses import JSONResponse
 
 from app.core.context import current_tenant_id
+from app.core.tenant_cache import CacheKey, get_tenant_cache
 from app.db.models.tenant import Tenant
 from app.db.session import AsyncSessionLocal
 
 TenantPortal = Literal["player", "staff"]
+_Resolution = Tuple[Optional[Tenant], Optional[TenantPortal]]
 
 _SMASHBOOK_DOMAIN = "smashbook.app"
 _LOCAL_HOSTS = {"localhost", "127.0.0.1", ""}
@@ -80,20 +85,21 @@ class TenantMiddleware(BaseHTTPMiddleware):
 # ---------------------------------------------------------------------------
 
 
-async def _resolve_tenant(request: Request) -> Tuple[Optional[Tenant], Optional[TenantPortal]]:
+async def _resolve_tenant(request: Request) -> _Resolution:
     # 1. Explicit UUID header — portal is unknown for this resolution mode.
     raw_id = request.headers.get("X-Tenant-ID")
     if raw_id:
         try:
             tid = UUID(raw_id)
-            return await _fetch_by_id(tid), None
         except ValueError:
             pass  # malformed header — fall through to next strategy
+        else:
+            return await _cached(("id", tid), lambda: _without_portal(_fetch_by_id(tid)))
 
     # 2. Subdomain header (handy for API clients / local dev)
     subdomain_header = request.headers.get("X-Tenant-Subdomain", "").strip().lower()
     if subdomain_header:
-        return await _fetch_by_subdomain(subdomain_header)
+        return await _cached(("subdomain", subdomain_header), lambda: _fetch_by_subdomain(subdomain_header))
 
     # 3. Host-based resolution
     host = request.headers.get("host", "").split(":")[0].lower()
@@ -102,15 +108,30 @@ async def _resolve_tenant(request: Request) -> Tuple[Optional[Tenant], Optional[
         # e.g.  "raquetclub.smashbook.app"
         subdomain = host[: -(len(_SMASHBOOK_DOMAIN) + 1)]
         if subdomain:
-            return await _fetch_by_subdomain(subdomain)
+            return await _cached(("subdomain", subdomain), lambda: _fetch_by_subdomain(subdomain))
 
     elif host not in _LOCAL_HOSTS and not host.endswith(_SMASHBOOK_DOMAIN):
         # Not a local address and not the bare platform domain — treat as custom domain
-        return await _fetch_by_custom_domain(host), None
+        return await _cached(("domain", host), lambda: _without_portal(_fetch_by_custom_domain(host)))
 
     return None, None
 
 
+async def _cached(key: CacheKey, fetch: Callable[[], Awaitable[_Resolution]]) -> _Resolution:
+    cache = get_tenant_cache()
+    hit = cache.get(key)
+    if hit is not None:
+        return hit.tenant, hit.portal
+    generation = cache.generation
+    tenant, portal = await fetch()
+    cache.put(key, tenant, portal, generation)
+    return tenant, portal
+
+
+async def _without_portal(lookup: Awaitable[Optional[Tenant]]) -> _Resolution:
+    return await lookup, None
+
+
 async def _fetch_by_id(tenant_id: UUID) -> Optional[Tenant]:
     async with AsyncSessionLocal() as session:
         return await session.get(Tenant, tenant_id)
@@ -0,0 +1,509 @@
+"""
+Per-club-day occupancy cache for court availability.
+
+``CourtService.get_availability`` spends most of its time loading bookings,
+reservations and operating hours and working out which court is free in which
+slot. None of that depends on the requesting user or the current time, so it
+is computed once per (club, club-local date) into a ``DayOccupancy``:
+
+  * the day's slot grid (operating-hours window + slot length),
+  * a ``blocked`` bitmap — one bit per (slot, court) covered by a reservation,
+  * a ``booked`` bitmap — one bit per (slot, court) covered by a booking,
+  * open-game markers for booked bits whose booking is a self-joinable game,
+    carrying just enough to apply the per-user join filters.
+
+Everything user- or clock-dependent (notice/advance cutoffs, skill filter,
+"already in this game", pricing) is overlaid per request.
+
+Backends
+--------
+``LocalLRUBackend`` (default) keeps entries in-process. Set
+``AVAILABILITY_CACHE_REDIS_URL`` to share entries across instances through any
+``redis.asyncio``-compatible server. ``AVAILABILITY_CACHE_TTL_SECONDS = 0``
+disables the cache entirely.
+
+Invalidation
+------------
+Writers call ``mark_availability_dirty`` / ``mark_club_availability_dirty`` on
+their session; the touched keys are invalidated after that session commits
+(and dropped on rollback). A miss that loaded before such a commit must not be
+stored afterwards, or it would re-cache the pre-commit state:
+
+  * In-process, invalidations are remembered for one TTL and entries whose
+    ``built_at`` predates them are not stored.
+  * With Redis, an invalidation also bumps a version per club-day (or per club)
+    and readers take ``stamp_days`` before loading a miss; ``put_days`` stores
+    an entry only if its versions are unchanged, checked and written in one
+    server-side script, so a write on any instance wins.
+
+Across instances with the local backend, a write is only visible once the
+other instance's entry expires — the TTL bounds that staleness. Availability
+is advisory either way: the bookings overlap constraint arbitrates every claim.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date as DateType, datetime, timedelta
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Iterable, Optional, Protocol
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+
+_KEY_PREFIX = "availability"
+# Version counters live outside ``_KEY_PREFIX`` so prefix deletes leave them.
+_VERSION_PREFIX = "v:"
+_DIRTY_INFO_KEY = "availability_cache_dirty"
+
+
+# ---------------------------------------------------------------------------
+# Cached value
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class OpenGameMarker:
+    booking_id: UUID
+    court_id: UUID
+    max_players: int
+    accepted_count: int
+    active_user_ids: frozenset[UUID]    # players who have not declined
+    min_skill_level: Optional[Decimal]
+    max_skill_level: Optional[Decimal]
+    total_price: Optional[Decimal]
+
+
+@dataclass(frozen=True)
+class DayOccupancy:
+    """Occupancy of every active court on one club-local date.
+
+    ``window_open``/``window_close`` are the unclamped operating-hours window
+    as true-UTC instants (``None`` when the club is closed). Bit
+    ``slot_index * len(court_ids) + court_position`` is set in ``blocked`` /
+    ``booked`` when that court is reserved / booked in that slot.
+    """
+
+    club_id: UUID
+    day: DateType
+    slot_minutes: int
+    window_open: Optional[datetime]
+    window_close: Optional[datetime]
+    court_ids: tuple[UUID, ...]
+    blocked: int = 0
+    booked: int = 0
+    open_games: dict[int, OpenGameMarker] = field(default_factory=dict)
+    built_at: float = 0.0
+
+    @property
+    def slot_count(self) -> int:
+        if self.window_open is None or self.window_close is None:
+            return 0
+        return max(0, (self.window_close - self.window_open) // timedelta(minutes=self.slot_minutes))
+
+    def bit(self, slot_index: int, court_position: int) -> int:
+        return slot_index * len(self.court_ids) + court_position
+
+    def is_blocked(self, bit: int) -> bool:
+        return bool(self.blocked >> bit & 1)
+
+    def is_booked(self, bit: int) -> bool:
+        return bool(self.booked >> bit & 1)
+
+    def serves(self, court_ids: Iterable[UUID], slot_minutes: int) -> bool:
+        """True when this entry covers every requested court on the same grid."""
+        return slot_minutes == self.slot_minutes and set(court_ids) <= set(self.court_ids)
+
+    # -- wire format for shared backends ------------------------------------
+
+    def to_bytes(self) -> bytes:
+        return json.dumps({
+            "club_id": str(self.club_id),
+            "day": self.day.isoformat(),
+            "slot_minutes": self.slot_minutes,
+            "window_open": self.window_open.isoformat() if self.window_open else None,
+            "window_close": self.window_close.isoformat() if self.window_close else None,
+            "court_ids": [str(c) for c in self.court_ids],
+            "blocked": format(self.blocked, "x"),
+            "booked": format(self.booked, "x"),
+            "open_games": {
+                str(bit): {
+                    "booking_id": str(g.booking_id),
+                    "court_id": str(g.court_id),
+                    "max_players": g.max_players,
+                    "accepted_count": g.accepted_count,
+                    "active_user_ids": [str(u) for u in g.active_user_ids],
+                    "min_skill_level": _dec_out(g.min_skill_level),
+                    "max_skill_level": _dec_out(g.max_skill_level),
+                    "total_price": _dec_out(g.total_price),
+                }
+                for bit, g in self.open_games.items()
+            },
+            "built_at": self.built_at,
+        }).encode("utf-8")
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "DayOccupancy":
+        data = json.loads(raw)
+        return cls(
+            club_id=UUID(data["club_id"]),
+            day=DateType.fromisoformat(data["day"]),
+            slot_minutes=data["slot_minutes"],
+            window_open=datetime.fromisoformat(data["window_open"]) if data["window_open"] else None,
+            window_close=datetime.fromisoformat(data["window_close"]) if data["window_close"] else None,
+            court_ids=tuple(UUID(c) for c in data["court_ids"]),
+            blocked=int(data["blocked"], 16),
+            booked=int(data["booked"], 16),
+            open_games={
+                int(bit): OpenGameMarker(
+                    booking_id=UUID(g["booking_id"]),
+                    court_id=UUID(g["court_id"]),
+                    max_players=g["max_players"],
+                    accepted_count=g["accepted_count"],
+                    active_user_ids=frozenset(UUID(u) for u in g["active_user_ids"]),
+                    min_skill_level=_dec_in(g["min_skill_level"]),
+                    max_skill_level=_dec_in(g["max_skill_level"]),
+                    total_price=_dec_in(g["total_price"]),
+                )
+                for bit, g in data["open_games"].items()
+            },
+            built_at=data["built_at"],
+        )
+
+
+def _dec_out(value) -> Optional[str]:
+    return str(value) if value is not None else None
+
+
+def _dec_in(value: Optional[str]) -> Optional[Decimal]:
+    return Decimal(value) if value is not None else None
+
+
+def day_key(club_id: UUID, day: DateType) -> str:
+    return f"{_KEY_PREFIX}:{club_id}:{day.isoformat()}"
+
+
+def club_key_prefix(club_id: UUID) -> str:
+    return f"{_KEY_PREFIX}:{club_id}:"
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+
+# Per-key versions seen before a load: day key → (day version, club version).
+Stamp = dict[str, tuple[str, str]]
+
+
+class AvailabilityCacheBackend(Protocol):
+    async def get_many(self, keys: list[str]) -> list[Optional[DayOccupancy]]: ...
+
+    async def stamp(self, keys: list[str]) -> Optional[Stamp]: ...
+
+    async def set_many(
+        self, entries: dict[str, DayOccupancy], ttl_seconds: int, stamp: Optional[Stamp] = None
+    ) -> None: ...
+
+    async def delete_many(self, keys: list[str]) -> None: ...
+
+    async def delete_prefix(self, prefix: str) -> None: ...
+
+
+class LocalLRUBackend:
+    """Process-local LRU holding ``DayOccupancy`` objects (no serialisation)."""
+
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, DayOccupancy]] = OrderedDict()
+
+    async def get_many(self, keys: list[str]) -> list[Optional[DayOccupancy]]:
+        now = time.monotonic()
+        out: list[Optional[DayOccupancy]] = []
+        for key in keys:
+            hit = self._entries.get(key)
+            if hit is None or hit[0] <= now:
+                if hit is not None:
+                    del self._entries[key]
+                out.append(None)
+                continue
+            self._entries.move_to_end(key)
+            out.append(hit[1])
+        return out
+
+    async def stamp(self, keys: list[str]) -> Optional[Stamp]:
+        # Every invalidation of this process's entries is in the facade's log.
+        return None
+
+    async def set_many(
+        self, entries: dict[str, DayOccupancy], ttl_seconds: int, stamp: Optional[Stamp] = None
+    ) -> None:
+        expires_at = time.monotonic() + ttl_seconds
+        for key, value in entries.items():
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete_many(self, keys: list[str]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            del self._entries[key]
+
+
+# KEYS: (entry, day version, club version) per entry.
+# ARGV: ttl, then (value, expected day version, expected club version) per entry.
+_SET_IF_UNCHANGED = """
+for i = 0, #KEYS / 3 - 1 do
+  local day_version = redis.call('GET', KEYS[3 * i + 2]) or ''
+  local club_version = redis.call('GET', KEYS[3 * i + 3]) or ''
+  if day_version == ARGV[3 * i + 3] and club_version == ARGV[3 * i + 4] then
+    redis.call('SET', KEYS[3 * i + 1], ARGV[3 * i + 2], 'EX', ARGV[1])
+  end
+end
+return 0
+"""
+
+
+def _version_keys(key: str) -> tuple[str, str]:
+    """Version counters of a day key and of its club prefix."""
+    return _VERSION_PREFIX + key, _VERSION_PREFIX + key.rsplit(":", 1)[0] + ":"
+
+
+def _decoded(value) -> str:
+    if value is None:
+        return ""
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+class RedisBackend:
+    """Shared backend over a ``redis.asyncio``-compatible client.
+
+    Deletes bump the version counters of what they delete, and ``set_many``
+    with a stamp only writes entries whose counters still match it.
+    """
+
+    def __init__(self, client: Any, version_ttl_seconds: int) -> None:
+        self._client = client
+        # Counters outlive any load that could have stamped them.
+        self._version_ttl = version_ttl_seconds
+        self._set_if_unchanged = client.register_script(_SET_IF_UNCHANGED)
+
+    async def get_many(self, keys: list[str]) -> list[Optional[DayOccupancy]]:
+        if not keys:
+            return []
+        raw = await self._client.mget(keys)
+        return [DayOccupancy.from_bytes(r) if r is not None else None for r in raw]
+
+    async def stamp(self, keys: list[str]) -> Optional[Stamp]:
+        if not keys:
+            return {}
+        version_keys = [vk for key in keys for vk in _version_keys(key)]
+        raw = [_decoded(v) for v in await self._client.mget(version_keys)]
+        return {key: (raw[2 * i], raw[2 * i + 1]) for i, key in enumerate(keys)}
+
+    async def set_many(
+        self, entries: dict[str, DayOccupancy], ttl_seconds: int, stamp: Optional[Stamp] = None
+    ) -> None:
+        if not entries:
+            return
+        if stamp is None:
+            async with self._client.pipeline(transaction=False) as pipe:
+                for key, value in entries.items():
+                    pipe.set(key, value.to_bytes(), ex=ttl_seconds)
+                await pipe.execute()
+            return
+        keys: list[str] = []
+        args: list[Any] = [ttl_seconds]
+        for key, value in entries.items():
+            if key not in stamp:
+                continue
+            keys += [key, *_version_keys(key)]
+            args += [value.to_bytes(), *stamp[key]]
+        if keys:
+            await self._set_if_unchanged(keys=keys, args=args)
+
+    async def delete_many(self, keys: list[str]) -> None:
+        if keys:
+            await self._bump([_version_keys(k)[0] for k in keys], keys)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        keys = [k async for k in self._client.scan_iter(match=f"{prefix}*")]
+        await self._bump([_VERSION_PREFIX + prefix], keys)
+
+    async def _bump(self, version_keys: list[str], keys: list[str]) -> None:
+        async with self._client.pipeline(transaction=True) as pipe:
+            for version_key in version_keys:
+                pipe.incr(version_key)
+                pipe.expire(version_key, self._version_ttl)
+            if keys:
+                pipe.delete(*keys)
+            await pipe.execute()
+
+
+# ---------------------------------------------------------------------------
+# Facade
+# ---------------------------------------------------------------------------
+
+
+class AvailabilityCache:
+    def __init__(self, backend: Optional[AvailabilityCacheBackend], ttl_seconds: int) -> None:
+        self._backend = backend
+        self._ttl = ttl_seconds
+        # In-process invalidation log: key (or club prefix) → wall time.
+        self._invalidated: dict[str, float] = {}
+        self._pending: set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self._backend is not None and self._ttl > 0
+
+    async def get_days(self, club_id: UUID, days: list[DateType]) -> dict[DateType, DayOccupancy]:
+        if not self.enabled or not days:
+            return {}
+        found = await self._backend.get_many([day_key(club_id, d) for d in days])
+        return {
+            d: entry
+            for d, entry in zip(days, found)
+            if entry is not None and not self._stale(club_id, d, entry.built_at)
+        }
+
+    async def stamp_days(self, club_id: UUID, days: list[DateType]) -> Optional[Stamp]:
+        """Versions to pass to ``put_days``; take them before loading ``days``."""
+        if not self.enabled or not days:
+            return None
+        return await self._backend.stamp([day_key(club_id, d) for d in days])
+
+    async def put_days(self, entries: Iterable[DayOccupancy], stamp: Optional[Stamp] = None) -> None:
+        """Store freshly built entries unless their club-day was invalidated
+        after they were loaded (``built_at`` and ``stamp`` must be taken before
+        the reads)."""
+        if not self.enabled:
+            return
+        fresh = {
+            day_key(e.club_id, e.day): e
+            for e in entries
+            if not self._stale(e.club_id, e.day, e.built_at)
+        }
+        await self._backend.set_many(fresh, self._ttl, stamp)
+
+    def invalidate(self, club_id: UUID, days: Iterable[DateType]) -> None:
+        if not self.enabled:
+            return
+        now = time.time()
+        keys = [day_key(club_id, d) for d in days]
+        for key in keys:
+            self._invalidated[key] = now
+        self._schedule(self._backend.delete_many(keys))
+
+    def invalidate_club(self, club_id: UUID) -> None:
+        if not self.enabled:
+            return
+        prefix = club_key_prefix(club_id)
+        self._invalidated[prefix] = time.time()
+        self._schedule(self._backend.delete_prefix(prefix))
+
+    def _stale(self, club_id: UUID, day: DateType, built_at: float) -> bool:
+        self._prune()
+        for key in (day_key(club_id, day), club_key_prefix(club_id)):
+            at = self._invalidated.get(key)
+            if at is not None and built_at <= at:
+                return True
+        return False
+
+    def _prune(self) -> None:
+        # Anything built before now - TTL has expired anyway.
+        horizon = time.time() - self._ttl
+        if self._invalidated and min(self._invalidated.values()) < horizon:
+            self._invalidated = {k: v for k, v in self._invalidated.items() if v >= horizon}
+
+    def _schedule(self, coro) -> None:
+        try:
+            task = asyncio.get_running_loop().create_task(coro)
+        except RuntimeError:
+            # No loop (sync caller): the in-process log still hides the entry
+            # here, and the TTL expires it everywhere else.
+            coro.close()
+            return
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+
+# A load that outlasts this many TTLs could miss an invalidation; none does.
+_VERSION_TTL_FACTOR = 10
+
+
+@lru_cache()
+def get_availability_cache() -> AvailabilityCache:
+    settings = get_settings()
+    ttl = settings.AVAILABILITY_CACHE_TTL_SECONDS
+    if ttl <= 0:
+        return AvailabilityCache(None, 0)
+    if settings.AVAILABILITY_CACHE_REDIS_URL:
+        import redis.asyncio as redis  # lazy: only instances with a Redis URL need it
+
+        backend: AvailabilityCacheBackend = RedisBackend(
+            redis.from_url(settings.AVAILABILITY_CACHE_REDIS_URL),
+            version_ttl_seconds=ttl * _VERSION_TTL_FACTOR,
+        )
+    else:
+        backend = LocalLRUBackend(settings.AVAILABILITY_CACHE_MAX_ENTRIES)
+    return AvailabilityCache(backend, ttl)
+
+
+# ---------------------------------------------------------------------------
+# Write-side hooks — invalidate after the writer's transaction commits
+# ---------------------------------------------------------------------------
+
+
+def _local_dates_around(start: datetime, end: datetime) -> list[DateType]:
+    # Any club-local date an instant can fall on is within a day of its UTC
+    # date, so invalidating that neighbourhood avoids needing the club's zone.
+    first = start.date() - timedelta(days=1)
+    last = end.date() + timedelta(days=1)
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+def mark_availability_dirty(session, club_id: UUID, start: datetime, end: datetime) -> None:
+    """Invalidate the club-days covering ``[start, end)`` (UTC) once ``session`` commits."""
+    if not get_availability_cache().enabled:
+        return
+    pending = session.info.setdefault(_DIRTY_INFO_KEY, {})
+    days = pending.setdefault(club_id, set())
+    if days is not None:  # None == whole club already marked
+        days.update(_local_dates_around(start, end))
+
+
+def mark_club_availability_dirty(session, club_id: UUID) -> None:
+    """Invalidate every cached day of a club once ``session`` commits (hours/grid changes)."""
+    if not get_availability_cache().enabled:
+        return
+    session.info.setdefault(_DIRTY_INFO_KEY, {})[club_id] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    pending = session.info.pop(_DIRTY_INFO_KEY, None)
+    if not pending:
+        return
+    cache = get_availability_cache()
+    for club_id, days in pending.items():
+        if days is None:
+            cache.invalidate_club(club_id)
+        else:
+            cache.invalidate(club_id, days)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session: Session) -> None:
+    session.info.pop(_DIRTY_INFO_KEY, None)
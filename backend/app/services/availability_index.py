@@ -0,0 +1,116 @@
+"""
+Interval indexes for court availability.
+
+``CourtService.get_availability`` asks, for every (slot, court) pair in the
+scan window, "which booking / reservation overlaps this slot?". Answering that
+with a linear scan of the court's bookings is O(slots × courts × bookings).
+
+``IntervalIndex`` answers the same question in O(log n): intervals are sorted
+by start once, and a running maximum of their ends turns "first interval with
+start < slot_end and end > slot_start" into two bisections. ``CourtOccupancy``
+bundles one index per court for bookings plus one per court for calendar
+reservations, with the club-wide (``court_id IS NULL``) reservations merged
+into every court's index at build time rather than concatenated per slot.
+
+Everything here is pure — no database access — so it is unit testable and
+can be benchmarked in isolation (``scripts/bench_availability.py``).
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Generic, Iterable, Optional, Sequence, TypeVar
+from uuid import UUID
+
+T = TypeVar("T")
+
+
+class IntervalIndex(Generic[T]):
+    """Static index over half-open ``[start, end)`` intervals.
+
+    Built once from ``(start, end, item)`` triples; ``first_overlap`` returns
+    the earliest-starting item overlapping a query window, or ``None``.
+    Overlapping input intervals are allowed.
+    """
+
+    __slots__ = ("_starts", "_max_ends", "_items")
+
+    def __init__(self, intervals: Iterable[tuple[datetime, datetime, T]]) -> None:
+        ordered = sorted(intervals, key=lambda iv: iv[0])
+        self._starts: list[datetime] = [iv[0] for iv in ordered]
+        self._items: list[T] = [iv[2] for iv in ordered]
+        # Running max of ends (non-decreasing), so it can be bisected.
+        self._max_ends: list[datetime] = []
+        running: Optional[datetime] = None
+        for _, end, _ in ordered:
+            running = end if running is None or end > running else running
+            self._max_ends.append(running)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def first_overlap(self, start: datetime, end: datetime) -> Optional[T]:
+        """Earliest-starting item with ``item.start < end`` and ``item.end > start``."""
+        position = self._first_overlap_position(start, end)
+        return self._items[position] if position is not None else None
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        return self._first_overlap_position(start, end) is not None
+
+    def _first_overlap_position(self, start: datetime, end: datetime) -> Optional[int]:
+        # Candidates are the prefix whose start is before the window's end.
+        limit = bisect_left(self._starts, end)
+        if limit == 0:
+            return None
+        # First position where the running max end passes `start`. The running
+        # max only increases at an interval whose own end is the new max, so
+        # the interval at `k` itself ends after `start`.
+        k = bisect_right(self._max_ends, start, 0, limit)
+        return k if k < limit else None
+
+
+class CourtOccupancy(Generic[T]):
+    """Per-court booking and reservation indexes for one availability scan.
+
+    ``bookings`` are ``(court_id, start, end, item)``; ``reservations`` are
+    ``(court_id_or_None, start, end)`` where ``None`` blocks every court.
+    """
+
+    __slots__ = ("_bookings", "_reservations")
+
+    def __init__(
+        self,
+        court_ids: Sequence[UUID],
+        bookings: Iterable[tuple[UUID, datetime, datetime, T]],
+        reservations: Iterable[tuple[Optional[UUID], datetime, datetime]],
+    ) -> None:
+        booking_rows: dict[UUID, list[tuple[datetime, datetime, T]]] = {
+            cid: [] for cid in court_ids
+        }
+        for court_id, start, end, item in bookings:
+            booking_rows.setdefault(court_id, []).append((start, end, item))
+
+        club_wide: list[tuple[datetime, datetime, None]] = []
+        reservation_rows: dict[UUID, list[tuple[datetime, datetime, None]]] = {
+            cid: [] for cid in court_ids
+        }
+        for court_id, start, end in reservations:
+            if court_id is None:
+                club_wide.append((start, end, None))
+            else:
+                reservation_rows.setdefault(court_id, []).append((start, end, None))
+
+        self._bookings: dict[UUID, IntervalIndex[T]] = {
+            cid: IntervalIndex(rows) for cid, rows in booking_rows.items()
+        }
+        self._reservations: dict[UUID, IntervalIndex[None]] = {
+            cid: IntervalIndex(rows + club_wide) for cid, rows in reservation_rows.items()
+        }
+
+    def booking_at(self, court_id: UUID, start: datetime, end: datetime) -> Optional[T]:
+        index = self._bookings.get(court_id)
+        return index.first_overlap(start, end) if index is not None else None
+
+    def is_reserved(self, court_id: UUID, start: datetime, end: datetime) -> bool:
+        index = self._reservations.get(court_id)
+        return index.overlaps(start, end) if index is not None else False
@@ -26,12 +26,15 @@ import uuid
 
 from fastapi import HTTPException, status
 from sqlalchemy import and_, func, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import contains_eager, selectinload
 
 from app.core.permissions import Capability, can
 from app.core.timezones import club_tz, ensure_utc, local_walltime_to_utc, utc_to_local
 from app.db.models.booking import (
+    COURT_OVERLAP_CONSTRAINT,
     Booking,
     BookingPlayer,
     BookingStatus,
@@ -45,7 +48,9 @@ from app.db.models.club import Club, OperatingHours
 from app.db.models.court import CalendarReservation, CalendarReservationType, Court
 from app.db.models.staff import StaffProfile, StaffRole
 from app.db.models.user import User
+from app.services.availability_cache import mark_availability_dirty
 from app.services.booking_confirmation import should_confirm
+from app.services.court_claims import is_court_overlap_violation, lock_court, release_lapsed_holds
 from app.services.pricing_service import PriceBreakdown, PricingService
 
 _GRID_ENFORCED_TYPES = {BookingType.regular}
@@ -185,6 +190,32 @@ class BookingService:
         if result.scalar_one_or_none():
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Court is already booked for this time slot")
 
+    async def _claim_court(self, values: dict) -> Booking:
+        """Insert a booking row, letting the court overlap constraint arbitrate the slot.
+
+        The happy path is a single ``INSERT ... ON CONFLICT DO NOTHING RETURNING``.
+        Losing to an overlapping booking takes the court lock and releases any
+        lapsed holds in the way before one retry; anything else is a 409.
+        """
+        stmt = (
+            pg_insert(Booking)
+            .values(**values)
+            .on_conflict_do_nothing(constraint=COURT_OVERLAP_CONSTRAINT)
+            .returning(Booking)
+        )
+        booking = (await self.db.execute(stmt)).scalar_one_or_none()
+        if booking is None:
+            court_id, start, end = values["court_id"], values["start_datetime"], values["end_datetime"]
+            await lock_court(self.db, court_id)
+            released = await release_lapsed_holds(self.db, court_id, start, end)
+            for club_id, released_start, released_end in released:
+                mark_availability_dirty(self.db, club_id, released_start, released_end)
+            if released:
+                booking = (await self.db.execute(stmt)).scalar_one_or_none()
+        if booking is None:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Court is already booked for this time slot")
+        return booking
+
     async def _check_no_trainer_conflict(self, staff_profile_id: uuid.UUID, start: datetime, end: datetime) -> None:
         stmt = select(Booking.id).where(
             Booking.staff_profile_id == staff_profile_id,
@@ -442,8 +473,7 @@ class BookingService:
                     detail=f"Bookings cannot be made more than {club.max_advance_booking_days} day(s) in advance",
                 )
 
-        # 8. Court conflict
-        await self._check_no_conflict(court_id, start_datetime, end_datetime)
+        # 8. Court conflict — arbitrated by the exclusion constraint at insert (step 15).
 
         # 9. Blackout
         await self._check_no_blackout(court_id, start_datetime, end_datetime)
@@ -505,7 +535,7 @@ class BookingService:
         requesting_user_id = requesting_user.id
 
         # 15. Create booking
-        booking = Booking(
+        booking = await self._claim_court(dict(
             club_id=club_id,
             court_id=court_id,
             booking_type=booking_type,
@@ -527,9 +557,7 @@ class BookingService:
             contact_name=contact_name,
             contact_email=contact_email,
             contact_phone=contact_phone,
-        )
-        self.db.add(booking)
-        await self.db.flush()  # get booking.id
+        ))
 
         # 16. Add organiser as BookingPlayer (skip only for staff-admin empty open games)
         created_players: list[BookingPlayer] = []
@@ -598,6 +626,7 @@ class BookingService:
             booking.status = BookingStatus.confirmed
 
         await self.db.flush()
+        mark_availability_dirty(self.db, club_id, start_datetime, end_datetime)
         return await self._load_booking(booking.id)
 
     async def list_bookings(
@@ -847,12 +876,16 @@ class BookingService:
         tenant_id: uuid.UUID,
         requesting_user: User,
     ) -> Booking:
+        # Lock the booking row so concurrent joins serialise on it: each one counts
+        # the players committed by the joins before it, so an open game can never
+        # be overfilled. Players are selectin-loaded after the lock is granted.
         result = await self.db.execute(
             select(Booking)
             .options(selectinload(Booking.players).selectinload(BookingPlayer.user))
             .options(selectinload(Booking.court))
             .join(Club, Booking.club_id == Club.id)
             .where(Booking.id == booking_id, Booking.club_id == club_id, Club.tenant_id == tenant_id)
+            .with_for_update(of=Booking)
         )
         booking = result.scalar_one_or_none()
         if not booking:
@@ -950,6 +983,7 @@ class BookingService:
             booking.status = BookingStatus.confirmed
 
         await self.db.flush()
+        mark_availability_dirty(self.db, booking.club_id, booking.start_datetime, booking.end_datetime)
         return await self._load_booking(booking.id)
 
     async def invite_player(
@@ -1043,6 +1077,7 @@ class BookingService:
             self.db.add(bp)
         await self.db.flush()
 
+        mark_availability_dirty(self.db, booking.club_id, booking.start_datetime, booking.end_datetime)
         return await self._load_booking(booking.id)
 
     async def respond_to_invite(
@@ -1065,6 +1100,8 @@ class BookingService:
             .options(contains_eager(Booking.club))
             .join(Club, Booking.club_id == Club.id)
             .where(Booking.id == booking_id, Booking.club_id == club_id, Club.tenant_id == tenant_id)
+            # Accepting takes a slot — serialise with joins like join_booking does.
+            .with_for_update(of=Booking)
         )
         booking = result.scalar_one_or_none()
         if not booking:
@@ -1129,6 +1166,7 @@ class BookingService:
         if breakdown and breakdown.credit_consumed:
             await pricing_svc.consume_credit(breakdown.membership_subscription_id, booking.id)
 
+        mark_availability_dirty(self.db, booking.club_id, booking.start_datetime, booking.end_datetime)
         return await self._load_booking(booking.id)
 
     async def cancel_booking(
@@ -1179,6 +1217,7 @@ class BookingService:
                 equipment.quantity_available += rental.quantity
 
         await self.db.flush()
+        mark_availability_dirty(self.db, booking.club_id, booking.start_datetime, booking.end_datetime)
         return await self._load_booking(booking.id)
 
     async def update_booking(
@@ -1253,8 +1292,17 @@ class BookingService:
 
             # Conflict and blackout (exclude the booking being edited)
             await self._check_no_conflict(new_court_id, new_start, new_end, exclude_booking_id=booking_id)
+            # The check ignores lapsed holds; cancel them so the constraint does too.
+            await lock_court(self.db, new_court_id)
+            for released_club_id, released_start, released_end in await release_lapsed_holds(
+                self.db, new_court_id, new_start, new_end, exclude_booking_id=booking_id
+            ):
+                mark_availability_dirty(self.db, released_club_id, released_start, released_end)
             await self._check_no_blackout(new_court_id, new_start, new_end)
 
+            # Both the vacated and the newly taken slot change availability.
+            mark_availability_dirty(self.db, club_id, booking.start_datetime, booking.end_datetime)
+            mark_availability_dirty(self.db, club_id, new_start, new_end)
             booking.court_id = new_court_id
             booking.start_datetime = new_start
             booking.end_datetime = new_end
@@ -1271,5 +1319,11 @@ class BookingService:
         if contact_phone is not None:
             booking.contact_phone = contact_phone
 
-        await self.db.flush()
+        try:
+            await self.db.flush()
+        except IntegrityError as exc:
+            # Lost a race for the new slot after the conflict check passed.
+            if is_court_overlap_violation(exc):
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Court is already booked for this time slot")
+            raise
         return await self._load_booking(booking.id)
@@ -0,0 +1,77 @@
+"""
+Court claims — database-arbitrated court double-booking prevention.
+
+No two pending/confirmed bookings may overlap on the same court; the
+``ex_bookings_court_no_overlap`` exclusion constraint enforces that, so
+concurrent ``create_booking`` calls for the same slot cannot both succeed and
+the happy path needs no conflict SELECT before the INSERT.
+
+The one rule the constraint cannot express is the court-hold expiry: a pending
+booking whose ``hold_expires_at`` has passed no longer blocks the court, even
+before the release sweep cancels it. A claim that loses to such a booking takes
+the court's transaction-scoped advisory lock, cancels the lapsed hold(s) and
+retries once. The lock only serialises claims that already hit a conflict on
+that court (and staff moves) — uncontended bookings never touch it.
+"""
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.booking import COURT_OVERLAP_CONSTRAINT, Booking, BookingStatus
+
+_EXCLUSION_VIOLATION = "23P01"
+
+
+def is_court_overlap_violation(exc: IntegrityError) -> bool:
+    """True when ``exc`` was raised by the court overlap exclusion constraint."""
+    orig = exc.orig
+    if getattr(orig, "sqlstate", None) not in (None, _EXCLUSION_VIOLATION):
+        return False
+    return COURT_OVERLAP_CONSTRAINT in str(orig)
+
+
+def court_lock_key(court_id: uuid.UUID) -> int:
+    """Signed 64-bit advisory lock key for a court."""
+    return int.from_bytes(court_id.bytes[:8], "big", signed=True)
+
+
+async def lock_court(db: AsyncSession, court_id: uuid.UUID) -> None:
+    """Take the court's advisory lock until the current transaction ends."""
+    await db.execute(select(func.pg_advisory_xact_lock(court_lock_key(court_id))))
+
+
+async def release_lapsed_holds(
+    db: AsyncSession,
+    court_id: uuid.UUID,
+    start: datetime,
+    end: datetime,
+    exclude_booking_id: Optional[uuid.UUID] = None,
+) -> list[tuple[uuid.UUID, datetime, datetime]]:
+    """Cancel pending bookings on ``court_id`` overlapping ``[start, end)`` whose hold has lapsed.
+
+    Callers hold the court lock. Returns ``(club_id, start, end)`` for each
+    released booking so availability can be marked dirty. The booking's unpaid
+    player slots are left for the release sweep, which also cancels any
+    in-flight PaymentIntent.
+    """
+    now = datetime.now(tz=timezone.utc)
+    stmt = update(Booking).where(
+        Booking.court_id == court_id,
+        Booking.status == BookingStatus.pending,
+        Booking.hold_expires_at.is_not(None),
+        Booking.hold_expires_at <= now,
+        Booking.start_datetime < end,
+        Booking.end_datetime > start,
+    )
+    if exclude_booking_id:
+        stmt = stmt.where(Booking.id != exclude_booking_id)
+    result = await db.execute(
+        stmt.values(status=BookingStatus.cancelled, hold_expires_at=None)
+        .returning(Booking.club_id, Booking.start_datetime, Booking.end_datetime)
+        .execution_options(synchronize_session="fetch")
+    )
+    return [tuple(row) for row in result.all()]
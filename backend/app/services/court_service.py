@@ -8,14 +8,16 @@ Responsibilities:
   - Recurring booking creation (leagues, coaching sessions)
 """
 import math
+import time
 import uuid
 from datetime import date as DateType, datetime, time as TimeType, timedelta, timezone
 from decimal import Decimal
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from dateutil.rrule import rrulestr
 from fastapi import HTTPException, status
-from sqlalchemy import or_, select
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -29,14 +31,24 @@ from app.db.models.booking import (
     PlayerRole,
 )
 from app.core.timezones import club_tz, local_walltime_to_utc, utc_to_local
-from app.db.models.club import Club, OperatingHours, PricingRule
+from app.db.models.club import Club, OperatingHours
 from app.db.models.court import CalendarReservation, CalendarReservationType, Court, SurfaceType
 from app.db.models.user import User
-from app.services.pricing_service import PricingService
+from app.services.availability_cache import (
+    DayOccupancy,
+    OpenGameMarker,
+    get_availability_cache,
+    mark_availability_dirty,
+)
+from app.services.availability_index import CourtOccupancy, IntervalIndex
+from app.services.court_claims import is_court_overlap_violation
+from app.services.pricing_service import PriceRequest, PricingService
+from app.services.pricing_table import load_pricing_table
 
 _MAX_OCCURRENCES = 104  # safety cap: ~2 years of weekly sessions
 _AVAILABILITY_DEFAULT_LIMIT = 40
 _AVAILABILITY_MAX_SCAN_DAYS = 60  # safety cap when end_date is omitted
+_AVAILABILITY_FIRST_CHUNK_DAYS = 1  # first lazy window when end_date is omitted
 
 
 class CourtService:
@@ -93,40 +105,44 @@ class CourtService:
             raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Court is not active")
         return club, court
 
-    async def _check_no_conflict(
+    async def _booked_index(
         self, court_id: uuid.UUID, start: datetime, end: datetime
-    ) -> bool:
+    ) -> IntervalIndex[datetime]:
+        """Every pending/confirmed booking on the court overlapping ``[start, end)``."""
         result = await self.db.execute(
-            select(Booking.id).where(
+            select(Booking.start_datetime, Booking.end_datetime).where(
                 Booking.court_id == court_id,
                 Booking.status.in_([BookingStatus.pending, BookingStatus.confirmed]),
                 Booking.start_datetime < end,
                 Booking.end_datetime > start,
             )
         )
-        return result.scalar_one_or_none() is not None
+        return IntervalIndex((s, e, s) for s, e in result.all())
 
-    async def _check_no_blackout(
+    async def _blackout_index(
         self, court_id: uuid.UUID, start: datetime, end: datetime
-    ) -> bool:
+    ) -> IntervalIndex[datetime]:
+        """Every maintenance reservation on the court overlapping ``[start, end)``."""
         result = await self.db.execute(
-            select(CalendarReservation.id).where(
+            select(CalendarReservation.start_datetime, CalendarReservation.end_datetime).where(
                 CalendarReservation.court_id == court_id,
                 CalendarReservation.reservation_type == CalendarReservationType.maintenance,
                 CalendarReservation.start_datetime < end,
                 CalendarReservation.end_datetime > start,
             )
         )
-        return result.scalar_one_or_none() is not None
+        return IntervalIndex((s, e, s) for s, e in result.all())
 
-    async def _get_price(
-        self, club_id: uuid.UUID, start: datetime, booking_type: BookingType, club_timezone: str
-    ) -> Optional[Decimal]:
+    async def _get_prices(
+        self, club_id: uuid.UUID, starts: list[datetime], booking_type: BookingType, club_timezone: str
+    ) -> list[Optional[Decimal]]:
         pricing_svc = PricingService(self.db)
-        breakdown = await pricing_svc.calculate(
-            club_id, start, club_timezone, max_players=1, user_id=None, booking_type=booking_type
+        breakdowns = await pricing_svc.calculate_many(
+            club_id,
+            club_timezone,
+            [PriceRequest(start, max_players=1, booking_type=booking_type) for start in starts],
         )
-        return breakdown.unit_price if breakdown else None
+        return [breakdown.unit_price if breakdown else None for breakdown in breakdowns]
 
     # ------------------------------------------------------------------
     # Public
@@ -157,11 +173,14 @@ class CourtService:
 
         - Expands the RRULE from first_start up to recurrence_end_date (inclusive),
           capped at _MAX_OCCURRENCES.
-        - Per occurrence: checks court conflict and blackout.
+        - Checks every occurrence for court conflict and blackout in memory, against
+          the court's bookings and maintenance reservations loaded once for the
+          whole series span.
           If skip_conflicts=False any conflict raises 409 immediately.
           If skip_conflicts=True conflicting occurrences are skipped and reported.
-        - All valid occurrences are created in one transaction with the first booking
-          acting as parent (parent_booking_id=None) and subsequent ones linking to it.
+        - All valid occurrences are created in one transaction by a single bulk
+          INSERT ... RETURNING, with the first booking acting as parent
+          (parent_booking_id=None) and subsequent ones linking to it.
         - Returns {"created": [BookingResponse…], "skipped": [{"occurrence": datetime, "reason": str}…]}
         """
         _, court = await self._get_club_and_court(club_id, court_id, tenant_id)
@@ -233,15 +252,27 @@ class CourtService:
                 )
             named_users.append(u)
 
-        created_bookings: list[Booking] = []
+        # Price the whole series up front — one rules query, not one per occurrence.
+        prices = await self._get_prices(club_id, occurrences, booking_type, club.timezone)
+
+        # Everything that can block the series, in two queries for its whole span.
+        series_start, series_end = occurrences[0], occurrences[-1] + duration
+        booked = await self._booked_index(court_id, series_start, series_end)
+        blackouts = await self._blackout_index(court_id, series_start, series_end)
+
+        rows: list[dict] = []
         skipped: list[dict] = []
         parent_id: Optional[uuid.UUID] = None
         requesting_user_id = created_by_user.id
 
-        for occurrence_start in occurrences:
+        for occurrence_start, total_price in zip(occurrences, prices):
             occurrence_end = occurrence_start + duration
 
-            if await self._check_no_conflict(court_id, occurrence_start, occurrence_end):
+            # Occurrences are ascending, so the last accepted one is the only
+            # earlier occurrence of this series that can overlap.
+            if booked.overlaps(occurrence_start, occurrence_end) or (
+                rows and rows[-1]["end_datetime"] > occurrence_start
+            ):
                 if skip_conflicts:
                     skipped.append({"occurrence": occurrence_start, "reason": "court conflict"})
                     continue
@@ -250,7 +281,7 @@ class CourtService:
                     detail=f"Court is already booked at {occurrence_start.isoformat()}",
                 )
 
-            if await self._check_no_blackout(court_id, occurrence_start, occurrence_end):
+            if blackouts.overlaps(occurrence_start, occurrence_end):
                 if skip_conflicts:
                     skipped.append({"occurrence": occurrence_start, "reason": "court blackout"})
                     continue
@@ -259,10 +290,10 @@ class CourtService:
                     detail=f"Court is under maintenance at {occurrence_start.isoformat()}",
                 )
 
-            total_price = await self._get_price(club_id, occurrence_start, booking_type, club.timezone)
-            amount_due = (total_price / max_players) if total_price else Decimal("0.00")
-
-            booking = Booking(
+            # Ids are assigned here so children can reference the parent in the same INSERT.
+            booking_id = uuid.uuid4()
+            rows.append(dict(
+                id=booking_id,
                 club_id=club_id,
                 court_id=court_id,
                 booking_type=booking_type,
@@ -276,64 +307,75 @@ class CourtService:
                 is_recurring=True,
                 recurrence_rule=recurrence_rule,
                 recurrence_end_date=recurrence_end_date,
-                parent_booking_id=parent_id,
+                parent_booking_id=parent_id,  # None for the first booking — it is the parent
                 total_price=total_price,
                 notes=notes,
                 event_name=event_name,
                 contact_name=contact_name,
                 contact_email=contact_email,
                 contact_phone=contact_phone,
+            ))
+            if parent_id is None:
+                parent_id = booking_id
+
+        if not rows:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="All occurrences conflict with existing bookings or blackouts — nothing was created",
             )
-            self.db.add(booking)
-            await self.db.flush()
 
-            if parent_id is None:
-                parent_id = booking.id
-                booking.parent_booking_id = None  # first booking is the parent
+        try:
+            result = await self.db.execute(
+                insert(Booking).returning(Booking, sort_by_parameter_order=True), rows
+            )
+        except IntegrityError as exc:
+            # A concurrent booking took one of the slots after the conflict scan.
+            if is_court_overlap_violation(exc):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Court was booked for one of the occurrences while the series was being created",
+                )
+            raise
+        created_bookings: list[Booking] = list(result.scalars().all())
 
-            organiser_bp = BookingPlayer(
-                booking=booking,
-                user=created_by_user,
+        players: list[BookingPlayer] = []
+        for row in rows:
+            total_price = row["total_price"]
+            amount_due = (total_price / max_players) if total_price else Decimal("0.00")
+            players.append(BookingPlayer(
+                booking_id=row["id"],
+                user_id=requesting_user_id,
                 role=PlayerRole.organiser,
                 invite_status=InviteStatus.accepted,
                 payment_status=PaymentStatus.pending,
                 amount_due=amount_due,
-            )
-            self.db.add(organiser_bp)
-
+            ))
             for named_user in named_users:
-                self.db.add(BookingPlayer(
-                    booking=booking,
-                    user=named_user,
+                players.append(BookingPlayer(
+                    booking_id=row["id"],
+                    user_id=named_user.id,
                     role=PlayerRole.player,
                     invite_status=InviteStatus.accepted,
                     payment_status=PaymentStatus.pending,
                     amount_due=amount_due,
                 ))
-
-            await self.db.flush()
-            created_bookings.append(booking)
-
-        if not created_bookings:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="All occurrences conflict with existing bookings or blackouts — nothing was created",
-            )
+            mark_availability_dirty(self.db, club_id, row["start_datetime"], row["end_datetime"])
+        self.db.add_all(players)
+        await self.db.flush()
 
         await self.db.commit()
 
         # Reload with relationships for response building
-        loaded: list[Booking] = []
-        for b in created_bookings:
-            r = await self.db.execute(
-                select(Booking)
-                .options(
-                    selectinload(Booking.players).selectinload(BookingPlayer.user),
-                    selectinload(Booking.court),
-                )
-                .where(Booking.id == b.id)
+        result = await self.db.execute(
+            select(Booking)
+            .options(
+                selectinload(Booking.players).selectinload(BookingPlayer.user),
+                selectinload(Booking.court),
             )
-            loaded.append(r.scalar_one())
+            .where(Booking.id.in_([b.id for b in created_bookings]))
+            .order_by(Booking.start_datetime)
+        )
+        loaded = list(result.scalars().all())
 
         return {"created": loaded, "skipped": skipped}
 
@@ -369,7 +411,9 @@ class CourtService:
             excluded from `existing_matches`. Games they declined/left remain so they can re-join.
           - A slot is omitted entirely if it has neither available courts nor joinable matches.
           - When `end_date` is None: scan forward (up to a safety cap of _AVAILABILITY_MAX_SCAN_DAYS)
-            until `limit` slot rows are emitted, then return a `next_cursor` for the FE.
+            until `limit` slot rows are emitted, then return a `next_cursor` for the FE. Bookings,
+            reservations and hours are loaded in expanding day windows (1, 3, 7, 15… days), so
+            a page filled early never queries the rest of the scan range.
           - When `end_date` is given: return every matching slot in the range, no cap, no cursor.
           - Past slots and slots violating `min_booking_notice_hours` / `max_advance_booking_days`
             are dropped from `available_courts`. They can still surface as `existing_matches`
@@ -395,11 +439,13 @@ class CourtService:
         if not club:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Club not found")
 
-        court_stmt = select(Court).where(Court.club_id == club_id, Court.is_active)
-        if surface is not None:
-            court_stmt = court_stmt.where(Court.surface_type == surface)
-        courts_result = await self.db.execute(court_stmt)
-        courts: list[Court] = list(courts_result.scalars().all())
+        # Occupancy is cached per club-day across *all* active courts, so the
+        # surface filter is applied in Python rather than in the query.
+        courts_result = await self.db.execute(
+            select(Court).where(Court.club_id == club_id, Court.is_active)
+        )
+        club_courts: list[Court] = list(courts_result.scalars().all())
+        courts = [c for c in club_courts if surface is None or c.surface_type == surface]
 
         if not courts:
             return {
@@ -409,8 +455,6 @@ class CourtService:
                 "next_cursor": None,
             }
 
-        court_ids = [c.id for c in courts]
-
         # Determine scan boundary
         if end_date is not None:
             scan_end = end_date
@@ -419,70 +463,12 @@ class CourtService:
             scan_end = start_date + timedelta(days=_AVAILABILITY_MAX_SCAN_DAYS - 1)
             apply_limit = True
 
-        # start_date/scan_end are club-local calendar dates; the query window is
-        # their club-local day bounds converted to true UTC.
         tz = club_tz(club)
-        range_start_dt = local_walltime_to_utc(start_date, TimeType.min, tz)
-        range_end_dt = local_walltime_to_utc(scan_end + timedelta(days=1), TimeType.min, tz)
+        scan_days = [start_date + timedelta(days=i) for i in range((scan_end - start_date).days + 1)]
 
-        # Bookings in range across our courts
-        bookings_result = await self.db.execute(
-            select(Booking)
-            .options(selectinload(Booking.players))
-            .where(
-                Booking.court_id.in_(court_ids),
-                Booking.status.in_([BookingStatus.pending, BookingStatus.confirmed]),
-                Booking.start_datetime < range_end_dt,
-                Booking.end_datetime > range_start_dt,
-            )
-        )
-        bookings: list[Booking] = list(bookings_result.scalars().unique().all())
-
-        bookings_by_court: dict[uuid.UUID, list[Booking]] = {cid: [] for cid in court_ids}
-        for b in bookings:
-            bookings_by_court[b.court_id].append(b)
-
-        # Calendar reservations in range (court-specific OR club-wide where court_id IS NULL)
-        reservations_result = await self.db.execute(
-            select(CalendarReservation).where(
-                CalendarReservation.club_id == club_id,
-                or_(
-                    CalendarReservation.court_id.in_(court_ids),
-                    CalendarReservation.court_id.is_(None),
-                ),
-                CalendarReservation.start_datetime < range_end_dt,
-                CalendarReservation.end_datetime > range_start_dt,
-            )
-        )
-        reservations: list[CalendarReservation] = list(reservations_result.scalars().all())
-
-        reservations_by_court: dict[Optional[uuid.UUID], list[CalendarReservation]] = {}
-        for r in reservations:
-            reservations_by_court.setdefault(r.court_id, []).append(r)
-
-        # Operating hours and pricing rules — pull once, group by weekday
-        oh_result = await self.db.execute(
-            select(OperatingHours).where(
-                OperatingHours.club_id == club_id,
-                or_(OperatingHours.valid_from.is_(None), OperatingHours.valid_from <= scan_end),
-                or_(OperatingHours.valid_until.is_(None), OperatingHours.valid_until >= start_date),
-            )
-        )
-        oh_records: list[OperatingHours] = list(oh_result.scalars().all())
-
-        pricing_result = await self.db.execute(
-            select(PricingRule).where(
-                PricingRule.club_id == club_id,
-                PricingRule.is_active.is_(True),
-                or_(PricingRule.valid_from.is_(None), PricingRule.valid_from <= scan_end),
-                or_(PricingRule.valid_until.is_(None), PricingRule.valid_until >= start_date),
-            )
-        )
-        pricing_rules: list[PricingRule] = list(pricing_result.scalars().all())
-
-        pricing_by_dow: dict[int, list[PricingRule]] = {}
-        for rule in pricing_rules:
-            pricing_by_dow.setdefault(rule.day_of_week, []).append(rule)
+        # Pricing is overlaid per request from the club's compiled table, which
+        # resolves seasons and incentive expiry for every slot.
+        pricing = await load_pricing_table(self.db, club_id)
 
         slot_duration = timedelta(minutes=club.booking_duration_minutes)
         now = datetime.now(tz=timezone.utc)
@@ -494,38 +480,42 @@ class CourtService:
         next_cursor: Optional[dict] = None
         cursor_set = False
 
-        def _select_pricing(day_rules: list[PricingRule], slot_start_t: TimeType, query_date: DateType) -> tuple[Optional[Decimal], Optional[str]]:
-            for rule in day_rules:
-                if not (rule.start_time <= slot_start_t < rule.end_time):
-                    continue
-                if rule.valid_from is not None and rule.valid_from > query_date:
-                    continue
-                if rule.valid_until is not None and rule.valid_until < query_date:
-                    continue
-                if rule.incentive_price is not None and (
-                    rule.incentive_expires_at is None or rule.incentive_expires_at > now
-                ):
-                    return Decimal(str(rule.incentive_price)), (rule.incentive_label or rule.label)
-                return Decimal(str(rule.price_per_slot)), rule.label
-            return None, None
-
-        current = start_date
-        while current <= scan_end and not cursor_set:
-            dow = current.weekday()
-            day_oh = [oh for oh in oh_records if oh.day_of_week == dow
-                      and (oh.valid_from is None or oh.valid_from <= current)
-                      and (oh.valid_until is None or oh.valid_until >= current)]
-            if not day_oh:
-                current += timedelta(days=1)
+        def _joinable_match(game: OpenGameMarker) -> Optional[dict]:
+            slots_left = max(0, (game.max_players or 0) - game.accepted_count)
+            if slots_left <= 0:
+                return None
+            # Hide games the requestor is already actively part of (they can't re-join);
+            # a declined/released slot is left visible so they can join again.
+            if requesting_user.id in game.active_user_ids:
+                return None
+            if user_skill is not None:
+                if game.min_skill_level is not None and Decimal(str(game.min_skill_level)) > user_skill:
+                    return None
+                if game.max_skill_level is not None and Decimal(str(game.max_skill_level)) < user_skill:
+                    return None
+            return {
+                "booking_id": game.booking_id,
+                "court_id": game.court_id,
+                "slots_available": slots_left,
+                "min_skill_level": game.min_skill_level,
+                "max_skill_level": game.max_skill_level,
+                "total_price": game.total_price,
+            }
+
+        # Occupancy is loaded lazily: with a `limit`, in expanding day windows so
+        # a page satisfied early never reads the rest of the scan range.
+        async for day in self._iter_day_occupancy(club, club_courts, scan_days, chunked=apply_limit):
+            current = day.day
+            if day.window_open is None:
                 continue
-            # Prefer seasonal (valid_from set) over the catch-all row
-            oh = next((h for h in day_oh if h.valid_from is not None), day_oh[0])
+            court_positions = {cid: pos for pos, cid in enumerate(day.court_ids)}
+            requested = [(court.id, court_positions[court.id]) for court in courts]
 
             # open/close + from/to clamps are club-local wall-clock; build the
             # day's window as true-UTC instants so it compares against stored
             # booking/reservation instants and notice/advance cutoffs.
-            window_open = local_walltime_to_utc(current, oh.open_time, tz)
-            window_close = local_walltime_to_utc(current, oh.close_time, tz)
+            window_open = day.window_open
+            window_close = day.window_close
             # `from_time` is a filter, not a new grid anchor: the slot grid stays
             # aligned to the club's open_time so slot boundaries don't shift with
             # the search start. We advance to the first grid-aligned slot at or
@@ -540,18 +530,16 @@ class CourtService:
                 if clamp_close < window_close:
                     window_close = clamp_close
             if window_open >= window_close:
-                current += timedelta(days=1)
                 continue
 
-            day_rules = pricing_by_dow.get(dow, [])
             day_slots: list[dict] = []
 
             # Grid is anchored at window_open; skip ahead to the first aligned
             # slot whose start is at or after `from_time`.
-            slot_start = window_open
-            if earliest_start > slot_start:
-                steps = math.ceil((earliest_start - slot_start) / slot_duration)
-                slot_start = slot_start + steps * slot_duration
+            slot_index = 0
+            if earliest_start > window_open:
+                slot_index = math.ceil((earliest_start - window_open) / slot_duration)
+            slot_start = window_open + slot_index * slot_duration
             while slot_start + slot_duration <= window_close and not cursor_set:
                 slot_end = slot_start + slot_duration
 
@@ -559,70 +547,33 @@ class CourtService:
 
                 available_courts: list[dict] = []
                 existing_matches: list[dict] = []
+                slot_price: Optional[tuple[Optional[Decimal], Optional[str]]] = None
 
-                for court in courts:
-                    overlap_booking = next(
-                        (
-                            b for b in bookings_by_court.get(court.id, [])
-                            if b.start_datetime < slot_end and b.end_datetime > slot_start
-                        ),
-                        None,
-                    )
-                    overlap_reservation = next(
-                        (
-                            r for r in (
-                                reservations_by_court.get(court.id, [])
-                                + reservations_by_court.get(None, [])
-                            )
-                            if r.start_datetime < slot_end and r.end_datetime > slot_start
-                        ),
-                        None,
-                    )
-
-                    if overlap_reservation is not None:
+                for court_id, position in requested:
+                    bit = day.bit(slot_index, position)
+                    if day.is_blocked(bit):
                         continue  # court blocked at this slot
 
-                    if overlap_booking is None:
+                    if not day.is_booked(bit):
                         if not bookable:
                             continue
-                        price, price_label = _select_pricing(day_rules, utc_to_local(slot_start, tz).time(), current)
+                        # Price depends only on the slot, not the court.
+                        if slot_price is None:
+                            priced = pricing.lookup(utc_to_local(slot_start, tz))
+                            slot_price = (priced.price, priced.label) if priced else (None, None)
+                        price, price_label = slot_price
                         available_courts.append({
-                            "court_id": court.id,
+                            "court_id": court_id,
                             "price": price,
                             "price_label": price_label,
                         })
                         continue
 
                     # Court has a booking — only surface it if it's a joinable open game
-                    if not overlap_booking.is_open_game:
-                        continue
-                    accepted = sum(
-                        1 for p in overlap_booking.players
-                        if p.invite_status == InviteStatus.accepted
-                    )
-                    slots_left = max(0, (overlap_booking.max_players or 0) - accepted)
-                    if slots_left <= 0:
-                        continue
-                    # Hide games the requestor is already actively part of (they can't re-join);
-                    # a declined/released slot is left visible so they can join again.
-                    if any(
-                        p.user_id == requesting_user.id and p.invite_status != InviteStatus.declined
-                        for p in overlap_booking.players
-                    ):
-                        continue
-                    if user_skill is not None:
-                        if overlap_booking.min_skill_level is not None and Decimal(str(overlap_booking.min_skill_level)) > user_skill:
-                            continue
-                        if overlap_booking.max_skill_level is not None and Decimal(str(overlap_booking.max_skill_level)) < user_skill:
-                            continue
-                    existing_matches.append({
-                        "booking_id": overlap_booking.id,
-                        "court_id": court.id,
-                        "slots_available": slots_left,
-                        "min_skill_level": overlap_booking.min_skill_level,
-                        "max_skill_level": overlap_booking.max_skill_level,
-                        "total_price": overlap_booking.total_price,
-                    })
+                    game = day.open_games.get(bit)
+                    match = _joinable_match(game) if game is not None else None
+                    if match is not None:
+                        existing_matches.append(match)
 
                 if available_courts or existing_matches:
                     if apply_limit and emitted_count >= limit:
@@ -642,11 +593,12 @@ class CourtService:
                     emitted_count += 1
 
                 slot_start = slot_end
+                slot_index += 1
 
             if day_slots:
                 days_out.append({"date": current, "slots": day_slots})
-
-            current += timedelta(days=1)
+            if cursor_set:
+                break  # before the generator loads another window
 
         return {
             "club_id": club_id,
@@ -654,3 +606,180 @@ class CourtService:
             "days": days_out,
             "next_cursor": next_cursor,
         }
+
+    async def _iter_day_occupancy(
+        self,
+        club: Club,
+        courts: list[Court],
+        days: list[DateType],
+        chunked: bool,
+    ) -> AsyncIterator[DayOccupancy]:
+        """Yield a ``DayOccupancy`` per day in ``days``, in order.
+
+        Each window of days is served from the cache where possible and the
+        misses are built with one set of queries. Unchunked, the window is the
+        whole range; chunked, windows grow 1, 3, 7, 15… days so a consumer that
+        stops early (a satisfied ``limit``) stops querying too.
+        """
+        cache = get_availability_cache()
+        court_ids = [c.id for c in courts]
+        size = len(days) if not chunked else _AVAILABILITY_FIRST_CHUNK_DAYS
+        offset = 0
+        while offset < len(days):
+            window = days[offset:offset + size]
+            offset += len(window)
+            size = size * 2 + 1
+
+            occupancy = {
+                d: entry
+                for d, entry in (await cache.get_days(club.id, window)).items()
+                if entry.serves(court_ids, club.booking_duration_minutes)
+            }
+            missing = [d for d in window if d not in occupancy]
+            if missing:
+                stamp = await cache.stamp_days(club.id, missing)
+                built = await self._build_day_occupancy(club, courts, missing[0], missing[-1])
+                await cache.put_days((built[d] for d in missing), stamp)
+                occupancy.update(built)
+            for d in window:
+                yield occupancy[d]
+
+    async def _build_day_occupancy(
+        self,
+        club: Club,
+        courts: list[Court],
+        first_day: DateType,
+        last_day: DateType,
+    ) -> dict[DateType, DayOccupancy]:
+        """Load bookings, reservations and operating hours for the club-local
+        dates ``first_day..last_day`` and reduce each day to a ``DayOccupancy``
+        covering every court in ``courts``."""
+        built_at = time.time()  # before the reads, so a racing invalidation wins
+        tz = club_tz(club)
+        court_ids = [c.id for c in courts]
+        range_start_dt = local_walltime_to_utc(first_day, TimeType.min, tz)
+        range_end_dt = local_walltime_to_utc(last_day + timedelta(days=1), TimeType.min, tz)
+
+        # Bookings in range across our courts
+        bookings_result = await self.db.execute(
+            select(Booking)
+            .options(selectinload(Booking.players))
+            .where(
+                Booking.court_id.in_(court_ids),
+                Booking.status.in_([BookingStatus.pending, BookingStatus.confirmed]),
+                Booking.start_datetime < range_end_dt,
+                Booking.end_datetime > range_start_dt,
+            )
+        )
+        bookings: list[Booking] = list(bookings_result.scalars().unique().all())
+
+        # Calendar reservations in range (court-specific OR club-wide where court_id IS NULL)
+        reservations_result = await self.db.execute(
+            select(CalendarReservation).where(
+                CalendarReservation.club_id == club.id,
+                or_(
+                    CalendarReservation.court_id.in_(court_ids),
+                    CalendarReservation.court_id.is_(None),
+                ),
+                CalendarReservation.start_datetime < range_end_dt,
+                CalendarReservation.end_datetime > range_start_dt,
+            )
+        )
+        reservations: list[CalendarReservation] = list(reservations_result.scalars().all())
+
+        oh_result = await self.db.execute(
+            select(OperatingHours).where(
+                OperatingHours.club_id == club.id,
+                or_(OperatingHours.valid_from.is_(None), OperatingHours.valid_from <= last_day),
+                or_(OperatingHours.valid_until.is_(None), OperatingHours.valid_until >= first_day),
+            )
+        )
+        oh_records: list[OperatingHours] = list(oh_result.scalars().all())
+
+        # Sorted per-court interval indexes: each (slot, court) lookup below is a
+        # bisection instead of a scan, and club-wide reservations are merged into
+        # every court's index once rather than concatenated per slot.
+        occupancy: CourtOccupancy[Booking] = CourtOccupancy(
+            court_ids,
+            ((b.court_id, b.start_datetime, b.end_datetime, b) for b in bookings),
+            ((r.court_id, r.start_datetime, r.end_datetime) for r in reservations),
+        )
+
+        # A booking spanning several slots is summarised once, not once per slot.
+        markers: dict[uuid.UUID, OpenGameMarker] = {}
+
+        def _marker(booking: Booking) -> OpenGameMarker:
+            if booking.id not in markers:
+                markers[booking.id] = OpenGameMarker(
+                    booking_id=booking.id,
+                    court_id=booking.court_id,
+                    max_players=booking.max_players,
+                    accepted_count=sum(
+                        1 for p in booking.players if p.invite_status == InviteStatus.accepted
+                    ),
+                    active_user_ids=frozenset(
+                        p.user_id for p in booking.players if p.invite_status != InviteStatus.declined
+                    ),
+                    min_skill_level=booking.min_skill_level,
+                    max_skill_level=booking.max_skill_level,
+                    total_price=booking.total_price,
+                )
+            return markers[booking.id]
+
+        slot_duration = timedelta(minutes=club.booking_duration_minutes)
+        days: dict[DateType, DayOccupancy] = {}
+        current = first_day
+        while current <= last_day:
+            dow = current.weekday()
+            day_oh = [oh for oh in oh_records if oh.day_of_week == dow
+                      and (oh.valid_from is None or oh.valid_from <= current)
+                      and (oh.valid_until is None or oh.valid_until >= current)]
+            if not day_oh:
+                days[current] = DayOccupancy(
+                    club_id=club.id,
+                    day=current,
+                    slot_minutes=club.booking_duration_minutes,
+                    window_open=None,
+                    window_close=None,
+                    court_ids=tuple(court_ids),
+                    built_at=built_at,
+                )
+                current += timedelta(days=1)
+                continue
+            # Prefer seasonal (valid_from set) over the catch-all row
+            oh = next((h for h in day_oh if h.valid_from is not None), day_oh[0])
+            window_open = local_walltime_to_utc(current, oh.open_time, tz)
+            window_close = local_walltime_to_utc(current, oh.close_time, tz)
+
+            blocked = 0
+            booked = 0
+            open_games: dict[int, OpenGameMarker] = {}
+            bit = 0
+            slot_start = window_open
+            while slot_start + slot_duration <= window_close:
+                slot_end = slot_start + slot_duration
+                for court_id in court_ids:
+                    if occupancy.is_reserved(court_id, slot_start, slot_end):
+                        blocked |= 1 << bit
+                    booking = occupancy.booking_at(court_id, slot_start, slot_end)
+                    if booking is not None:
+                        booked |= 1 << bit
+                        if booking.is_open_game:
+                            open_games[bit] = _marker(booking)
+                    bit += 1
+                slot_start = slot_end
+
+            days[current] = DayOccupancy(
+                club_id=club.id,
+                day=current,
+                slot_minutes=club.booking_duration_minutes,
+                window_open=window_open,
+                window_close=window_close,
+                court_ids=tuple(court_ids),
+                blocked=blocked,
+                booked=booked,
+                open_games=open_games,
+                built_at=built_at,
+            )
+            current += timedelta(days=1)
+        return days
\ No newline at end of file
@@ -0,0 +1,195 @@
+"""
+Transactional outbox for domain events.
+
+Services used to commit and then publish inline, logging and dropping the
+event if Pub/Sub was unavailable. Instead they now add an ``EventOutbox`` row
+with ``enqueue_*`` before committing: the event is durable exactly when the
+change it announces is, and nothing is published on the request path.
+
+``relay_outbox`` drains pending rows for the outbox relay worker:
+
+  * Batches are claimed oldest-first with ``FOR UPDATE SKIP LOCKED``, so
+    overlapping relay runs never publish the same row concurrently.
+  * A batch is handed to the publisher in one go with ``publish_async`` —
+    which waits on the loop, never the thread, when too many messages are in
+    flight — and its acks are awaited together. Acked rows get ``sent_at``.
+    Failed rows keep ``sent_at`` NULL, record the error and are retried
+    (at-least-once) once ``available_at`` passes, with exponential backoff so
+    a row that keeps failing never sits at the head of every batch. After
+    ``OUTBOX_MAX_ATTEMPTS`` a row is given up (``dead_at``) and logged.
+  * Rows sharing an ``ordering_key`` are published with it, so Pub/Sub keeps
+    them in ``id`` order. A keyed row is held back while an older row with the
+    same key is still pending outside the batch (locked by another run, or
+    backing off), so a retry never overtakes its predecessor. A dead row no
+    longer blocks its key.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, func, select
+
+from app.core.config import get_settings
+from app.core.drain import drain_until
+from app.core.pubsub import EventPublisher, get_publisher
+from app.db.models.outbox import EventOutbox
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+_MAX_ERROR_LENGTH = 2000
+_MAX_RETRY_DELAY = timedelta(hours=1)
+
+
+def enqueue_event(
+    db, topic_name: str, event_type: str, payload: dict, ordering_key: Optional[str] = None
+) -> EventOutbox:
+    """Add an event to ``db``'s transaction; it is published after the commit."""
+    row = EventOutbox(
+        topic=topic_name,
+        event_type=event_type,
+        payload=payload,
+        ordering_key=ordering_key,
+        attempts=0,
+    )
+    db.add(row)
+    return row
+
+
+def enqueue_notification_event(
+    db, event_type: str, payload: dict, ordering_key: Optional[str] = None
+) -> EventOutbox:
+    return enqueue_event(db, settings.PUBSUB_TOPIC_NOTIFICATION_EVENTS, event_type, payload, ordering_key)
+
+
+async def relay_batch(db, batch_size: int, publisher: Optional[EventPublisher] = None) -> dict:
+    """Publish one batch of pending rows and commit the outcome."""
+    publisher = publisher or get_publisher()
+    result = await db.execute(
+        select(EventOutbox)
+        .where(
+            EventOutbox.sent_at.is_(None),
+            EventOutbox.dead_at.is_(None),
+            EventOutbox.available_at <= datetime.now(timezone.utc),
+        )
+        .order_by(EventOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    rows = list(result.scalars().all())
+    if not rows:
+        await db.commit()
+        return {"claimed": 0, "sent": 0, "failed": 0, "deferred": 0}
+
+    ready = await _in_key_order(db, rows)
+    acks = []
+    for row in ready:
+        try:
+            acks.append(await publisher.publish_async(
+                row.topic, row.event_type, row.payload, row.ordering_key or "",
+            ))
+        except Exception as exc:  # noqa: BLE001 - e.g. backpressure; retried next pass
+            acks.append(exc)
+    outcomes = await asyncio.gather(
+        *(_ack(a) for a in acks), return_exceptions=True,
+    )
+
+    now = datetime.now(timezone.utc)
+    sent = failed = 0
+    paused: set[tuple[str, str]] = set()
+    for row, outcome in zip(ready, outcomes):
+        if isinstance(outcome, BaseException):
+            failed += 1
+            _record_failure(row, outcome, now)
+            if row.ordering_key:
+                paused.add((row.topic, row.ordering_key))
+        else:
+            sent += 1
+            row.sent_at = now
+    await db.commit()
+
+    for topic_name, ordering_key in paused:
+        publisher.resume(topic_name, ordering_key)
+    return {"claimed": len(rows), "sent": sent, "failed": failed, "deferred": len(rows) - len(ready)}
+
+
+async def relay_outbox(
+    session_factory,
+    batch_size: int,
+    run_seconds: float,
+    poll_seconds: float,
+    publisher: Optional[EventPublisher] = None,
+) -> dict:
+    """Relay batches until ``run_seconds`` elapse, polling while the outbox is empty."""
+    totals = {"batches": 0, "sent": 0, "failed": 0}
+
+    async def run_batch() -> bool:
+        async with session_factory() as db:
+            batch = await relay_batch(db, batch_size, publisher)
+        if batch["claimed"]:
+            totals["batches"] += 1
+            totals["sent"] += batch["sent"]
+            totals["failed"] += batch["failed"]
+        # Only a full batch that all went out suggests more is ready now.
+        return batch["claimed"] == batch_size and not batch["failed"] and not batch["deferred"]
+
+    await drain_until(asyncio.get_running_loop().time() + run_seconds, run_batch, poll_seconds)
+    async with session_factory() as db:
+        totals["pruned"] = await prune_sent(db, timedelta(days=settings.OUTBOX_RETENTION_DAYS))
+    return totals
+
+
+async def prune_sent(db, retention: timedelta) -> int:
+    """Delete rows published more than ``retention`` ago."""
+    cutoff = datetime.now(timezone.utc) - retention
+    result = await db.execute(delete(EventOutbox).where(EventOutbox.sent_at < cutoff))
+    await db.commit()
+    return result.rowcount or 0
+
+
+async def _in_key_order(db, rows: list[EventOutbox]) -> list[EventOutbox]:
+    """``rows`` minus keyed rows whose key has an older pending row outside the batch."""
+    keys = {row.ordering_key for row in rows if row.ordering_key}
+    if not keys:
+        return rows
+    result = await db.execute(
+        select(EventOutbox.ordering_key, func.min(EventOutbox.id))
+        .where(
+            EventOutbox.sent_at.is_(None),
+            EventOutbox.dead_at.is_(None),
+            EventOutbox.ordering_key.in_(keys),
+        )
+        .group_by(EventOutbox.ordering_key)
+    )
+    oldest = dict(result.all())
+    claimed = {row.id for row in rows}
+    blocked = {key for key, first_id in oldest.items() if first_id not in claimed}
+    return [row for row in rows if row.ordering_key not in blocked]
+
+
+def _record_failure(row: EventOutbox, exc: BaseException, now: datetime) -> None:
+    row.attempts += 1
+    row.last_error = str(exc)[:_MAX_ERROR_LENGTH] or type(exc).__name__
+    if row.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        row.dead_at = now
+        logger.error(
+            "outbox: publish failed id=%s event_type=%s %s times; giving up",
+            row.id, row.event_type, row.attempts, exc_info=exc,
+        )
+        return
+    delay = timedelta(seconds=settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (row.attempts - 1))
+    row.available_at = now + min(delay, _MAX_RETRY_DELAY)
+    logger.warning(
+        "outbox: publish failed id=%s event_type=%s attempts=%s",
+        row.id, row.event_type, row.attempts,
+    )
+
+
+async def _ack(ack_or_exc):
+    if isinstance(ack_or_exc, BaseException):
+        raise ack_or_exc
+    return await ack_or_exc
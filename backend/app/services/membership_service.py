@@ -6,6 +6,9 @@ Responsibilities:
   - Subscribe a player to a plan (Stripe Subscription + local record)
   - Cancel at period end (player-initiated via UI)
   - Handle Stripe subscription lifecycle webhooks (renewal, cancellation, payment failure)
+  - Keep each plan's ``active_member_count`` in step with its active/trialing
+    subscriptions, so ``max_active_members`` is enforced by one conditional
+    UPDATE rather than a count of subscription rows
 """
 import logging
 from datetime import datetime, timezone
@@ -14,11 +17,13 @@ from typing import Optional
 
 import stripe
 from fastapi import HTTPException, status
+from sqlalchemy import func, or_
 from sqlalchemy import select as sa_select
+from sqlalchemy import update as sa_update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
-from app.core.pubsub import publish_notification_event
+from app.core.stripe_clients import configure_platform_stripe
 from app.db.models.club import Club
 from app.db.models.membership import (
     CreditType,
@@ -28,12 +33,12 @@ from app.db.models.membership import (
     MembershipSubscription,
 )
 from app.db.models.user import User
+from app.services.event_outbox import enqueue_notification_event
 
 logger = logging.getLogger(__name__)
 
 settings = get_settings()
-stripe.api_key = settings.STRIPE_SECRET_KEY
-stripe.api_version = settings.STRIPE_API_VERSION
+configure_platform_stripe()
 
 
 def _to_dict(obj) -> dict:
@@ -65,11 +70,108 @@ def _stripe_status_to_local(stripe_status: str) -> MembershipStatus:
     }.get(stripe_status, MembershipStatus.active)
 
 
+# Statuses that occupy one of a plan's max_active_members seats.
+_SEAT_STATUSES = (MembershipStatus.active, MembershipStatus.trialing)
+
+_PLAN_FULL = "This membership plan is at full capacity"
+
+
+def _holds_seat(status: MembershipStatus) -> bool:
+    return status in _SEAT_STATUSES
+
+
+def _ensure_capacity(plan: MembershipPlan) -> None:
+    """Fast 409 from the plan's loaded count. Not a reservation — subscribe and
+    upgrade still claim the seat atomically with ``_claim_seat``."""
+    if plan.max_active_members is not None and plan.active_member_count >= plan.max_active_members:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=_PLAN_FULL)
+
+
+async def adjust_active_member_count(db: AsyncSession, plan_id, delta: int) -> None:
+    """
+    Move a plan's ``active_member_count`` by ``delta`` with no capacity check.
+    For seats that are already owed — Stripe status changes, the free default
+    plan, a scheduled downgrade landing — and for releases. Never goes below 0.
+    """
+    await db.execute(
+        sa_update(MembershipPlan)
+        .where(MembershipPlan.id == plan_id)
+        .values(active_member_count=func.greatest(MembershipPlan.active_member_count + delta, 0))
+        .execution_options(synchronize_session="fetch")
+    )
+
+
 class MembershipService:
 
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    # -----------------------------------------------------------------------
+    # Plan seats (active_member_count)
+    # -----------------------------------------------------------------------
+
+    async def _claim_seat(self, plan: MembershipPlan) -> bool:
+        """
+        Take one of ``plan``'s seats; False when it is full. The cap is checked
+        inside the UPDATE, so concurrent sign-ups serialize on the plan row
+        until commit and the count can never pass ``max_active_members``.
+        """
+        result = await self.db.execute(
+            sa_update(MembershipPlan)
+            .where(
+                MembershipPlan.id == plan.id,
+                or_(
+                    MembershipPlan.max_active_members.is_(None),
+                    MembershipPlan.active_member_count < MembershipPlan.max_active_members,
+                ),
+            )
+            .values(active_member_count=MembershipPlan.active_member_count + 1)
+            .returning(MembershipPlan.active_member_count)
+            .execution_options(synchronize_session="fetch")
+        )
+        return result.first() is not None
+
+    async def _sync_seat(self, plan_id, held: bool, holds: bool) -> None:
+        """Follow a status change Stripe has already made — no capacity check."""
+        if held != holds:
+            await adjust_active_member_count(self.db, plan_id, 1 if holds else -1)
+
+    async def reconcile_active_member_counts(self) -> dict:
+        """
+        Re-count every plan's active/trialing subscriptions and correct
+        ``active_member_count`` where it has drifted (a lost webhook, a manual
+        edit). The plan rows are locked first so no seat is claimed or released
+        between the count and the write. Commits.
+        """
+        await self.db.execute(
+            sa_select(MembershipPlan.id).order_by(MembershipPlan.id).with_for_update()
+        )
+        counted = (
+            sa_select(func.count(MembershipSubscription.id))
+            .where(
+                MembershipSubscription.plan_id == MembershipPlan.id,
+                MembershipSubscription.status.in_(_SEAT_STATUSES),
+            )
+            .correlate(MembershipPlan)
+            .scalar_subquery()
+        )
+        result = await self.db.execute(
+            sa_update(MembershipPlan)
+            .where(MembershipPlan.active_member_count != counted)
+            .values(active_member_count=counted)
+            .returning(MembershipPlan.id)
+            .execution_options(synchronize_session=False)
+        )
+        corrected = result.scalars().all()
+        await self.db.commit()
+
+        if corrected:
+            logger.warning(
+                "membership reconciliation corrected active_member_count on %s plan(s): %s",
+                len(corrected), ", ".join(str(plan_id) for plan_id in corrected),
+            )
+        return {"plans_corrected": len(corrected)}
+
     # -----------------------------------------------------------------------
     # Stripe Product + Price provisioning (lazy — called at first subscribe)
     # -----------------------------------------------------------------------
@@ -83,7 +185,7 @@ class MembershipService:
         if plan.stripe_price_id:
             return plan.stripe_price_id
 
-        product = stripe.Product.create(
+        product = await stripe.Product.create_async(
             name=plan.name,
             metadata={"plan_id": str(plan.id), "club_id": str(plan.club_id)},
         )
@@ -92,7 +194,7 @@ class MembershipService:
         price_pence = int(plan.price * 100)
         currency = (club.currency or "GBP").lower()
 
-        price = stripe.Price.create(
+        price = await stripe.Price.create_async(
             unit_amount=price_pence,
             currency=currency,
             recurring={"interval": interval},
@@ -129,14 +231,11 @@ class MembershipService:
         """
         # Guard: duplicate active subscription
         dup_result = await self.db.execute(
-            sa_select(MembershipSubscription).where(
+            sa_select(MembershipSubscription.id).where(
                 MembershipSubscription.user_id == user.id,
                 MembershipSubscription.club_id == club.id,
-                MembershipSubscription.status.in_([
-                    MembershipStatus.active,
-                    MembershipStatus.trialing,
-                ]),
-            )
+                MembershipSubscription.status.in_(_SEAT_STATUSES),
+            ).limit(1)
         )
         if dup_result.scalar_one_or_none():
             raise HTTPException(
@@ -144,22 +243,8 @@ class MembershipService:
                 detail="Player already has an active membership at this club",
             )
 
-        # Guard: enrollment cap
-        if plan.max_active_members is not None:
-            cap_result = await self.db.execute(
-                sa_select(MembershipSubscription).where(
-                    MembershipSubscription.plan_id == plan.id,
-                    MembershipSubscription.status.in_([
-                        MembershipStatus.active,
-                        MembershipStatus.trialing,
-                    ]),
-                )
-            )
-            if len(cap_result.scalars().all()) >= plan.max_active_members:
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail="This membership plan is at full capacity",
-                )
+        # Guard: enrollment cap (the seat itself is claimed after Stripe below)
+        _ensure_capacity(plan)
 
         # Stripe customer required
         if not user.stripe_customer_id:
@@ -202,7 +287,7 @@ class MembershipService:
             sub_kwargs["transfer_data"] = {"destination": club.stripe_connect_account_id}
 
         try:
-            stripe_sub = stripe.Subscription.create(**sub_kwargs)
+            stripe_sub = await stripe.Subscription.create_async(**sub_kwargs)
         except stripe.StripeError as exc:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -223,6 +308,19 @@ class MembershipService:
 
         local_status = _stripe_status_to_local(sub_dict["status"])
 
+        # Claim the seat only now so the plan row stays locked for the insert
+        # and commit, not for the Stripe round trip. Losing the last seat to a
+        # concurrent sign-up cancels the Stripe subscription just created.
+        if _holds_seat(local_status) and not await self._claim_seat(plan):
+            try:
+                await stripe.Subscription.cancel_async(sub_dict["id"])
+            except stripe.StripeError:
+                logger.exception(
+                    "failed to cancel Stripe subscription %s after plan %s filled up",
+                    sub_dict["id"], plan.id,
+                )
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=_PLAN_FULL)
+
         subscription = MembershipSubscription(
             user_id=user.id,
             plan_id=plan.id,
@@ -326,21 +424,7 @@ class MembershipService:
                 )
 
         # Capacity guard on the destination plan
-        if new_plan.max_active_members is not None:
-            cap_result = await self.db.execute(
-                sa_select(MembershipSubscription).where(
-                    MembershipSubscription.plan_id == new_plan.id,
-                    MembershipSubscription.status.in_([
-                        MembershipStatus.active,
-                        MembershipStatus.trialing,
-                    ]),
-                )
-            )
-            if len(cap_result.scalars().all()) >= new_plan.max_active_members:
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail="This membership plan is at full capacity",
-                )
+        _ensure_capacity(new_plan)
 
         if not user.stripe_customer_id:
             raise HTTPException(
@@ -357,6 +441,13 @@ class MembershipService:
 
         await self.provision_stripe_price(new_plan, club)
 
+        # Reserve the seat before touching Stripe: a Path B price swap invoices
+        # immediately and cannot be taken back if the plan turns out to be full.
+        if not await self._claim_seat(new_plan):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=_PLAN_FULL)
+        if current_subscription is not None and _holds_seat(current_subscription.status):
+            await adjust_active_member_count(self.db, current_subscription.plan_id, -1)
+
         now = datetime.now(timezone.utc)
         client_secret: Optional[str] = None
 
@@ -381,7 +472,7 @@ class MembershipService:
                 sub_kwargs["transfer_data"] = {"destination": club.stripe_connect_account_id}
 
             try:
-                stripe_sub = stripe.Subscription.create(**sub_kwargs)
+                stripe_sub = await stripe.Subscription.create_async(**sub_kwargs)
             except stripe.StripeError as exc:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -433,11 +524,11 @@ class MembershipService:
         else:
             # Path B — existing paid sub: swap the price on Stripe with immediate proration + cycle reset.
             try:
-                stripe_sub_obj = stripe.Subscription.retrieve(current_subscription.stripe_subscription_id)
+                stripe_sub_obj = await stripe.Subscription.retrieve_async(current_subscription.stripe_subscription_id)
                 stripe_sub_dict = _to_dict(stripe_sub_obj)
                 item_id = stripe_sub_dict["items"]["data"][0]["id"]
 
-                updated = stripe.Subscription.modify(
+                updated = await stripe.Subscription.modify_async(
                     current_subscription.stripe_subscription_id,
                     items=[{"id": item_id, "price": new_plan.stripe_price_id}],
                     proration_behavior="always_invoice",
@@ -492,23 +583,17 @@ class MembershipService:
 
             result_sub = current_subscription
 
+        await self.db.flush()  # assigns result_sub.id when the upgrade created a new row
+        enqueue_notification_event(self.db, "membership_upgraded", {
+            "user_id": str(user.id),
+            "club_id": str(club.id),
+            "subscription_id": str(result_sub.id),
+            "new_plan_id": str(new_plan.id),
+            "period_end": result_sub.current_period_end.isoformat(),
+        }, ordering_key=f"user:{user.id}")
         await self.db.commit()
         await self.db.refresh(result_sub)
 
-        try:
-            publish_notification_event("membership_upgraded", {
-                "user_id": str(user.id),
-                "club_id": str(club.id),
-                "subscription_id": str(result_sub.id),
-                "new_plan_id": str(new_plan.id),
-                "period_end": result_sub.current_period_end.isoformat(),
-            })
-        except Exception:
-            logger.exception(
-                "failed to publish membership_upgraded event subscription_id=%s user_id=%s",
-                result_sub.id, user.id,
-            )
-
         return {
             "subscription_id": result_sub.id,
             "stripe_subscription_id": result_sub.stripe_subscription_id,
@@ -570,25 +655,11 @@ class MembershipService:
                 detail="New plan price must be lower than current plan to downgrade",
             )
 
-        if new_plan.max_active_members is not None:
-            cap_result = await self.db.execute(
-                sa_select(MembershipSubscription).where(
-                    MembershipSubscription.plan_id == new_plan.id,
-                    MembershipSubscription.status.in_([
-                        MembershipStatus.active,
-                        MembershipStatus.trialing,
-                    ]),
-                )
-            )
-            if len(cap_result.scalars().all()) >= new_plan.max_active_members:
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail="This membership plan is at full capacity",
-                )
+        _ensure_capacity(new_plan)
 
         if current_subscription.stripe_subscription_id:
             try:
-                stripe.Subscription.modify(
+                await stripe.Subscription.modify_async(
                     current_subscription.stripe_subscription_id,
                     cancel_at_period_end=True,
                 )
@@ -601,23 +672,16 @@ class MembershipService:
         current_subscription.pending_plan_id = new_plan.id
         current_subscription.cancel_at_period_end = True
         self.db.add(current_subscription)
+        enqueue_notification_event(self.db, "membership_downgrade_scheduled", {
+            "user_id": str(user.id),
+            "club_id": str(club.id),
+            "subscription_id": str(current_subscription.id),
+            "new_plan_id": str(new_plan.id),
+            "effective_at": current_subscription.current_period_end.isoformat(),
+        }, ordering_key=f"user:{user.id}")
         await self.db.commit()
         await self.db.refresh(current_subscription)
 
-        try:
-            publish_notification_event("membership_downgrade_scheduled", {
-                "user_id": str(user.id),
-                "club_id": str(club.id),
-                "subscription_id": str(current_subscription.id),
-                "new_plan_id": str(new_plan.id),
-                "effective_at": current_subscription.current_period_end.isoformat(),
-            })
-        except Exception:
-            logger.exception(
-                "failed to publish membership_downgrade_scheduled event subscription_id=%s user_id=%s",
-                current_subscription.id, user.id,
-            )
-
         return current_subscription
 
     async def cancel_pending_downgrade(
@@ -638,7 +702,7 @@ class MembershipService:
 
         if subscription.stripe_subscription_id:
             try:
-                stripe.Subscription.modify(
+                await stripe.Subscription.modify_async(
                     subscription.stripe_subscription_id,
                     cancel_at_period_end=False,
                 )
@@ -668,8 +732,8 @@ class MembershipService:
 
         Returns the new subscription, or ``None`` if the target plan no
         longer exists. Errors talking to Stripe are surfaced — the caller
-        leaves ``expiring_sub`` in the cancelled state so the webhook can be
-        retried.
+        leaves ``expiring_sub`` in the cancelled state so the Stripe event
+        worker can retry the event.
         """
         target_plan = await self.db.get(MembershipPlan, expiring_sub.pending_plan_id)
         if target_plan is None:
@@ -727,7 +791,11 @@ class MembershipService:
             if club.stripe_connect_account_id:
                 sub_kwargs["transfer_data"] = {"destination": club.stripe_connect_account_id}
 
-            stripe_sub = stripe.Subscription.create(**sub_kwargs)
+            # The Stripe call is not rolled back with the transaction; a retried
+            # event gets the same subscription back rather than a second one.
+            stripe_sub = await stripe.Subscription.create_async(
+                **sub_kwargs, idempotency_key=f"membership-downgrade-{expiring_sub.id}",
+            )
             sub_dict = _to_dict(stripe_sub)
             period_start = datetime.fromtimestamp(sub_dict["current_period_start"], tz=timezone.utc)
             period_end = datetime.fromtimestamp(sub_dict["current_period_end"], tz=timezone.utc)
@@ -747,6 +815,10 @@ class MembershipService:
             self.db.add(new_sub)
             await self.db.flush()
 
+        # Capacity was checked when the downgrade was scheduled; the member is
+        # owed this seat now even if the plan has since filled.
+        await adjust_active_member_count(self.db, target_plan.id, 1)
+
         if target_plan.booking_credits_per_period > 0:
             self.db.add(MembershipCreditLog(
                 subscription_id=new_sub.id,
@@ -783,7 +855,7 @@ class MembershipService:
 
         if subscription.stripe_subscription_id:
             try:
-                stripe.Subscription.modify(
+                await stripe.Subscription.modify_async(
                     subscription.stripe_subscription_id,
                     cancel_at_period_end=True,
                 )
@@ -796,22 +868,15 @@ class MembershipService:
         subscription.cancel_at_period_end = True
         subscription.cancelled_at = datetime.now(timezone.utc)
         self.db.add(subscription)
+        enqueue_notification_event(self.db, "membership_cancelled", {
+            "user_id": str(subscription.user_id),
+            "club_id": str(subscription.club_id),
+            "subscription_id": str(subscription.id),
+            "effective_end": subscription.current_period_end.isoformat(),
+        }, ordering_key=f"user:{subscription.user_id}")
         await self.db.commit()
         await self.db.refresh(subscription)
 
-        try:
-            publish_notification_event("membership_cancelled", {
-                "user_id": str(subscription.user_id),
-                "club_id": str(subscription.club_id),
-                "subscription_id": str(subscription.id),
-                "effective_end": subscription.current_period_end.isoformat(),
-            })
-        except Exception:
-            logger.exception(
-                "failed to publish membership_cancelled event subscription_id=%s user_id=%s",
-                subscription.id, subscription.user_id,
-            )
-
         return subscription
 
     # -----------------------------------------------------------------------
@@ -840,7 +905,7 @@ class MembershipService:
         )
         for sub in result.scalars().all():
             try:
-                stripe.Subscription.modify(
+                await stripe.Subscription.modify_async(
                     sub.stripe_subscription_id,
                     default_payment_method=payment_method_id,
                 )
@@ -862,8 +927,10 @@ class MembershipService:
         if not sub:
             return
 
+        held = _holds_seat(sub.status)
         sub.status = _stripe_status_to_local(stripe_sub["status"])
         sub.cancel_at_period_end = _sget(stripe_sub, "cancel_at_period_end", False)
+        await self._sync_seat(sub.plan_id, held, _holds_seat(sub.status))
 
         # Period fields are not guaranteed in every update event (e.g. cancel_at_period_end
         # toggle). Fall back to a Stripe retrieve if either is absent.
@@ -871,7 +938,7 @@ class MembershipService:
         period_end = _sget(stripe_sub, "current_period_end")
         if period_start is None or period_end is None:
             try:
-                fresh = _to_dict(stripe.Subscription.retrieve(stripe_sub["id"]))
+                fresh = _to_dict(await stripe.Subscription.retrieve_async(stripe_sub["id"]))
                 period_start = fresh.get("current_period_start", period_start)
                 period_end = fresh.get("current_period_end", period_end)
             except stripe.StripeError:
@@ -901,6 +968,7 @@ class MembershipService:
             return
 
         now = datetime.now(timezone.utc)
+        await self._sync_seat(sub.plan_id, _holds_seat(sub.status), False)
 
         if sub.pending_plan_id is not None:
             # Cycle-boundary downgrade — replace the sub rather than just marking cancelled.
@@ -908,20 +976,15 @@ class MembershipService:
             sub.cancelled_at = sub.cancelled_at or now
             self.db.add(sub)
             new_sub = await self._apply_pending_downgrade(sub)
-            await self.db.commit()
             if new_sub is not None:
-                try:
-                    publish_notification_event("membership_downgrade_applied", {
-                        "user_id": str(new_sub.user_id),
-                        "club_id": str(new_sub.club_id),
-                        "subscription_id": str(new_sub.id),
-                        "new_plan_id": str(new_sub.plan_id),
-                    })
-                except Exception:
-                    logger.exception(
-                        "failed to publish membership_downgrade_applied event subscription_id=%s",
-                        new_sub.id,
-                    )
+                await self.db.flush()  # assigns new_sub.id
+                enqueue_notification_event(self.db, "membership_downgrade_applied", {
+                    "user_id": str(new_sub.user_id),
+                    "club_id": str(new_sub.club_id),
+                    "subscription_id": str(new_sub.id),
+                    "new_plan_id": str(new_sub.plan_id),
+                }, ordering_key=f"user:{new_sub.user_id}")
+            await self.db.commit()
             return
 
         sub.status = MembershipStatus.cancelled
@@ -951,12 +1014,14 @@ class MembershipService:
 
         now = datetime.now(timezone.utc)
         billing_reason = _sget(invoice, "billing_reason", "")
+        # Both branches below (re)activate the subscription.
+        await self._sync_seat(sub.plan_id, _holds_seat(sub.status), True)
 
         if billing_reason == "subscription_cycle":
             # Renewal — fetch fresh period dates from Stripe and reset credits.
             # Retrieve returns a direct API StripeObject so _to_dict() is safe here.
             try:
-                stripe_sub = _to_dict(stripe.Subscription.retrieve(stripe_sub_id))
+                stripe_sub = _to_dict(await stripe.Subscription.retrieve_async(stripe_sub_id))
                 sub.current_period_start = datetime.fromtimestamp(
                     stripe_sub["current_period_start"], tz=timezone.utc
                 )
@@ -986,23 +1051,16 @@ class MembershipService:
             sub.status = MembershipStatus.active
             self.db.add(sub)
 
+        enqueue_notification_event(self.db, "membership_renewed", {
+            "user_id": str(sub.user_id),
+            "club_id": str(sub.club_id),
+            "subscription_id": str(sub.id),
+            "amount": str(Decimal(str(_sget(invoice, "amount_paid", 0))) / 100),
+            "currency": _sget(invoice, "currency", "gbp"),
+            "period_end": sub.current_period_end.isoformat(),
+        }, ordering_key=f"user:{sub.user_id}")
         await self.db.commit()
 
-        try:
-            publish_notification_event("membership_renewed", {
-                "user_id": str(sub.user_id),
-                "club_id": str(sub.club_id),
-                "subscription_id": str(sub.id),
-                "amount": str(Decimal(str(_sget(invoice, "amount_paid", 0))) / 100),
-                "currency": _sget(invoice, "currency", "gbp"),
-                "period_end": sub.current_period_end.isoformat(),
-            })
-        except Exception:
-            logger.exception(
-                "failed to publish membership_renewed event subscription_id=%s user_id=%s",
-                sub.id, sub.user_id,
-            )
-
     async def handle_invoice_payment_failed(self, event: dict) -> None:
         """
         invoice.payment_failed — notify the player to update their payment method.
@@ -1017,16 +1075,11 @@ class MembershipService:
         if not sub:
             return
 
-        try:
-            publish_notification_event("membership_payment_failed", {
-                "user_id": str(sub.user_id),
-                "club_id": str(sub.club_id),
-                "subscription_id": str(sub.id),
-                "amount": str(Decimal(str(_sget(invoice, "amount_due", 0))) / 100),
-                "currency": _sget(invoice, "currency", "gbp"),
-            })
-        except Exception:
-            logger.exception(
-                "failed to publish membership_payment_failed event subscription_id=%s user_id=%s",
-                sub.id, sub.user_id,
-            )
+        enqueue_notification_event(self.db, "membership_payment_failed", {
+            "user_id": str(sub.user_id),
+            "club_id": str(sub.club_id),
+            "subscription_id": str(sub.id),
+            "amount": str(Decimal(str(_sget(invoice, "amount_due", 0))) / 100),
+            "currency": _sget(invoice, "currency", "gbp"),
+        }, ordering_key=f"user:{sub.user_id}")
+        await self.db.commit()
@@ -9,6 +9,7 @@ Responsibilities:
   - Reconcile Stripe payouts
   - Apply discounts / promo codes
 """
+import asyncio
 import hashlib
 import logging
 import uuid
@@ -21,7 +22,7 @@ from sqlalchemy import select as sa_select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
-from app.core.pubsub import publish_notification_event
+from app.core.stripe_clients import configure_platform_stripe
 from app.db.models.booking import Booking, BookingPlayer, BookingStatus, InviteStatus, PaymentStatus
 from app.db.models.club import Club
 from app.db.models.payment import Payment, PlatformFee, PlatformFeeType, Payout, PayoutStatus, PayoutReconStatus
@@ -30,13 +31,14 @@ from app.db.models.payment import PaymentState
 from app.db.models.tenant import SubscriptionPlan, Tenant
 from app.db.models.user import User
 from app.db.models.wallet import Wallet, WalletClubDebt, WalletTransaction, WalletTransactionSource, WalletTransactionType
+from app.services.availability_cache import mark_availability_dirty
 from app.services.booking_confirmation import should_confirm
+from app.services.event_outbox import enqueue_notification_event
 
 logger = logging.getLogger(__name__)
 
 settings = get_settings()
-stripe.api_key = settings.STRIPE_SECRET_KEY
-stripe.api_version = settings.STRIPE_API_VERSION
+configure_platform_stripe()
 
 
 class PaymentService:
@@ -52,7 +54,7 @@ class PaymentService:
         """Return the Stripe customer ID for the user, creating one if absent."""
         if user.stripe_customer_id:
             return user.stripe_customer_id
-        customer = stripe.Customer.create(
+        customer = await stripe.Customer.create_async(
             email=user.email,
             metadata={"user_id": str(user.id)},
         )
@@ -73,7 +75,7 @@ class PaymentService:
         Returns { client_secret, setup_intent_id }.
         """
         customer_id = await self._ensure_stripe_customer(user)
-        setup_intent = stripe.SetupIntent.create(
+        setup_intent = await stripe.SetupIntent.create_async(
             customer=customer_id,
             usage="off_session",
             payment_method_types=["card"],
@@ -97,14 +99,14 @@ class PaymentService:
         """
         customer_id = await self._ensure_stripe_customer(user)
         try:
-            pm = stripe.PaymentMethod.retrieve(payment_method_id)
+            pm = await stripe.PaymentMethod.retrieve_async(payment_method_id)
             if pm.customer != customer_id:
                 if pm.customer:
                     raise HTTPException(
                         status_code=status.HTTP_400_BAD_REQUEST,
                         detail="Payment method belongs to a different customer",
                     )
-                pm = stripe.PaymentMethod.attach(payment_method_id, customer=customer_id)
+                pm = await stripe.PaymentMethod.attach_async(payment_method_id, customer=customer_id)
         except stripe.StripeError as exc:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -118,7 +120,7 @@ class PaymentService:
             )
 
         if set_as_default:
-            stripe.Customer.modify(
+            await stripe.Customer.modify_async(
                 customer_id,
                 invoice_settings={"default_payment_method": payment_method_id},
             )
@@ -142,7 +144,7 @@ class PaymentService:
         Returns them from Stripe with is_default flagged.
         """
         customer_id = await self._ensure_stripe_customer(user)
-        methods = stripe.PaymentMethod.list(customer=customer_id, type="card")
+        methods = await stripe.PaymentMethod.list_async(customer=customer_id, type="card")
         return [
             {
                 "id": pm.id,
@@ -166,13 +168,13 @@ class PaymentService:
                 detail="Payment method not found",
             )
         try:
-            pm = stripe.PaymentMethod.retrieve(payment_method_id)
+            pm = await stripe.PaymentMethod.retrieve_async(payment_method_id)
             if pm.customer != user.stripe_customer_id:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Payment method not found",
                 )
-            stripe.PaymentMethod.detach(payment_method_id)
+            await stripe.PaymentMethod.detach_async(payment_method_id)
         except stripe.StripeError as exc:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -197,7 +199,7 @@ class PaymentService:
                 detail="Payment method not found",
             )
         try:
-            pm = stripe.PaymentMethod.retrieve(payment_method_id)
+            pm = await stripe.PaymentMethod.retrieve_async(payment_method_id)
             if pm.customer != user.stripe_customer_id:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -209,7 +211,7 @@ class PaymentService:
                 detail=str(exc.user_message or exc),
             )
 
-        stripe.Customer.modify(
+        await stripe.Customer.modify_async(
             user.stripe_customer_id,
             invoice_settings={"default_payment_method": payment_method_id},
         )
@@ -310,7 +312,7 @@ class PaymentService:
                     pi_kwargs["application_fee_amount"] = fee_pence
 
         try:
-            pi = stripe.PaymentIntent.create(**pi_kwargs)
+            pi = await stripe.PaymentIntent.create_async(**pi_kwargs)
         except stripe.StripeError as exc:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -358,21 +360,14 @@ class PaymentService:
             balance_after=new_balance,
             reference=pi["id"],
         ))
-        await self.db.commit()
-
         if user_id_str:
-            try:
-                publish_notification_event("wallet_topped_up", {
-                    "user_id": user_id_str,
-                    "amount": str(amount),
-                    "balance": str(new_balance),
-                    "currency": wallet.currency,
-                })
-            except Exception:
-                logger.exception(
-                    "failed to publish wallet_topped_up event user_id=%s",
-                    user_id_str,
-                )
+            enqueue_notification_event(self.db, "wallet_topped_up", {
+                "user_id": user_id_str,
+                "amount": str(amount),
+                "balance": str(new_balance),
+                "currency": wallet.currency,
+            }, ordering_key=f"user:{user_id_str}")
+        await self.db.commit()
 
     async def confirm_payment(self, stripe_event: dict) -> None:
         """
@@ -381,7 +376,9 @@ class PaymentService:
           2. Set Payment.state = succeeded; capture charge ID and receipt URL
           3. Set BookingPlayer.payment_status = paid
           4. If all players paid → set Booking.status = confirmed
-          5. Publish send_payment_receipt → notification-events
+          5. Record the platform fee and enqueue send_payment_receipt
+        All in one commit, so a failure part-way leaves nothing applied and the
+        retried event (``payment.state`` still pending) runs every step again.
         """
         pi = stripe_event["data"]["object"]
         pi_id = pi["id"]
@@ -409,7 +406,7 @@ class PaymentService:
 
         if payment.stripe_charge_id:
             try:
-                charge = stripe.Charge.retrieve(payment.stripe_charge_id)
+                charge = await stripe.Charge.retrieve_async(payment.stripe_charge_id)
                 payment.stripe_receipt_url = charge.receipt_url
                 # Destination-charge Connect flow: walk Charge → Transfer to
                 # capture the connected-account-side payment id (py_xxx) so
@@ -417,7 +414,7 @@ class PaymentService:
                 transfer_id = getattr(charge, "transfer", None)
                 if transfer_id:
                     try:
-                        transfer = stripe.Transfer.retrieve(transfer_id)
+                        transfer = await stripe.Transfer.retrieve_async(transfer_id)
                         payment.stripe_destination_payment_id = getattr(transfer, "destination_payment", None)
                     except stripe.StripeError:
                         pass  # best-effort; payout reconciliation can still backfill
@@ -452,8 +449,6 @@ class PaymentService:
                 booking.status = BookingStatus.confirmed
             self.db.add(booking)
 
-        await self.db.commit()
-
         # Record SmashBook's platform fee at the rate frozen from the plan at transaction time
         user = await self.db.get(User, payment.user_id)
         tenant = await self.db.get(Tenant, user.tenant_id) if user else None
@@ -468,24 +463,18 @@ class PaymentService:
                 pct_applied=plan.booking_fee_pct,
                 created_at=datetime.now(timezone.utc),
             ))
-            await self.db.commit()
 
-        try:
-            publish_notification_event("send_payment_receipt", {
-                "user_id": str(payment.user_id),
-                "email": user.email if user else None,
-                "full_name": user.full_name if user else None,
-                "booking_id": str(payment.booking_id),
-                "payment_id": str(payment.id),
-                "amount": str(payment.amount),
-                "currency": payment.currency,
-                "receipt_url": payment.stripe_receipt_url,
-            })
-        except Exception:
-            logger.exception(
-                "failed to publish send_payment_receipt event payment_id=%s user_id=%s",
-                payment.id, payment.user_id,
-            )
+        enqueue_notification_event(self.db, "send_payment_receipt", {
+            "user_id": str(payment.user_id),
+            "email": user.email if user else None,
+            "full_name": user.full_name if user else None,
+            "booking_id": str(payment.booking_id),
+            "payment_id": str(payment.id),
+            "amount": str(payment.amount),
+            "currency": payment.currency,
+            "receipt_url": payment.stripe_receipt_url,
+        }, ordering_key=f"user:{payment.user_id}")
+        await self.db.commit()
 
     async def handle_payment_failed(self, stripe_event: dict) -> None:
         """
@@ -527,34 +516,20 @@ class PaymentService:
         if booking and failed_bp and failed_bp.payment_status != PaymentStatus.paid:
             await self._free_player_slot(booking, failed_bp)
 
+        enqueue_notification_event(self.db, "payment_failed_player", {
+            "user_id": str(payment.user_id),
+            "booking_id": str(payment.booking_id),
+            "payment_id": str(payment.id),
+            "failure_reason": failure_reason,
+        }, ordering_key=f"user:{payment.user_id}")
+        enqueue_notification_event(self.db, "payment_failed_staff", {
+            "booking_id": str(payment.booking_id),
+            "user_id": str(payment.user_id),
+            "payment_id": str(payment.id),
+            "failure_reason": failure_reason,
+        })
         await self.db.commit()
 
-        try:
-            publish_notification_event("payment_failed_player", {
-                "user_id": str(payment.user_id),
-                "booking_id": str(payment.booking_id),
-                "payment_id": str(payment.id),
-                "failure_reason": failure_reason,
-            })
-        except Exception:
-            logger.exception(
-                "failed to publish payment_failed_player event payment_id=%s user_id=%s",
-                payment.id, payment.user_id,
-            )
-
-        try:
-            publish_notification_event("payment_failed_staff", {
-                "booking_id": str(payment.booking_id),
-                "user_id": str(payment.user_id),
-                "payment_id": str(payment.id),
-                "failure_reason": failure_reason,
-            })
-        except Exception:
-            logger.exception(
-                "failed to publish payment_failed_staff event payment_id=%s booking_id=%s",
-                payment.id, payment.booking_id,
-            )
-
     async def _free_player_slot(self, booking: Booking, bp: BookingPlayer) -> None:
         """Release one unpaid slot; cancel the booking if no paid player remains.
 
@@ -565,6 +540,7 @@ class PaymentService:
         bp.invite_status = InviteStatus.declined
         bp.payment_deadline = None
         self.db.add(bp)
+        mark_availability_dirty(self.db, booking.club_id, booking.start_datetime, booking.end_datetime)
 
         result = await self.db.execute(
             sa_select(BookingPlayer).where(BookingPlayer.booking_id == booking.id)
@@ -724,7 +700,7 @@ class PaymentService:
             )
 
         try:
-            pi = stripe.PaymentIntent.create(
+            pi = await stripe.PaymentIntent.create_async(
                 amount=amount_pence,
                 currency=wallet.currency.lower(),
                 customer=customer_id,
@@ -776,11 +752,11 @@ class PaymentService:
 
         if payment.stripe_payment_intent_id:
             try:
-                stripe.PaymentIntent.cancel(payment.stripe_payment_intent_id)
+                await stripe.PaymentIntent.cancel_async(payment.stripe_payment_intent_id)
             except stripe.InvalidRequestError:
                 # Likely in a non-cancellable state — fetch and decide.
                 try:
-                    pi = stripe.PaymentIntent.retrieve(payment.stripe_payment_intent_id)
+                    pi = await stripe.PaymentIntent.retrieve_async(payment.stripe_payment_intent_id)
                     if pi.status == "succeeded":
                         raise HTTPException(
                             status_code=status.HTTP_409_CONFLICT,
@@ -921,16 +897,11 @@ class PaymentService:
                 "payment_method": "wallet",
             }
 
-        await self.db.commit()
-
         if receipt_payload:
-            try:
-                publish_notification_event("send_payment_receipt", receipt_payload)
-            except Exception:
-                logger.exception(
-                    "failed to publish send_payment_receipt event (wallet) payment_id=%s user_id=%s",
-                    payment.id, user_id,
-                )
+            enqueue_notification_event(
+                self.db, "send_payment_receipt", receipt_payload, ordering_key=f"user:{user_id}",
+            )
+        await self.db.commit()
 
         return {"balance_after": wallet.balance, "transaction_id": txn.id}
 
@@ -939,6 +910,11 @@ class PaymentService:
         Transfer unsettled wallet-debit funds to each club's Stripe Connect account.
         Groups by club, issues one Stripe Transfer per club, then stamps settled_at.
         Clubs without a stripe_connect_account_id are skipped (logged).
+
+        Transfers for different clubs are issued concurrently, at most
+        `STRIPE_CLUB_CONCURRENCY` at a time. Debts of clubs whose transfer
+        succeeded are stamped and committed even if another club's failed;
+        the failure is then raised as a 502.
         Returns {settled_count, total_transferred, skipped_count}.
         """
         result = await self.db.execute(
@@ -952,10 +928,8 @@ class PaymentService:
         for debt, club in rows:
             by_club.setdefault(debt.club_id, []).append((debt, club))
 
-        settled_count = 0
         skipped_count = 0
-        total_transferred = Decimal("0")
-
+        payable: list[tuple[uuid.UUID, list, Decimal]] = []
         for club_id, items in by_club.items():
             _, club = items[0]
             if not club.stripe_connect_account_id:
@@ -963,11 +937,15 @@ class PaymentService:
                 continue
 
             net = sum(d.amount - d.platform_fee_amount for d, _ in items)
-            net_pence = int(net * 100)
-            if net_pence <= 0:
+            if int(net * 100) <= 0:
                 skipped_count += len(items)
                 continue
+            payable.append((club_id, items, net))
+
+        slots = asyncio.Semaphore(settings.STRIPE_CLUB_CONCURRENCY)
 
+        async def transfer(club_id: uuid.UUID, items: list, net: Decimal):
+            _, club = items[0]
             # Deterministic idempotency key over the set of debts being settled.
             # If a prior run partially committed before raising (e.g. Stripe call
             # succeeded but DB commit was rolled back), this key lets Stripe
@@ -976,31 +954,44 @@ class PaymentService:
             idempotency_key = "settle-" + hashlib.sha256(
                 ",".join(debt_ids_sorted).encode()
             ).hexdigest()
-
-            try:
-                transfer = stripe.Transfer.create(
-                    amount=net_pence,
+            async with slots:
+                return await stripe.Transfer.create_async(
+                    amount=int(net * 100),
                     currency=club.currency.lower(),
                     destination=club.stripe_connect_account_id,
                     metadata={"club_id": str(club_id), "debt_count": len(items)},
                     idempotency_key=idempotency_key,
                 )
-            except stripe.StripeError as exc:
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail=f"Stripe transfer failed for club {club_id}: {exc.user_message or exc}",
-                )
 
-            now = datetime.now(timezone.utc)
+        outcomes = await asyncio.gather(
+            *(transfer(*entry) for entry in payable), return_exceptions=True,
+        )
+
+        settled_count = 0
+        total_transferred = Decimal("0")
+        failures: list[tuple[uuid.UUID, BaseException]] = []
+        now = datetime.now(timezone.utc)
+        for (club_id, items, net), outcome in zip(payable, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error("wallet settlement transfer failed for club %s: %s", club_id, outcome)
+                failures.append((club_id, outcome))
+                continue
             for debt, _ in items:
-                debt.stripe_transfer_id = transfer.id
+                debt.stripe_transfer_id = outcome.id
                 debt.settled_at = now
                 self.db.add(debt)
-
             settled_count += len(items)
             total_transferred += net
 
         await self.db.commit()
+        if failures:
+            club_id, exc = failures[0]
+            if not isinstance(exc, stripe.StripeError):
+                raise exc
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Stripe transfer failed for club {club_id}: {exc.user_message or exc}",
+            )
         return {
             "settled_count": settled_count,
             "total_transferred": total_transferred,
@@ -1052,37 +1043,56 @@ class PaymentService:
         """
         Platform-wide payout reconciliation sweep (cron entrypoint).
 
-        Iterates every club with a Stripe Connect account and re-reconciles its
-        payouts via `reconcile_stripe_payouts`. The safety net behind the
+        Re-reconciles the payouts of every club with a Stripe Connect account,
+        like `reconcile_stripe_payouts`. The safety net behind the
         real-time `payout.paid` webhook: catches payouts the webhook missed, or
         matched only `partial`ly because `stripe_destination_payment_id` failed
         its best-effort capture at confirm time.
 
+        Clubs run concurrently, at most `STRIPE_CLUB_CONCURRENCY` at a time, so
+        the sweep takes as long as its slowest clubs rather than the sum of all
+        their Stripe round-trips. The session cannot run statements
+        concurrently, so every DB section holds `db_lock`; Stripe calls overlap.
+
         Commits **per club** so one club's Stripe failure doesn't discard the
         reconciliations already done for others. Returns an aggregate summary.
         """
         result = await self.db.execute(
-            sa_select(Club.id).where(Club.stripe_connect_account_id.isnot(None))
+            sa_select(Club.id, Club.stripe_connect_account_id)
+            .where(Club.stripe_connect_account_id.isnot(None))
         )
-        club_ids = list(result.scalars().all())
+        clubs = result.all()
 
-        clubs_processed = 0
-        clubs_failed = 0
-        payouts_reconciled = 0
-        for club_id in club_ids:
-            try:
-                summaries = await self.reconcile_stripe_payouts(str(club_id))
-                await self.db.commit()
-                clubs_processed += 1
-                payouts_reconciled += len(summaries)
-            except Exception:
-                await self.db.rollback()
-                clubs_failed += 1
-                logger.exception("payout reconciliation failed for club %s", club_id)
+        db_lock = asyncio.Lock()
+        slots = asyncio.Semaphore(settings.STRIPE_CLUB_CONCURRENCY)
+
+        async def reconcile_club(club_id, account: str):
+            async with slots:
+                try:
+                    pending = await self._fetch_unmatched_payouts(account, db_lock)
+                    async with db_lock:
+                        try:
+                            summaries = [
+                                await self._record_paid_payout(po, account, str(club_id), txns)
+                                for po, txns in pending
+                            ]
+                            await self.db.commit()
+                        except Exception:
+                            await self.db.rollback()
+                            raise
+                    return summaries
+                except Exception:
+                    logger.exception("payout reconciliation failed for club %s", club_id)
+                    return None
+
+        outcomes = await asyncio.gather(
+            *(reconcile_club(club_id, account) for club_id, account in clubs)
+        )
+        reconciled = [summaries for summaries in outcomes if summaries is not None]
         return {
-            "clubs_processed": clubs_processed,
-            "clubs_failed": clubs_failed,
-            "payouts_reconciled": payouts_reconciled,
+            "clubs_processed": len(reconciled),
+            "clubs_failed": len(outcomes) - len(reconciled),
+            "payouts_reconciled": sum(len(summaries) for summaries in reconciled),
         }
 
     async def reconcile_stripe_payouts(self, club_id: str) -> list:
@@ -1092,6 +1102,7 @@ class PaymentService:
         Safety net for the best-effort `stripe_destination_payment_id` capture
         at confirm time: lists paid payouts from Stripe and (re)reconciles any
         that aren't already fully matched. Returns a per-payout summary.
+        Does NOT commit — the caller owns the transaction.
         """
         result = await self.db.execute(sa_select(Club).where(Club.id == club_id))
         club = result.scalar_one_or_none()
@@ -1099,16 +1110,39 @@ class PaymentService:
             return []
         account = club.stripe_connect_account_id
 
-        summaries: list[dict] = []
-        listing = stripe.Payout.list(stripe_account=account, status="paid", limit=100)
-        for po in listing.auto_paging_iter():
-            existing = await self._get_payout(po["id"])
-            if existing is not None and existing.reconciliation_status == PayoutReconStatus.matched:
-                continue
-            summaries.append(
-                await self._apply_paid_payout(po, account, str(club_id))
+        pending = await self._fetch_unmatched_payouts(account, asyncio.Lock())
+        return [
+            await self._record_paid_payout(po, account, str(club_id), txns)
+            for po, txns in pending
+        ]
+
+    async def _fetch_unmatched_payouts(self, account: str, db_lock: asyncio.Lock) -> list:
+        """
+        List the account's paid payouts that aren't fully matched yet, each
+        paired with its payment balance transactions. Only Stripe calls, plus
+        one read under `db_lock`; the transaction lists are fetched concurrently.
+        """
+        listing = await stripe.Payout.list_async(stripe_account=account, status="paid", limit=100)
+        # Plain dicts, like the webhook payload `_record_paid_payout` also takes;
+        # StripeObject has no `.get`.
+        payouts = [po.to_dict() async for po in listing.auto_paging_iter()]
+        if not payouts:
+            return []
+
+        async with db_lock:
+            result = await self.db.execute(
+                sa_select(Payout.stripe_payout_id).where(
+                    Payout.stripe_payout_id.in_([po["id"] for po in payouts]),
+                    Payout.reconciliation_status == PayoutReconStatus.matched,
+                )
             )
-        return summaries
+            matched = set(result.scalars().all())
+        pending = [po for po in payouts if po["id"] not in matched]
+
+        txn_lists = await asyncio.gather(
+            *(self._list_payout_txns(po["id"], account) for po in pending)
+        )
+        return list(zip(pending, txn_lists))
 
     async def handle_payout_paid(self, event: dict) -> None:
         """
@@ -1119,8 +1153,8 @@ class PaymentService:
         the connected-account destination payment id (py_xxx) on each balance
         transaction (type="payment") against Payment.stripe_destination_payment_id
         — not the platform-side ch_xxx, which never appears connect-side.
-        Raises stripe.StripeError on API failure so the webhook returns 500 and
-        Stripe retries automatically.
+        Raises stripe.StripeError on API failure so the Stripe event worker
+        rolls back and retries the event.
         """
         payout = event["data"]["object"]
         connect_account_id: str = event["account"]
@@ -1133,26 +1167,32 @@ class PaymentService:
             )
             return
 
-        await self._apply_paid_payout(payout, connect_account_id, str(club_id))
+        txns = await self._list_payout_txns(payout["id"], connect_account_id)
+        await self._record_paid_payout(payout, connect_account_id, str(club_id), txns)
         await self.db.commit()
 
-    async def _apply_paid_payout(self, payout, connect_account_id: str, club_id: str) -> dict:
-        """
-        Reconcile one paid payout: pull its payment balance transactions, match
-        them to Payment rows, compute gross/fee/matched/discrepancy, and upsert
-        the `payouts` row. Does NOT commit — the caller owns the transaction.
-        """
-        payout_id: str = payout["id"]
-
-        txns = stripe.BalanceTransaction.list(
+    @staticmethod
+    async def _list_payout_txns(payout_id: str, connect_account_id: str) -> list:
+        """A payout's payment balance transactions, all pages."""
+        txns = await stripe.BalanceTransaction.list_async(
             payout=payout_id,
             type="payment",
             stripe_account=connect_account_id,
         )
+        return [t async for t in txns.auto_paging_iter()]
+
+    async def _record_paid_payout(self, payout, connect_account_id: str, club_id: str, txns: list) -> dict:
+        """
+        Reconcile one paid payout: match its payment balance transactions to
+        Payment rows, compute gross/fee/matched/discrepancy, and upsert the
+        `payouts` row. Does NOT commit — the caller owns the transaction.
+        """
+        payout_id: str = payout["id"]
+
         destination_payment_ids: list[str] = []
         gross_minor = 0
         fee_minor = 0
-        for t in txns.auto_paging_iter():
+        for t in txns:
             src = getattr(t, "source", None)
             if src:
                 destination_payment_ids.append(src)
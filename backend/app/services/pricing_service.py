@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Optional
+from typing import Iterable, Optional, Sequence
 from zoneinfo import ZoneInfo
 import uuid
 
@@ -11,8 +11,8 @@ from sqlalchemy.orm import selectinload
 
 from app.core.timezones import utc_to_local
 from app.db.models.booking import BookingType, DiscountSource
-from app.db.models.club import PricingRule
 from app.db.models.membership import MembershipCreditLog, MembershipStatus, MembershipSubscription, CreditType
+from app.services.pricing_table import SlotPrice, load_pricing_table
 
 
 @dataclass
@@ -27,6 +27,16 @@ class PriceBreakdown:
     amount_due: Decimal
 
 
+@dataclass(frozen=True)
+class PriceRequest:
+    """One slot to price with calculate_many(); mirrors calculate()'s per-slot arguments."""
+
+    start_datetime: datetime
+    max_players: int
+    user_id: Optional[uuid.UUID] = None
+    booking_type: BookingType = BookingType.regular
+
+
 class PricingService:
     def __init__(self, db: AsyncSession) -> None:
         self.db = db
@@ -53,6 +63,9 @@ class PricingService:
           session_type equals `booking_type`. If the club has not configured a
           rule for this session type, we fall back to the `regular` rule for the
           same window. Only when even `regular` is unconfigured do we return None.
+          Rules outside their valid_from/valid_until season (on the slot's
+          club-local date) never match. The lookup goes through the club's
+          compiled PricingTable, shared with availability and analytics.
 
         Priority order (price overrides):
           1. incentive_price (flat promotional override on the pricing rule)
@@ -72,75 +85,55 @@ class PricingService:
         # silently misses rules for clubs offset from UTC (e.g. a Madrid 07:00
         # slot is 05:00Z and would fall outside a 06:00-local rule window).
         start_local = utc_to_local(start_datetime, ZoneInfo(club_timezone))
-        day_of_week = start_local.weekday()
-        slot_time = start_local.time()
-
-        result = await self.db.execute(
-            select(PricingRule)
-            .where(
-                PricingRule.club_id == club_id,
-                PricingRule.day_of_week == day_of_week,
-                PricingRule.is_active.is_(True),
-                PricingRule.start_time <= slot_time,
-                PricingRule.end_time > slot_time,
-                PricingRule.session_type.in_([booking_type, BookingType.regular]),
-            )
-            # Exact session_type match wins; the regular rule is the fallback.
-            .order_by((PricingRule.session_type == booking_type).desc())
-        )
-        rule = result.scalars().first()
-        if not rule:
+        slot = (await load_pricing_table(self.db, club_id, now)).lookup(start_local, booking_type)
+        if slot is None:
             return None
 
-        base_price = Decimal(str(rule.price_per_slot))
+        sub = None
+        if user_id is not None:
+            sub = await self._active_subscription(user_id, club_id, now)
+        return _price_breakdown(slot, sub, max_players)
 
-        if rule.incentive_price and (
-            rule.incentive_expires_at is None or rule.incentive_expires_at > now
-        ):
-            unit_price = Decimal(str(rule.incentive_price))
-        else:
-            unit_price = base_price
+    async def calculate_many(
+        self,
+        club_id: uuid.UUID,
+        club_timezone: str,
+        requests: Sequence[PriceRequest],
+    ) -> list[Optional[PriceBreakdown]]:
+        """
+        Price many slots/players for one club; result i is what calculate() returns for requests[i].
 
-        per_player_price = (unit_price / max_players).quantize(Decimal("0.01"))
+        Loads the club's compiled PricingTable once (one query, none when
+        cached) and the requesting users' active subscriptions in one more
+        (skipped when no user is involved), then prices every slot in memory.
+        Same session-type fallback and price priority as calculate();
+        credit availability is read once, so every slot of a user sees the same
+        credits_remaining — exactly as repeated calculate() calls would.
+        """
+        if not requests:
+            return []
+        now = datetime.now(tz=timezone.utc)
+        tz = ZoneInfo(club_timezone)
 
-        discount_amount = Decimal("0.00")
-        discount_source: Optional[DiscountSource] = None
-        membership_subscription_id: Optional[uuid.UUID] = None
-        credit_consumed = False
+        table = await load_pricing_table(self.db, club_id, now)
+        slots = [
+            table.lookup(utc_to_local(request.start_datetime, tz), request.booking_type)
+            for request in requests
+        ]
 
-        if user_id is not None:
-            sub = await self._active_subscription(user_id, club_id, now)
-            if sub is not None:
-                membership_subscription_id = sub.id
-                plan = sub.plan
-
-                has_credits = sub.credits_remaining > 0
-
-                if has_credits:
-                    discount_amount = per_player_price
-                    discount_source = DiscountSource.membership
-                    credit_consumed = True
-                elif plan.discount_pct is not None:
-                    discount_amount = (per_player_price * Decimal(str(plan.discount_pct)) / 100).quantize(
-                        Decimal("0.01")
-                    )
-                    discount_source = DiscountSource.membership
-                else:
-                    membership_subscription_id = None
-
-        total_price = unit_price
-        amount_due = (per_player_price - discount_amount).quantize(Decimal("0.01"))
-
-        return PriceBreakdown(
-            base_price=base_price,
-            unit_price=unit_price,
-            discount_amount=discount_amount,
-            discount_source=discount_source,
-            membership_subscription_id=membership_subscription_id,
-            credit_consumed=credit_consumed,
-            total_price=total_price,
-            amount_due=amount_due,
-        )
+        user_ids = {
+            request.user_id
+            for request, slot in zip(requests, slots)
+            if slot is not None and request.user_id is not None
+        }
+        subs = await self._active_subscriptions(user_ids, club_id, now) if user_ids else {}
+
+        return [
+            _price_breakdown(slot, subs.get(request.user_id), request.max_players)
+            if slot is not None
+            else None
+            for request, slot in zip(requests, slots)
+        ]
 
     async def consume_credit(
         self,
@@ -190,3 +183,75 @@ class PricingService:
             )
         )
         return result.scalar_one_or_none()
+
+    async def _active_subscriptions(
+        self,
+        user_ids: Iterable[uuid.UUID],
+        club_id: uuid.UUID,
+        now: datetime,
+    ) -> dict[uuid.UUID, MembershipSubscription]:
+        result = await self.db.execute(
+            select(MembershipSubscription)
+            .options(selectinload(MembershipSubscription.plan))
+            .where(
+                MembershipSubscription.user_id.in_(list(user_ids)),
+                MembershipSubscription.club_id == club_id,
+                MembershipSubscription.status.in_(
+                    [MembershipStatus.active, MembershipStatus.trialing]
+                ),
+                MembershipSubscription.current_period_end > now,
+            )
+        )
+        subs: dict[uuid.UUID, MembershipSubscription] = {}
+        for sub in result.scalars().all():
+            subs.setdefault(sub.user_id, sub)
+        return subs
+
+
+def _price_breakdown(
+    slot: SlotPrice,
+    sub: Optional[MembershipSubscription],
+    max_players: int,
+) -> PriceBreakdown:
+    """Apply membership credit or discount to a slot's (incentive-resolved) price."""
+    base_price = slot.base_price
+    unit_price = slot.price
+
+    per_player_price = (unit_price / max_players).quantize(Decimal("0.01"))
+
+    discount_amount = Decimal("0.00")
+    discount_source: Optional[DiscountSource] = None
+    membership_subscription_id: Optional[uuid.UUID] = None
+    credit_consumed = False
+
+    if sub is not None:
+        membership_subscription_id = sub.id
+        plan = sub.plan
+
+        has_credits = sub.credits_remaining > 0
+
+        if has_credits:
+            discount_amount = per_player_price
+            discount_source = DiscountSource.membership
+            credit_consumed = True
+        elif plan.discount_pct is not None:
+            discount_amount = (per_player_price * Decimal(str(plan.discount_pct)) / 100).quantize(
+                Decimal("0.01")
+            )
+            discount_source = DiscountSource.membership
+        else:
+            membership_subscription_id = None
+
+    total_price = unit_price
+    amount_due = (per_player_price - discount_amount).quantize(Decimal("0.01"))
+
+    return PriceBreakdown(
+        base_price=base_price,
+        unit_price=unit_price,
+        discount_amount=discount_amount,
+        discount_source=discount_source,
+        membership_subscription_id=membership_subscription_id,
+        credit_consumed=credit_consumed,
+        total_price=total_price,
+        amount_due=amount_due,
+    )
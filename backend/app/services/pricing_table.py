@@ -0,0 +1,295 @@
+"""
+Compiled pricing-rule lookup shared by quotes, availability and analytics.
+
+"Which PricingRule prices this club-local weekday + time?" used to be answered
+by separate linear scans in ``PricingService.calculate``, the availability
+overlay and the utilisation snapshot's ``revenue_potential`` — each with its
+own idea of seasons and incentives. A ``PricingTable`` answers it once per club:
+
+  * Seasons: every ``valid_from`` and every day after a ``valid_until`` is a
+    cut. Between two cuts the set of valid rules is constant, so each season
+    is compiled separately and a lookup bisects the date into its season.
+  * Within a season, per (weekday, session_type), the rules' start/end times
+    form a sorted breakpoint array. Each interval between breakpoints holds
+    the price of the rule covering it, so a lookup is one bisect. Where
+    windows overlap the latest-starting rule wins, and a seasonal rule beats
+    a catch-all one with the same start.
+  * Incentives are resolved when the table is built. The table records the
+    earliest incentive expiry still ahead and reports itself stale from then
+    on, so a cached table never serves a lapsed promotion.
+
+Session types fall back to ``regular`` exactly as ``PricingService.calculate``
+always has; availability and utilisation price the ``regular`` session.
+
+Cache
+-----
+Tables are cached per club in-process. ``PUT /clubs/{club_id}/pricing-rules``
+calls ``mark_pricing_rules_dirty``; once that session commits the club's
+version is bumped and its table dropped. A build whose reads began under an
+older version is not stored, nor is any build in the short window after an
+invalidation, so a lagging read replica cannot re-cache the old rules. Other
+instances see the change once their entry's TTL lapses.
+``PRICING_TABLE_CACHE_TTL_SECONDS = 0`` disables it.
+"""
+from __future__ import annotations
+
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date as DateType, datetime, time as TimeType, timedelta, timezone
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.models.booking import BookingType
+from app.db.models.club import PricingRule
+
+_DIRTY_INFO_KEY = "pricing_table_dirty"
+
+# After an invalidation, builds are not cached for this long (replica lag).
+INVALIDATION_SETTLE_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class SlotPrice:
+    """How one slot is priced by the rule covering it."""
+
+    base_price: Decimal         # rule.price_per_slot
+    price: Decimal              # incentive_price while the incentive runs, else base_price
+    label: Any                  # incentive_label (or label) while the incentive runs, else label
+
+
+@dataclass(frozen=True)
+class _DayTable:
+    breakpoints: tuple[TimeType, ...]
+    prices: tuple[Optional[SlotPrice], ...]    # prices[i] covers [breakpoints[i], breakpoints[i + 1])
+
+    def lookup(self, slot_time: TimeType) -> Optional[SlotPrice]:
+        i = bisect_right(self.breakpoints, slot_time) - 1
+        if 0 <= i < len(self.prices):
+            return self.prices[i]
+        return None
+
+
+_Season = dict[tuple[int, BookingType], _DayTable]
+
+
+class PricingTable:
+    def __init__(self, cuts: list[DateType], seasons: list[_Season], stale_at: Optional[datetime]) -> None:
+        self._cuts = cuts           # season i covers [cuts[i - 1], cuts[i])
+        self._seasons = seasons
+        self.stale_at = stale_at    # first incentive expiry after the build, if any
+
+    @classmethod
+    def compile(cls, rules: Iterable[Any], now: Optional[datetime] = None) -> "PricingTable":
+        """
+        Compile active ``rules`` of one club.
+
+        ``rules`` are ``PricingRule`` rows or lighter objects with the same
+        window attributes (``day_of_week``, ``start_time``, ``end_time``,
+        ``price_per_slot``); missing optional attributes mean a ``regular``
+        rule valid all year with no incentive.
+        """
+        now = now or datetime.now(tz=timezone.utc)
+        rules = [r for r in rules if r.start_time < r.end_time]
+
+        cut_set: set[DateType] = set()
+        for rule in rules:
+            valid_from = getattr(rule, "valid_from", None)
+            valid_until = getattr(rule, "valid_until", None)
+            if valid_from is not None:
+                cut_set.add(valid_from)
+            if valid_until is not None and valid_until < DateType.max:
+                cut_set.add(valid_until + timedelta(days=1))
+        cuts = sorted(cut_set)
+
+        prices: dict[int, SlotPrice] = {}
+        stale_at: Optional[datetime] = None
+        for rule in rules:
+            slot_price, expires_at = _resolve(rule, now)
+            prices[id(rule)] = slot_price
+            if expires_at is not None and (stale_at is None or expires_at < stale_at):
+                stale_at = expires_at
+
+        seasons = [
+            _compile_season([r for r in rules if _valid_on(r, first_day)], prices)
+            for first_day in [DateType.min, *cuts]
+        ]
+        return cls(cuts, seasons, stale_at)
+
+    def is_current(self, now: datetime) -> bool:
+        return self.stale_at is None or now < self.stale_at
+
+    def lookup(
+        self, start_local: datetime, session_type: BookingType = BookingType.regular
+    ) -> Optional[SlotPrice]:
+        """Price of the slot starting at club-local ``start_local``, or None if no rule covers it."""
+        season = self._seasons[bisect_right(self._cuts, start_local.date())]
+        day_of_week = start_local.weekday()
+        slot_time = start_local.time()
+        # Exact session_type match wins; the regular rule is the fallback.
+        for candidate in dict.fromkeys((session_type, BookingType.regular)):
+            day = season.get((day_of_week, candidate))
+            if day is not None:
+                price = day.lookup(slot_time)
+                if price is not None:
+                    return price
+        return None
+
+
+def _valid_on(rule: Any, on: DateType) -> bool:
+    valid_from = getattr(rule, "valid_from", None)
+    valid_until = getattr(rule, "valid_until", None)
+    return (valid_from is None or valid_from <= on) and (valid_until is None or valid_until >= on)
+
+
+def _resolve(rule: Any, now: datetime) -> tuple[SlotPrice, Optional[datetime]]:
+    """The rule's price at ``now`` and, while an incentive runs, when it lapses."""
+    base_price = Decimal(str(rule.price_per_slot))
+    label = getattr(rule, "label", None)
+    incentive_price = getattr(rule, "incentive_price", None)
+    expires_at = getattr(rule, "incentive_expires_at", None)
+    if incentive_price is not None and (expires_at is None or expires_at > now):
+        incentive_label = getattr(rule, "incentive_label", None) or label
+        return SlotPrice(base_price, Decimal(str(incentive_price)), incentive_label), expires_at
+    return SlotPrice(base_price, base_price, label), None
+
+
+def _precedence(rule: Any) -> tuple[TimeType, bool]:
+    # Latest start wins; on the same start a seasonal rule beats a catch-all.
+    seasonal = getattr(rule, "valid_from", None) is not None or getattr(rule, "valid_until", None) is not None
+    return rule.start_time, seasonal
+
+
+def _compile_season(rules: list[Any], prices: dict[int, SlotPrice]) -> _Season:
+    grouped: dict[tuple[int, BookingType], list[Any]] = {}
+    for rule in rules:
+        session_type = getattr(rule, "session_type", None) or BookingType.regular
+        grouped.setdefault((rule.day_of_week, session_type), []).append(rule)
+
+    season: _Season = {}
+    for key, group in grouped.items():
+        breakpoints = sorted({r.start_time for r in group} | {r.end_time for r in group})
+        interval_prices = []
+        for lo in breakpoints[:-1]:
+            covering = [r for r in group if r.start_time <= lo < r.end_time]
+            winner = max(covering, key=_precedence, default=None)
+            interval_prices.append(prices[id(winner)] if winner is not None else None)
+        season[key] = _DayTable(tuple(breakpoints), tuple(interval_prices))
+    return season
+
+
+# ---------------------------------------------------------------------------
+# Per-club cache
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class _Entry:
+    table: PricingTable
+    expires_at: float
+
+
+class PricingTableCache:
+    def __init__(self, ttl_seconds: int, max_entries: int) -> None:
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: OrderedDict[UUID, _Entry] = OrderedDict()
+        # club_id -> (version, monotonic time of the last invalidation)
+        self._versions: dict[UUID, tuple[int, float]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl > 0
+
+    def version(self, club_id: UUID) -> int:
+        """Read before loading the rules and hand back to ``put``."""
+        return self._versions.get(club_id, (0, 0.0))[0]
+
+    def get(self, club_id: UUID, now: datetime) -> Optional[PricingTable]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(club_id)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic() or not entry.table.is_current(now):
+            del self._entries[club_id]
+            return None
+        self._entries.move_to_end(club_id)
+        return entry.table
+
+    def put(self, club_id: UUID, table: PricingTable, version: int) -> None:
+        if not self.enabled:
+            return
+        current, invalidated_at = self._versions.get(club_id, (0, None))
+        if version != current:
+            return
+        if invalidated_at is not None and time.monotonic() - invalidated_at < INVALIDATION_SETTLE_SECONDS:
+            return
+        self._entries.pop(club_id, None)
+        self._entries[club_id] = _Entry(table, time.monotonic() + self._ttl)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_club(self, club_id: UUID) -> None:
+        self._versions[club_id] = (self.version(club_id) + 1, time.monotonic())
+        self._entries.pop(club_id, None)
+
+
+@lru_cache
+def get_pricing_table_cache() -> PricingTableCache:
+    settings = get_settings()
+    return PricingTableCache(settings.PRICING_TABLE_CACHE_TTL_SECONDS, settings.PRICING_TABLE_CACHE_MAX_ENTRIES)
+
+
+async def load_pricing_table(db, club_id: UUID, now: Optional[datetime] = None) -> PricingTable:
+    """The club's compiled table — cached, or built from its active rules in one query."""
+    now = now or datetime.now(tz=timezone.utc)
+    cache = get_pricing_table_cache()
+    table = cache.get(club_id, now)
+    if table is not None:
+        return table
+
+    version = cache.version(club_id)
+    result = await db.execute(
+        select(PricingRule).where(
+            PricingRule.club_id == club_id,
+            PricingRule.is_active.is_(True),
+        )
+    )
+    table = PricingTable.compile(result.scalars().all(), now)
+    cache.put(club_id, table, version)
+    return table
+
+
+# ---------------------------------------------------------------------------
+# Write-side hooks — invalidate after the writer's transaction commits
+# ---------------------------------------------------------------------------
+
+
+def mark_pricing_rules_dirty(session, club_id: UUID) -> None:
+    """Drop the club's compiled pricing table once ``session`` commits."""
+    if not get_pricing_table_cache().enabled:
+        return
+    session.info.setdefault(_DIRTY_INFO_KEY, set()).add(club_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    pending = session.info.pop(_DIRTY_INFO_KEY, None)
+    if not pending:
+        return
+    cache = get_pricing_table_cache()
+    for club_id in pending:
+        cache.invalidate_club(club_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session: Session) -> None:
+    session.info.pop(_DIRTY_INFO_KEY, None)
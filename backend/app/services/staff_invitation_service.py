@@ -29,7 +29,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.permissions import ROLE_RANK, Capability, can, max_grantable_rank
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
 from app.db.models.club import Club
 from app.db.models.staff import StaffProfile, StaffRole
 from app.db.models.staff_invitation import StaffInvitation, StaffInvitationStatus
@@ -206,7 +206,7 @@ class StaffInvitationService:
                 tenant_id=invitation.tenant_id,
                 email=invitation.email,
                 full_name=full_name,
-                hashed_password=get_password_hash(password),
+                hashed_password=await get_password_hash_async(password),
                 role=TenantUserRole.player,
                 email_verified_at=now,
             )
@@ -4,12 +4,18 @@ StorageService — Cloud Storage operations.
 Handles signed URL generation for:
   - Match video uploads (player-initiated)
   - Payment receipt PDF downloads (player-initiated)
-  - Report exports (staff-initiated)
+  - Report exports (staff-initiated), streamed in as they are built
 """
+import logging
+from abc import ABC, abstractmethod
 from datetime import timedelta
+from pathlib import Path
 from google.cloud import storage
 from app.core.config import get_settings
 
+logger = logging.getLogger(__name__)
+
+
 def _get_client():
     settings = get_settings()
     return storage.Client(project=settings.GCS_PROJECT_ID)
@@ -74,23 +80,92 @@ class StorageService:
         return f"gs://{settings.GCS_BUCKET_INVOICES}/{object_path}"
 
     @staticmethod
-    def upload_report_export(file_bytes: bytes, club_id: str,
-                              report_type: str, filename: str) -> str:
+    def open_report_export(club_id: str, report_type: str, filename: str,
+                           content_type: str) -> "ReportExportUpload":
         """
-        Uploads a report CSV/XLSX to the exports bucket.
-        Returns signed download URL valid for 1 hour.
-        Auto-deleted by GCS lifecycle rule after 7 days.
+        Opens a streaming upload for a report export in the exports bucket.
+        Object path: {club_id}/{report_type}/{filename}
+        Call write() as the file is produced, then close() for the signed
+        download URL (1 hour). Auto-deleted by GCS lifecycle rule after 7 days.
+        With EXPORT_STORAGE = "local" the file is written under
+        EXPORT_LOCAL_DIR instead.
         """
         settings = get_settings()
-        gcs_client = _get_client()
-        bucket = gcs_client.bucket(settings.GCS_BUCKET_EXPORTS)
         object_path = f"{club_id}/{report_type}/{filename}"
-        blob = bucket.blob(object_path)
-        content_type = "text/csv" if filename.endswith(".csv") else \
-                        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        blob.upload_from_string(file_bytes, content_type=content_type)
-        return blob.generate_signed_url(
+        if settings.EXPORT_STORAGE == "local":
+            return LocalReportExportUpload(Path(settings.EXPORT_LOCAL_DIR) / object_path)
+        bucket = _get_client().bucket(settings.GCS_BUCKET_EXPORTS)
+        return GcsReportExportUpload(
+            bucket.blob(object_path), content_type, settings.EXPORT_UPLOAD_CHUNK_BYTES
+        )
+
+
+class ReportExportUpload(ABC):
+    """A report export being written to storage. Blocking: call off the event loop."""
+
+    @abstractmethod
+    def write(self, data: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def close(self) -> str:
+        """Finish the upload; returns the download URL."""
+
+    @abstractmethod
+    def abort(self) -> None:
+        """Give up on a partial upload; nothing is published."""
+
+
+class GcsReportExportUpload(ReportExportUpload):
+    """
+    Resumable upload: data is buffered to chunk_size and each full chunk is
+    sent as it fills, so only one chunk is ever held in memory.
+    """
+
+    def __init__(self, blob, content_type: str, chunk_size: int):
+        self._blob = blob
+        self._writer = blob.open(
+            "wb", chunk_size=chunk_size, ignore_flush=True, content_type=content_type
+        )
+
+    def write(self, data: bytes) -> None:
+        self._writer.write(data)
+
+    def close(self) -> str:
+        self._writer.close()
+        return self._blob.generate_signed_url(
             version="v4",
             expiration=timedelta(hours=1),
             method="GET",
         )
+
+    def abort(self) -> None:
+        # The writer can only finish the session, so finish it and delete the
+        # partial object. Nobody holds a signed URL for it.
+        try:
+            self._writer.close()
+            self._blob.delete()
+        except Exception:  # noqa: BLE001 - the lifecycle rule removes it within 7 days
+            logger.warning("could not discard partial export %s", self._blob.name, exc_info=True)
+
+
+class LocalReportExportUpload(ReportExportUpload):
+    """Filesystem stand-in for the exports bucket; close() returns a file:// URL."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._partial = path.with_name(path.name + ".part")
+        self._file = open(self._partial, "wb")
+
+    def write(self, data: bytes) -> None:
+        self._file.write(data)
+
+    def close(self) -> str:
+        self._file.close()
+        self._partial.replace(self.path)
+        return self.path.resolve().as_uri()
+
+    def abort(self) -> None:
+        self._file.close()
+        self._partial.unlink(missing_ok=True)
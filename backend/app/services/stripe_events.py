@@ -0,0 +1,275 @@
+"""
+Inbox for Stripe webhook events.
+
+The webhook endpoint used to verify an event and run its handler inline, so
+a slow handler (a payout listing its balance transactions, a downgrade
+creating a Stripe subscription) held the request until Stripe timed out and
+redelivered, and the redelivery ran the handler again. Now the endpoint only
+verifies the event and calls ``record_event``:
+
+  * Rows are keyed by Stripe's event id and inserted with ON CONFLICT DO
+    NOTHING, so a redelivered event is a no-op.
+  * Only event types with a handler in ``HANDLERS`` are recorded.
+
+``process_events`` drains the inbox for the Stripe event worker:
+
+  * Batches are claimed oldest-first with ``FOR UPDATE SKIP LOCKED`` and
+    leased by pushing ``available_at`` forward, so overlapping runs never
+    process the same event.
+  * Each event concerns one Stripe object — its PaymentIntent, payout or
+    subscription (invoice events use their subscription) — stored as
+    ``ordering_key``. Events sharing a key run one at a time in ``seq`` order;
+    different keys run concurrently, each event in its own session. A keyed
+    event is held back while an older one with its key is still pending
+    outside the batch.
+  * ``processed_at`` is stamped in the handler's transaction. Every handler
+    in ``HANDLERS`` commits once, at its end, so the stamp commits together
+    with all of the handler's writes — keep it that way when adding one. A
+    handler that raises is rolled back and retried with exponential backoff,
+    and the later events for its key wait behind it. After
+    ``STRIPE_EVENT_MAX_ATTEMPTS`` the event is given up (``dead_at``) and
+    logged, which unblocks its key.
+  * Calls a handler makes to Stripe are not rolled back; a handler that
+    creates something there passes an idempotency key so a retry does not
+    create it twice.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import get_settings
+from app.core.drain import drain_until
+from app.db.models.stripe_event import StripeEvent
+from app.services.membership_service import MembershipService
+from app.services.payment_service import PaymentService
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+_MAX_ERROR_LENGTH = 2000
+_MAX_RETRY_DELAY = timedelta(hours=1)
+
+# event type → (service class, handler method)
+HANDLERS: dict[str, tuple[type, str]] = {
+    "payment_intent.succeeded": (PaymentService, "confirm_payment"),
+    "payment_intent.payment_failed": (PaymentService, "handle_payment_failed"),
+    "payout.paid": (PaymentService, "handle_payout_paid"),
+    "payout.failed": (PaymentService, "handle_payout_failed"),
+    "payout.canceled": (PaymentService, "handle_payout_canceled"),
+    "customer.subscription.updated": (MembershipService, "handle_subscription_updated"),
+    "customer.subscription.deleted": (MembershipService, "handle_subscription_deleted"),
+    "invoice.payment_succeeded": (MembershipService, "handle_invoice_payment_succeeded"),
+    "invoice.payment_failed": (MembershipService, "handle_invoice_payment_failed"),
+}
+
+
+class ClaimedEvent(NamedTuple):
+    id: str
+    ordering_key: Optional[str]
+    payload: dict
+    attempts: int
+
+
+def ordering_key(event: dict) -> Optional[str]:
+    """The Stripe object whose events must be applied in order."""
+    obj = (event.get("data") or {}).get("object") or {}
+    if event["type"].startswith("invoice."):
+        return obj.get("subscription") or obj.get("id")
+    return obj.get("id")
+
+
+async def record_event(db, event: dict) -> bool:
+    """Add a verified event to ``db``'s transaction. False for an event type
+    nobody handles or an id already recorded."""
+    if event["type"] not in HANDLERS:
+        return False
+    result = await db.execute(
+        pg_insert(StripeEvent)
+        .values(
+            id=event["id"],
+            event_type=event["type"],
+            ordering_key=ordering_key(event),
+            payload=event,
+        )
+        .on_conflict_do_nothing(index_elements=[StripeEvent.id])
+    )
+    return bool(result.rowcount)
+
+
+async def dispatch_event(db, event: dict) -> None:
+    service_cls, method = HANDLERS[event["type"]]
+    await getattr(service_cls(db), method)(event)
+
+
+async def claim_batch(db, batch_size: int, lease: timedelta) -> tuple[list[ClaimedEvent], int]:
+    """Lease up to ``batch_size`` due events; returns them and how many were deferred."""
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        select(StripeEvent)
+        .where(
+            StripeEvent.processed_at.is_(None),
+            StripeEvent.dead_at.is_(None),
+            StripeEvent.available_at <= now,
+        )
+        .order_by(StripeEvent.seq)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    rows = list(result.scalars().all())
+    ready = await _in_key_order(db, rows)
+    for row in ready:
+        row.available_at = now + lease
+    claimed = [ClaimedEvent(row.id, row.ordering_key, row.payload, row.attempts) for row in ready]
+    await db.commit()
+    return claimed, len(rows) - len(ready)
+
+
+async def process_event(session_factory, event: ClaimedEvent) -> bool:
+    """Run one event's handler; True once it has committed.
+
+    The handler's single commit also commits the ``processed_at`` stamp; on
+    failure ``_record_failure`` clears it again in case a handler did commit
+    before raising.
+    """
+    async with session_factory() as db:
+        try:
+            await db.execute(
+                update(StripeEvent).where(StripeEvent.id == event.id).values(processed_at=func.now())
+            )
+            await dispatch_event(db, event.payload)
+            await db.commit()
+            return True
+        except Exception as exc:  # noqa: BLE001 - any handler failure is retried
+            await db.rollback()
+            await _record_failure(db, event, exc)
+            return False
+
+
+async def process_batch(session_factory, batch_size: int, concurrency: int) -> dict:
+    """Claim one batch and process it, keys concurrently and each key in order."""
+    async with session_factory() as db:
+        claimed, deferred = await claim_batch(
+            db, batch_size, timedelta(seconds=settings.STRIPE_EVENT_LEASE_SECONDS)
+        )
+    groups: dict[str, list[ClaimedEvent]] = {}
+    for event in claimed:
+        groups.setdefault(event.ordering_key or event.id, []).append(event)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(group: list[ClaimedEvent]) -> int:
+        async with semaphore:
+            for done, event in enumerate(group):
+                if not await process_event(session_factory, event):
+                    await _release(session_factory, group[done + 1:])
+                    return done
+            return len(group)
+
+    done = await asyncio.gather(*(run(group) for group in groups.values()))
+    return {
+        "claimed": len(claimed) + deferred,
+        "processed": sum(done),
+        "failed": sum(1 for group, n in zip(groups.values(), done) if n < len(group)),
+        "deferred": deferred,
+    }
+
+
+async def process_events(
+    session_factory,
+    batch_size: int,
+    concurrency: int,
+    run_seconds: float,
+    poll_seconds: float,
+) -> dict:
+    """Process batches until ``run_seconds`` elapse, polling while the inbox is idle."""
+    totals = {"batches": 0, "processed": 0, "failed": 0}
+
+    async def run_batch() -> bool:
+        batch = await process_batch(session_factory, batch_size, concurrency)
+        if batch["claimed"]:
+            totals["batches"] += 1
+            totals["processed"] += batch["processed"]
+            totals["failed"] += batch["failed"]
+        # Only a full batch that all went through suggests more is ready now.
+        return batch["claimed"] == batch_size and not batch["failed"] and not batch["deferred"]
+
+    await drain_until(asyncio.get_running_loop().time() + run_seconds, run_batch, poll_seconds)
+    async with session_factory() as db:
+        totals["pruned"] = await prune_processed(db, timedelta(days=settings.STRIPE_EVENT_RETENTION_DAYS))
+    return totals
+
+
+async def prune_processed(db, retention: timedelta) -> int:
+    """Delete events processed more than ``retention`` ago."""
+    cutoff = datetime.now(timezone.utc) - retention
+    result = await db.execute(delete(StripeEvent).where(StripeEvent.processed_at < cutoff))
+    await db.commit()
+    return result.rowcount or 0
+
+
+async def _in_key_order(db, rows: list[StripeEvent]) -> list[StripeEvent]:
+    """``rows`` minus keyed rows whose key has an older pending row outside the batch."""
+    keys = {row.ordering_key for row in rows if row.ordering_key}
+    if not keys:
+        return rows
+    result = await db.execute(
+        select(StripeEvent.ordering_key, func.min(StripeEvent.seq))
+        .where(
+            StripeEvent.processed_at.is_(None),
+            StripeEvent.dead_at.is_(None),
+            StripeEvent.ordering_key.in_(keys),
+        )
+        .group_by(StripeEvent.ordering_key)
+    )
+    oldest = dict(result.all())
+    claimed = {row.seq for row in rows}
+    blocked = {key for key, first_seq in oldest.items() if first_seq not in claimed}
+    return [row for row in rows if row.ordering_key not in blocked]
+
+
+async def _record_failure(db, event: ClaimedEvent, exc: Exception) -> None:
+    attempts = event.attempts + 1
+    now = datetime.now(timezone.utc)
+    values: dict = {
+        # A handler that committed before raising is run again, as Stripe's
+        # own redelivery would have done.
+        "processed_at": None,
+        "attempts": attempts,
+        "last_error": str(exc)[:_MAX_ERROR_LENGTH] or type(exc).__name__,
+    }
+    if attempts >= settings.STRIPE_EVENT_MAX_ATTEMPTS:
+        values["dead_at"] = now
+        logger.error(
+            "stripe event %s (%s) failed %s times; giving up",
+            event.id, event.payload.get("type"), attempts, exc_info=exc,
+        )
+    else:
+        delay = timedelta(seconds=settings.STRIPE_EVENT_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+        values["available_at"] = now + min(delay, _MAX_RETRY_DELAY)
+        logger.warning(
+            "stripe event %s (%s) failed, attempt %s: %s",
+            event.id, event.payload.get("type"), attempts, exc,
+        )
+    await db.execute(update(StripeEvent).where(StripeEvent.id == event.id).values(**values))
+    await db.commit()
+
+
+async def _release(session_factory, events: list[ClaimedEvent]) -> None:
+    """Hand back the leases of events queued behind a failure on their key;
+    they stay deferred until the failed event goes through or is given up."""
+    if not events:
+        return
+    async with session_factory() as db:
+        await db.execute(
+            update(StripeEvent)
+            .where(StripeEvent.id.in_([event.id for event in events]))
+            .values(available_at=func.now())
+        )
+        await db.commit()
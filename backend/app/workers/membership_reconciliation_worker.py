@@ -0,0 +1,74 @@
+"""
+Pub/Sub subscriber: membership-reconciliation-events topic.
+
+Re-counts ``membership_plans.active_member_count`` on a schedule. Cloud
+Scheduler publishes ``{"event_type": "membership.reconcile_counts"}`` to
+``membership-reconciliation-events`` nightly; the push subscription delivers it
+here.
+
+This is the safety net behind the seat accounting in ``MembershipService``:
+every subscribe, upgrade, downgrade and Stripe status webhook moves the count
+in the same transaction as the subscription row, but a webhook that never
+arrives or a row edited by hand would leave it drifted. ``reconcile_active_member_counts``
+locks the plan rows, recounts active/trialing subscriptions and corrects any
+plan that differs, logging a warning per run that found drift.
+
+Deployed as a separate Cloud Run service from the same image
+(``Dockerfile.worker``), with the ``app.workers.membership_reconciliation_worker:app``
+arg override at deploy time. The sweep is platform-wide — no tenant scope is
+supplied — and reads/writes the **primary**.
+
+Pub/Sub redelivery is safe: a second run finds nothing to correct.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import logging
+
+from fastapi import FastAPI, Request
+
+from app.core.pubsub import pubsub_lifespan
+from app.db.session import AsyncSessionLocal
+from app.services.membership_service import MembershipService
+
+logger = logging.getLogger(__name__)
+
+app = FastAPI(lifespan=pubsub_lifespan)
+
+
+@app.get("/healthz")
+async def health():
+    return {"status": "ok"}
+
+
+@app.post("/pubsub")
+async def process_reconcile_event(request: Request):
+    """Receive a Pub/Sub push delivery for membership-reconciliation events."""
+    envelope = await request.json()
+    message = envelope.get("message", {})
+    data = json.loads(base64.b64decode(message.get("data", "")).decode())
+
+    event_type = data.get("event_type")
+
+    if event_type != "membership.reconcile_counts":
+        # Unknown event on this subscription — ack so Pub/Sub does not redeliver.
+        logger.warning(
+            "membership_reconciliation_worker: ignoring unexpected event_type=%s", event_type
+        )
+        return {"status": "ignored", "event_type": event_type}
+
+    result = await reconcile()
+    logger.info(
+        "membership_reconciliation_worker: corrected %s plan(s)",
+        result.get("plans_corrected"),
+    )
+    return {"status": "ok", **result}
+
+
+async def reconcile() -> dict:
+    """Recount every plan's active members on the primary DB."""
+    async with AsyncSessionLocal() as session:
+        # reconcile_active_member_counts commits its own transaction.
+        svc = MembershipService(session)
+        return await svc.reconcile_active_member_counts()
@@ -0,0 +1,77 @@
+"""
+Pub/Sub subscriber: outbox-relay-events topic.
+
+Publishes the domain events services write to ``event_outbox`` in the same
+transaction as their changes (see ``app/services/event_outbox.py``). Cloud
+Scheduler publishes ``{"event_type": "outbox.relay"}`` to
+``outbox-relay-events`` every minute; each delivery drains the outbox for
+``OUTBOX_RELAY_RUN_SECONDS``, polling while it is empty, so events go out
+within about ``OUTBOX_RELAY_POLL_SECONDS`` of their commit.
+
+Deployed as a separate Cloud Run service from the same image
+(``Dockerfile.worker``), with the ``app.workers.outbox_relay_worker:app`` arg
+override at deploy time. The relay is platform-wide and reads/writes the
+**primary**.
+
+Overlapping or redelivered runs are safe: rows are claimed with
+``FOR UPDATE SKIP LOCKED`` and only acked rows are marked sent. A row whose
+ack is lost is published again, so consumers must tolerate duplicates
+(at-least-once delivery).
+"""
+from __future__ import annotations
+
+import base64
+import json
+import logging
+
+from fastapi import FastAPI, Request
+
+from app.core.config import get_settings
+from app.core.pubsub import pubsub_lifespan
+from app.db.session import AsyncSessionLocal
+from app.services.event_outbox import relay_outbox
+
+logger = logging.getLogger(__name__)
+
+app = FastAPI(lifespan=pubsub_lifespan)
+
+
+@app.get("/healthz")
+async def health():
+    return {"status": "ok"}
+
+
+@app.post("/pubsub")
+async def process_relay_event(request: Request):
+    """Receive a Pub/Sub push delivery for outbox-relay events."""
+    envelope = await request.json()
+    message = envelope.get("message", {})
+    data = json.loads(base64.b64decode(message.get("data", "")).decode())
+
+    event_type = data.get("event_type")
+
+    if event_type != "outbox.relay":
+        # Unknown event on this subscription — ack so Pub/Sub does not redeliver.
+        logger.warning("outbox_relay_worker: ignoring unexpected event_type=%s", event_type)
+        return {"status": "ignored", "event_type": event_type}
+
+    result = await relay()
+    logger.info(
+        "outbox_relay_worker: %s batch(es), %s sent, %s failed, %s pruned",
+        result.get("batches"),
+        result.get("sent"),
+        result.get("failed"),
+        result.get("pruned"),
+    )
+    return {"status": "ok", **result}
+
+
+async def relay() -> dict:
+    """Drain the outbox on the primary DB for one scheduled run."""
+    settings = get_settings()
+    return await relay_outbox(
+        AsyncSessionLocal,
+        batch_size=settings.OUTBOX_RELAY_BATCH_SIZE,
+        run_seconds=settings.OUTBOX_RELAY_RUN_SECONDS,
+        poll_seconds=settings.OUTBOX_RELAY_POLL_SECONDS,
+    )
@@ -31,12 +31,13 @@ import logging
 
 from fastapi import FastAPI, Request
 
+from app.core.pubsub import pubsub_lifespan
 from app.db.session import AsyncSessionLocal
 from app.services.payment_service import PaymentService
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+app = FastAPI(lifespan=pubsub_lifespan)
 
 
 @app.get("/healthz")
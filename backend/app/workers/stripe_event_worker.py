@@ -0,0 +1,78 @@
+"""
+Pub/Sub subscriber: stripe-event-processing topic.
+
+Runs the handlers for the Stripe webhook events that ``POST
+/payments/stripe/webhook`` queues in ``stripe_events`` (see
+``app/services/stripe_events.py``). Cloud Scheduler publishes
+``{"event_type": "stripe_events.process"}`` to ``stripe-event-processing``
+every minute; each delivery processes events for ``STRIPE_EVENT_RUN_SECONDS``,
+polling while the inbox is idle, so a webhook is handled within about
+``STRIPE_EVENT_POLL_SECONDS`` of being acknowledged.
+
+Deployed as a separate Cloud Run service from the same image
+(``Dockerfile.worker``), with the ``app.workers.stripe_event_worker:app`` arg
+override at deploy time. Processing is platform-wide and reads/writes the
+**primary**; handlers call Stripe with the platform key as before.
+
+Overlapping or redelivered runs are safe: events are leased with
+``FOR UPDATE SKIP LOCKED`` and each is marked processed in its handler's own
+transaction.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import logging
+
+from fastapi import FastAPI, Request
+
+from app.core.config import get_settings
+from app.core.pubsub import pubsub_lifespan
+from app.db.session import AsyncSessionLocal
+from app.services.stripe_events import process_events
+
+logger = logging.getLogger(__name__)
+
+app = FastAPI(lifespan=pubsub_lifespan)
+
+
+@app.get("/healthz")
+async def health():
+    return {"status": "ok"}
+
+
+@app.post("/pubsub")
+async def process_stripe_event_run(request: Request):
+    """Receive a Pub/Sub push delivery for Stripe event processing."""
+    envelope = await request.json()
+    message = envelope.get("message", {})
+    data = json.loads(base64.b64decode(message.get("data", "")).decode())
+
+    event_type = data.get("event_type")
+
+    if event_type != "stripe_events.process":
+        # Unknown event on this subscription — ack so Pub/Sub does not redeliver.
+        logger.warning("stripe_event_worker: ignoring unexpected event_type=%s", event_type)
+        return {"status": "ignored", "event_type": event_type}
+
+    result = await process()
+    logger.info(
+        "stripe_event_worker: %s batch(es), %s processed, %s failed, %s pruned",
+        result.get("batches"),
+        result.get("processed"),
+        result.get("failed"),
+        result.get("pruned"),
+    )
+    return {"status": "ok", **result}
+
+
+async def process() -> dict:
+    """Process queued Stripe events on the primary DB for one scheduled run."""
+    settings = get_settings()
+    return await process_events(
+        AsyncSessionLocal,
+        batch_size=settings.STRIPE_EVENT_BATCH_SIZE,
+        concurrency=settings.STRIPE_EVENT_CONCURRENCY,
+        run_seconds=settings.STRIPE_EVENT_RUN_SECONDS,
+        poll_seconds=settings.STRIPE_EVENT_POLL_SECONDS,
+    )
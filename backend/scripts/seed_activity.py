@@ -73,7 +73,6 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 
 from app.analytics.services.court_utilisation_service import (  # noqa: E402
     OperatingWindow,
-    PricingWindow,
     ReservationInput,
     _price_for,
     iter_bookable_slots,
@@ -99,6 +98,7 @@ from app.db.models.payment import (  # noqa: E402
 )
 from app.db.models.staff import StaffProfile, StaffRole, TrainerAvailability  # noqa: E402
 from app.db.models.user import TenantUserRole, User  # noqa: E402
+from app.services.pricing_table import PricingTable  # noqa: E402
 
 UTC = timezone.utc
 
@@ -218,6 +218,11 @@ class ClubCtx:
     operating_hours: list[OperatingHours]
     pricing_rules: list[PricingRule]
     reservations: list[CalendarReservation]
+    pricing: PricingTable = field(init=False)
+
+    def __post_init__(self) -> None:
+        # Seasons are resolved inside the compiled table, per slot date.
+        self.pricing = PricingTable.compile(pr for pr in self.pricing_rules if pr.is_active)
 
     def windows_for(self, on: DateType) -> list[OperatingWindow]:
         dow = on.weekday()
@@ -232,20 +237,6 @@ class ClubCtx:
             out.append(OperatingWindow(oh.open_time, oh.close_time))
         return out
 
-    def pricing_for(self, on: DateType) -> list[PricingWindow]:
-        dow = on.weekday()
-        out = []
-        for pr in self.pricing_rules:
-            if not pr.is_active or pr.day_of_week != dow:
-                continue
-            if pr.valid_from and pr.valid_from > on:
-                continue
-            if pr.valid_until and pr.valid_until < on:
-                continue
-            out.append(PricingWindow(pr.day_of_week, pr.start_time, pr.end_time,
-                                     Decimal(str(pr.price_per_slot))))
-        return out
-
     def reservations_for(self, court_id: UUID, on: DateType) -> list[ReservationInput]:
         day_start = datetime.combine(on, TimeType.min, tzinfo=self.tz)
         day_end = day_start + timedelta(days=1)
@@ -401,7 +392,7 @@ async def _existing_occupancy(db: AsyncSession, club: Club, tz: ZoneInfo,
 # Booking construction
 # ---------------------------------------------------------------------------
 
-def _slot_price(slot_start: datetime, pricing: list[PricingWindow]) -> Decimal:
+def _slot_price(slot_start: datetime, pricing: PricingTable) -> Decimal:
     price = _price_for(slot_start, pricing)
     return price if price > 0 else FALLBACK_SLOT_PRICE
 
@@ -430,8 +421,7 @@ def _build_booking(
     end_utc = slot_end_local.astimezone(UTC)
     dow = slot_start_local.weekday()
     on = slot_start_local.date()
-    pricing = ctx.pricing_for(on)
-    base_price = _slot_price(slot_start_local, pricing)
+    base_price = _slot_price(slot_start_local, ctx.pricing)
 
     # Decide lesson vs match — lessons only where a trainer is on shift.
     want_lesson = rng.random() < lesson_ratio
@@ -0,0 +1,131 @@
+"""
+In-process fake of the Stripe REST API.
+
+``FakeStripe.handle`` is an async ``httpx.MockTransport`` handler: the
+``fake_stripe`` fixture (tests/conftest.py) routes the shared
+``StripeHTTPClient`` through it, so services exercise the real SDK — request
+encoding, retries, idempotency keys, pagination — without network access.
+Only the async client is served.
+
+Supported: create / retrieve for any resource, plus listing payouts and
+balance transactions seeded with ``add_payout``. Like Stripe, a POST that
+repeats an ``Idempotency-Key`` replays the first response. ``fail_next``
+queues error responses; ``latency`` delays every response, and
+``max_concurrency`` records how many requests were ever in flight at once.
+"""
+import asyncio
+import json
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from itertools import count
+from urllib.parse import parse_qsl
+
+import httpx
+
+_ID_PREFIXES = {
+    "customers": "cus",
+    "payment_intents": "pi",
+    "payment_methods": "pm",
+    "setup_intents": "seti",
+    "subscriptions": "sub",
+    "transfers": "tr",
+}
+
+
+@dataclass
+class RecordedRequest:
+    method: str
+    path: str
+    params: dict
+    account: str | None
+    idempotency_key: str | None
+
+
+@dataclass
+class FakeStripe:
+    latency: float = 0.0
+    requests: list[RecordedRequest] = field(default_factory=list)
+    objects: dict[str, dict] = field(default_factory=dict)
+    max_concurrency: int = 0
+    _in_flight: int = 0
+    _failures: deque = field(default_factory=deque)
+    _payouts: dict = field(default_factory=lambda: defaultdict(list))
+    _balance_transactions: dict = field(default_factory=lambda: defaultdict(list))
+    _idempotent: dict = field(default_factory=dict)
+    _ids: count = field(default_factory=lambda: count(1))
+
+    def add_payout(self, account: str, payout: dict, balance_transactions: list[dict]) -> None:
+        self._payouts[account].append({"object": "payout", "status": "paid", **payout})
+        self._balance_transactions[payout["id"]] = [
+            {"object": "balance_transaction", "type": "payment", **t} for t in balance_transactions
+        ]
+
+    def fail_next(self, status: int = 503, times: int = 1) -> None:
+        self._failures.extend([status] * times)
+
+    def requests_to(self, method: str, path: str) -> list[RecordedRequest]:
+        return [r for r in self.requests if r.method == method and r.path == path]
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self._in_flight += 1
+        self.max_concurrency = max(self.max_concurrency, self._in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return self._respond(request)
+        finally:
+            self._in_flight -= 1
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "POST":
+            params = dict(parse_qsl(request.content.decode()))
+        else:
+            params = dict(request.url.params)
+        recorded = RecordedRequest(
+            method=request.method,
+            path=request.url.path,
+            params=params,
+            account=request.headers.get("Stripe-Account"),
+            idempotency_key=request.headers.get("Idempotency-Key"),
+        )
+        self.requests.append(recorded)
+
+        if self._failures:
+            status = self._failures.popleft()
+            return httpx.Response(
+                status,
+                json={"error": {"type": "api_error", "message": f"fake Stripe error {status}"}},
+            )
+
+        replay_key = (recorded.path, recorded.idempotency_key)
+        if request.method == "POST" and replay_key in self._idempotent:
+            return httpx.Response(200, json=self._idempotent[replay_key])
+
+        parts = recorded.path.strip("/").split("/")[1:]  # drop "v1"
+        if request.method == "POST" and len(parts) == 1:
+            body = self._create(parts[0], params)
+            if recorded.idempotency_key:
+                self._idempotent[replay_key] = body
+            return httpx.Response(200, json=body)
+        if request.method == "GET" and parts == ["payouts"]:
+            return self._list(recorded.path, self._payouts[recorded.account])
+        if request.method == "GET" and parts == ["balance_transactions"]:
+            return self._list(recorded.path, self._balance_transactions[params.get("payout")])
+        if request.method == "GET" and len(parts) == 2 and parts[1] in self.objects:
+            return httpx.Response(200, json=self.objects[parts[1]])
+        return httpx.Response(
+            404,
+            json={"error": {"type": "invalid_request_error", "message": f"No such route {recorded.path}"}},
+        )
+
+    def _create(self, resource: str, params: dict) -> dict:
+        prefix = _ID_PREFIXES.get(resource, resource.rstrip("s"))
+        obj = {"id": f"{prefix}_fake{next(self._ids)}", "object": resource.rstrip("s"), **params}
+        self.objects[obj["id"]] = obj
+        return obj
+
+    @staticmethod
+    def _list(path: str, items: list[dict]) -> httpx.Response:
+        return httpx.Response(
+            200, json={"object": "list", "url": path, "has_more": False, "data": items},
+        )
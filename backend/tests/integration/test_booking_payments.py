@@ -6,15 +6,17 @@ Coverage
 POST /payments/payment-intent    — success, no booking player, no payment method, unauthenticated
 Service: confirm_payment         — sets payment succeeded, marks player paid, confirms booking
 Service: handle_payment_failed   — sets payment failed, records reason, increments retry_count
-POST /payments/stripe/webhook    — invalid signature → 400, unknown event type → 200, succeeded dispatch
+POST /payments/stripe/webhook    — invalid signature → 400, unknown event type → 200, succeeded queued once + processed
 Platform fees                    — application_fee_amount passed to Stripe PI; PlatformFee record written on confirm
 
 All Stripe API calls are mocked — no network traffic.
 """
 
+import json
 from decimal import Decimal
 from unittest.mock import MagicMock, patch
 
+import pytest
 import pytest_asyncio
 import stripe
 from sqlalchemy import delete as sql_delete, select
@@ -31,9 +33,11 @@ from app.db.models.booking import (
 from app.db.models.club import Club
 from app.db.models.court import Court
 from app.db.models.payment import Payment, PaymentMethod as PMEnum, PaymentState, PlatformFee
+from app.db.models.stripe_event import StripeEvent
 from app.db.models.tenant import SubscriptionPlan
 from app.db.models.user import User
 from app.services.payment_service import PaymentService
+from app.services.stripe_events import process_batch
 
 STRIPE_CUSTOMER_ID = "cus_paytest111111"
 STRIPE_PM_ID = "pm_paytest111111"
@@ -173,7 +177,7 @@ class TestCreatePaymentIntent:
         await _set_stripe_customer(test_session_factory, player.id)
 
         mock_pi = _mock_pi()
-        with patch("stripe.PaymentIntent.create", return_value=mock_pi):
+        with patch("stripe.PaymentIntent.create_async", return_value=mock_pi):
             resp = await client.post(
                 "/api/v1/payments/payment-intent",
                 json={"booking_id": str(booking.id)},
@@ -191,7 +195,7 @@ class TestCreatePaymentIntent:
         await _set_stripe_customer(test_session_factory, player.id)
 
         mock_pi = _mock_pi()
-        with patch("stripe.PaymentIntent.create", return_value=mock_pi):
+        with patch("stripe.PaymentIntent.create_async", return_value=mock_pi):
             await client.post(
                 "/api/v1/payments/payment-intent",
                 json={"booking_id": str(booking.id)},
@@ -217,7 +221,7 @@ class TestCreatePaymentIntent:
         await _set_stripe_customer(test_session_factory, player.id)
 
         mock_pi = _mock_pi()
-        with patch("stripe.PaymentIntent.create", return_value=mock_pi):
+        with patch("stripe.PaymentIntent.create_async", return_value=mock_pi):
             await client.post(
                 "/api/v1/payments/payment-intent",
                 json={"booking_id": str(booking.id)},
@@ -251,7 +255,7 @@ class TestCreatePaymentIntent:
             u.default_payment_method_id = None
             await session.commit()
 
-        with patch("stripe.Customer.create", return_value=MagicMock(id=STRIPE_CUSTOMER_ID)):
+        with patch("stripe.Customer.create_async", return_value=MagicMock(id=STRIPE_CUSTOMER_ID)):
             resp = await client.post(
                 "/api/v1/payments/payment-intent",
                 json={"booking_id": str(booking.id)},
@@ -300,7 +304,7 @@ class TestConfirmPayment:
 
         async with test_session_factory() as session:
             svc = PaymentService(session)
-            with patch("stripe.Charge.retrieve", return_value=mock_charge):
+            with patch("stripe.Charge.retrieve_async", return_value=mock_charge):
                 await svc.confirm_payment(event)
 
         async with test_session_factory() as session:
@@ -315,7 +319,7 @@ class TestConfirmPayment:
 
         async with test_session_factory() as session:
             svc = PaymentService(session)
-            with patch("stripe.Charge.retrieve", return_value=MagicMock(receipt_url=None)):
+            with patch("stripe.Charge.retrieve_async", return_value=MagicMock(receipt_url=None)):
                 await svc.confirm_payment(event)
 
         async with test_session_factory() as session:
@@ -340,7 +344,7 @@ class TestConfirmPayment:
 
         async with test_session_factory() as session:
             svc = PaymentService(session)
-            with patch("stripe.Charge.retrieve", return_value=MagicMock(receipt_url=None)):
+            with patch("stripe.Charge.retrieve_async", return_value=MagicMock(receipt_url=None)):
                 await svc.confirm_payment(event)
 
         async with test_session_factory() as session:
@@ -354,7 +358,7 @@ class TestConfirmPayment:
 
         async with test_session_factory() as session:
             svc = PaymentService(session)
-            with patch("stripe.Charge.retrieve", return_value=MagicMock(receipt_url=None)):
+            with patch("stripe.Charge.retrieve_async", return_value=MagicMock(receipt_url=None)):
                 await svc.confirm_payment(event)
 
         async with test_session_factory() as session:
@@ -367,7 +371,7 @@ class TestConfirmPayment:
 
         async with test_session_factory() as session:
             svc = PaymentService(session)
-            with patch("stripe.Charge.retrieve", return_value=MagicMock(receipt_url=None)):
+            with patch("stripe.Charge.retrieve_async", return_value=MagicMock(receipt_url=None)):
                 await svc.confirm_payment(event)
                 await svc.confirm_payment(event)  # second call must be a no-op
 
@@ -469,19 +473,23 @@ class TestStripeWebhook:
             )
         assert resp.status_code == 400
 
-    async def test_unknown_event_type_returns_200(self, client):
-        mock_event = {"type": "customer.created", "data": {"object": {}}}
+    async def test_unknown_event_type_returns_200_and_is_not_queued(self, client, test_session_factory):
+        mock_event = {"id": "evt_test_unknown", "type": "customer.created", "data": {"object": {}}}
         with patch("stripe.Webhook.construct_event", return_value=mock_event):
             resp = await client.post(
                 "/api/v1/payments/stripe/webhook",
-                content=b"{}",
+                content=json.dumps(mock_event).encode(),
                 headers={"stripe-signature": "t=1,v1=abc"},
             )
         assert resp.status_code == 200
         assert resp.json() == {"received": True}
+        async with test_session_factory() as session:
+            assert await session.get(StripeEvent, "evt_test_unknown") is None
 
-    async def test_succeeded_event_dispatched(self, client, booking, player, booking_player, test_session_factory):
-        """Webhook with payment_intent.succeeded must update Payment state."""
+    async def test_succeeded_event_queued_once_then_processed(
+        self, client, booking, player, booking_player, test_session_factory,
+    ):
+        """The webhook only queues the event; the worker's batch updates the Payment."""
         # Seed a pending Payment
         async with test_session_factory() as session:
             p = Payment(
@@ -499,19 +507,36 @@ class TestStripeWebhook:
             await session.refresh(p)
             payment_id = p.id
 
-        mock_event = _stripe_event("payment_intent.succeeded")
-        with patch("stripe.Webhook.construct_event", return_value=mock_event), \
-             patch("stripe.Charge.retrieve", return_value=MagicMock(receipt_url=None)):
-            resp = await client.post(
-                "/api/v1/payments/stripe/webhook",
-                content=b"{}",
-                headers={"stripe-signature": "t=1,v1=abc"},
-            )
-
-        assert resp.status_code == 200
-        async with test_session_factory() as session:
-            p = await session.get(Payment, payment_id)
-            assert p.state == PaymentState.succeeded
+        mock_event = {"id": "evt_test_succeeded", **_stripe_event("payment_intent.succeeded")}
+        try:
+            with patch("stripe.Webhook.construct_event", return_value=mock_event):
+                for _ in range(2):  # Stripe redelivers
+                    resp = await client.post(
+                        "/api/v1/payments/stripe/webhook",
+                        content=json.dumps(mock_event).encode(),
+                        headers={"stripe-signature": "t=1,v1=abc"},
+                    )
+                    assert resp.status_code == 200
+
+            async with test_session_factory() as session:
+                assert (await session.get(Payment, payment_id)).state == PaymentState.pending
+                queued = (await session.execute(
+                    select(StripeEvent).where(StripeEvent.id == "evt_test_succeeded")
+                )).scalars().all()
+                assert len(queued) == 1
+                assert queued[0].ordering_key == STRIPE_PI_ID
+
+            with patch("stripe.Charge.retrieve_async", return_value=MagicMock(receipt_url=None)):
+                batch = await process_batch(test_session_factory, batch_size=10, concurrency=2)
+
+            assert batch["processed"] == 1
+            async with test_session_factory() as session:
+                assert (await session.get(Payment, payment_id)).state == PaymentState.succeeded
+                assert (await session.get(StripeEvent, "evt_test_succeeded")).processed_at is not None
+        finally:
+            async with test_session_factory() as session:
+                await session.execute(sql_delete(StripeEvent).where(StripeEvent.id == "evt_test_succeeded"))
+                await session.commit()
 
 
 # ---------------------------------------------------------------------------
@@ -566,7 +591,7 @@ class TestPlatformFees:
             captured_kwargs.update(kwargs)
             return _mock_pi()
 
-        with patch("stripe.PaymentIntent.create", side_effect=capture_create):
+        with patch("stripe.PaymentIntent.create_async", side_effect=capture_create):
             resp = await client.post(
                 "/api/v1/payments/payment-intent",
                 json={"booking_id": str(booking.id)},
@@ -595,7 +620,7 @@ class TestPlatformFees:
             captured_kwargs.update(kwargs)
             return _mock_pi()
 
-        with patch("stripe.PaymentIntent.create", side_effect=capture_create):
+        with patch("stripe.PaymentIntent.create_async", side_effect=capture_create):
             await client.post(
                 "/api/v1/payments/payment-intent",
                 json={"booking_id": str(booking.id)},
@@ -622,7 +647,7 @@ class TestPlatformFees:
             captured_kwargs.update(kwargs)
             return _mock_pi()
 
-        with patch("stripe.PaymentIntent.create", side_effect=capture_create):
+        with patch("stripe.PaymentIntent.create_async", side_effect=capture_create):
             await client.post(
                 "/api/v1/payments/payment-intent",
                 json={"booking_id": str(booking.id)},
@@ -641,7 +666,7 @@ class TestPlatformFees:
 
         async with test_session_factory() as session:
             svc = PaymentService(session)
-            with patch("stripe.Charge.retrieve", return_value=MagicMock(receipt_url=None)):
+            with patch("stripe.Charge.retrieve_async", return_value=MagicMock(receipt_url=None)):
                 await svc.confirm_payment(event)
 
         async with test_session_factory() as session:
@@ -655,6 +680,35 @@ class TestPlatformFees:
         assert fee.amount == Decimal("1.00")  # 5% of £20.00
         assert fee.fee_type.value == "booking_fee"
 
+    async def test_confirm_failing_part_way_is_fully_applied_on_retry(
+        self, plan, club, booking, player, booking_player, test_session_factory
+    ):
+        """A failure after the payment update commits nothing, so the retried
+        event still records the platform fee."""
+        await self._activate_fees(test_session_factory, plan, club, "5.00")
+        payment = await self._seed_payment(test_session_factory, booking, player)
+        event = _stripe_event("payment_intent.succeeded")
+
+        async with test_session_factory() as session:
+            with patch("stripe.Charge.retrieve_async", return_value=MagicMock(receipt_url=None)), \
+                 patch("app.services.payment_service.enqueue_notification_event",
+                       side_effect=RuntimeError("boom")):
+                with pytest.raises(RuntimeError):
+                    await PaymentService(session).confirm_payment(event)
+            await session.rollback()
+
+        async with test_session_factory() as session:
+            assert (await session.get(Payment, payment.id)).state == PaymentState.pending
+            with patch("stripe.Charge.retrieve_async", return_value=MagicMock(receipt_url=None)):
+                await PaymentService(session).confirm_payment(event)
+
+        async with test_session_factory() as session:
+            assert (await session.get(Payment, payment.id)).state == PaymentState.succeeded
+            result = await session.execute(
+                select(PlatformFee).where(PlatformFee.payment_id == payment.id)
+            )
+            assert result.scalar_one_or_none() is not None
+
     async def test_no_platform_fee_record_when_pct_null(
         self, booking, player, booking_player, test_session_factory
     ):
@@ -664,7 +718,7 @@ class TestPlatformFees:
 
         async with test_session_factory() as session:
             svc = PaymentService(session)
-            with patch("stripe.Charge.retrieve", return_value=MagicMock(receipt_url=None)):
+            with patch("stripe.Charge.retrieve_async", return_value=MagicMock(receipt_url=None)):
                 await svc.confirm_payment(event)
 
         async with test_session_factory() as session:
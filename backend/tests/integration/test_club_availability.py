@@ -13,13 +13,18 @@ Coverage:
 - Slots with only joinable matches (all courts booked, one open game) still surface
 - 404 on unknown / cross-tenant club; 403 unauth; 422 on bad input
 - Operating-hours gaps drop the entire day from the response
+- With the occupancy cache on, creating, joining and cancelling a booking
+  invalidate the cached day
 """
 import uuid
-from datetime import datetime, time as TimeType, timezone
+from datetime import date, datetime, time as TimeType, timezone
 from decimal import Decimal
 
+import pytest
 from sqlalchemy import delete as sql_delete, update as sql_update
 
+from app.services import availability_cache, court_service
+
 
 # ---------------------------------------------------------------------------
 # Local helpers (lightweight versions of test_courts.py helpers — kept here so
@@ -865,6 +870,97 @@ class TestPaging:
 # ---------------------------------------------------------------------------
 
 
+class TestOccupancyCache:
+    @pytest.fixture(autouse=True)
+    def availability_cache_on(self, monkeypatch):
+        # tests/conftest.py disables the cache; switch it on for this class so
+        # the booking writes below go through their real invalidation hooks.
+        cache = availability_cache.AvailabilityCache(
+            availability_cache.LocalLRUBackend(max_entries=100), ttl_seconds=60
+        )
+        monkeypatch.setattr(availability_cache, "get_availability_cache", lambda: cache)
+        monkeypatch.setattr(court_service, "get_availability_cache", lambda: cache)
+        return cache
+
+    async def test_create_join_and_cancel_invalidate_the_cached_day(
+        self, client, staff_headers, player_headers, club, tenant, test_session_factory,
+        availability_cache_on,
+    ):
+        from app.core.security import create_access_token
+        from app.db.models.user import TenantUserRole
+        from tests.integration.conftest import _create_user, _delete_user
+
+        c1 = await _make_court(client, staff_headers, club, name="C1")
+        await _set_club_booking_window(club.id, test_session_factory)
+        oh = await _seed_operating_hours(club.id, test_session_factory, 0,
+                                          open_time="09:00", close_time="12:00")
+        rule = await _seed_pricing_rule(club.id, test_session_factory, 0,
+                                         start_time="09:00", end_time="12:00")
+        joiner = await _create_user(
+            tenant.id, "joiner", "Joining Player", TenantUserRole.player, test_session_factory
+        )
+        joiner_token = create_access_token({"sub": str(joiner.id), "tid": str(tenant.id)})
+        joiner_headers = {"Authorization": f"Bearer {joiner_token}", "X-Tenant-ID": str(tenant.id)}
+        booking_ids = []
+
+        async def slot0900():
+            resp = await client.get(
+                f"/api/v1/clubs/{club.id}/availability",
+                params={"start_date": MON, "end_date": MON},
+                headers=staff_headers,
+            )
+            assert resp.status_code == 200, resp.text
+            slots = {s["start_time"]: s for s in resp.json()["days"][0]["slots"]}
+            return slots.get("09:00")
+
+        try:
+            # Prime the cache with the empty day.
+            assert [c["court_id"] for c in (await slot0900())["available_courts"]] == [c1]
+            assert await availability_cache_on.get_days(club.id, [date(2030, 1, 7)])
+
+            created = await client.post(
+                "/api/v1/bookings",
+                json={
+                    "club_id": str(club.id),
+                    "court_id": c1,
+                    "start_datetime": datetime(2030, 1, 7, 9, 0, tzinfo=timezone.utc).isoformat(),
+                    "booking_type": "regular",
+                    "is_open_game": True,
+                    "max_players": 4,
+                },
+                headers=player_headers,
+            )
+            assert created.status_code == 201, created.text
+            booking_id = created.json()["id"]
+            booking_ids.append(uuid.UUID(booking_id))
+
+            slot = await slot0900()
+            assert slot["available_courts"] == []
+            assert [(m["booking_id"], m["slots_available"]) for m in slot["existing_matches"]] == [
+                (booking_id, 3)
+            ]
+
+            joined = await client.post(
+                f"/api/v1/bookings/{booking_id}/join?club_id={club.id}", headers=joiner_headers
+            )
+            assert joined.status_code == 200, joined.text
+            slot = await slot0900()
+            assert [m["slots_available"] for m in slot["existing_matches"]] == [2]
+
+            cancelled = await client.delete(
+                f"/api/v1/bookings/{booking_id}?club_id={club.id}", headers=player_headers
+            )
+            assert cancelled.status_code == 200, cancelled.text
+            slot = await slot0900()
+            assert [c["court_id"] for c in slot["available_courts"]] == [c1]
+            assert slot["existing_matches"] == []
+        finally:
+            await _cleanup_bookings(booking_ids, test_session_factory)
+            await _delete_user(joiner.id, test_session_factory)
+            await _cleanup_pricing_rules([rule.id], test_session_factory)
+            await _cleanup_operating_hours([oh.id], test_session_factory)
+
+
 class TestAuthAndValidation:
     async def test_unauthenticated_returns_403(self, client, club, tenant):
         resp = await client.get(
@@ -263,3 +263,20 @@ class TestCoachPopularity:
         assert rows[0]["staff_profile_id"] == str(seeded_coaches["coach_z_sp"])
         sessions = [r["sessions"] for r in rows]
         assert sessions == sorted(sessions, reverse=True)
+
+    async def test_cursor_pages_cover_the_leaderboard(
+        self, client, staff_headers, club, seeded_coaches
+    ):
+        full = (await client.get(
+            f"{_BASE}/{club.id}/popularity?sort=return_rate", headers=staff_headers
+        )).json()
+        walked, cursor = [], None
+        while True:
+            url = f"{_BASE}/{club.id}/popularity?sort=return_rate&limit=1"
+            resp = await client.get(url + (f"&cursor={cursor}" if cursor else ""), headers=staff_headers)
+            assert resp.status_code == 200
+            walked += [r["staff_profile_id"] for r in resp.json()["rows"]]
+            cursor = resp.json()["next_cursor"]
+            if cursor is None:
+                break
+        assert walked == [r["staff_profile_id"] for r in full["rows"]]
@@ -0,0 +1,142 @@
+"""
+Integration tests for the snapshot worker's COPY-staged write path (G7).
+
+``write_club_snapshots`` stages rows with asyncpg ``COPY`` and swaps them in
+with one set-based DELETE + INSERT. These run it against Postgres to pin the
+idempotency contract: re-running a range never duplicates the NULL-hour daily
+rollup, changed figures replace the stored row, unchanged rows are left as
+they were, rows outside the range are untouched, and the weekly/monthly
+rollups follow every change.
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest_asyncio
+from sqlalchemy import delete as sql_delete
+from sqlalchemy import select
+
+from app.analytics.services.court_utilisation_service import SnapshotRow
+from app.analytics.workers.snapshot_court_utilisation import write_club_snapshots
+from app.db.models.analytics import (
+    CourtUtilisationCourtMonth,
+    CourtUtilisationSnapshot,
+    CourtUtilisationWeekHour,
+)
+from app.db.models.court import Court
+
+D1 = date(2026, 5, 20)
+D2 = date(2026, 5, 21)
+
+
+def _row(day, hour, booked):
+    return SnapshotRow(
+        snapshot_date=day, hour_of_day=hour, day_of_week=day.weekday(),
+        total_slots=2, booked_slots=booked,
+        utilisation_pct=Decimal(booked * 50).quantize(Decimal("0.01")),
+        revenue_actual=Decimal(booked * 20), revenue_potential=Decimal("40"),
+        avg_booking_lead_time_h=None,
+    )
+
+
+@pytest_asyncio.fixture
+async def court_id(club, test_session_factory):
+    async with test_session_factory() as session:
+        court = Court(club_id=club.id, name="Snapshot Court", surface_type="indoor", is_active=True)
+        session.add(court)
+        await session.commit()
+        court_id = court.id
+
+    yield court_id
+
+    async with test_session_factory() as session:
+        await session.execute(
+            sql_delete(CourtUtilisationSnapshot).where(CourtUtilisationSnapshot.court_id == court_id)
+        )
+        for rollup in (CourtUtilisationWeekHour, CourtUtilisationCourtMonth):
+            await session.execute(sql_delete(rollup).where(rollup.club_id == club.id))
+        await session.execute(sql_delete(Court).where(Court.id == court_id))
+        await session.commit()
+
+
+async def _write(session_factory, club_id, court_id, rows, date_from, date_to):
+    async with session_factory() as session:
+        written = await write_club_snapshots(session, club_id, {court_id: rows}, date_from, date_to)
+        await session.commit()
+    return written
+
+
+async def _stored(session_factory, court_id):
+    async with session_factory() as session:
+        result = await session.execute(
+            select(CourtUtilisationSnapshot)
+            .where(CourtUtilisationSnapshot.court_id == court_id)
+            .order_by(
+                CourtUtilisationSnapshot.snapshot_date,
+                CourtUtilisationSnapshot.hour_of_day.nulls_last(),
+            )
+        )
+        return list(result.scalars().all())
+
+
+class TestWriteClubSnapshots:
+    async def test_rerun_does_not_duplicate_daily_rollup(self, club, court_id, test_session_factory):
+        rows = [_row(D1, 9, 1), _row(D1, None, 1)]
+        await _write(test_session_factory, club.id, court_id, rows, D1, D1)
+        await _write(test_session_factory, club.id, court_id, rows, D1, D1)
+
+        stored = await _stored(test_session_factory, court_id)
+        assert [(s.snapshot_date, s.hour_of_day) for s in stored] == [(D1, 9), (D1, None)]
+
+    async def test_unchanged_rows_are_kept_and_changed_rows_replaced(
+        self, club, court_id, test_session_factory
+    ):
+        await _write(
+            test_session_factory, club.id, court_id, [_row(D1, 9, 1), _row(D1, None, 1)], D1, D1
+        )
+        before = {s.hour_of_day: s.id for s in await _stored(test_session_factory, court_id)}
+
+        # Hour 9 unchanged; the rollup's booked count moved 1 → 2.
+        await _write(
+            test_session_factory, club.id, court_id, [_row(D1, 9, 1), _row(D1, None, 2)], D1, D1
+        )
+
+        after = {s.hour_of_day: s for s in await _stored(test_session_factory, court_id)}
+        assert after[9].id == before[9]
+        assert after[None].id != before[None]
+        assert after[None].booked_slots == 2
+
+    async def test_rows_outside_the_range_are_untouched(self, club, court_id, test_session_factory):
+        await _write(
+            test_session_factory, club.id, court_id, [_row(D1, None, 1), _row(D2, None, 1)], D1, D2
+        )
+
+        # Re-snapshot only D2, which is now closed (no rows).
+        written = await _write(test_session_factory, club.id, court_id, [], D2, D2)
+
+        assert written == 0
+        stored = await _stored(test_session_factory, court_id)
+        assert [(s.snapshot_date, s.hour_of_day) for s in stored] == [(D1, None)]
+
+    async def test_rollups_follow_rewrites(self, club, court_id, test_session_factory):
+        await _write(
+            test_session_factory, club.id, court_id,
+            [_row(D1, 9, 1), _row(D1, None, 1), _row(D2, 9, 2), _row(D2, None, 2)], D1, D2,
+        )
+        # D2 re-snapshotted as closed: both rollups must drop its figures.
+        await _write(test_session_factory, club.id, court_id, [], D2, D2)
+
+        async with test_session_factory() as session:
+            week_hours = (
+                await session.execute(
+                    select(CourtUtilisationWeekHour).where(CourtUtilisationWeekHour.club_id == club.id)
+                )
+            ).scalars().all()
+            month = (
+                await session.execute(
+                    select(CourtUtilisationCourtMonth).where(CourtUtilisationCourtMonth.club_id == club.id)
+                )
+            ).scalar_one()
+        assert [(w.week_start, w.day_of_week, w.hour_of_day, w.booked_slots) for w in week_hours] == [
+            (date(2026, 5, 18), D1.weekday(), 9, 1),
+        ]
+        assert (month.month_start, month.court_id, month.booked_slots) == (date(2026, 5, 1), court_id, 1)
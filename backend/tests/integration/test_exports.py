@@ -7,6 +7,7 @@ enqueues; file generation lives in the worker, so ``publish_analytics_export`` i
 patched to capture the event rather than hitting Pub/Sub.
 """
 import uuid
+from concurrent.futures import Future
 
 import pytest
 
@@ -20,6 +21,9 @@ def captured_publish(monkeypatch):
 
     def _fake(event_type, payload):
         calls.append((event_type, payload))
+        acked = Future()
+        acked.set_result("1")
+        return acked
 
     monkeypatch.setattr(exports_api, "publish_analytics_export", _fake)
     return calls
@@ -98,6 +102,7 @@ class TestHappyPath:
         assert event_type == "analytics.export_requested"
         assert payload["club_id"] == str(club.id)
         assert payload["report_type"] == "player_value"
+        assert payload["gzip"] is False
         assert payload["recipient_email"]  # caller's email is attached for delivery
 
     async def test_unknown_report_type_rejected(self, client, staff_headers, club, captured_publish):
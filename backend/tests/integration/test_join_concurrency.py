@@ -0,0 +1,125 @@
+"""
+Concurrency harness for open-game joins.
+
+Fires N parallel POST /bookings/{id}/join requests at one open game. Each
+request runs in its own session (and connection), so they genuinely race in
+Postgres. The booking row lock in BookingService.join_booking must let exactly
+max_players - 1 joiners in (the organiser holds the first slot) and turn every
+other request into the existing 409 "Booking is full".
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, time, timedelta, timezone
+
+import pytest_asyncio
+from sqlalchemy import delete as sql_delete, select
+
+from app.core.security import create_access_token
+from app.db.models.booking import Booking, BookingPlayer, InviteStatus
+from app.db.models.club import OperatingHours
+from app.db.models.court import Court
+from app.db.models.user import TenantUserRole, User
+
+MAX_PLAYERS = 4
+JOINERS = 12
+
+
+def _future() -> datetime:
+    dt = datetime.now(tz=timezone.utc) + timedelta(hours=48)
+    return dt.replace(hour=10, minute=30, second=0, microsecond=0)
+
+
+@pytest_asyncio.fixture
+async def open_court(club, test_session_factory):
+    """Court + Mon–Sun 06:00–23:00 hours for `club`."""
+    async with test_session_factory() as session:
+        court = Court(club_id=club.id, name="Race Court", surface_type="indoor", is_active=True)
+        session.add(court)
+        for dow in range(7):
+            session.add(OperatingHours(
+                club_id=club.id, day_of_week=dow,
+                open_time=time(6, 0), close_time=time(23, 0),
+            ))
+        await session.commit()
+        await session.refresh(court)
+
+    yield court
+
+    async with test_session_factory() as session:
+        booking_ids = (await session.execute(
+            select(Booking.id).where(Booking.court_id == court.id)
+        )).scalars().all()
+        if booking_ids:
+            await session.execute(sql_delete(BookingPlayer).where(BookingPlayer.booking_id.in_(booking_ids)))
+            await session.execute(sql_delete(Booking).where(Booking.id.in_(booking_ids)))
+        await session.execute(sql_delete(OperatingHours).where(OperatingHours.club_id == club.id))
+        await session.execute(sql_delete(Court).where(Court.id == court.id))
+        await session.commit()
+
+
+@pytest_asyncio.fixture
+async def joiner_headers(tenant, test_session_factory):
+    """Auth headers for JOINERS players without a skill level (the tenant cleans them up)."""
+    async with test_session_factory() as session:
+        users = [
+            User(
+                tenant_id=tenant.id,
+                email=f"racer{i}-{uuid.uuid4().hex[:6]}@test.com",
+                full_name=f"Racer {i}",
+                hashed_password="x",
+                is_active=True,
+                role=TenantUserRole.player,
+            )
+            for i in range(JOINERS)
+        ]
+        session.add_all(users)
+        await session.commit()
+        user_ids = [u.id for u in users]
+    return [
+        {
+            "Authorization": f"Bearer {create_access_token({'sub': str(uid), 'tid': str(tenant.id)})}",
+            "X-Tenant-ID": str(tenant.id),
+        }
+        for uid in user_ids
+    ]
+
+
+class TestConcurrentJoins:
+
+    async def test_parallel_joins_fill_exactly_max_players(
+        self, client, player_headers, joiner_headers, club, open_court, test_session_factory
+    ):
+        resp = await client.post(
+            "/api/v1/bookings",
+            json={
+                "club_id": str(club.id),
+                "court_id": str(open_court.id),
+                "start_datetime": _future().isoformat(),
+                "booking_type": "regular",
+                "is_open_game": True,
+                "max_players": MAX_PLAYERS,
+            },
+            headers=player_headers,
+        )
+        assert resp.status_code == 201, resp.text
+        booking_id = resp.json()["id"]
+
+        responses = await asyncio.gather(*(
+            client.post(f"/api/v1/bookings/{booking_id}/join?club_id={club.id}", headers=headers)
+            for headers in joiner_headers
+        ))
+
+        codes = sorted(r.status_code for r in responses)
+        assert codes.count(200) == MAX_PLAYERS - 1, [r.text for r in responses]
+        assert codes.count(409) == JOINERS - (MAX_PLAYERS - 1)
+        assert all(r.json()["detail"] == "Booking is full" for r in responses if r.status_code == 409)
+
+        async with test_session_factory() as session:
+            accepted = (await session.execute(
+                select(BookingPlayer).where(
+                    BookingPlayer.booking_id == uuid.UUID(booking_id),
+                    BookingPlayer.invite_status == InviteStatus.accepted,
+                )
+            )).scalars().all()
+        assert len(accepted) == MAX_PLAYERS
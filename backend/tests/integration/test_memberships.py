@@ -33,6 +33,7 @@ from app.db.models.membership import (
     MembershipSubscription,
 )
 from app.db.models.user import User
+from app.services.membership_service import MembershipService
 
 
 
@@ -664,9 +665,9 @@ class TestSubscribeToPlan:
     ):
         await _set_player_stripe(test_session_factory, player.id)
 
-        with patch("stripe.Product.create", return_value=_mock_stripe_obj("prod_t")), \
-             patch("stripe.Price.create", return_value=_mock_stripe_obj("price_t")), \
-             patch("stripe.Subscription.create", return_value=_mock_stripe_sub()) as mock_sub:
+        with patch("stripe.Product.create_async", return_value=_mock_stripe_obj("prod_t")), \
+             patch("stripe.Price.create_async", return_value=_mock_stripe_obj("price_t")), \
+             patch("stripe.Subscription.create_async", return_value=_mock_stripe_sub()) as mock_sub:
             resp = await client.post(
                 f"/api/v1/clubs/{club.id}/memberships/subscribe",
                 json={"plan_id": str(silver_plan.id)},
@@ -687,10 +688,11 @@ class TestSubscribeToPlan:
         assert kwargs["default_payment_method"] == STRIPE_PM_ID
         assert "trial_period_days" not in kwargs
 
-        # And the plan row now has a stripe_price_id stamped on it
+        # And the plan row now has a stripe_price_id stamped on it and one seat taken
         async with test_session_factory() as session:
             p = await session.get(MembershipPlan, silver_plan.id)
             assert p.stripe_price_id == "price_t"
+            assert p.active_member_count == 1
 
     async def test_success_trial_plan_no_client_secret(
         self, client, player, player_headers, club, trial_plan,
@@ -700,9 +702,9 @@ class TestSubscribeToPlan:
         await _set_player_stripe(test_session_factory, player.id, default_pm=None)
 
         trial_sub = _mock_stripe_sub(status_="trialing", client_secret=None)
-        with patch("stripe.Product.create", return_value=_mock_stripe_obj("prod_t")), \
-             patch("stripe.Price.create", return_value=_mock_stripe_obj("price_t")), \
-             patch("stripe.Subscription.create", return_value=trial_sub) as mock_sub:
+        with patch("stripe.Product.create_async", return_value=_mock_stripe_obj("prod_t")), \
+             patch("stripe.Price.create_async", return_value=_mock_stripe_obj("price_t")), \
+             patch("stripe.Subscription.create_async", return_value=trial_sub) as mock_sub:
             resp = await client.post(
                 f"/api/v1/clubs/{club.id}/memberships/subscribe",
                 json={"plan_id": str(trial_plan.id)},
@@ -731,9 +733,9 @@ class TestSubscribeToPlan:
             await session.commit()
         await _set_player_stripe(test_session_factory, player.id)
 
-        with patch("stripe.Product.create") as mock_prod, \
-             patch("stripe.Price.create") as mock_price, \
-             patch("stripe.Subscription.create", return_value=_mock_stripe_sub()):
+        with patch("stripe.Product.create_async") as mock_prod, \
+             patch("stripe.Price.create_async") as mock_price, \
+             patch("stripe.Subscription.create_async", return_value=_mock_stripe_sub()):
             resp = await client.post(
                 f"/api/v1/clubs/{club.id}/memberships/subscribe",
                 json={"plan_id": str(silver_plan.id)},
@@ -750,9 +752,9 @@ class TestSubscribeToPlan:
     ):
         await _set_player_stripe(test_session_factory, player.id)
 
-        with patch("stripe.Product.create", return_value=_mock_stripe_obj("prod_t")), \
-             patch("stripe.Price.create", return_value=_mock_stripe_obj("price_t")), \
-             patch("stripe.Subscription.create", return_value=_mock_stripe_sub()):
+        with patch("stripe.Product.create_async", return_value=_mock_stripe_obj("prod_t")), \
+             patch("stripe.Price.create_async", return_value=_mock_stripe_obj("price_t")), \
+             patch("stripe.Subscription.create_async", return_value=_mock_stripe_sub()):
             resp = await client.post(
                 f"/api/v1/clubs/{club.id}/memberships/subscribe",
                 json={"plan_id": str(silver_plan.id)},
@@ -807,6 +809,7 @@ class TestSubscribeToPlan:
                 billing_period=BillingPeriod.monthly,
                 price=Decimal("9.99"),
                 max_active_members=1,
+                active_member_count=1,
             )
             session.add(cap_plan)
             await session.flush()
@@ -866,8 +869,8 @@ class TestSubscribeToPlan:
     ):
         # Stripe customer but no default PM
         await _set_player_stripe(test_session_factory, player.id, default_pm=None)
-        with patch("stripe.Product.create", return_value=_mock_stripe_obj("prod_t")), \
-             patch("stripe.Price.create", return_value=_mock_stripe_obj("price_t")):
+        with patch("stripe.Product.create_async", return_value=_mock_stripe_obj("prod_t")), \
+             patch("stripe.Price.create_async", return_value=_mock_stripe_obj("price_t")):
             resp = await client.post(
                 f"/api/v1/clubs/{club.id}/memberships/subscribe",
                 json={"plan_id": str(silver_plan.id)},
@@ -930,9 +933,9 @@ class TestSubscribeToPlan:
     ):
         import stripe
         await _set_player_stripe(test_session_factory, player.id)
-        with patch("stripe.Product.create", return_value=_mock_stripe_obj("prod_t")), \
-             patch("stripe.Price.create", return_value=_mock_stripe_obj("price_t")), \
-             patch("stripe.Subscription.create",
+        with patch("stripe.Product.create_async", return_value=_mock_stripe_obj("prod_t")), \
+             patch("stripe.Price.create_async", return_value=_mock_stripe_obj("price_t")), \
+             patch("stripe.Subscription.create_async",
                    side_effect=stripe.StripeError("card declined")):
             resp = await client.post(
                 f"/api/v1/clubs/{club.id}/memberships/subscribe",
@@ -942,6 +945,24 @@ class TestSubscribeToPlan:
         assert resp.status_code == 400
 
 
+class TestReconcileActiveMemberCounts:
+    async def test_recounts_seats_written_outside_the_service(
+        self, membership_subscription, test_session_factory,
+    ):
+        # The fixture inserts its active subscription directly, so the plan's
+        # maintained count has not seen it.
+        _, plan = membership_subscription
+        async with test_session_factory() as session:
+            first = await MembershipService(session).reconcile_active_member_counts()
+        async with test_session_factory() as session:
+            second = await MembershipService(session).reconcile_active_member_counts()
+            p = await session.get(MembershipPlan, plan.id)
+
+        assert first["plans_corrected"] >= 1
+        assert second == {"plans_corrected": 0}
+        assert p.active_member_count == 1
+
+
 # ---------------------------------------------------------------------------
 # POST /api/v1/clubs/{id}/memberships/me/cancel
 # ---------------------------------------------------------------------------
@@ -962,8 +983,7 @@ class TestCancelMyMembership:
             )
             await session.commit()
 
-        with patch("stripe.Subscription.modify") as mock_modify, \
-             patch("app.services.membership_service.publish_notification_event"):
+        with patch("stripe.Subscription.modify_async") as mock_modify:
             resp = await client.post(
                 f"/api/v1/clubs/{club.id}/memberships/me/cancel",
                 headers=player_headers,
@@ -983,8 +1003,7 @@ class TestCancelMyMembership:
         self, client, player_headers, club, membership_subscription,
     ):
         # No stripe_subscription_id set — Stripe.modify must not be called
-        with patch("stripe.Subscription.modify") as mock_modify, \
-             patch("app.services.membership_service.publish_notification_event"):
+        with patch("stripe.Subscription.modify_async") as mock_modify:
             resp = await client.post(
                 f"/api/v1/clubs/{club.id}/memberships/me/cancel",
                 headers=player_headers,
@@ -1177,12 +1196,11 @@ class TestUpgradeMembership:
             "status": "active",
         }
 
-        with patch("stripe.Product.create", return_value=_mock_stripe_obj("prod_g")), \
-             patch("stripe.Price.create", return_value=_mock_stripe_obj("price_g")), \
-             patch("stripe.Subscription.retrieve", return_value=retrieved), \
-             patch("stripe.Subscription.modify",
-                   return_value=_mock_stripe_sub(sub_id="sub_remote_existing")) as mock_modify, \
-             patch("app.services.membership_service.publish_notification_event"):
+        with patch("stripe.Product.create_async", return_value=_mock_stripe_obj("prod_g")), \
+             patch("stripe.Price.create_async", return_value=_mock_stripe_obj("price_g")), \
+             patch("stripe.Subscription.retrieve_async", return_value=retrieved), \
+             patch("stripe.Subscription.modify_async",
+                   return_value=_mock_stripe_sub(sub_id="sub_remote_existing")) as mock_modify:
             resp = await client.post(
                 f"/api/v1/clubs/{club.id}/memberships/me/upgrade",
                 json={"plan_id": str(gold_plan.id)},
@@ -1213,12 +1231,11 @@ class TestUpgradeMembership:
         # No existing MembershipSubscription row for this player.
         await _set_player_stripe(test_session_factory, player.id)
 
-        with patch("stripe.Product.create", return_value=_mock_stripe_obj("prod_g")), \
-             patch("stripe.Price.create", return_value=_mock_stripe_obj("price_g")), \
-             patch("stripe.Subscription.create",
+        with patch("stripe.Product.create_async", return_value=_mock_stripe_obj("prod_g")), \
+             patch("stripe.Price.create_async", return_value=_mock_stripe_obj("price_g")), \
+             patch("stripe.Subscription.create_async",
                    return_value=_mock_stripe_sub(sub_id="sub_new")) as mock_create, \
-             patch("stripe.Subscription.modify") as mock_modify, \
-             patch("app.services.membership_service.publish_notification_event"):
+             patch("stripe.Subscription.modify_async") as mock_modify:
             resp = await client.post(
                 f"/api/v1/clubs/{club.id}/memberships/me/upgrade",
                 json={"plan_id": str(gold_plan.id)},
@@ -1342,10 +1359,10 @@ class TestUpgradeMembership:
             "items": {"data": [{"id": "si_existing"}]},
             "status": "active",
         }
-        with patch("stripe.Product.create", return_value=_mock_stripe_obj("prod_g")), \
-             patch("stripe.Price.create", return_value=_mock_stripe_obj("price_g")), \
-             patch("stripe.Subscription.retrieve", return_value=retrieved), \
-             patch("stripe.Subscription.modify",
+        with patch("stripe.Product.create_async", return_value=_mock_stripe_obj("prod_g")), \
+             patch("stripe.Price.create_async", return_value=_mock_stripe_obj("price_g")), \
+             patch("stripe.Subscription.retrieve_async", return_value=retrieved), \
+             patch("stripe.Subscription.modify_async",
                    side_effect=stripe_mod.StripeError("card declined")):
             resp = await client.post(
                 f"/api/v1/clubs/{club.id}/memberships/me/upgrade",
@@ -1419,8 +1436,7 @@ class TestDowngradeMembership:
             )
             await session.commit()
 
-        with patch("stripe.Subscription.modify") as mock_modify, \
-             patch("app.services.membership_service.publish_notification_event"):
+        with patch("stripe.Subscription.modify_async") as mock_modify:
             resp = await client.post(
                 f"/api/v1/clubs/{club.id}/memberships/me/downgrade",
                 json={"plan_id": str(bronze_plan.id)},
@@ -1451,8 +1467,7 @@ class TestDowngradeMembership:
             )
             await session.commit()
 
-        with patch("stripe.Subscription.modify"), \
-             patch("app.services.membership_service.publish_notification_event"):
+        with patch("stripe.Subscription.modify_async"):
             resp = await client.post(
                 f"/api/v1/clubs/{club.id}/memberships/me/downgrade",
                 json={"plan_id": str(free_default_plan.id)},
@@ -1573,7 +1588,7 @@ class TestCancelPendingDowngrade:
             )
             await session.commit()
 
-        with patch("stripe.Subscription.modify") as mock_modify:
+        with patch("stripe.Subscription.modify_async") as mock_modify:
             resp = await client.post(
                 f"/api/v1/clubs/{club.id}/memberships/me/downgrade/cancel",
                 headers=player_headers,
@@ -13,7 +13,7 @@ All Stripe API calls are mocked — no network traffic.
 """
 
 import uuid
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from app.core.security import create_access_token
 from app.db.models.tenant import Tenant as TenantModel
@@ -74,8 +74,8 @@ async def _set_stripe_fields(
 
 class TestCreateSetupIntent:
     async def test_success(self, client, player_headers):
-        with patch("stripe.Customer.create", return_value=_mock_customer()), \
-             patch("stripe.SetupIntent.create", return_value=_mock_setup_intent()):
+        with patch("stripe.Customer.create_async", return_value=_mock_customer()), \
+             patch("stripe.SetupIntent.create_async", return_value=_mock_setup_intent()):
             resp = await client.post("/api/v1/payments/setup-intent", headers=player_headers)
 
         assert resp.status_code == 200
@@ -87,8 +87,8 @@ class TestCreateSetupIntent:
         """When stripe_customer_id is already set, Customer.create must not be called."""
         await _set_stripe_fields(test_session_factory, player.id)
 
-        with patch("stripe.Customer.create") as mock_create, \
-             patch("stripe.SetupIntent.create", return_value=_mock_setup_intent()):
+        with patch("stripe.Customer.create_async") as mock_create, \
+             patch("stripe.SetupIntent.create_async", return_value=_mock_setup_intent()):
             resp = await client.post("/api/v1/payments/setup-intent", headers=player_headers)
 
         assert resp.status_code == 200
@@ -138,10 +138,10 @@ class TestSavePaymentMethod:
         """Unattached PM (direct createPaymentMethod flow): retrieve → attach → set default."""
         unattached_pm = _mock_pm(attached=False)
         attached_pm = _mock_pm()
-        with patch("stripe.Customer.create", return_value=_mock_customer()), \
-             patch("stripe.PaymentMethod.retrieve", return_value=unattached_pm), \
-             patch("stripe.PaymentMethod.attach", return_value=attached_pm), \
-             patch("stripe.Customer.modify"):
+        with patch("stripe.Customer.create_async", return_value=_mock_customer()), \
+             patch("stripe.PaymentMethod.retrieve_async", return_value=unattached_pm), \
+             patch("stripe.PaymentMethod.attach_async", new_callable=AsyncMock, return_value=attached_pm), \
+             patch("stripe.Customer.modify_async"):
             resp = await client.post(
                 "/api/v1/payments/payment-methods",
                 json={"payment_method_id": STRIPE_PM_ID, "set_as_default": True},
@@ -163,9 +163,9 @@ class TestSavePaymentMethod:
 
         unattached_pm = _mock_pm(attached=False)
         attached_pm = _mock_pm()
-        with patch("stripe.Customer.create", return_value=_mock_customer()), \
-             patch("stripe.PaymentMethod.retrieve", return_value=unattached_pm), \
-             patch("stripe.PaymentMethod.attach", return_value=attached_pm):
+        with patch("stripe.Customer.create_async", return_value=_mock_customer()), \
+             patch("stripe.PaymentMethod.retrieve_async", return_value=unattached_pm), \
+             patch("stripe.PaymentMethod.attach_async", new_callable=AsyncMock, return_value=attached_pm):
             resp = await client.post(
                 "/api/v1/payments/payment-methods",
                 json={"payment_method_id": STRIPE_PM_ID, "set_as_default": False},
@@ -178,10 +178,10 @@ class TestSavePaymentMethod:
     async def test_default_persisted_to_db(self, client, player, player_headers, test_session_factory):
         unattached_pm = _mock_pm(attached=False)
         attached_pm = _mock_pm()
-        with patch("stripe.Customer.create", return_value=_mock_customer()), \
-             patch("stripe.PaymentMethod.retrieve", return_value=unattached_pm), \
-             patch("stripe.PaymentMethod.attach", return_value=attached_pm), \
-             patch("stripe.Customer.modify"):
+        with patch("stripe.Customer.create_async", return_value=_mock_customer()), \
+             patch("stripe.PaymentMethod.retrieve_async", return_value=unattached_pm), \
+             patch("stripe.PaymentMethod.attach_async", new_callable=AsyncMock, return_value=attached_pm), \
+             patch("stripe.Customer.modify_async"):
             await client.post(
                 "/api/v1/payments/payment-methods",
                 json={"payment_method_id": STRIPE_PM_ID, "set_as_default": True},
@@ -197,9 +197,9 @@ class TestSavePaymentMethod:
         await _set_stripe_fields(test_session_factory, player.id)
 
         already_attached_pm = _mock_pm()  # customer == STRIPE_CUSTOMER_ID
-        with patch("stripe.PaymentMethod.retrieve", return_value=already_attached_pm) as mock_retrieve, \
-             patch("stripe.PaymentMethod.attach") as mock_attach, \
-             patch("stripe.Customer.modify"):
+        with patch("stripe.PaymentMethod.retrieve_async", return_value=already_attached_pm) as mock_retrieve, \
+             patch("stripe.PaymentMethod.attach_async", new_callable=AsyncMock) as mock_attach, \
+             patch("stripe.Customer.modify_async"):
             resp = await client.post(
                 "/api/v1/payments/payment-methods",
                 json={"payment_method_id": STRIPE_PM_ID, "set_as_default": True},
@@ -215,7 +215,7 @@ class TestSavePaymentMethod:
         await _set_stripe_fields(test_session_factory, player.id)
 
         foreign_pm = _mock_pm(customer_id="cus_someoneElse")
-        with patch("stripe.PaymentMethod.retrieve", return_value=foreign_pm):
+        with patch("stripe.PaymentMethod.retrieve_async", return_value=foreign_pm):
             resp = await client.post(
                 "/api/v1/payments/payment-methods",
                 json={"payment_method_id": STRIPE_PM_ID, "set_as_default": True},
@@ -246,7 +246,7 @@ class TestListPaymentMethods:
         mock_list = MagicMock()
         mock_list.data = [pm1, pm2]
 
-        with patch("stripe.PaymentMethod.list", return_value=mock_list):
+        with patch("stripe.PaymentMethod.list_async", return_value=mock_list):
             resp = await client.get("/api/v1/payments/payment-methods", headers=player_headers)
 
         assert resp.status_code == 200
@@ -261,8 +261,8 @@ class TestListPaymentMethods:
         mock_list = MagicMock()
         mock_list.data = []
 
-        with patch("stripe.Customer.create", return_value=_mock_customer()), \
-             patch("stripe.PaymentMethod.list", return_value=mock_list):
+        with patch("stripe.Customer.create_async", return_value=_mock_customer()), \
+             patch("stripe.PaymentMethod.list_async", return_value=mock_list):
             resp = await client.get("/api/v1/payments/payment-methods", headers=player_headers)
 
         assert resp.status_code == 200
@@ -282,8 +282,8 @@ class TestDeletePaymentMethod:
     async def test_success(self, client, player, player_headers, test_session_factory):
         await _set_stripe_fields(test_session_factory, player.id, default_pm_id=STRIPE_PM_ID_2)
 
-        with patch("stripe.PaymentMethod.retrieve", return_value=_mock_pm(STRIPE_PM_ID)), \
-             patch("stripe.PaymentMethod.detach"):
+        with patch("stripe.PaymentMethod.retrieve_async", return_value=_mock_pm(STRIPE_PM_ID)), \
+             patch("stripe.PaymentMethod.detach_async", new_callable=AsyncMock):
             resp = await client.delete(
                 f"/api/v1/payments/payment-methods/{STRIPE_PM_ID}",
                 headers=player_headers,
@@ -294,8 +294,8 @@ class TestDeletePaymentMethod:
     async def test_deleting_default_clears_it(self, client, player, player_headers, test_session_factory):
         await _set_stripe_fields(test_session_factory, player.id, default_pm_id=STRIPE_PM_ID)
 
-        with patch("stripe.PaymentMethod.retrieve", return_value=_mock_pm(STRIPE_PM_ID)), \
-             patch("stripe.PaymentMethod.detach"):
+        with patch("stripe.PaymentMethod.retrieve_async", return_value=_mock_pm(STRIPE_PM_ID)), \
+             patch("stripe.PaymentMethod.detach_async", new_callable=AsyncMock):
             resp = await client.delete(
                 f"/api/v1/payments/payment-methods/{STRIPE_PM_ID}",
                 headers=player_headers,
@@ -312,7 +312,7 @@ class TestDeletePaymentMethod:
         await _set_stripe_fields(test_session_factory, player.id)
 
         foreign_pm = _mock_pm(STRIPE_PM_ID, customer_id="cus_SOMEONE_ELSE")
-        with patch("stripe.PaymentMethod.retrieve", return_value=foreign_pm):
+        with patch("stripe.PaymentMethod.retrieve_async", return_value=foreign_pm):
             resp = await client.delete(
                 f"/api/v1/payments/payment-methods/{STRIPE_PM_ID}",
                 headers=player_headers,
@@ -334,8 +334,8 @@ class TestSetDefaultPaymentMethod:
     async def test_success(self, client, player, player_headers, test_session_factory):
         await _set_stripe_fields(test_session_factory, player.id, default_pm_id=STRIPE_PM_ID_2)
 
-        with patch("stripe.PaymentMethod.retrieve", return_value=_mock_pm(STRIPE_PM_ID)), \
-             patch("stripe.Customer.modify"):
+        with patch("stripe.PaymentMethod.retrieve_async", return_value=_mock_pm(STRIPE_PM_ID)), \
+             patch("stripe.Customer.modify_async"):
             resp = await client.patch(
                 f"/api/v1/payments/payment-methods/{STRIPE_PM_ID}/default",
                 headers=player_headers,
@@ -354,7 +354,7 @@ class TestSetDefaultPaymentMethod:
         await _set_stripe_fields(test_session_factory, player.id)
 
         foreign_pm = _mock_pm(STRIPE_PM_ID, customer_id="cus_SOMEONE_ELSE")
-        with patch("stripe.PaymentMethod.retrieve", return_value=foreign_pm):
+        with patch("stripe.PaymentMethod.retrieve_async", return_value=foreign_pm):
             resp = await client.patch(
                 f"/api/v1/payments/payment-methods/{STRIPE_PM_ID}/default",
                 headers=player_headers,
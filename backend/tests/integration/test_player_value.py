@@ -346,6 +346,39 @@ class TestValueLeaderboard:
         assert len(body["rows"]) == 1  # page is limited
         assert body["total_records"] == 3  # but the count is the full set
 
+    async def test_cursor_walk_matches_offset_order(
+        self, client, staff_headers, club, seeded_players
+    ):
+        """Seeking page by page (across B's NULL last_played_at) returns the
+        same rows in the same order as one unpaginated request."""
+        base = f"/api/v1/analytics/players/clubs/{club.id}/value?sort=last_played_at"
+        full = (await client.get(f"{base}&limit=50", headers=staff_headers)).json()
+        assert full["next_cursor"] is None
+
+        walked, cursor = [], None
+        while True:
+            url = f"{base}&limit=1" + (f"&cursor={cursor}" if cursor else "")
+            resp = await client.get(url, headers=staff_headers)
+            assert resp.status_code == 200
+            body = resp.json()
+            assert body["total_records"] == 3
+            walked += [r["user_id"] for r in body["rows"]]
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+        assert walked == [r["user_id"] for r in full["rows"]]
+        assert full["rows"][-1]["last_played_at"] is None  # NULLS LAST
+
+    async def test_cursor_from_another_sort_rejected(
+        self, client, staff_headers, club, seeded_players
+    ):
+        base = f"/api/v1/analytics/players/clubs/{club.id}/value"
+        cursor = (await client.get(f"{base}?limit=1", headers=staff_headers)).json()["next_cursor"]
+        resp = await client.get(
+            f"{base}?limit=1&sort=bookings_played&cursor={cursor}", headers=staff_headers
+        )
+        assert resp.status_code == 422
+
 
 class TestMostActive:
     async def test_recent_players_ranked(self, client, staff_headers, club, seeded_players):
@@ -8,12 +8,14 @@ GET /analytics/revenue/clubs/{id}/summary    — role 403, tenant 404, empty sta
 GET /analytics/revenue/clubs/{id}/by-type     — six-type split
 GET /analytics/revenue/clubs/{id}/timeseries  — granularity rollup, range cap
 GET /analytics/revenue/clubs                   — tenant-wide cross-club comparison
-
-Unlike the snapshot tables, the revenue views are *materialized views*, not ORM
-tables, so ``Base.metadata.create_all`` does not build them. The
-``revenue_views`` fixture creates them in the test DB using the exact DDL frozen
-in the migration (single source of truth), and seeded tests ``REFRESH`` them
-after committing real payments/bookings.
+revenue_rollups service                        — incremental refund/delete, reconcile + repair
+response cache                                 — ETag 304 until a rollup apply moves the generation
+
+The revenue rollups are ORM tables, so ``Base.metadata.create_all`` builds
+them, but the triggers that queue changed payments are hand-written DDL. The
+``revenue_rollups`` fixture installs them in the test DB from the constants
+frozen in the migration (single source of truth), and seeded tests apply the
+queue with ``apply_dirty_batch`` after committing real payments/bookings.
 """
 import importlib.util
 import pathlib
@@ -21,10 +23,20 @@ import uuid
 from datetime import datetime, timezone
 from decimal import Decimal
 
+import pytest
 import pytest_asyncio
 from sqlalchemy import delete as sql_delete
-from sqlalchemy import text
-
+from sqlalchemy import text, update
+
+from app.analytics.api import response_cache
+from app.analytics.services.revenue_rollups import apply_dirty_batch, reconcile_revenue_rollups
+from app.db.models.analytics import (
+    AnalyticsDataGeneration,
+    RevenueByClubDayCash,
+    RevenueByClubDayService,
+    RevenueDirtyPayment,
+    RevenuePaymentFact,
+)
 from app.db.models.booking import Booking, BookingType, BookingStatus
 from app.db.models.court import Court
 from app.db.models.equipment import EquipmentInventory, EquipmentRental, ItemType, ItemCondition
@@ -36,41 +48,57 @@ REVENUE_DATE = "2026-05-20"
 
 _MIGRATIONS = pathlib.Path(__file__).resolve().parents[2] / "app" / "db" / "migrations" / "versions"
 
+_ROLLUP_MODELS = (
+    RevenueDirtyPayment, RevenuePaymentFact, RevenueByClubDayService, RevenueByClubDayCash,
+    AnalyticsDataGeneration,
+)
 
-def _load_view_ddl():
-    """Import the frozen MV DDL constants from the create-views migration."""
-    path = next(_MIGRATIONS.glob("*_create_revenue_by_club_materialized_*.py"))
-    spec = importlib.util.spec_from_file_location("_rev_mv_migration", path)
+
+def _load_trigger_ddl():
+    """Import the frozen trigger DDL constants from the revenue-rollups migration."""
+    path = next(_MIGRATIONS.glob("*_revenue_rollups.py"))
+    spec = importlib.util.spec_from_file_location("_rev_rollup_migration", path)
     mod = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(mod)
     return mod
 
 
 @pytest_asyncio.fixture(scope="module")
-async def revenue_views(test_engine):
-    """Create both revenue materialized views in the test DB (once per module)."""
-    mig = _load_view_ddl()
+async def revenue_rollups(test_engine):
+    """Install the revenue dirty-queue triggers in the test DB (once per module)."""
+    mig = _load_trigger_ddl()
     async with test_engine.begin() as conn:
-        for view_name, bucket_ts in mig._VIEWS.items():
-            await conn.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {view_name}"))
-            await conn.execute(text(mig._VIEW_SQL.format(view_name=view_name, bucket_ts=bucket_ts)))
-            await conn.execute(
-                text(mig._INDEX_SQL.format(index_name=f"ix_{view_name}_key", view_name=view_name))
-            )
+        for statement in mig._DROP_TRIGGER_SQL + mig._TRIGGER_SQL:
+            await conn.execute(text(statement))
     yield
     async with test_engine.begin() as conn:
-        for view_name in mig._VIEWS:
-            await conn.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {view_name}"))
+        for statement in mig._DROP_TRIGGER_SQL:
+            await conn.execute(text(statement))
+        for model in _ROLLUP_MODELS:
+            await conn.execute(sql_delete(model))
 
 
-async def _refresh(test_engine):
-    async with test_engine.begin() as conn:
-        await conn.execute(text("REFRESH MATERIALIZED VIEW mv_revenue_by_club_day_service"))
-        await conn.execute(text("REFRESH MATERIALIZED VIEW mv_revenue_by_club_day_cash"))
+async def _apply(session_factory):
+    """Drain the dirty-payment queue into the rollups."""
+    while True:
+        async with session_factory() as session:
+            batch = await apply_dirty_batch(session, batch_size=100)
+        if not batch["claimed"]:
+            return
+
+
+async def _summary(client, headers, club_id, basis="service"):
+    resp = await client.get(
+        f"/api/v1/analytics/revenue/clubs/{club_id}/summary"
+        f"?date_from=2026-05-01&date_to=2026-05-31&basis={basis}",
+        headers=headers,
+    )
+    assert resp.status_code == 200
+    return resp.json()
 
 
 @pytest_asyncio.fixture
-async def seeded_revenue(club, player, test_session_factory, test_engine, revenue_views):
+async def seeded_revenue(club, player, test_session_factory, revenue_rollups):
     """One regular booking with a £50 payment that embeds an £8 equipment rental.
 
     Subtract-embedded expectation: regular net = 42.00, equipment net = 8.00,
@@ -112,7 +140,7 @@ async def seeded_revenue(club, player, test_session_factory, test_engine, revenu
         await session.commit()
         ids = {"court": court.id, "booking": booking.id, "equip": equip.id}
 
-    await _refresh(test_engine)
+    await _apply(test_session_factory)
     yield ids
 
     async with test_session_factory() as session:
@@ -122,11 +150,11 @@ async def seeded_revenue(club, player, test_session_factory, test_engine, revenu
         await session.execute(sql_delete(Booking).where(Booking.id == ids["booking"]))
         await session.execute(sql_delete(Court).where(Court.id == ids["court"]))
         await session.commit()
-    await _refresh(test_engine)
+    await _apply(test_session_factory)
 
 
 class TestRoleEnforcement:
-    async def test_player_forbidden(self, client, player_headers, club, revenue_views):
+    async def test_player_forbidden(self, client, player_headers, club, revenue_rollups):
         resp = await client.get(
             f"/api/v1/analytics/revenue/clubs/{club.id}/summary", headers=player_headers
         )
@@ -135,7 +163,7 @@ class TestRoleEnforcement:
 
 class TestTenantIsolation:
     async def test_other_tenants_club_returns_404(
-        self, client, staff_headers, test_session_factory, plan, revenue_views
+        self, client, staff_headers, test_session_factory, plan, revenue_rollups
     ):
         from app.db.models.club import Club
         from app.db.models.tenant import Tenant as TenantModel
@@ -170,7 +198,7 @@ class TestTenantIsolation:
 
 
 class TestEmptyState:
-    async def test_summary_zeroed(self, client, staff_headers, club, revenue_views):
+    async def test_summary_zeroed(self, client, staff_headers, club, revenue_rollups):
         resp = await client.get(
             f"/api/v1/analytics/revenue/clubs/{club.id}/summary"
             f"?date_from=2026-05-01&date_to=2026-05-31",
@@ -182,7 +210,7 @@ class TestEmptyState:
         assert body["transaction_count"] == 0
         assert body["by_type"] == []
 
-    async def test_timeseries_empty(self, client, staff_headers, club, revenue_views):
+    async def test_timeseries_empty(self, client, staff_headers, club, revenue_rollups):
         resp = await client.get(
             f"/api/v1/analytics/revenue/clubs/{club.id}/timeseries"
             f"?date_from=2026-05-01&date_to=2026-05-31",
@@ -193,7 +221,7 @@ class TestEmptyState:
 
 
 class TestRangeCap:
-    async def test_range_cap_rejected(self, client, staff_headers, club, revenue_views):
+    async def test_range_cap_rejected(self, client, staff_headers, club, revenue_rollups):
         resp = await client.get(
             f"/api/v1/analytics/revenue/clubs/{club.id}/summary"
             f"?date_from=2020-01-01&date_to=2026-01-01",
@@ -271,3 +299,119 @@ class TestCrossClub:
         rows = {r["club_id"]: r for r in resp.json()["clubs"]}
         assert str(club.id) in rows
         assert Decimal(rows[str(club.id)]["net_amount"]) == Decimal("50.00")
+
+
+class TestIncrementalRollups:
+    async def test_refund_is_applied_without_a_rebuild(
+        self, client, staff_headers, club, seeded_revenue, test_session_factory
+    ):
+        async with test_session_factory() as session:
+            await session.execute(
+                update(Payment)
+                .where(Payment.booking_id == seeded_revenue["booking"])
+                .values(refund_amount=Decimal("10.00"), state=PaymentState.partially_refunded)
+            )
+            await session.commit()
+        await _apply(test_session_factory)
+
+        body = await _summary(client, staff_headers, club.id)
+        assert Decimal(body["gross_amount"]) == Decimal("50.00")
+        assert Decimal(body["refund_amount"]) == Decimal("10.00")
+        assert Decimal(body["net_amount"]) == Decimal("40.00")
+        by_type = {r["revenue_type"]: r for r in body["by_type"]}
+        assert Decimal(by_type["equipment"]["refund_amount"]) == Decimal("0")
+
+    async def test_deleted_payment_leaves_no_rows(
+        self, client, staff_headers, club, seeded_revenue, test_session_factory
+    ):
+        async with test_session_factory() as session:
+            await session.execute(sql_delete(Payment).where(Payment.booking_id == seeded_revenue["booking"]))
+            await session.commit()
+        await _apply(test_session_factory)
+
+        body = await _summary(client, staff_headers, club.id, basis="cash")
+        assert body["transaction_count"] == 0
+        assert body["by_type"] == []
+
+    async def test_reconcile_detects_and_repairs_drift(
+        self, club, seeded_revenue, test_session_factory
+    ):
+        # Reconciliation is DB-wide; assert on this module's club only.
+        async with test_session_factory() as session:
+            result = await reconcile_revenue_rollups(session)
+        assert str(club.id) not in result["clubs"]
+
+        async with test_session_factory() as session:
+            await session.execute(
+                update(RevenueByClubDayCash)
+                .where(RevenueByClubDayCash.club_id == club.id)
+                .values(net_amount=Decimal("999.00"))
+            )
+            await session.commit()
+
+        async with test_session_factory() as session:
+            result = await reconcile_revenue_rollups(session, repair=True)
+        assert str(club.id) in result["clubs"]
+        assert result["mismatched_keys"]["cash"] >= 2
+        assert result["repaired"] is True
+
+        async with test_session_factory() as session:
+            result = await reconcile_revenue_rollups(session)
+        assert str(club.id) not in result["clubs"]
+
+    async def test_reconcile_folds_queued_payments_before_comparing(
+        self, club, seeded_revenue, test_session_factory
+    ):
+        # A refund the applier has not reached yet is pending work, not drift.
+        async with test_session_factory() as session:
+            await session.execute(
+                update(Payment)
+                .where(Payment.booking_id == seeded_revenue["booking"])
+                .values(refund_amount=Decimal("10.00"), state=PaymentState.partially_refunded)
+            )
+            await session.commit()
+
+        async with test_session_factory() as session:
+            result = await reconcile_revenue_rollups(session)
+        assert str(club.id) not in result["clubs"]
+
+        async with test_session_factory() as session:
+            queued = await session.execute(text("SELECT count(*) FROM revenue_dirty_payments"))
+        assert queued.scalar_one() == 0
+
+
+class TestResponseCache:
+    @pytest.fixture(autouse=True)
+    def response_cache_on(self, monkeypatch):
+        # tests/conftest.py disables the cache; switch it on for this class.
+        cache = response_cache.ResponseCache(max_entries=100)
+        monkeypatch.setattr(response_cache, "get_response_cache", lambda: cache)
+
+    async def test_unchanged_rollups_revalidate_with_304_until_an_apply(
+        self, client, staff_headers, club, seeded_revenue, test_session_factory
+    ):
+        url = (
+            f"/api/v1/analytics/revenue/clubs/{club.id}/summary"
+            "?date_from=2026-05-01&date_to=2026-05-31"
+        )
+        first = await client.get(url, headers=staff_headers)
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+
+        revalidated = await client.get(url, headers={**staff_headers, "If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["etag"] == etag
+
+        async with test_session_factory() as session:
+            await session.execute(
+                update(Payment)
+                .where(Payment.booking_id == seeded_revenue["booking"])
+                .values(refund_amount=Decimal("10.00"), state=PaymentState.partially_refunded)
+            )
+            await session.commit()
+        await _apply(test_session_factory)
+
+        changed = await client.get(url, headers={**staff_headers, "If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+        assert Decimal(changed.json()["net_amount"]) == Decimal("40.00")
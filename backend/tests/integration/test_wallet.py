@@ -303,7 +303,7 @@ class TestWalletTopUp:
         await _set_stripe_fields(test_session_factory, player.id)
         wallet = await _create_wallet(test_session_factory, player.id, balance="10.00")
         try:
-            with patch("stripe.PaymentIntent.create", return_value=_mock_pi(2000)):
+            with patch("stripe.PaymentIntent.create_async", return_value=_mock_pi(2000)):
                 resp = await client.post(
                     "/api/v1/payments/wallet/top-up",
                     json={"amount_pence": 2000, "payment_method_id": STRIPE_PM_ID},
@@ -323,7 +323,7 @@ class TestWalletTopUp:
         await _set_stripe_fields(test_session_factory, player.id, default_pm_id=STRIPE_PM_ID)
         wallet = await _create_wallet(test_session_factory, player.id, balance="5.00")
         try:
-            with patch("stripe.PaymentIntent.create", return_value=_mock_pi(1500)) as mock_create:
+            with patch("stripe.PaymentIntent.create_async", return_value=_mock_pi(1500)) as mock_create:
                 resp = await client.post(
                     "/api/v1/payments/wallet/top-up",
                     json={"amount_pence": 1500},
@@ -338,7 +338,7 @@ class TestWalletTopUp:
     async def test_auto_creates_wallet_when_none_exists(self, client, player, player_headers, test_session_factory):
         """If the player has no wallet, one is created during the top-up call."""
         await _set_stripe_fields(test_session_factory, player.id, default_pm_id=STRIPE_PM_ID)
-        with patch("stripe.PaymentIntent.create", return_value=_mock_pi(1000)):
+        with patch("stripe.PaymentIntent.create_async", return_value=_mock_pi(1000)):
             resp = await client.post(
                 "/api/v1/payments/wallet/top-up",
                 json={"amount_pence": 1000},
@@ -462,7 +462,7 @@ class TestSettleWalletDebts:
                     await session.commit()
 
     async def test_no_unsettled_debts_returns_zero_counts(self, client, admin_headers):
-        with patch("stripe.Transfer.create") as mock_transfer:
+        with patch("stripe.Transfer.create_async") as mock_transfer:
             resp = await client.post("/api/v1/payments/wallet/settle-debts", headers=admin_headers)
         assert resp.status_code == 200
         body = resp.json()
@@ -482,7 +482,7 @@ class TestSettleWalletDebts:
         )
         await _create_wallet_club_debt(test_session_factory, club.id, tenant.id, txn.id)
         try:
-            with patch("stripe.Transfer.create") as mock_transfer:
+            with patch("stripe.Transfer.create_async") as mock_transfer:
                 resp = await client.post("/api/v1/payments/wallet/settle-debts", headers=admin_headers)
             assert resp.status_code == 200
             body = resp.json()
@@ -512,7 +512,7 @@ class TestSettleWalletDebts:
             amount="15.00", platform_fee="0.75",
         )
         try:
-            with patch("stripe.Transfer.create", return_value=_mock_transfer()):
+            with patch("stripe.Transfer.create_async", return_value=_mock_transfer()):
                 resp = await client.post("/api/v1/payments/wallet/settle-debts", headers=admin_headers)
             assert resp.status_code == 200
             body = resp.json()
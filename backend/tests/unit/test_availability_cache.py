@@ -0,0 +1,297 @@
+"""
+Unit tests for the per-club-day availability occupancy cache.
+
+Covers the local LRU backend, the Redis backend's versioned writes (against an
+in-memory stand-in for the client), the wire format used by shared backends,
+the facade's invalidation bookkeeping and the after-commit session hooks.
+"""
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.services import availability_cache as cache_module
+from app.services.availability_cache import (
+    AvailabilityCache,
+    DayOccupancy,
+    LocalLRUBackend,
+    OpenGameMarker,
+    RedisBackend,
+    mark_availability_dirty,
+    mark_club_availability_dirty,
+)
+
+CLUB_ID = uuid.uuid4()
+COURTS = (uuid.uuid4(), uuid.uuid4())
+DAY = date(2027, 5, 3)
+
+
+def _entry(day=DAY, built_at=None, **overrides):
+    params = dict(
+        club_id=CLUB_ID,
+        day=day,
+        slot_minutes=90,
+        window_open=datetime(2027, 5, 3, 9, 0, tzinfo=timezone.utc),
+        window_close=datetime(2027, 5, 3, 12, 0, tzinfo=timezone.utc),
+        court_ids=COURTS,
+        built_at=time.time() if built_at is None else built_at,
+    )
+    params.update(overrides)
+    return DayOccupancy(**params)
+
+
+def _enabled_cache():
+    return AvailabilityCache(LocalLRUBackend(max_entries=8), ttl_seconds=60)
+
+
+# ---------------------------------------------------------------------------
+# DayOccupancy
+# ---------------------------------------------------------------------------
+
+
+def test_slot_count_and_bits():
+    entry = _entry(booked=0b0110, blocked=0b1000)
+    assert entry.slot_count == 2
+    assert entry.bit(1, 0) == 2
+    assert entry.is_booked(1) and entry.is_booked(2)
+    assert not entry.is_booked(0)
+    assert entry.is_blocked(3)
+
+
+def test_closed_day_has_no_slots():
+    assert _entry(window_open=None, window_close=None).slot_count == 0
+
+
+def test_serves_requires_same_grid_and_superset_of_courts():
+    entry = _entry()
+    assert entry.serves([COURTS[0]], 90)
+    assert not entry.serves([COURTS[0]], 60)
+    assert not entry.serves([uuid.uuid4()], 90)
+
+
+def test_wire_format_round_trips():
+    marker = OpenGameMarker(
+        booking_id=uuid.uuid4(),
+        court_id=COURTS[1],
+        max_players=4,
+        accepted_count=2,
+        active_user_ids=frozenset({uuid.uuid4()}),
+        min_skill_level=Decimal("2.5"),
+        max_skill_level=None,
+        total_price=Decimal("48.00"),
+    )
+    entry = _entry(booked=0b10, blocked=0b100, open_games={1: marker})
+    assert DayOccupancy.from_bytes(entry.to_bytes()) == entry
+
+
+# ---------------------------------------------------------------------------
+# LocalLRUBackend
+# ---------------------------------------------------------------------------
+
+
+async def test_lru_evicts_least_recently_used():
+    backend = LocalLRUBackend(max_entries=2)
+    await backend.set_many({"a": _entry(), "b": _entry()}, ttl_seconds=60)
+    await backend.get_many(["a"])  # touch a → b is now oldest
+    await backend.set_many({"c": _entry()}, ttl_seconds=60)
+    a, b, c = await backend.get_many(["a", "b", "c"])
+    assert a is not None and b is None and c is not None
+
+
+async def test_lru_expires_entries():
+    backend = LocalLRUBackend(max_entries=2)
+    await backend.set_many({"a": _entry()}, ttl_seconds=0)
+    assert await backend.get_many(["a"]) == [None]
+
+
+async def test_lru_delete_prefix():
+    backend = LocalLRUBackend(max_entries=8)
+    await backend.set_many({"x:1": _entry(), "x:2": _entry(), "y:1": _entry()}, ttl_seconds=60)
+    await backend.delete_prefix("x:")
+    x1, x2, y1 = await backend.get_many(["x:1", "x:2", "y:1"])
+    assert x1 is None and x2 is None and y1 is not None
+
+
+# ---------------------------------------------------------------------------
+# RedisBackend
+# ---------------------------------------------------------------------------
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self._client = client
+        self._ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self._ops.append((name, args, kwargs))
+
+    async def execute(self):
+        return [await getattr(self._client, name)(*args, **kwargs) for name, args, kwargs in self._ops]
+
+
+class _FakeRedis:
+    """Just enough of ``redis.asyncio.Redis`` for ``RedisBackend``. The
+    registered script is emulated from its documented KEYS/ARGV layout."""
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+
+    async def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, b"0")) + 1).encode()
+
+    async def expire(self, key, seconds):
+        pass
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def scan_iter(self, match):
+        for key in list(self.data):
+            if key.startswith(match.rstrip("*")):
+                yield key
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    def register_script(self, script):
+        async def run(keys, args):
+            for i in range(len(keys) // 3):
+                entry, day_version, club_version = keys[3 * i:3 * i + 3]
+                value, expected_day, expected_club = args[3 * i + 1:3 * i + 4]
+                if (
+                    self.data.get(day_version, b"").decode() == expected_day
+                    and self.data.get(club_version, b"").decode() == expected_club
+                ):
+                    self.data[entry] = value
+
+        return run
+
+
+def _redis_pair():
+    """A reader's cache and another instance's backend over one server."""
+    client = _FakeRedis()
+    reader = AvailabilityCache(RedisBackend(client, version_ttl_seconds=600), ttl_seconds=60)
+    return reader, RedisBackend(client, version_ttl_seconds=600)
+
+
+async def test_redis_round_trips_entries():
+    cache, _ = _redis_pair()
+    await cache.put_days([_entry(built_at=1.0e10)], await cache.stamp_days(CLUB_ID, [DAY]))
+    assert await cache.get_days(CLUB_ID, [DAY]) == {DAY: _entry(built_at=1.0e10)}
+
+
+async def test_redis_skips_entry_invalidated_on_another_instance_while_loading():
+    reader, other_instance = _redis_pair()
+    other_day = DAY + timedelta(days=1)
+
+    stamp = await reader.stamp_days(CLUB_ID, [DAY, other_day])
+    # A write commits elsewhere while the reader is loading; the reader's
+    # in-process log knows nothing about it.
+    await other_instance.delete_many([cache_module.day_key(CLUB_ID, DAY)])
+    await reader.put_days([_entry(), _entry(day=other_day)], stamp)
+
+    assert list(await reader.get_days(CLUB_ID, [DAY, other_day])) == [other_day]
+
+
+async def test_redis_skips_entries_after_a_club_wide_invalidation():
+    reader, other_instance = _redis_pair()
+
+    stamp = await reader.stamp_days(CLUB_ID, [DAY])
+    await other_instance.delete_prefix(cache_module.club_key_prefix(CLUB_ID))
+    await reader.put_days([_entry()], stamp)
+
+    assert await reader.get_days(CLUB_ID, [DAY]) == {}
+    # A load stamped after the invalidation is stored as usual.
+    await reader.put_days([_entry()], await reader.stamp_days(CLUB_ID, [DAY]))
+    assert list(await reader.get_days(CLUB_ID, [DAY])) == [DAY]
+
+
+# ---------------------------------------------------------------------------
+# AvailabilityCache facade
+# ---------------------------------------------------------------------------
+
+
+async def test_disabled_cache_is_a_no_op():
+    cache = AvailabilityCache(None, 0)
+    await cache.put_days([_entry()])
+    assert await cache.get_days(CLUB_ID, [DAY]) == {}
+
+
+async def test_put_then_get():
+    cache = _enabled_cache()
+    await cache.put_days([_entry()])
+    assert list(await cache.get_days(CLUB_ID, [DAY, DAY + timedelta(days=1)])) == [DAY]
+
+
+async def test_invalidate_drops_day():
+    cache = _enabled_cache()
+    await cache.put_days([_entry(), _entry(day=DAY + timedelta(days=1))])
+    cache.invalidate(CLUB_ID, [DAY])
+    assert list(await cache.get_days(CLUB_ID, [DAY, DAY + timedelta(days=1)])) == [DAY + timedelta(days=1)]
+
+
+async def test_entry_loaded_before_invalidation_is_not_stored():
+    cache = _enabled_cache()
+    loaded_at = time.time()
+    cache.invalidate(CLUB_ID, [DAY])  # a write commits while the miss is loading
+    await cache.put_days([_entry(built_at=loaded_at)])
+    assert await cache.get_days(CLUB_ID, [DAY]) == {}
+
+
+async def test_invalidate_club_drops_every_day():
+    cache = _enabled_cache()
+    await cache.put_days([_entry(), _entry(day=DAY + timedelta(days=3))])
+    cache.invalidate_club(CLUB_ID)
+    assert await cache.get_days(CLUB_ID, [DAY, DAY + timedelta(days=3)]) == {}
+
+
+# ---------------------------------------------------------------------------
+# Session hooks
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def enabled_cache(monkeypatch):
+    cache = _enabled_cache()
+    monkeypatch.setattr(cache_module, "get_availability_cache", lambda: cache)
+    return cache
+
+
+async def test_dirty_days_are_invalidated_after_commit(enabled_cache):
+    await enabled_cache.put_days([_entry()])
+    session = Session()
+    session.begin()
+    start = datetime(2027, 5, 3, 10, 30, tzinfo=timezone.utc)
+    mark_availability_dirty(session, CLUB_ID, start, start + timedelta(minutes=90))
+
+    # Nothing happens until the writer's transaction commits.
+    assert list(await enabled_cache.get_days(CLUB_ID, [DAY])) == [DAY]
+    session.commit()
+    assert await enabled_cache.get_days(CLUB_ID, [DAY]) == {}
+
+
+async def test_dirty_days_are_discarded_on_rollback(enabled_cache):
+    await enabled_cache.put_days([_entry()])
+    session = Session()
+    session.begin()
+    mark_club_availability_dirty(session, CLUB_ID)
+    session.rollback()
+    session.begin()
+    session.commit()
+    assert list(await enabled_cache.get_days(CLUB_ID, [DAY])) == [DAY]
@@ -0,0 +1,101 @@
+"""
+Unit tests for the availability interval indexes.
+
+Pure data structures — no database. ``IntervalIndex.first_overlap`` is checked
+against a brute-force scan on randomised inputs, including overlapping input
+intervals, and ``CourtOccupancy`` is checked for club-wide reservation merging.
+"""
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.services.availability_index import CourtOccupancy, IntervalIndex
+
+T0 = datetime(2027, 3, 1, 7, 0, tzinfo=timezone.utc)
+
+
+def _at(minutes: int) -> datetime:
+    return T0 + timedelta(minutes=minutes)
+
+
+def _brute_first_overlap(intervals, start, end):
+    hits = [iv for iv in intervals if iv[0] < end and iv[1] > start]
+    if not hits:
+        return None
+    return min(hits, key=lambda iv: iv[0])[2]
+
+
+def test_empty_index_has_no_overlaps():
+    index = IntervalIndex([])
+    assert len(index) == 0
+    assert index.first_overlap(_at(0), _at(90)) is None
+
+
+def test_touching_intervals_do_not_overlap():
+    index = IntervalIndex([(_at(0), _at(90), "a")])
+    assert index.first_overlap(_at(90), _at(180)) is None
+    assert index.first_overlap(_at(-90), _at(0)) is None
+    assert index.first_overlap(_at(89), _at(180)) == "a"
+
+
+def test_returns_earliest_starting_overlap():
+    index = IntervalIndex([
+        (_at(60), _at(120), "late"),
+        (_at(0), _at(60), "early"),
+    ])
+    assert index.first_overlap(_at(0), _at(90)) == "early"
+    assert index.first_overlap(_at(60), _at(150)) == "late"
+
+
+def test_long_interval_is_found_past_shorter_later_ones():
+    # A long reservation followed by short ones: the running max end must
+    # still surface the long one for a window the short ones miss.
+    index = IntervalIndex([
+        (_at(0), _at(600), "long"),
+        (_at(30), _at(60), "short-1"),
+        (_at(90), _at(120), "short-2"),
+    ])
+    assert index.first_overlap(_at(300), _at(390)) == "long"
+
+
+def test_matches_brute_force_on_random_intervals():
+    rng = random.Random(1234)
+    for _ in range(200):
+        intervals = []
+        for i in range(rng.randint(0, 25)):
+            start = rng.randint(0, 1000)
+            intervals.append((_at(start), _at(start + rng.randint(1, 180)), i))
+        index = IntervalIndex(intervals)
+        for _ in range(30):
+            q = rng.randint(-100, 1100)
+            start, end = _at(q), _at(q + rng.choice([30, 60, 90]))
+            expected = _brute_first_overlap(intervals, start, end)
+            actual = index.first_overlap(start, end)
+            if expected is None:
+                assert actual is None
+            else:
+                # Ties on start may resolve to either item; the start must match.
+                by_item = {iv[2]: iv for iv in intervals}
+                assert actual is not None
+                assert by_item[actual][0] == by_item[expected][0]
+
+
+def test_court_occupancy_merges_club_wide_reservations():
+    court_a, court_b = uuid.uuid4(), uuid.uuid4()
+    occupancy = CourtOccupancy(
+        [court_a, court_b],
+        bookings=[(court_a, _at(0), _at(90), "booking-a")],
+        reservations=[
+            (court_b, _at(90), _at(180)),
+            (None, _at(300), _at(360)),
+        ],
+    )
+    assert occupancy.booking_at(court_a, _at(0), _at(90)) == "booking-a"
+    assert occupancy.booking_at(court_b, _at(0), _at(90)) is None
+
+    assert occupancy.is_reserved(court_b, _at(90), _at(180))
+    assert not occupancy.is_reserved(court_a, _at(90), _at(180))
+
+    # Club-wide reservation blocks every court.
+    assert occupancy.is_reserved(court_a, _at(270), _at(360))
+    assert occupancy.is_reserved(court_b, _at(270), _at(360))
@@ -0,0 +1,237 @@
+"""
+Unit tests for CourtService.get_availability.
+
+Mocks the database session — no real Postgres needed. The execute() calls
+(club, courts, pricing rules, then bookings / reservations / operating hours per
+occupancy load) are fed in order; assertions cover court blocking, joinable open games, pricing and
+the per-club-day occupancy cache.
+"""
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.db.models.booking import InviteStatus
+from app.services.availability_cache import AvailabilityCache, LocalLRUBackend
+from app.services.court_service import CourtService
+
+TENANT_ID = uuid.uuid4()
+CLUB_ID = uuid.uuid4()
+COURT_A = uuid.uuid4()
+COURT_B = uuid.uuid4()
+USER_ID = uuid.uuid4()
+
+# Far enough ahead that notice/advance cutoffs never bite; UTC keeps wall-clock == instant.
+DAY = (datetime.now(tz=timezone.utc) + timedelta(days=3)).date()
+
+_CLUB = SimpleNamespace(
+    id=CLUB_ID,
+    tenant_id=TENANT_ID,
+    timezone="UTC",
+    booking_duration_minutes=90,
+    min_booking_notice_hours=0,
+    max_advance_booking_days=30,
+)
+_COURTS = [SimpleNamespace(id=COURT_A), SimpleNamespace(id=COURT_B)]
+_USER = SimpleNamespace(id=USER_ID, skill_level=None)
+
+
+def _at(hour, minute=0, day=DAY):
+    return datetime.combine(day, time(hour, minute), tzinfo=timezone.utc)
+
+
+def _hours(day=DAY):
+    return SimpleNamespace(
+        day_of_week=day.weekday(),
+        open_time=time(9, 0),
+        close_time=time(12, 0),  # 09:00 and 10:30 slots
+        valid_from=None,
+        valid_until=None,
+    )
+
+
+def _rule(day=DAY):
+    return SimpleNamespace(
+        day_of_week=day.weekday(),
+        start_time=time(0, 0),
+        end_time=time(23, 59),
+        valid_from=None,
+        valid_until=None,
+        incentive_price=None,
+        incentive_expires_at=None,
+        incentive_label=None,
+        price_per_slot=Decimal("24.00"),
+        label="standard",
+    )
+
+
+def _booking(court_id, start, *, open_game=False, accepted=1, max_players=4):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        court_id=court_id,
+        start_datetime=start,
+        end_datetime=start + timedelta(minutes=90),
+        is_open_game=open_game,
+        max_players=max_players,
+        min_skill_level=None,
+        max_skill_level=None,
+        total_price=Decimal("48.00"),
+        players=[
+            SimpleNamespace(user_id=uuid.uuid4(), invite_status=InviteStatus.accepted)
+            for _ in range(accepted)
+        ],
+    )
+
+
+def _reservation(court_id, start, end):
+    return SimpleNamespace(court_id=court_id, start_datetime=start, end_datetime=end)
+
+
+def _result(value=None, values=()):
+    m = MagicMock()
+    m.scalar_one_or_none.return_value = value
+    m.scalars.return_value.all.return_value = list(values)
+    m.scalars.return_value.unique.return_value.all.return_value = list(values)
+    return m
+
+
+def _make_db(bookings=(), reservations=(), hours=None, rules=None):
+    db = AsyncMock()
+    db.execute = AsyncMock(side_effect=[
+        _result(_CLUB),
+        _result(values=_COURTS),
+        _result(values=[_rule()] if rules is None else rules),
+        *_occupancy_results(bookings, reservations, hours),
+    ])
+    return db
+
+
+def _occupancy_results(bookings=(), reservations=(), hours=None):
+    """One occupancy load: bookings, reservations, operating hours."""
+    return [
+        _result(values=bookings),
+        _result(values=reservations),
+        _result(values=[_hours()] if hours is None else hours),
+    ]
+
+
+async def _availability(db, **overrides):
+    kwargs = dict(
+        tenant_id=TENANT_ID,
+        club_id=CLUB_ID,
+        start_date=DAY,
+        end_date=DAY,
+        surface=None,
+        from_time=None,
+        to_time=None,
+        requesting_user=_USER,
+    )
+    kwargs.update(overrides)
+    return await CourtService(db).get_availability(**kwargs)
+
+
+def _slot(result, start_time):
+    slots = result["days"][0]["slots"]
+    return next(s for s in slots if s["start_time"] == start_time)
+
+
+async def test_empty_club_day_lists_every_court_with_price():
+    result = await _availability(_make_db())
+
+    assert [s["start_time"] for s in result["days"][0]["slots"]] == ["09:00", "10:30"]
+    slot = _slot(result, "09:00")
+    assert {c["court_id"] for c in slot["available_courts"]} == {COURT_A, COURT_B}
+    assert all(c["price"] == Decimal("24.00") for c in slot["available_courts"])
+    assert result["next_cursor"] is None
+
+
+async def test_booked_court_is_not_available_in_overlapping_slot_only():
+    booking = _booking(COURT_A, _at(9))
+    result = await _availability(_make_db(bookings=[booking]))
+
+    assert [c["court_id"] for c in _slot(result, "09:00")["available_courts"]] == [COURT_B]
+    assert _slot(result, "09:00")["existing_matches"] == []
+    assert _slot(result, "10:30")["available_count"] == 2
+
+
+async def test_club_wide_reservation_blocks_every_court():
+    reservation = _reservation(None, _at(10, 30), _at(12))
+    result = await _availability(_make_db(reservations=[reservation]))
+
+    assert [s["start_time"] for s in result["days"][0]["slots"]] == ["09:00"]
+
+
+async def test_court_reservation_blocks_only_that_court():
+    reservation = _reservation(COURT_B, _at(9), _at(10))
+    result = await _availability(_make_db(reservations=[reservation]))
+
+    assert [c["court_id"] for c in _slot(result, "09:00")["available_courts"]] == [COURT_A]
+
+
+async def test_joinable_open_game_surfaces_as_existing_match():
+    game = _booking(COURT_A, _at(9), open_game=True, accepted=2, max_players=4)
+    result = await _availability(_make_db(bookings=[game]))
+
+    slot = _slot(result, "09:00")
+    assert slot["existing_matches"] == [{
+        "booking_id": game.id,
+        "court_id": COURT_A,
+        "slots_available": 2,
+        "min_skill_level": None,
+        "max_skill_level": None,
+        "total_price": Decimal("48.00"),
+    }]
+    assert [c["court_id"] for c in slot["available_courts"]] == [COURT_B]
+
+
+async def test_full_open_game_is_hidden():
+    game = _booking(COURT_A, _at(9), open_game=True, accepted=4, max_players=4)
+    result = await _availability(_make_db(bookings=[game]))
+
+    assert _slot(result, "09:00")["existing_matches"] == []
+
+
+async def test_limit_sets_next_cursor_when_end_date_omitted():
+    db = _make_db()
+    result = await _availability(db, end_date=None, limit=1)
+
+    assert len(result["days"][0]["slots"]) == 1
+    assert result["next_cursor"] == {"date": DAY, "from_time": "10:30"}
+    # Only the first one-day window was loaded, not the whole scan range.
+    assert db.execute.await_count == 6
+
+
+async def test_open_ended_scan_loads_expanding_windows_until_limit():
+    # Hours apply to every weekday so each day has two slots.
+    hours = [_hours(DAY + timedelta(days=i)) for i in range(7)]
+    db = _make_db(hours=hours)
+    db.execute.side_effect = list(db.execute.side_effect) + _occupancy_results(hours=hours)
+    result = await _availability(db, end_date=None, limit=3)
+
+    # Day 1 (first window) gives two rows; the second window (days 2–4) is
+    # loaded once, gives the third row and the cursor, and nothing further.
+    assert [len(d["slots"]) for d in result["days"]] == [2, 1]
+    assert result["next_cursor"] == {"date": DAY + timedelta(days=1), "from_time": "10:30"}
+    assert db.execute.await_count == 9
+
+
+async def test_second_request_is_served_from_occupancy_cache(monkeypatch):
+    cache = AvailabilityCache(LocalLRUBackend(max_entries=8), ttl_seconds=60)
+    monkeypatch.setattr("app.services.court_service.get_availability_cache", lambda: cache)
+
+    game = _booking(COURT_A, _at(9), open_game=True, accepted=2)
+    first_db = _make_db(bookings=[game])
+    first = await _availability(first_db)
+    assert first_db.execute.await_count == 6
+
+    # Club, courts and pricing only — bookings, reservations and hours come from the cache.
+    second_db = AsyncMock()
+    second_db.execute = AsyncMock(side_effect=[
+        _result(_CLUB),
+        _result(values=_COURTS),
+        _result(values=[_rule()]),
+    ])
+    second = await _availability(second_db)
+    assert second_db.execute.await_count == 3
+    assert second["days"] == first["days"]
@@ -0,0 +1,110 @@
+"""
+Unit tests for database-arbitrated court claims.
+
+Covers recognising the overlap exclusion violation, the advisory lock key and
+BookingService._claim_court's happy path / lapsed-hold retry / 409 paths
+against a mocked session.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+
+from app.services.booking_service import BookingService
+from app.services.court_claims import court_lock_key, is_court_overlap_violation
+
+CLUB_ID = uuid.uuid4()
+COURT_ID = uuid.uuid4()
+START = datetime(2027, 5, 3, 18, 0, tzinfo=timezone.utc)
+END = START + timedelta(minutes=90)
+
+
+class _DriverError(Exception):
+    def __init__(self, message, sqlstate):
+        super().__init__(message)
+        self.sqlstate = sqlstate
+
+
+def _integrity_error(message, sqlstate):
+    return IntegrityError("INSERT INTO bookings ...", {}, _DriverError(message, sqlstate))
+
+
+def _result(value=None, rows=()):
+    m = MagicMock()
+    m.scalar_one_or_none.return_value = value
+    m.all.return_value = list(rows)
+    return m
+
+
+def _values():
+    return dict(club_id=CLUB_ID, court_id=COURT_ID, start_datetime=START, end_datetime=END)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def test_recognises_overlap_violation():
+    exc = _integrity_error(
+        'conflicting key value violates exclusion constraint "ex_bookings_court_no_overlap"', "23P01"
+    )
+    assert is_court_overlap_violation(exc)
+
+
+def test_ignores_other_integrity_errors():
+    exc = _integrity_error(
+        'duplicate key value violates unique constraint "uq_booking_players_booking_user"', "23505"
+    )
+    assert not is_court_overlap_violation(exc)
+
+
+def test_lock_key_is_stable_signed_bigint():
+    key = court_lock_key(COURT_ID)
+    assert key == court_lock_key(uuid.UUID(str(COURT_ID)))
+    assert -(2 ** 63) <= key < 2 ** 63
+
+
+# ---------------------------------------------------------------------------
+# BookingService._claim_court
+# ---------------------------------------------------------------------------
+
+
+async def test_claim_is_a_single_insert_on_the_happy_path():
+    booking = MagicMock()
+    db = AsyncMock()
+    db.execute = AsyncMock(side_effect=[_result(booking)])
+
+    assert await BookingService(db)._claim_court(_values()) is booking
+    db.execute.assert_awaited_once()
+    sql = str(db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT ON CONSTRAINT ex_bookings_court_no_overlap DO NOTHING" in sql
+
+
+async def test_claim_releases_lapsed_hold_and_retries():
+    booking = MagicMock()
+    db = AsyncMock()
+    db.execute = AsyncMock(side_effect=[
+        _result(None),                                # insert loses
+        _result(),                                    # advisory lock
+        _result(rows=[(CLUB_ID, START, END)]),        # lapsed hold released
+        _result(booking),                             # retry wins
+    ])
+
+    assert await BookingService(db)._claim_court(_values()) is booking
+    assert db.execute.await_count == 4
+
+
+async def test_claim_raises_409_when_slot_is_genuinely_taken():
+    db = AsyncMock()
+    db.execute = AsyncMock(side_effect=[_result(None), _result(), _result(rows=[])])
+
+    with pytest.raises(HTTPException) as exc_info:
+        await BookingService(db)._claim_court(_values())
+
+    assert exc_info.value.status_code == 409
+    assert db.execute.await_count == 3
@@ -2,12 +2,12 @@
 Unit tests for CourtService.create_recurring_booking.
 
 Mocks the database session — no real Postgres needed.
-Verifies: RRULE expansion, conflict/blackout detection, skip_conflicts flag,
-validation guards (invalid rule, no end condition, no occurrences), and that
-created Booking objects carry the correct fields.
+Verifies: RRULE expansion, set-based conflict/blackout detection, skip_conflicts
+flag, validation guards (invalid rule, no end condition, no occurrences), and
+that the bulk-inserted booking rows carry the correct fields.
 """
 import uuid
-from datetime import datetime, date, timedelta, timezone
+from datetime import datetime, date, time, timedelta, timezone
 from decimal import Decimal
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock
@@ -39,68 +39,103 @@ _STAFF_USER = SimpleNamespace(id=STAFF_ID, tenant_id=TENANT_ID)
 # A Monday at 10:00 UTC well in the future
 _FIRST_START = datetime(2027, 1, 4, 10, 0, 0, tzinfo=timezone.utc)  # Monday
 
+# Monday all-day regular rule — covers every weekly occurrence in club-local time.
+_RULE_WINDOW = dict(
+    day_of_week=0,
+    start_time=time(6, 0),
+    end_time=time(23, 0),
+    session_type=BookingType.regular,
+)
+
+
+def _scalar_returning(value):
+    m = MagicMock()
+    m.scalar_one_or_none.return_value = value
+    m.scalar_one.return_value = value
+    # PricingService.calculate_many loads the club's rules via .scalars().all().
+    m.scalars.return_value.all.return_value = [value] if value is not None else []
+    return m
+
+
+def _intervals(*spans):
+    """Result of a (start_datetime, end_datetime) interval query."""
+    m = MagicMock()
+    m.all.return_value = list(spans)
+    return m
+
+
+def _covering(first, weeks):
+    """One interval spanning the first `weeks` weekly occurrences."""
+    return (first - timedelta(hours=1), first + timedelta(weeks=weeks - 1, hours=3))
 
-def _make_db(conflict=False, blackout=False, price=None):
+
+def _make_db(conflict=False, blackout=False, price=None, booked=(), blackouts=()):
     """
     Build a minimal AsyncSession mock for create_recurring_booking.
 
-    DB interactions expected (in order per occurrence):
+    DB interactions expected, in order:
      1. _get_club_and_court: two execute() calls (Club lookup, Court lookup)
      2. A third execute() for the Club row needed for booking_duration_minutes
-     3. Per occurrence: _check_no_conflict, _check_no_blackout, _get_price
-     4. flush() after each Booking + after BookingPlayers
-
-    We use a side_effect list that cycles: first three are setup calls, then
-    the per-occurrence triple repeats.  For simplicity we generate enough
-    entries for 12 occurrences.
+     3. One pricing-rules query for the whole series (_get_prices)
+     4. One booked-interval and one blackout-interval query for the series span
+     5. The bulk INSERT ... RETURNING (execute with a list of row dicts)
+     6. flush() for the BookingPlayers, commit(), then one reload query
+
+    `conflict` / `blackout` block every occurrence; `booked` / `blackouts` take
+    explicit (start, end) spans. Inserted rows are recorded on db._inserted and
+    added objects (BookingPlayers) on db._added.
     """
     db = AsyncMock()
 
-    def _scalar_returning(value):
-        m = MagicMock()
-        m.scalar_one_or_none.return_value = value
-        m.scalar_one.return_value = value
-        # PricingService resolves the rule via .scalars().first(); wire it too.
-        m.scalars.return_value.first.return_value = value
-        m.scalars.return_value.all.return_value = [value] if value is not None else []
-        return m
-
-    conflict_result = _scalar_returning(SimpleNamespace(id=uuid.uuid4()) if conflict else None)
-    blackout_result = _scalar_returning(SimpleNamespace(id=uuid.uuid4()) if blackout else None)
     price_result = _scalar_returning(
         SimpleNamespace(
             price_per_slot=price or Decimal("20.00"),
             incentive_price=None,
             incentive_expires_at=None,
             is_active=True,
+            **_RULE_WINDOW,
         )
         if price is not False
         else None
     )
+    if conflict:
+        booked = [_covering(_FIRST_START, _MAX_OCCURRENCES)]
+    if blackout:
+        blackouts = [_covering(_FIRST_START, _MAX_OCCURRENCES)]
 
-    # Setup: Club lookup, Court lookup, Club re-fetch for duration
-    setup_calls = [
+    queue = [
         _scalar_returning(_CLUB),   # Club.where(id, tenant_id)
         _scalar_returning(_COURT),  # Court.where(id, club_id)
         _scalar_returning(_CLUB),   # Club re-fetch for booking_duration_minutes
+        price_result,               # Pricing rules for the whole series
+        _intervals(*booked),        # Blocking bookings over the series span
+        _intervals(*blackouts),     # Maintenance reservations over the series span
     ]
-    # Per-occurrence: conflict check, blackout check, price lookup
-    per_occurrence = [conflict_result, blackout_result, price_result] * _MAX_OCCURRENCES
+    inserted: list[dict] = []
+
+    async def _execute(stmt, params=None):
+        if params is not None:  # bulk INSERT ... RETURNING
+            inserted.extend(params)
+            result = MagicMock()
+            result.scalars.return_value.all.return_value = [SimpleNamespace(**row) for row in params]
+            return result
+        if queue:
+            return queue.pop(0)
+        # Reload with relationships
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = [
+            SimpleNamespace(**row, players=[], court=_COURT) for row in inserted
+        ]
+        return result
 
-    db.execute = AsyncMock(side_effect=setup_calls + per_occurrence)
+    db.execute = AsyncMock(side_effect=_execute)
     db.flush = AsyncMock()
     db.commit = AsyncMock()
 
     added = []
-
-    def _add(obj):
-        if not getattr(obj, "id", None):
-            import uuid as _uuid
-            object.__setattr__(obj, "id", _uuid.uuid4())
-        added.append(obj)
-
-    db.add = MagicMock(side_effect=_add)
+    db.add_all = MagicMock(side_effect=added.extend)
     db._added = added
+    db._inserted = inserted
     return db
 
 
@@ -145,95 +180,60 @@ class TestHappyPath:
     @pytest.mark.asyncio
     async def test_creates_correct_number_of_bookings(self):
         db = _make_db()
-
-        # Reload each booking with relationships — mock that too
-        loaded_booking = SimpleNamespace(
-            id=uuid.uuid4(),
-            players=[],
-            court=_COURT,
-            club_id=CLUB_ID,
-            court_id=COURT_ID,
-            booking_type=BookingType.lesson_individual,
-            status=BookingStatus.confirmed,
-            is_recurring=True,
-            is_open_game=False,
-        )
-        reload_result = MagicMock()
-        reload_result.scalar_one.return_value = loaded_booking
-
-        # After the initial setup + per-occurrence execute calls, the reload
-        # calls follow.  Patch the select reload path via a second side_effect.
-        original_side_effect = list(db.execute.side_effect)
-        reload_calls = [reload_result] * 4
-        db.execute.side_effect = original_side_effect + reload_calls
-
         svc = _make_svc(db)
         result = await svc.create_recurring_booking(**_recurring_kwargs())
 
         assert len(result["created"]) == 4
         assert len(result["skipped"]) == 0
 
+    @pytest.mark.asyncio
+    async def test_single_bulk_insert_and_constant_query_count(self):
+        """A long series costs the same number of round-trips as a short one."""
+        db = _make_db()
+        svc = _make_svc(db)
+        await svc.create_recurring_booking(**_recurring_kwargs(recurrence_rule="FREQ=WEEKLY;COUNT=52"))
+
+        bulk_inserts = [c for c in db.execute.await_args_list if len(c.args) > 1]
+        assert len(bulk_inserts) == 1
+        assert len(db._inserted) == 52
+        # 3 setup + pricing + 2 interval scans + insert + reload
+        assert db.execute.await_count == 8
+
     @pytest.mark.asyncio
     async def test_bookings_are_confirmed_and_recurring(self):
         """Each created booking must have status=confirmed and is_recurring=True."""
         db = _make_db()
-        loaded = SimpleNamespace(
-            id=uuid.uuid4(), players=[], court=_COURT,
-            status=BookingStatus.confirmed, is_recurring=True,
-        )
-        reload_result = MagicMock()
-        reload_result.scalar_one.return_value = loaded
-        db.execute.side_effect = list(db.execute.side_effect) + [reload_result] * 4
-
         svc = _make_svc(db)
         await svc.create_recurring_booking(**_recurring_kwargs())
 
-        # Inspect the Booking objects added to the session
-        bookings = [o for o in db._added if hasattr(o, "is_recurring")]
-        assert all(b.status == BookingStatus.confirmed for b in bookings)
-        assert all(b.is_recurring is True for b in bookings)
+        assert all(b["status"] == BookingStatus.confirmed for b in db._inserted)
+        assert all(b["is_recurring"] is True for b in db._inserted)
+        assert all(b["total_price"] == Decimal("20.00") for b in db._inserted)
 
     @pytest.mark.asyncio
     async def test_first_booking_has_no_parent(self):
         """The first booking in a series must have parent_booking_id=None."""
         db = _make_db()
-        loaded = SimpleNamespace(id=uuid.uuid4(), players=[], court=_COURT)
-        reload_result = MagicMock()
-        reload_result.scalar_one.return_value = loaded
-        db.execute.side_effect = list(db.execute.side_effect) + [reload_result] * 4
-
         svc = _make_svc(db)
         await svc.create_recurring_booking(**_recurring_kwargs())
 
-        bookings = [o for o in db._added if hasattr(o, "parent_booking_id")]
-        assert bookings[0].parent_booking_id is None
+        assert db._inserted[0]["parent_booking_id"] is None
 
     @pytest.mark.asyncio
     async def test_subsequent_bookings_share_parent_id(self):
         """Bookings after the first must share the same parent_booking_id."""
         db = _make_db()
-        loaded = SimpleNamespace(id=uuid.uuid4(), players=[], court=_COURT)
-        reload_result = MagicMock()
-        reload_result.scalar_one.return_value = loaded
-        db.execute.side_effect = list(db.execute.side_effect) + [reload_result] * 4
-
         svc = _make_svc(db)
         await svc.create_recurring_booking(**_recurring_kwargs())
 
-        bookings = [o for o in db._added if hasattr(o, "parent_booking_id")]
-        parent_id = bookings[0].id
-        for b in bookings[1:]:
-            assert b.parent_booking_id == parent_id
+        parent_id = db._inserted[0]["id"]
+        for b in db._inserted[1:]:
+            assert b["parent_booking_id"] == parent_id
 
     @pytest.mark.asyncio
     async def test_organiser_booking_player_added(self):
         """The creating staff user must be added as an organiser BookingPlayer."""
         db = _make_db()
-        loaded = SimpleNamespace(id=uuid.uuid4(), players=[], court=_COURT)
-        reload_result = MagicMock()
-        reload_result.scalar_one.return_value = loaded
-        db.execute.side_effect = list(db.execute.side_effect) + [reload_result] * 4
-
         svc = _make_svc(db)
         await svc.create_recurring_booking(**_recurring_kwargs())
 
@@ -242,16 +242,13 @@ class TestHappyPath:
             if hasattr(o, "role") and o.role == PlayerRole.organiser
         ]
         assert len(organiser_bps) == 4  # one per occurrence
+        assert {bp.booking_id for bp in organiser_bps} == {b["id"] for b in db._inserted}
+        assert all(bp.user_id == STAFF_ID for bp in organiser_bps)
 
     @pytest.mark.asyncio
     async def test_recurrence_end_date_stops_expansion(self):
         """recurrence_end_date=first_start + 13 days with FREQ=WEEKLY → 2 occurrences."""
         db = _make_db()
-        loaded = SimpleNamespace(id=uuid.uuid4(), players=[], court=_COURT)
-        reload_result = MagicMock()
-        reload_result.scalar_one.return_value = loaded
-        db.execute.side_effect = list(db.execute.side_effect) + [reload_result] * 4
-
         end_date = (_FIRST_START + timedelta(days=13)).date()
         svc = _make_svc(db)
         result = await svc.create_recurring_booking(
@@ -265,11 +262,6 @@ class TestHappyPath:
     @pytest.mark.asyncio
     async def test_commit_called_once(self):
         db = _make_db()
-        loaded = SimpleNamespace(id=uuid.uuid4(), players=[], court=_COURT)
-        reload_result = MagicMock()
-        reload_result.scalar_one.return_value = loaded
-        db.execute.side_effect = list(db.execute.side_effect) + [reload_result] * 4
-
         svc = _make_svc(db)
         await svc.create_recurring_booking(**_recurring_kwargs())
 
@@ -290,6 +282,7 @@ class TestConflictBehaviour:
         with pytest.raises(HTTPException) as exc_info:
             await svc.create_recurring_booking(**_recurring_kwargs(skip_conflicts=False))
         assert exc_info.value.status_code == 409
+        assert db._inserted == []
 
     @pytest.mark.asyncio
     async def test_blackout_raises_409_when_skip_false(self):
@@ -312,73 +305,43 @@ class TestConflictBehaviour:
 
     @pytest.mark.asyncio
     async def test_skip_conflicts_true_skips_and_continues(self):
-        """When skip_conflicts=True and only the first occurrence conflicts, the rest are created."""
-        db = AsyncMock()
-
-        def _scalar_returning(value):
-            m = MagicMock()
-            m.scalar_one_or_none.return_value = value
-            m.scalar_one.return_value = value
-            # PricingService resolves the rule via .scalars().first(); wire it too.
-            m.scalars.return_value.first.return_value = value
-            m.scalars.return_value.all.return_value = [value] if value is not None else []
-            return m
-
-        conflict_hit = MagicMock()
-        conflict_hit.scalar_one_or_none.return_value = SimpleNamespace(id=uuid.uuid4())
-
-        no_conflict = MagicMock()
-        no_conflict.scalar_one_or_none.return_value = None
-
-        no_blackout = MagicMock()
-        no_blackout.scalar_one_or_none.return_value = None
-
-        price_rule = SimpleNamespace(
-            price_per_slot=Decimal("20.00"),
-            incentive_price=None,
-            incentive_expires_at=None,
+        """When skip_conflicts=True only the conflicting occurrences are skipped."""
+        second = _FIRST_START + timedelta(weeks=1)
+        third = _FIRST_START + timedelta(weeks=2)
+        db = _make_db(
+            booked=[(_FIRST_START + timedelta(minutes=30), _FIRST_START + timedelta(hours=2))],
+            blackouts=[(third - timedelta(hours=1), third + timedelta(minutes=1))],
         )
-        price_result = _scalar_returning(price_rule)
-
-        loaded = SimpleNamespace(id=uuid.uuid4(), players=[], court=_COURT)
-        reload_result = MagicMock()
-        reload_result.scalar_one.return_value = loaded
-
-        # Setup: Club, Court, Club for duration
-        # occurrence 1: only conflict check runs (skip_conflicts skips after conflict)
-        # occurrences 2-4: conflict, blackout, price all run
-        db.execute = AsyncMock(side_effect=[
-            _scalar_returning(_CLUB),    # Club lookup
-            _scalar_returning(_COURT),   # Court lookup
-            _scalar_returning(_CLUB),    # Club for duration
-            # occurrence 1 — conflict check only; continue skips blackout + price
-            conflict_hit,
-            # occurrence 2
-            no_conflict, no_blackout, price_result,
-            # occurrence 3
-            no_conflict, no_blackout, price_result,
-            # occurrence 4
-            no_conflict, no_blackout, price_result,
-            # reloads (one per created booking = 3)
-            reload_result, reload_result, reload_result,
-        ])
-        db.flush = AsyncMock()
-        db.commit = AsyncMock()
-        added = []
-
-        def _add(obj):
-            if not getattr(obj, "id", None):
-                object.__setattr__(obj, "id", uuid.uuid4())
-            added.append(obj)
-
-        db.add = MagicMock(side_effect=_add)
 
         svc = _make_svc(db)
         result = await svc.create_recurring_booking(**_recurring_kwargs(skip_conflicts=True))
 
-        assert len(result["created"]) == 3
-        assert len(result["skipped"]) == 1
-        assert result["skipped"][0]["reason"] == "court conflict"
+        assert len(result["created"]) == 2
+        assert result["skipped"] == [
+            {"occurrence": _FIRST_START, "reason": "court conflict"},
+            {"occurrence": third, "reason": "court blackout"},
+        ]
+        # The first surviving occurrence becomes the series parent.
+        assert db._inserted[0]["start_datetime"] == second
+        assert db._inserted[0]["parent_booking_id"] is None
+        assert db._inserted[1]["parent_booking_id"] == db._inserted[0]["id"]
+
+    @pytest.mark.asyncio
+    async def test_overlapping_occurrences_conflict_with_each_other(self):
+        """Occurrences closer together than the slot length block each other."""
+        db = _make_db()
+        svc = _make_svc(db)
+        result = await svc.create_recurring_booking(
+            **_recurring_kwargs(recurrence_rule="FREQ=HOURLY;COUNT=3", skip_conflicts=True)
+        )
+
+        # 90-minute slots every hour: 10:00 and 12:00 fit, 11:00 collides with 10:00.
+        assert [b["start_datetime"] for b in db._inserted] == [
+            _FIRST_START, _FIRST_START + timedelta(hours=2),
+        ]
+        assert result["skipped"] == [
+            {"occurrence": _FIRST_START + timedelta(hours=1), "reason": "court conflict"},
+        ]
 
 
 # ---------------------------------------------------------------------------
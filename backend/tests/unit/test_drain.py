@@ -0,0 +1,38 @@
+"""
+Unit tests for the time-boxed drain loop shared by the queue workers.
+"""
+import asyncio
+
+from app.core.drain import drain_until
+
+
+async def test_runs_back_to_back_while_work_is_waiting_then_polls():
+    loop = asyncio.get_running_loop()
+    calls = []
+    backlog = [True, True, False]
+
+    async def run_batch():
+        calls.append(loop.time())
+        return backlog.pop(0) if backlog else False
+
+    started = loop.time()
+    await drain_until(started + 0.05, run_batch, poll_seconds=0.2)
+
+    # Three batches straight away; the idle one is followed by a poll cut short
+    # at the deadline, and the batch after it is the last.
+    assert len(calls) == 4
+    assert calls[2] - started < 0.03
+    assert 0.04 < calls[3] - started < 0.15
+
+
+async def test_always_runs_at_least_one_batch():
+    calls = 0
+
+    async def run_batch():
+        nonlocal calls
+        calls += 1
+        return True
+
+    await drain_until(asyncio.get_running_loop().time() - 1, run_batch, poll_seconds=1.0)
+
+    assert calls == 1
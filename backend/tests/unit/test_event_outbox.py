@@ -0,0 +1,238 @@
+"""
+Unit tests for the transactional outbox relay and its worker.
+
+Mocks the database session and publishes through the in-memory transport — no
+Postgres or Pub/Sub needed. Covers marking acked rows sent, recording failures
+for retry with backoff, giving up on rows that keep failing, waiting for
+in-flight slots, holding back keyed rows behind an older pending row, and the
+worker's push-envelope handling.
+"""
+import asyncio
+import base64
+import json
+import logging
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+from httpx import ASGITransport
+
+from app.core.config import get_settings
+from app.core.pubsub import EventPublisher, InMemoryTransport
+from app.db.models.outbox import EventOutbox
+from app.services.event_outbox import enqueue_notification_event, relay_batch
+from app.workers import outbox_relay_worker as worker
+
+settings = get_settings()
+
+
+def _row(id, event_type="welcome", ordering_key=None):
+    return EventOutbox(
+        id=id,
+        topic="notification-events",
+        event_type=event_type,
+        payload={"n": id},
+        ordering_key=ordering_key,
+        attempts=0,
+    )
+
+
+def _claimed(rows):
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = rows
+    return result
+
+
+def _oldest_pending(pairs):
+    result = MagicMock()
+    result.all.return_value = pairs
+    return result
+
+
+def _db(*results):
+    db = AsyncMock()
+    db.execute = AsyncMock(side_effect=list(results))
+    db.commit = AsyncMock()
+    return db
+
+
+def _publisher(**transport_kwargs):
+    transport = InMemoryTransport(**transport_kwargs)
+    return EventPublisher(transport, max_in_flight=100, backpressure_timeout=0.05), transport
+
+
+def test_enqueue_adds_row_to_the_callers_transaction():
+    db = MagicMock()
+    row = enqueue_notification_event(db, "welcome", {"user_id": "u1"}, ordering_key="user:u1")
+
+    db.add.assert_called_once_with(row)
+    assert row.topic == "notification-events"
+    assert row.sent_at is None
+
+
+async def test_acked_rows_are_marked_sent():
+    rows = [_row(1), _row(2)]
+    db = _db(_claimed(rows))
+    publisher, transport = _publisher()
+
+    result = await relay_batch(db, batch_size=10, publisher=publisher)
+
+    assert result == {"claimed": 2, "sent": 2, "failed": 0, "deferred": 0}
+    assert all(r.sent_at is not None for r in rows)
+    assert [m.event["payload"] for m in transport.messages] == [{"n": 1}, {"n": 2}]
+    db.commit.assert_awaited_once()
+
+
+async def test_failed_rows_stay_pending_with_error():
+    rows = [_row(1)]
+    db = _db(_claimed(rows))
+    publisher, transport = _publisher(auto_ack=False)
+    relay = relay_batch(db, batch_size=10, publisher=publisher)
+
+    task = asyncio.ensure_future(relay)
+    await asyncio.sleep(0)
+    transport.fail_pending(RuntimeError("topic not found"))
+    result = await task
+
+    assert result["failed"] == 1
+    assert rows[0].sent_at is None
+    assert rows[0].attempts == 1
+    assert rows[0].last_error == "topic not found"
+
+
+async def test_keyed_row_waits_behind_older_pending_row_outside_batch():
+    # Row 5 for user:a is older than our rows but locked by another relay run.
+    rows = [_row(7, ordering_key="user:a"), _row(8, ordering_key="user:b"), _row(9)]
+    db = _db(_claimed(rows), _oldest_pending([("user:a", 5), ("user:b", 8)]))
+    publisher, transport = _publisher()
+
+    result = await relay_batch(db, batch_size=10, publisher=publisher)
+
+    assert result["deferred"] == 1
+    assert rows[0].sent_at is None
+    assert [m.ordering_key for m in transport.messages] == ["user:b", ""]
+
+
+async def test_batch_larger_than_in_flight_limit_waits_for_slots_on_the_loop():
+    rows = [_row(1), _row(2), _row(3)]
+    db = _db(_claimed(rows))
+    transport = InMemoryTransport(ack_latency=0.01)
+    publisher = EventPublisher(transport, max_in_flight=1, backpressure_timeout=1.0)
+
+    result = await relay_batch(db, batch_size=10, publisher=publisher)
+
+    assert result["sent"] == 3
+    assert [m.event["payload"] for m in transport.messages] == [{"n": 1}, {"n": 2}, {"n": 3}]
+
+
+class _Outbox:
+    """A session over a list of rows that applies the claim's live-row filter,
+    so retried rows behave as they would against the table."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.commit = AsyncMock()
+
+    async def execute(self, stmt):
+        sql = str(stmt)
+        assert "event_outbox.dead_at IS NULL" in sql
+        assert "event_outbox.available_at <=" in sql
+        now = datetime.now(timezone.utc)
+        live = [
+            r for r in self.rows
+            if r.sent_at is None and r.dead_at is None and (r.available_at is None or r.available_at <= now)
+        ]
+        return _claimed(sorted(live, key=lambda r: r.id)[:stmt._limit])
+
+
+class _PoisonTransport(InMemoryTransport):
+    """Fails every publish whose payload is marked poison."""
+
+    def publish(self, topic_path, data, ordering_key="", **attributes):
+        future = super().publish(topic_path, data, ordering_key, **attributes)
+        if b'"poison"' in data:
+            failed = Future()
+            failed.set_exception(RuntimeError("topic not found"))
+            return failed
+        return future
+
+
+async def test_poisoned_rows_back_off_instead_of_stalling_newer_ones():
+    poisoned = [_row(i) for i in (1, 2, 3)]
+    for row in poisoned:
+        row.payload = {"poison": True}
+    healthy = _row(4)
+    db = _Outbox([*poisoned, healthy])
+    publisher = EventPublisher(_PoisonTransport(), max_in_flight=100, backpressure_timeout=0.05)
+
+    first = await relay_batch(db, batch_size=3, publisher=publisher)
+    second = await relay_batch(db, batch_size=3, publisher=publisher)
+
+    assert first["failed"] == 3
+    assert all(r.available_at > datetime.now(timezone.utc) for r in poisoned)
+    assert second == {"claimed": 1, "sent": 1, "failed": 0, "deferred": 0}
+    assert healthy.sent_at is not None
+
+
+async def test_row_is_given_up_after_max_attempts(caplog):
+    row = _row(1)
+    row.payload = {"poison": True}
+    row.attempts = settings.OUTBOX_MAX_ATTEMPTS - 1
+    db = _Outbox([row])
+    publisher = EventPublisher(_PoisonTransport(), max_in_flight=100, backpressure_timeout=0.05)
+
+    with caplog.at_level(logging.ERROR, logger="app.services.event_outbox"):
+        await relay_batch(db, batch_size=10, publisher=publisher)
+
+    assert row.dead_at is not None
+    assert "giving up" in caplog.text
+    # Dead rows are neither claimed again nor block later rows with their key.
+    assert (await relay_batch(db, batch_size=10, publisher=publisher))["claimed"] == 0
+
+
+async def test_key_order_check_ignores_dead_rows():
+    db = _db(_claimed([_row(7, ordering_key="user:a")]), _oldest_pending([("user:a", 7)]))
+    publisher, _ = _publisher()
+
+    await relay_batch(db, batch_size=10, publisher=publisher)
+
+    assert "event_outbox.dead_at IS NULL" in str(db.execute.await_args_list[1].args[0])
+
+
+async def test_empty_outbox_publishes_nothing():
+    db = _db(_claimed([]))
+    publisher, transport = _publisher()
+
+    result = await relay_batch(db, batch_size=10, publisher=publisher)
+
+    assert result["claimed"] == 0
+    assert transport.messages == []
+
+
+def _envelope(event_type: str) -> dict:
+    data = base64.b64encode(json.dumps({"event_type": event_type}).encode()).decode()
+    return {"message": {"data": data}}
+
+
+async def _post(envelope: dict) -> httpx.Response:
+    transport = ASGITransport(app=worker.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://worker") as client:
+        return await client.post("/pubsub", json=envelope)
+
+
+async def test_worker_runs_relay():
+    result = {"batches": 1, "sent": 3, "failed": 0, "pruned": 0}
+    with patch.object(worker, "relay", AsyncMock(return_value=result)) as mock_relay:
+        resp = await _post(_envelope("outbox.relay"))
+
+    mock_relay.assert_awaited_once()
+    assert resp.json() == {"status": "ok", **result}
+
+
+async def test_worker_ignores_unexpected_event_type():
+    with patch.object(worker, "relay", AsyncMock()) as mock_relay:
+        resp = await _post(_envelope("payout.reconcile"))
+
+    mock_relay.assert_not_called()
+    assert resp.json()["status"] == "ignored"
@@ -0,0 +1,49 @@
+"""
+Unit tests for the membership-reconciliation worker.
+
+No DB or network — patches ``reconcile`` so nothing touches Postgres.
+
+Coverage
+--------
+- a ``membership.reconcile_counts`` push envelope invokes the recount and
+  returns its result merged into the response
+- an unexpected event_type is acked (200) without running the recount, so
+  Pub/Sub does not redeliver it forever
+"""
+import base64
+import json
+from unittest.mock import AsyncMock, patch
+
+import httpx
+from httpx import ASGITransport
+
+from app.workers import membership_reconciliation_worker as worker
+
+
+def _envelope(event_type: str) -> dict:
+    data = base64.b64encode(json.dumps({"event_type": event_type}).encode()).decode()
+    return {"message": {"data": data}}
+
+
+async def _post(envelope: dict) -> httpx.Response:
+    transport = ASGITransport(app=worker.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://worker") as client:
+        return await client.post("/pubsub", json=envelope)
+
+
+class TestProcessReconcileEvent:
+    async def test_reconcile_counts_runs_recount(self):
+        with patch.object(worker, "reconcile", AsyncMock(return_value={"plans_corrected": 2})) as mock_reconcile:
+            resp = await _post(_envelope("membership.reconcile_counts"))
+
+        mock_reconcile.assert_awaited_once()
+        assert resp.status_code == 200
+        assert resp.json() == {"status": "ok", "plans_corrected": 2}
+
+    async def test_unexpected_event_type_is_ignored(self):
+        with patch.object(worker, "reconcile", AsyncMock()) as mock_reconcile:
+            resp = await _post(_envelope("payout.reconcile"))
+
+        mock_reconcile.assert_not_called()
+        assert resp.status_code == 200
+        assert resp.json()["status"] == "ignored"
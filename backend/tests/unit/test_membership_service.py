@@ -55,6 +55,7 @@ def _make_plan(**kw):
         guest_passes_per_period=1,
         discount_pct=None,
         max_active_members=None,
+        active_member_count=0,
         stripe_price_id="price_test_123",
         is_active=True,
     )
@@ -174,7 +175,7 @@ async def test_subscribe_creates_local_subscription():
     plan = _make_plan()
     club = _make_club()
 
-    with patch("app.services.membership_service.stripe.Subscription.create") as mock_create:
+    with patch("app.services.membership_service.stripe.Subscription.create_async") as mock_create:
         mock_create.return_value = _fake_stripe_sub()
         svc = MembershipService(db)
         result = await svc.subscribe(user, plan, club)
@@ -193,7 +194,7 @@ async def test_subscribe_with_trial_does_not_set_payment_behavior():
     stripe_sub = _fake_stripe_sub(status="trialing")
     stripe_sub["latest_invoice"] = None
 
-    with patch("app.services.membership_service.stripe.Subscription.create") as mock_create:
+    with patch("app.services.membership_service.stripe.Subscription.create_async") as mock_create:
         mock_create.return_value = stripe_sub
         svc = MembershipService(db)
         result = await svc.subscribe(_make_user(), plan, _make_club())
@@ -210,7 +211,7 @@ async def test_subscribe_uses_provided_payment_method():
     db = _make_db()
     plan = _make_plan(stripe_price_id="price_x")
 
-    with patch("app.services.membership_service.stripe.Subscription.create") as mock_create:
+    with patch("app.services.membership_service.stripe.Subscription.create_async") as mock_create:
         mock_create.return_value = _fake_stripe_sub()
         svc = MembershipService(db)
         await svc.subscribe(_make_user(), plan, _make_club(), payment_method_id="pm_custom")
@@ -224,7 +225,7 @@ async def test_subscribe_with_connect_account_adds_transfer_data():
     db = _make_db()
     club = _make_club(stripe_connect_account_id="acct_123")
 
-    with patch("app.services.membership_service.stripe.Subscription.create") as mock_create:
+    with patch("app.services.membership_service.stripe.Subscription.create_async") as mock_create:
         mock_create.return_value = _fake_stripe_sub()
         svc = MembershipService(db)
         await svc.subscribe(_make_user(), _make_plan(), club)
@@ -239,7 +240,7 @@ async def test_subscribe_writes_credit_log_when_credits_nonzero():
 
     db = _make_db()
 
-    with patch("app.services.membership_service.stripe.Subscription.create") as mock_create:
+    with patch("app.services.membership_service.stripe.Subscription.create_async") as mock_create:
         mock_create.return_value = _fake_stripe_sub()
         svc = MembershipService(db)
         await svc.subscribe(_make_user(), _make_plan(booking_credits_per_period=5), _make_club())
@@ -255,7 +256,7 @@ async def test_subscribe_no_credit_log_when_zero_credits():
 
     db = _make_db()
 
-    with patch("app.services.membership_service.stripe.Subscription.create") as mock_create:
+    with patch("app.services.membership_service.stripe.Subscription.create_async") as mock_create:
         mock_create.return_value = _fake_stripe_sub()
         svc = MembershipService(db)
         await svc.subscribe(_make_user(), _make_plan(booking_credits_per_period=0), _make_club())
@@ -288,20 +289,55 @@ async def test_subscribe_raises_409_on_duplicate_active():
 async def test_subscribe_raises_409_when_plan_at_capacity():
     db = _make_db()
 
-    # First execute (duplicate check) returns None; second (cap check) returns 10 members
-    members = [_make_subscription() for _ in range(10)]
-    no_result = MagicMock()
-    no_result.scalar_one_or_none.return_value = None
+    with patch("app.services.membership_service.stripe.Subscription.create_async") as mock_create:
+        svc = MembershipService(db)
+        with pytest.raises(HTTPException) as exc_info:
+            await svc.subscribe(
+                _make_user(), _make_plan(max_active_members=10, active_member_count=10), _make_club()
+            )
+    assert exc_info.value.status_code == 409
+    # Only the duplicate check ran — no subscription rows are counted.
+    assert db.execute.await_count == 1
+    mock_create.assert_not_called()
 
-    cap_result = MagicMock()
-    cap_result.scalars.return_value.all.return_value = members
 
-    db.execute = AsyncMock(side_effect=[no_result, cap_result])
+@pytest.mark.asyncio
+async def test_subscribe_claims_seat_with_conditional_update():
+    db = _make_db()
+
+    with patch("app.services.membership_service.stripe.Subscription.create_async") as mock_create:
+        mock_create.return_value = _fake_stripe_sub()
+        svc = MembershipService(db)
+        await svc.subscribe(_make_user(), _make_plan(max_active_members=10, active_member_count=3), _make_club())
+
+    claim = str(db.execute.await_args_list[1].args[0])
+    assert claim.startswith("UPDATE membership_plans SET active_member_count=")
+    assert "membership_plans.active_member_count < membership_plans.max_active_members" in claim
+    assert "RETURNING" in claim
+
+
+@pytest.mark.asyncio
+async def test_subscribe_cancels_stripe_sub_when_last_seat_is_taken_concurrently():
+    """The loaded plan still shows a free seat, but the conditional UPDATE matches no row."""
+    db = _make_db()
+    no_dup = MagicMock()
+    no_dup.scalar_one_or_none.return_value = None
+    full = MagicMock()
+    full.first.return_value = None
+    db.execute = AsyncMock(side_effect=[no_dup, full])
+
+    with patch("app.services.membership_service.stripe.Subscription.create_async") as mock_create, \
+         patch("app.services.membership_service.stripe.Subscription.cancel_async",
+               new_callable=AsyncMock) as mock_cancel:
+        mock_create.return_value = _fake_stripe_sub()
+        svc = MembershipService(db)
+        with pytest.raises(HTTPException) as exc_info:
+            await svc.subscribe(_make_user(), _make_plan(max_active_members=10, active_member_count=9), _make_club())
 
-    svc = MembershipService(db)
-    with pytest.raises(HTTPException) as exc_info:
-        await svc.subscribe(_make_user(), _make_plan(max_active_members=10), _make_club())
     assert exc_info.value.status_code == 409
+    mock_cancel.assert_awaited_once_with("sub_test_789")
+    assert db._added == []
+    db.commit.assert_not_awaited()
 
 
 @pytest.mark.asyncio
@@ -335,7 +371,7 @@ async def test_subscribe_no_payment_method_required_if_trial():
     stripe_sub = _fake_stripe_sub(status="trialing")
     stripe_sub["latest_invoice"] = None
 
-    with patch("app.services.membership_service.stripe.Subscription.create") as mock_create:
+    with patch("app.services.membership_service.stripe.Subscription.create_async") as mock_create:
         mock_create.return_value = stripe_sub
         svc = MembershipService(db)
         result = await svc.subscribe(user, plan, _make_club())
@@ -372,9 +408,9 @@ async def test_upgrade_swaps_price_with_proration_and_cycle_reset():
     current_plan = _make_plan()  # price 29.99
     db.get = AsyncMock(return_value=current_plan)
 
-    with patch("app.services.membership_service.stripe.Subscription.retrieve",
+    with patch("app.services.membership_service.stripe.Subscription.retrieve_async",
                return_value=_fake_stripe_sub_retrieve()) as mock_retrieve, \
-         patch("app.services.membership_service.stripe.Subscription.modify",
+         patch("app.services.membership_service.stripe.Subscription.modify_async",
                return_value=_fake_stripe_sub()) as mock_modify:
         svc = MembershipService(db)
         result = await svc.upgrade(user, current_sub, new_plan, club)
@@ -403,9 +439,9 @@ async def test_upgrade_writes_credit_log_when_credits_nonzero():
                           stripe_price_id="price_gold", booking_credits_per_period=10)
     db.get = AsyncMock(return_value=_make_plan())
 
-    with patch("app.services.membership_service.stripe.Subscription.retrieve",
+    with patch("app.services.membership_service.stripe.Subscription.retrieve_async",
                return_value=_fake_stripe_sub_retrieve()), \
-         patch("app.services.membership_service.stripe.Subscription.modify",
+         patch("app.services.membership_service.stripe.Subscription.modify_async",
                return_value=_fake_stripe_sub()):
         svc = MembershipService(db)
         await svc.upgrade(_make_user(), current_sub, new_plan, _make_club())
@@ -422,9 +458,9 @@ async def test_upgrade_from_free_plan_creates_fresh_subscription():
     new_plan = _make_plan(id=uuid.uuid4(), price=Decimal("19.99"),
                           stripe_price_id="price_silver", booking_credits_per_period=5)
 
-    with patch("app.services.membership_service.stripe.Subscription.create",
+    with patch("app.services.membership_service.stripe.Subscription.create_async",
                return_value=_fake_stripe_sub()) as mock_create, \
-         patch("app.services.membership_service.stripe.Subscription.modify") as mock_modify:
+         patch("app.services.membership_service.stripe.Subscription.modify_async") as mock_modify:
         svc = MembershipService(db)
         result = await svc.upgrade(_make_user(), None, new_plan, _make_club())
 
@@ -448,7 +484,7 @@ async def test_upgrade_from_free_plan_expires_old_local_row():
     new_plan = _make_plan(id=uuid.uuid4(), price=Decimal("19.99"),
                           stripe_price_id="price_silver")
 
-    with patch("app.services.membership_service.stripe.Subscription.create",
+    with patch("app.services.membership_service.stripe.Subscription.create_async",
                return_value=_fake_stripe_sub()):
         svc = MembershipService(db)
         await svc.upgrade(_make_user(), old_sub, new_plan, _make_club())
@@ -499,11 +535,9 @@ async def test_upgrade_rejects_when_new_plan_at_capacity():
     current_sub = _make_subscription()
     db.get = AsyncMock(return_value=_make_plan(price=Decimal("19.99")))
 
-    cap_result = MagicMock()
-    cap_result.scalars.return_value.all.return_value = [_make_subscription() for _ in range(5)]
-    db.execute = AsyncMock(return_value=cap_result)
-
-    new_plan = _make_plan(id=uuid.uuid4(), price=Decimal("49.99"), max_active_members=5)
+    new_plan = _make_plan(
+        id=uuid.uuid4(), price=Decimal("49.99"), max_active_members=5, active_member_count=5
+    )
 
     svc = MembershipService(db)
     with pytest.raises(HTTPException) as exc_info:
@@ -518,9 +552,9 @@ async def test_upgrade_raises_400_on_stripe_error():
     db.get = AsyncMock(return_value=_make_plan(price=Decimal("19.99")))
     new_plan = _make_plan(id=uuid.uuid4(), price=Decimal("49.99"), stripe_price_id="price_gold")
 
-    with patch("app.services.membership_service.stripe.Subscription.retrieve",
+    with patch("app.services.membership_service.stripe.Subscription.retrieve_async",
                return_value=_fake_stripe_sub_retrieve()), \
-         patch("app.services.membership_service.stripe.Subscription.modify",
+         patch("app.services.membership_service.stripe.Subscription.modify_async",
                side_effect=stripe.StripeError("card declined")):
         svc = MembershipService(db)
         with pytest.raises(HTTPException) as exc_info:
@@ -555,7 +589,7 @@ async def test_downgrade_sets_cancel_at_period_end_and_pending_plan():
     cheaper_plan = _make_plan(id=uuid.uuid4(), name="Bronze",
                               price=Decimal("9.99"))
 
-    with patch("app.services.membership_service.stripe.Subscription.modify") as mock_modify:
+    with patch("app.services.membership_service.stripe.Subscription.modify_async") as mock_modify:
         svc = MembershipService(db)
         result = await svc.downgrade(_make_user(), current_sub, cheaper_plan, _make_club())
 
@@ -628,7 +662,7 @@ async def test_downgrade_to_free_plan_without_stripe_sub_skips_modify():
     free_plan = _make_plan(id=uuid.uuid4(), price=Decimal("0.00"),
                            stripe_price_id=None)
 
-    with patch("app.services.membership_service.stripe.Subscription.modify") as mock_modify:
+    with patch("app.services.membership_service.stripe.Subscription.modify_async") as mock_modify:
         svc = MembershipService(db)
         await svc.downgrade(_make_user(), current_sub, free_plan, _make_club())
 
@@ -642,7 +676,7 @@ async def test_cancel_pending_downgrade_clears_state_and_resumes_stripe():
     target_id = uuid.uuid4()
     sub = _make_subscription(pending_plan_id=target_id, cancel_at_period_end=True)
 
-    with patch("app.services.membership_service.stripe.Subscription.modify") as mock_modify:
+    with patch("app.services.membership_service.stripe.Subscription.modify_async") as mock_modify:
         svc = MembershipService(db)
         await svc.cancel_pending_downgrade(sub)
 
@@ -683,8 +717,7 @@ async def test_subscription_deleted_applies_pending_downgrade_to_free_plan():
 
     event = {"data": {"object": {"id": "sub_test_789"}}}
 
-    with patch("app.services.membership_service.stripe.Subscription.create") as mock_create, \
-         patch("app.services.membership_service.publish_notification_event"):
+    with patch("app.services.membership_service.stripe.Subscription.create_async") as mock_create:
         svc = MembershipService(db)
         await svc.handle_subscription_deleted(event)
 
@@ -724,15 +757,16 @@ async def test_subscription_deleted_applies_pending_downgrade_to_paid_plan():
 
     event = {"data": {"object": {"id": "sub_test_789"}}}
 
-    with patch("app.services.membership_service.stripe.Subscription.create",
-               return_value=_fake_stripe_sub()) as mock_create, \
-         patch("app.services.membership_service.publish_notification_event"):
+    with patch("app.services.membership_service.stripe.Subscription.create_async",
+               return_value=_fake_stripe_sub()) as mock_create:
         svc = MembershipService(db)
         await svc.handle_subscription_deleted(event)
 
     mock_create.assert_called_once()
     kwargs = mock_create.call_args.kwargs
     assert kwargs["items"] == [{"price": "price_bronze"}]
+    # A retried event must not create a second Stripe subscription.
+    assert kwargs["idempotency_key"] == f"membership-downgrade-{expiring.id}"
     assert expiring.status == MembershipStatus.expired
     assert expiring.pending_plan_id is None
 
@@ -749,7 +783,7 @@ async def test_subscription_deleted_without_pending_keeps_legacy_cancelled_behav
 
     event = {"data": {"object": {"id": "sub_test_789"}}}
 
-    with patch("app.services.membership_service.stripe.Subscription.create") as mock_create:
+    with patch("app.services.membership_service.stripe.Subscription.create_async") as mock_create:
         svc = MembershipService(db)
         await svc.handle_subscription_deleted(event)
 
@@ -768,7 +802,7 @@ async def test_cancel_sets_cancel_at_period_end():
     db = _make_db()
     sub = _make_subscription()
 
-    with patch("app.services.membership_service.stripe.Subscription.modify") as mock_modify:
+    with patch("app.services.membership_service.stripe.Subscription.modify_async") as mock_modify:
         svc = MembershipService(db)
         await svc.cancel_subscription(sub)
 
@@ -804,7 +838,7 @@ async def test_cancel_works_without_stripe_subscription_id():
     db = _make_db()
     sub = _make_subscription(stripe_subscription_id=None)
 
-    with patch("app.services.membership_service.stripe.Subscription.modify") as mock_modify:
+    with patch("app.services.membership_service.stripe.Subscription.modify_async") as mock_modify:
         svc = MembershipService(db)
         await svc.cancel_subscription(sub)
 
@@ -949,7 +983,7 @@ async def test_invoice_payment_succeeded_resets_credits_on_renewal():
         }
     }
 
-    with patch("app.services.membership_service.stripe.Subscription.retrieve") as mock_retrieve:
+    with patch("app.services.membership_service.stripe.Subscription.retrieve_async") as mock_retrieve:
         mock_retrieve.return_value = stripe_sub
         svc = MembershipService(db)
         await svc.handle_invoice_payment_succeeded(event)
@@ -984,7 +1018,7 @@ async def test_invoice_payment_succeeded_no_credit_log_when_zero_credits():
         }
     }
 
-    with patch("app.services.membership_service.stripe.Subscription.retrieve") as mock_retrieve:
+    with patch("app.services.membership_service.stripe.Subscription.retrieve_async") as mock_retrieve:
         mock_retrieve.return_value = {"current_period_start": PERIOD_START_TS,
                                        "current_period_end": PERIOD_END_TS}
         svc = MembershipService(db)
@@ -1005,7 +1039,7 @@ async def test_sync_payment_method_updates_all_active_subscriptions():
     subs_result.scalars.return_value.all.return_value = [sub1, sub2]
     db.execute = AsyncMock(return_value=subs_result)
 
-    with patch("app.services.membership_service.stripe.Subscription.modify") as mock_modify:
+    with patch("app.services.membership_service.stripe.Subscription.modify_async") as mock_modify:
         svc = MembershipService(db)
         await svc.sync_payment_method_to_subscriptions(USER_ID, "pm_new_card")
 
@@ -1023,7 +1057,7 @@ async def test_sync_payment_method_skips_on_stripe_error():
     subs_result.scalars.return_value.all.return_value = [sub]
     db.execute = AsyncMock(return_value=subs_result)
 
-    with patch("app.services.membership_service.stripe.Subscription.modify",
+    with patch("app.services.membership_service.stripe.Subscription.modify_async",
                side_effect=stripe.StripeError("network error")):
         svc = MembershipService(db)
         # Should not raise — errors are swallowed per best-effort contract
@@ -1037,7 +1071,7 @@ async def test_sync_payment_method_no_calls_when_no_subscriptions():
     subs_result.scalars.return_value.all.return_value = []
     db.execute = AsyncMock(return_value=subs_result)
 
-    with patch("app.services.membership_service.stripe.Subscription.modify") as mock_modify:
+    with patch("app.services.membership_service.stripe.Subscription.modify_async") as mock_modify:
         svc = MembershipService(db)
         await svc.sync_payment_method_to_subscriptions(USER_ID, "pm_new_card")
 
@@ -1061,3 +1095,137 @@ async def test_invoice_payment_succeeded_ignores_non_membership_invoice():
     svc = MembershipService(db)
     await svc.handle_invoice_payment_succeeded(event)
     db.commit.assert_not_awaited()
+
+
+# ---------------------------------------------------------------------------
+# Plan seats (active_member_count)
+# ---------------------------------------------------------------------------
+
+
+def _seat_moves(db) -> list[tuple[uuid.UUID, str]]:
+    """(plan_id, SET clause) for every UPDATE the service issued on membership_plans."""
+    moves = []
+    for call in db.execute.await_args_list:
+        stmt = call.args[0]
+        sql = str(stmt)
+        if sql.startswith("UPDATE membership_plans"):
+            params = stmt.compile().params
+            moves.append((params["id_1"], sql.split(" WHERE ")[0]))
+    return moves
+
+
+def _webhook_db(sub):
+    db = _make_db()
+    sub_result = MagicMock()
+    sub_result.scalar_one_or_none.return_value = sub
+    db.execute = AsyncMock(return_value=sub_result)
+    return db
+
+
+@pytest.mark.asyncio
+async def test_upgrade_moves_seat_from_old_plan_to_new():
+    db = _make_db()
+    new_plan = _make_plan(id=uuid.uuid4(), price=Decimal("49.99"), stripe_price_id="price_gold")
+    db.get = AsyncMock(return_value=_make_plan())
+
+    with patch("app.services.membership_service.stripe.Subscription.retrieve_async",
+               return_value=_fake_stripe_sub_retrieve()), \
+         patch("app.services.membership_service.stripe.Subscription.modify_async",
+               return_value=_fake_stripe_sub()):
+        await MembershipService(db).upgrade(_make_user(), _make_subscription(), new_plan, _make_club())
+
+    moves = _seat_moves(db)
+    assert [plan_id for plan_id, _ in moves] == [new_plan.id, PLAN_ID]
+    assert "greatest(membership_plans.active_member_count + :active_member_count_1" in moves[1][1]
+
+
+@pytest.mark.asyncio
+async def test_upgrade_rejects_before_stripe_when_seat_claim_fails():
+    db = _make_db()
+    db.get = AsyncMock(return_value=_make_plan())
+    full = MagicMock()
+    full.first.return_value = None
+    db.execute = AsyncMock(return_value=full)
+    new_plan = _make_plan(id=uuid.uuid4(), price=Decimal("49.99"), max_active_members=5, active_member_count=4)
+
+    with patch("app.services.membership_service.stripe.Subscription.modify_async") as mock_modify:
+        with pytest.raises(HTTPException) as exc_info:
+            await MembershipService(db).upgrade(_make_user(), _make_subscription(), new_plan, _make_club())
+
+    assert exc_info.value.status_code == 409
+    mock_modify.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_subscription_updated_to_paused_releases_seat():
+    db = _webhook_db(_make_subscription(status=MembershipStatus.active))
+    event = {"data": {"object": {"id": "sub_test_789", "status": "unpaid",
+                                  "current_period_start": PERIOD_START_TS,
+                                  "current_period_end": PERIOD_END_TS}}}
+
+    await MembershipService(db).handle_subscription_updated(event)
+
+    assert [plan_id for plan_id, _ in _seat_moves(db)] == [PLAN_ID]
+
+
+@pytest.mark.asyncio
+async def test_subscription_updated_without_status_change_leaves_count_alone():
+    db = _webhook_db(_make_subscription(status=MembershipStatus.active))
+    event = {"data": {"object": {"id": "sub_test_789", "status": "past_due",
+                                  "current_period_start": PERIOD_START_TS,
+                                  "current_period_end": PERIOD_END_TS}}}
+
+    await MembershipService(db).handle_subscription_updated(event)
+
+    assert _seat_moves(db) == []
+
+
+@pytest.mark.asyncio
+async def test_subscription_deleted_releases_seat_once():
+    db = _webhook_db(_make_subscription(status=MembershipStatus.active))
+
+    await MembershipService(db).handle_subscription_deleted({"data": {"object": {"id": "sub_test_789"}}})
+
+    assert [plan_id for plan_id, _ in _seat_moves(db)] == [PLAN_ID]
+
+
+@pytest.mark.asyncio
+async def test_subscription_deleted_applying_downgrade_moves_seat():
+    free_plan_id = uuid.uuid4()
+    db = _webhook_db(_make_subscription(pending_plan_id=free_plan_id))
+    free_plan = _make_plan(id=free_plan_id, price=Decimal("0.00"), stripe_price_id=None,
+                           booking_credits_per_period=0, guest_passes_per_period=None)
+    db.get = AsyncMock(side_effect=[free_plan, _make_user(), _make_club()])
+
+    await MembershipService(db).handle_subscription_deleted({"data": {"object": {"id": "sub_test_789"}}})
+
+    assert [plan_id for plan_id, _ in _seat_moves(db)] == [PLAN_ID, free_plan_id]
+
+
+@pytest.mark.asyncio
+async def test_invoice_payment_succeeded_reactivating_paused_sub_takes_seat():
+    db = _webhook_db(_make_subscription(status=MembershipStatus.paused))
+    db.get = AsyncMock(return_value=_make_plan())
+    event = {"data": {"object": {"subscription": "sub_test_789", "billing_reason": "manual",
+                                  "amount_paid": 2999, "currency": "gbp"}}}
+
+    await MembershipService(db).handle_invoice_payment_succeeded(event)
+
+    assert [plan_id for plan_id, _ in _seat_moves(db)] == [PLAN_ID]
+
+
+@pytest.mark.asyncio
+async def test_reconcile_recounts_under_plan_locks_and_reports_corrections():
+    db = _make_db()
+    corrected = MagicMock()
+    corrected.scalars.return_value.all.return_value = [PLAN_ID]
+    db.execute = AsyncMock(side_effect=[MagicMock(), corrected])
+
+    result = await MembershipService(db).reconcile_active_member_counts()
+
+    lock, recount = (str(call.args[0]) for call in db.execute.await_args_list)
+    assert lock.endswith("FOR UPDATE")
+    assert "SET active_member_count=(SELECT count(membership_subscriptions.id)" in recount
+    assert "WHERE membership_plans.active_member_count != (SELECT" in recount
+    db.commit.assert_awaited_once()
+    assert result == {"plans_corrected": 1}
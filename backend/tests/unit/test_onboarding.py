@@ -117,7 +117,7 @@ async def test_onboard_creates_tenant_single_club_owner():
     db = _make_db()
     body = _valid_request()
 
-    with patch("app.api.v1.endpoints.admin.get_password_hash", return_value="hashed"):
+    with patch("app.api.v1.endpoints.admin.get_password_hash_async", AsyncMock(return_value="hashed")):
         response = await onboard_tenant(body, db)
 
     assert response.tenant_id is not None
@@ -136,7 +136,7 @@ async def test_onboard_creates_multiple_clubs():
         ]
     )
 
-    with patch("app.api.v1.endpoints.admin.get_password_hash", return_value="hashed"):
+    with patch("app.api.v1.endpoints.admin.get_password_hash_async", AsyncMock(return_value="hashed")):
         response = await onboard_tenant(body, db)
 
     assert len(response.club_ids) == 3
@@ -234,7 +234,7 @@ async def test_onboard_unlimited_plan_accepts_many_clubs():
         clubs=[ClubCreate(name=f"Club {i}") for i in range(10)]
     )
 
-    with patch("app.api.v1.endpoints.admin.get_password_hash", return_value="hashed"):
+    with patch("app.api.v1.endpoints.admin.get_password_hash_async", AsyncMock(return_value="hashed")):
         response = await onboard_tenant(body, db)
 
     assert len(response.club_ids) == 10
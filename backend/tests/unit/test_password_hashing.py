@@ -0,0 +1,49 @@
+"""
+Unit tests for the async password-hashing helpers in app.core.security.
+
+Covers the hash/verify round-trip, that bcrypt runs on the dedicated pool
+rather than the event-loop thread, and rehash-on-verify when the stored hash
+was made with different cost parameters.
+"""
+import threading
+
+from passlib.context import CryptContext
+
+from app.core import security
+from app.core.security import (
+    get_password_hash_async,
+    verify_and_update_password_async,
+    verify_password_async,
+)
+
+
+async def test_hash_and_verify_round_trip():
+    hashed = await get_password_hash_async("Password1!")
+
+    assert await verify_password_async("Password1!", hashed)
+    assert not await verify_password_async("Wrong1!", hashed)
+
+
+async def test_hashing_runs_off_the_event_loop_thread():
+    thread_name = await security._run_hashing(lambda: threading.current_thread().name)
+
+    assert thread_name.startswith("password-hash")
+    assert thread_name != threading.current_thread().name
+
+
+async def test_outdated_hash_is_upgraded_on_verify():
+    cheap = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("Password1!")
+
+    verified, new_hash = await verify_and_update_password_async("Password1!", cheap)
+
+    assert verified
+    assert new_hash is not None and new_hash != cheap
+    assert security.pwd_context.identify(new_hash) == "bcrypt"
+    assert not security.pwd_context.needs_update(new_hash)
+
+
+async def test_current_hash_is_not_rehashed_and_mismatch_returns_nothing():
+    hashed = security.get_password_hash("Password1!")
+
+    assert await verify_and_update_password_async("Password1!", hashed) == (True, None)
+    assert await verify_and_update_password_async("Wrong1!", hashed) == (False, None)
@@ -76,9 +76,25 @@ def _txn(**fields):
     return StripeObject.construct_from(fields, "fake_key")
 
 
+class _AsyncPages:
+    """What `ListObject.auto_paging_iter()` returns, for `async for`."""
+
+    def __init__(self, items):
+        self._items = iter(items)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._items)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
 def _make_balance_txns(txns):
     listing = MagicMock()
-    listing.auto_paging_iter = MagicMock(return_value=txns)
+    listing.auto_paging_iter = MagicMock(return_value=_AsyncPages(txns))
     return listing
 
 
@@ -109,7 +125,7 @@ async def test_stamps_payout_id_and_records_matched_payout():
         _txn(source="py_222", amount=1500, fee=44),
     ]
     with patch(
-        "app.services.payment_service.stripe.BalanceTransaction.list",
+        "app.services.payment_service.stripe.BalanceTransaction.list_async",
         return_value=_make_balance_txns(txns),
     ) as mock_list:
         await svc.handle_payout_paid(
@@ -143,7 +159,7 @@ async def test_unknown_connect_account_skips():
     db = _FakeDB([_Result(scalar=None)])  # club not found
     svc = PaymentService(db)
 
-    with patch("app.services.payment_service.stripe.BalanceTransaction.list") as mock_list:
+    with patch("app.services.payment_service.stripe.BalanceTransaction.list_async") as mock_list:
         await svc.handle_payout_paid(_payout_event())
 
     mock_list.assert_not_called()
@@ -168,7 +184,7 @@ async def test_partial_when_some_payments_unmatched():
         _txn(source="py_missing", amount=2000, fee=58),
     ]
     with patch(
-        "app.services.payment_service.stripe.BalanceTransaction.list",
+        "app.services.payment_service.stripe.BalanceTransaction.list_async",
         return_value=_make_balance_txns(txns),
     ):
         await svc.handle_payout_paid(_payout_event(amount=2913))
@@ -190,7 +206,7 @@ async def test_discrepancy_when_amounts_disagree():
 
     txns = [_txn(source="py_111", amount=1000, fee=29)]
     with patch(
-        "app.services.payment_service.stripe.BalanceTransaction.list",
+        "app.services.payment_service.stripe.BalanceTransaction.list_async",
         return_value=_make_balance_txns(txns),
     ):
         await svc.handle_payout_paid(_payout_event(amount=971))
@@ -215,7 +231,7 @@ async def test_matched_amount_is_net_of_refunds():
     # gross 6.00 so it reconciles cleanly against the net-of-refund matched sum
     txns = [_txn(source="py_111", amount=600, fee=20)]
     with patch(
-        "app.services.payment_service.stripe.BalanceTransaction.list",
+        "app.services.payment_service.stripe.BalanceTransaction.list_async",
         return_value=_make_balance_txns(txns),
     ):
         await svc.handle_payout_paid(_payout_event(amount=580))
@@ -1,5 +1,5 @@
 """
-Unit tests for PricingService.calculate() and PricingService.consume_credit().
+Unit tests for PricingService.calculate(), calculate_many() and consume_credit().
 
 All DB interaction is mocked — no database required.
 
@@ -9,7 +9,7 @@ Priority order under test:
   3. Membership discount_pct → percentage off unit_price
 """
 import uuid
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, time, timedelta, timezone
 from decimal import Decimal
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock
@@ -17,7 +17,7 @@ from unittest.mock import AsyncMock, MagicMock
 import pytest
 
 from app.db.models.booking import BookingType, DiscountSource
-from app.services.pricing_service import PricingService
+from app.services.pricing_service import PriceRequest, PricingService
 
 NOW = datetime.now(tz=timezone.utc)
 # "UTC" leaves START's 10:00 wall-clock unchanged when calculate() converts the
@@ -37,8 +37,16 @@ START = NOW.replace(hour=10, minute=0, second=0, microsecond=0)
 # ---------------------------------------------------------------------------
 
 def _rule(price_per_slot="20.00", incentive_price=None, incentive_expires_at=None,
-          session_type=BookingType.regular):
+          session_type=BookingType.regular, start=6, end=23, valid_from=None, valid_until=None):
+    """A rule on START's weekday covering [start, end) club-local hours."""
     return SimpleNamespace(
+        day_of_week=START.weekday(),
+        start_time=time(start, 0),
+        end_time=time(end, 0),
+        valid_from=valid_from,
+        valid_until=valid_until,
+        label="standard",
+        incentive_label=None,
         price_per_slot=Decimal(price_per_slot),
         incentive_price=Decimal(incentive_price) if incentive_price else None,
         incentive_expires_at=incentive_expires_at,
@@ -63,13 +71,17 @@ def _sub(plan, credits_remaining=0):
     )
 
 
-def _rule_result(rule):
-    """A query result whose .scalars().first() yields `rule` (the pricing-rule lookup)."""
+def _rules_result(rules):
+    """A query result whose .scalars().all() yields `rules` (the club's pricing-table load)."""
     result = MagicMock()
-    result.scalars.return_value.first.return_value = rule
+    result.scalars.return_value.all.return_value = rules
     return result
 
 
+def _rule_result(rule):
+    return _rules_result([rule] if rule is not None else [])
+
+
 def _sub_result(sub):
     """A query result whose .scalar_one_or_none() yields `sub` (the membership lookup)."""
     result = MagicMock()
@@ -309,6 +321,92 @@ class TestSessionType:
         assert bd.unit_price == Decimal("20.00")
 
 
+# ---------------------------------------------------------------------------
+# calculate_many — batched pricing
+# ---------------------------------------------------------------------------
+
+def _at(hour):
+    return START.replace(hour=hour)
+
+
+class TestCalculateMany:
+
+    @pytest.mark.asyncio
+    async def test_two_queries_for_many_slots_and_players(self):
+        other_user = uuid.uuid4()
+        sub = _sub(_plan(discount_pct="50"))
+        sub.user_id = USER_ID
+        db = AsyncMock()
+        db.execute = AsyncMock(side_effect=[
+            _rules_result([_rule()]),
+            _rules_result([sub]),
+        ])
+
+        requests = [
+            PriceRequest(_at(hour), max_players=4, user_id=user_id)
+            for hour in range(8, 20)
+            for user_id in (USER_ID, other_user, None)
+        ]
+        breakdowns = await PricingService(db).calculate_many(CLUB_ID, CLUB_TZ, requests)
+
+        assert db.execute.await_count == 2
+        assert len(breakdowns) == len(requests)
+        by_user = {r.user_id: bd for r, bd in zip(requests, breakdowns)}
+        assert by_user[USER_ID].amount_due == Decimal("2.50")
+        assert by_user[USER_ID].membership_subscription_id == SUB_ID
+        assert by_user[other_user].amount_due == Decimal("5.00")
+        assert by_user[None].amount_due == Decimal("5.00")
+
+    @pytest.mark.asyncio
+    async def test_matches_calculate_for_each_slot(self):
+        rules = [
+            _rule(start=6, end=10, price_per_slot="16.00"),
+            _rule(start=10, end=14, price_per_slot="20.00", incentive_price="12.00"),
+            _rule(start=10, end=14, price_per_slot="60.00", session_type=BookingType.lesson_individual),
+        ]
+        sub = _sub(_plan(booking_credits_per_period=5), credits_remaining=1)
+        sub.user_id = USER_ID
+        db = AsyncMock()
+        db.execute = AsyncMock(side_effect=[_rules_result(rules), _rules_result([sub])])
+
+        requests = [
+            PriceRequest(_at(9), max_players=4),
+            PriceRequest(_at(10), max_players=4, user_id=USER_ID),
+            PriceRequest(_at(11), max_players=1, booking_type=BookingType.lesson_individual),
+            PriceRequest(_at(9), max_players=1, booking_type=BookingType.lesson_individual),
+            PriceRequest(_at(15), max_players=4),
+        ]
+        batched = await PricingService(db).calculate_many(CLUB_ID, CLUB_TZ, requests)
+
+        assert batched[3].unit_price == Decimal("16.00")   # lesson falls back to regular
+        assert batched[4] is None
+        for request, bd in zip(requests, batched):
+            single_db = AsyncMock()
+            single_db.execute = AsyncMock(side_effect=[_rules_result(rules), _sub_result(sub)])
+            single = await PricingService(single_db).calculate(
+                CLUB_ID, request.start_datetime, CLUB_TZ, request.max_players,
+                request.user_id, request.booking_type,
+            )
+            assert bd == single
+
+    @pytest.mark.asyncio
+    async def test_no_subscription_query_without_users(self):
+        db = AsyncMock()
+        db.execute = AsyncMock(return_value=_rules_result([_rule()]))
+        breakdowns = await PricingService(db).calculate_many(
+            CLUB_ID, CLUB_TZ, [PriceRequest(_at(8), max_players=2), PriceRequest(_at(23), max_players=2)]
+        )
+        assert db.execute.await_count == 1
+        assert breakdowns[0].amount_due == Decimal("10.00")
+        assert breakdowns[1] is None   # end_time is exclusive
+
+    @pytest.mark.asyncio
+    async def test_empty_request_list_issues_no_queries(self):
+        db = AsyncMock()
+        assert await PricingService(db).calculate_many(CLUB_ID, CLUB_TZ, []) == []
+        db.execute.assert_not_awaited()
+
+
 # ---------------------------------------------------------------------------
 # consume_credit
 # ---------------------------------------------------------------------------
@@ -0,0 +1,175 @@
+"""
+Unit tests for the compiled per-club PricingTable and its cache.
+
+Covers breakpoint lookup (window edges, overlaps), seasonal validity, session
+type fallback, incentive resolution and staleness, and the cache's version
+guard and after-commit invalidation. No database needed.
+"""
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.db.models.booking import BookingType
+from app.services import pricing_table as table_module
+from app.services.pricing_table import (
+    PricingTable,
+    PricingTableCache,
+    load_pricing_table,
+    mark_pricing_rules_dirty,
+)
+
+CLUB_ID = uuid.uuid4()
+NOW = datetime(2026, 6, 1, 8, 0, tzinfo=timezone.utc)
+MONDAY = date(2026, 6, 1)
+
+
+def _rule(start, end, price="20.00", day=0, **overrides):
+    params = dict(
+        day_of_week=day,
+        start_time=time(start, 0),
+        end_time=time(end, 0),
+        price_per_slot=Decimal(price),
+        session_type=BookingType.regular,
+        valid_from=None,
+        valid_until=None,
+        label="standard",
+        incentive_price=None,
+        incentive_label=None,
+        incentive_expires_at=None,
+    )
+    params.update(overrides)
+    return SimpleNamespace(**params)
+
+
+def _at(on, hour, minute=0):
+    return datetime.combine(on, time(hour, minute))
+
+
+def _price(table, on, hour, minute=0, session_type=BookingType.regular):
+    slot = table.lookup(_at(on, hour, minute), session_type)
+    return slot.price if slot is not None else None
+
+
+# ---------------------------------------------------------------------------
+# Lookup
+# ---------------------------------------------------------------------------
+
+
+def test_window_start_is_inclusive_and_end_exclusive():
+    table = PricingTable.compile([_rule(6, 10, "16.00"), _rule(10, 14, "24.00")], NOW)
+    assert _price(table, MONDAY, 5, 59) is None
+    assert _price(table, MONDAY, 6) == Decimal("16.00")
+    assert _price(table, MONDAY, 9, 59) == Decimal("16.00")
+    assert _price(table, MONDAY, 10) == Decimal("24.00")
+    assert _price(table, MONDAY, 14) is None
+    assert _price(table, MONDAY + timedelta(days=1), 8) is None  # Tuesday has no rules
+
+
+def test_overlapping_windows_latest_start_wins():
+    table = PricingTable.compile([_rule(6, 23, "20.00"), _rule(18, 21, "30.00")], NOW)
+    assert _price(table, MONDAY, 17) == Decimal("20.00")
+    assert _price(table, MONDAY, 19) == Decimal("30.00")
+    assert _price(table, MONDAY, 21) == Decimal("20.00")
+
+
+def test_seasonal_rule_applies_only_inside_its_dates():
+    summer = _rule(6, 23, "35.00", valid_from=date(2026, 6, 8), valid_until=date(2026, 8, 31))
+    table = PricingTable.compile([_rule(6, 23, "20.00"), summer], NOW)
+    assert _price(table, MONDAY, 10) == Decimal("20.00")
+    assert _price(table, MONDAY + timedelta(weeks=1), 10) == Decimal("35.00")
+    assert _price(table, date(2026, 8, 31), 10) == Decimal("35.00")
+    assert _price(table, date(2026, 9, 7), 10) == Decimal("20.00")
+
+
+def test_session_type_falls_back_to_regular():
+    lesson = _rule(10, 12, "60.00", session_type=BookingType.lesson_individual)
+    table = PricingTable.compile([_rule(6, 23, "20.00"), lesson], NOW)
+    assert _price(table, MONDAY, 11, session_type=BookingType.lesson_individual) == Decimal("60.00")
+    assert _price(table, MONDAY, 13, session_type=BookingType.lesson_individual) == Decimal("20.00")
+    assert _price(table, MONDAY, 11) == Decimal("20.00")
+
+
+def test_incentive_resolved_at_build_and_marks_table_stale_on_expiry():
+    expires = NOW + timedelta(hours=2)
+    promo = _rule(6, 23, "20.00", incentive_price=Decimal("12.00"),
+                  incentive_label="Happy Hour", incentive_expires_at=expires)
+    table = PricingTable.compile([promo], NOW)
+
+    slot = table.lookup(_at(MONDAY, 10))
+    assert (slot.base_price, slot.price, slot.label) == (Decimal("20.00"), Decimal("12.00"), "Happy Hour")
+    assert table.is_current(NOW)
+    assert not table.is_current(expires)
+
+    later = PricingTable.compile([promo], expires)
+    assert later.lookup(_at(MONDAY, 10)).price == Decimal("20.00")
+    assert later.stale_at is None
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+
+def _table():
+    return PricingTable.compile([_rule(6, 23)], NOW)
+
+
+def test_build_started_before_invalidation_is_not_stored(monkeypatch):
+    cache = PricingTableCache(ttl_seconds=60, max_entries=8)
+    version = cache.version(CLUB_ID)
+    cache.invalidate_club(CLUB_ID)
+    cache.put(CLUB_ID, _table(), version)
+    assert cache.get(CLUB_ID, NOW) is None
+
+    # Fresh builds are refused until the settle window has passed.
+    cache.put(CLUB_ID, _table(), cache.version(CLUB_ID))
+    assert cache.get(CLUB_ID, NOW) is None
+    monkeypatch.setattr(table_module, "INVALIDATION_SETTLE_SECONDS", 0.0)
+    cache.put(CLUB_ID, _table(), cache.version(CLUB_ID))
+    assert cache.get(CLUB_ID, NOW) is not None
+
+
+def test_stale_table_is_a_miss():
+    cache = PricingTableCache(ttl_seconds=60, max_entries=8)
+    promo = _rule(6, 23, incentive_price=Decimal("12.00"), incentive_expires_at=NOW + timedelta(hours=1))
+    cache.put(CLUB_ID, PricingTable.compile([promo], NOW), cache.version(CLUB_ID))
+    assert cache.get(CLUB_ID, NOW) is not None
+    assert cache.get(CLUB_ID, NOW + timedelta(hours=1)) is None
+
+
+@pytest.fixture
+def enabled_cache(monkeypatch):
+    cache = PricingTableCache(ttl_seconds=60, max_entries=8)
+    monkeypatch.setattr(table_module, "get_pricing_table_cache", lambda: cache)
+    return cache
+
+
+async def test_load_queries_once_then_serves_from_cache(enabled_cache):
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = [_rule(6, 23, "22.00")]
+    db = AsyncMock()
+    db.execute = AsyncMock(return_value=result)
+
+    first = await load_pricing_table(db, CLUB_ID, NOW)
+    second = await load_pricing_table(db, CLUB_ID, NOW)
+
+    assert first is second
+    assert first.lookup(_at(MONDAY, 9)).price == Decimal("22.00")
+    db.execute.assert_awaited_once()
+
+
+def test_pricing_rules_update_invalidates_after_commit(enabled_cache):
+    enabled_cache.put(CLUB_ID, _table(), enabled_cache.version(CLUB_ID))
+    session = Session()
+    session.begin()
+    mark_pricing_rules_dirty(session, CLUB_ID)
+
+    assert enabled_cache.get(CLUB_ID, NOW) is not None
+    session.commit()
+    assert enabled_cache.get(CLUB_ID, NOW) is None
+    assert enabled_cache.version(CLUB_ID) == 1
@@ -0,0 +1,196 @@
+"""
+Unit tests for the authenticated-principal cache and get_current_user.
+
+Covers snapshot hits merged without SQL, per-token keys, invalidation after a
+flushed User change commits, the replica-lag grace window, and which session
+get_current_user resolves the principal on (including the primary fallback).
+"""
+import time
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.api.v1.dependencies.auth import get_current_user
+from app.core import principal_cache as cache_module
+from app.core.principal_cache import PrincipalCache
+from app.core.security import create_access_token
+from app.db.models.user import TenantUserRole, User
+
+USER_ID = uuid.uuid4()
+TENANT_ID = uuid.uuid4()
+IAT = 1_790_000_000
+
+
+def _user(**overrides):
+    params = dict(
+        id=USER_ID,
+        tenant_id=TENANT_ID,
+        email="player@test.com",
+        full_name="Player",
+        hashed_password="x",
+        role=TenantUserRole.player,
+        is_active=True,
+    )
+    params.update(overrides)
+    return User(**params)
+
+
+def _cache(**overrides):
+    params = dict(ttl_seconds=60, max_entries=8)
+    params.update(overrides)
+    return PrincipalCache(**params)
+
+
+# ---------------------------------------------------------------------------
+# PrincipalCache
+# ---------------------------------------------------------------------------
+
+
+def test_hit_is_a_detached_copy_keyed_by_token():
+    cache = _cache()
+    cache.put(IAT, _user(), time.monotonic())
+
+    hit = cache.get(USER_ID, IAT)
+    assert hit.id == USER_ID and hit.role == TenantUserRole.player
+    assert hit is not cache.get(USER_ID, IAT)
+    assert cache.get(USER_ID, IAT + 1) is None
+
+
+def test_disabled_cache_never_hits():
+    cache = _cache(ttl_seconds=0)
+    cache.put(IAT, _user(), time.monotonic())
+    assert cache.get(USER_ID, IAT) is None
+
+
+def test_invalidate_drops_every_token_of_the_user():
+    cache = _cache()
+    cache.put(IAT, _user(), time.monotonic())
+    cache.put(IAT + 60, _user(), time.monotonic())
+    cache.invalidate_user(USER_ID)
+    assert cache.get(USER_ID, IAT) is None
+    assert cache.get(USER_ID, IAT + 60) is None
+
+
+def test_load_started_before_invalidation_is_not_stored():
+    cache = _cache()
+    loaded_at = time.monotonic()
+    cache.invalidate_user(USER_ID)
+    cache.put(IAT, _user(), loaded_at)
+    assert cache.get(USER_ID, IAT) is None
+
+
+def test_replica_read_inside_lag_grace_is_not_stored():
+    cache = _cache()
+    cache.invalidate_user(USER_ID)
+    cache.put(IAT, _user(), time.monotonic(), from_replica=True)
+    assert cache.get(USER_ID, IAT) is None
+
+    # A primary read after the commit is authoritative.
+    cache.put(IAT, _user(), time.monotonic())
+    assert cache.get(USER_ID, IAT) is not None
+
+
+@pytest.fixture
+def enabled_cache(monkeypatch):
+    cache = _cache()
+    monkeypatch.setattr(cache_module, "get_principal_cache", lambda: cache)
+    monkeypatch.setattr("app.api.v1.dependencies.auth.get_principal_cache", lambda: cache)
+    return cache
+
+
+def test_flushed_user_change_invalidates_after_commit(enabled_cache):
+    enabled_cache.put(IAT, _user(), time.monotonic())
+    session = Session()
+    session.begin()
+    user = _user()
+    make_transient_to_detached(user)
+    session.add(user)
+    user.role = TenantUserRole.admin
+    # No database here: run the after_flush hook by hand, then drop the object
+    # so the commit has nothing to write.
+    cache_module._collect_dirty_users(session, None)
+    session.expunge(user)
+
+    assert enabled_cache.get(USER_ID, IAT) is not None
+    session.commit()
+    assert enabled_cache.get(USER_ID, IAT) is None
+
+
+# ---------------------------------------------------------------------------
+# get_current_user
+# ---------------------------------------------------------------------------
+
+
+def _credentials():
+    token = create_access_token({"sub": str(USER_ID), "tid": str(TENANT_ID)})
+    return SimpleNamespace(credentials=token)
+
+
+def _request(method):
+    return SimpleNamespace(method=method, state=SimpleNamespace(tenant=SimpleNamespace(id=TENANT_ID)))
+
+
+def _session(user=None):
+    session = AsyncMock()
+    session.get = AsyncMock(return_value=user)
+    session.merge = AsyncMock(side_effect=lambda obj, load: obj)
+    return session
+
+
+async def test_get_resolves_on_replica_then_serves_from_cache(enabled_cache):
+    db, read_db = _session(), _session(_user())
+    credentials = _credentials()
+
+    first = await get_current_user(_request("GET"), credentials, db, read_db)
+    second = await get_current_user(_request("GET"), credentials, db, read_db)
+
+    assert first.id == second.id == USER_ID
+    read_db.get.assert_awaited_once()
+    read_db.merge.assert_awaited_once()
+    db.get.assert_not_awaited()
+    db.merge.assert_not_awaited()
+
+
+async def test_write_request_resolves_on_primary_session(enabled_cache):
+    db, read_db = _session(_user()), _session()
+
+    user = await get_current_user(_request("POST"), _credentials(), db, read_db)
+
+    assert user.id == USER_ID
+    db.get.assert_awaited_once()
+    read_db.get.assert_not_awaited()
+
+
+async def test_user_missing_on_replica_is_read_from_primary(enabled_cache):
+    # Signed up a moment ago: the replica has not caught up yet.
+    db, read_db = _session(_user()), _session(None)
+
+    user = await get_current_user(_request("GET"), _credentials(), db, read_db)
+
+    assert user.id == USER_ID
+    read_db.get.assert_awaited_once()
+    db.get.assert_awaited_once()
+
+
+async def test_inactive_on_replica_is_rechecked_on_primary(enabled_cache):
+    db, read_db = _session(_user(is_active=False)), _session(_user(is_active=False))
+
+    with pytest.raises(HTTPException) as exc:
+        await get_current_user(_request("GET"), _credentials(), db, read_db)
+
+    assert exc.value.status_code == 401
+    db.get.assert_awaited_once()
+
+
+async def test_recently_changed_user_is_read_from_primary(enabled_cache):
+    enabled_cache.invalidate_user(USER_ID)
+    db, read_db = _session(_user()), _session(_user())
+
+    await get_current_user(_request("GET"), _credentials(), db, read_db)
+
+    db.get.assert_awaited_once()
+    read_db.get.assert_not_awaited()
@@ -0,0 +1,134 @@
+"""
+Unit tests for the non-blocking Pub/Sub publisher.
+
+Covers the hand-off (no wait for the ack), awaiting an ack on the event loop,
+logged failures, in-flight backpressure (failing fast, or waiting on the loop) and the
+shutdown flush. Uses the
+in-memory transport — no Pub/Sub needed.
+"""
+import asyncio
+import logging
+import threading
+import time
+
+import pytest
+
+from app.core import pubsub
+from app.core.pubsub import EventPublisher, InMemoryTransport, PublishBackpressureError
+
+
+def _publisher(transport, max_in_flight=10, backpressure_timeout=0.05):
+    return EventPublisher(transport, max_in_flight=max_in_flight, backpressure_timeout=backpressure_timeout)
+
+
+def test_publish_returns_before_the_ack():
+    transport = InMemoryTransport(auto_ack=False)
+    publisher = _publisher(transport)
+
+    future = publisher.publish("notification-events", "welcome", {"user_id": "u1"})
+
+    assert not future.done()
+    assert publisher.in_flight == 1
+    message = transport.messages[0]
+    assert message.topic_path.endswith("/topics/notification-events")
+    assert message.attributes == {"event_type": "welcome"}
+    assert message.event == {"event_type": "welcome", "payload": {"user_id": "u1"}}
+
+    transport.ack_pending()
+    assert future.result() == message.message_id
+    assert publisher.in_flight == 0
+
+
+async def test_ack_can_be_awaited_on_the_loop():
+    transport = InMemoryTransport(ack_latency=0.01)
+    publisher = _publisher(transport)
+
+    message_id = await asyncio.wrap_future(publisher.publish("t", "welcome", {}))
+
+    assert message_id == transport.messages[0].message_id
+
+
+def test_failed_publish_is_logged_not_raised(caplog):
+    transport = InMemoryTransport(auto_ack=False)
+    publisher = _publisher(transport)
+    future = publisher.publish("t", "send_email", {})
+
+    with caplog.at_level(logging.ERROR, logger="app.core.pubsub"):
+        transport.fail_pending(RuntimeError("pubsub down"))
+
+    assert isinstance(future.exception(), RuntimeError)
+    assert publisher.in_flight == 0
+    assert "event_type=send_email" in caplog.text
+
+
+def test_backpressure_rejects_once_in_flight_limit_is_reached():
+    transport = InMemoryTransport(auto_ack=False)
+    publisher = _publisher(transport, max_in_flight=2)
+    publisher.publish("t", "a", {})
+    publisher.publish("t", "b", {})
+
+    with pytest.raises(PublishBackpressureError):
+        publisher.publish("t", "c", {})
+    assert len(transport.messages) == 2
+
+    transport.ack_pending()
+    publisher.publish("t", "c", {})
+    assert len(transport.messages) == 3
+
+
+def test_publish_fails_fast_instead_of_waiting_for_a_slot():
+    transport = InMemoryTransport(auto_ack=False)
+    publisher = _publisher(transport, max_in_flight=1, backpressure_timeout=5.0)
+    publisher.publish("t", "a", {})
+
+    started = time.monotonic()
+    with pytest.raises(PublishBackpressureError):
+        publisher.publish("t", "b", {})
+    assert time.monotonic() - started < 0.5
+
+
+async def test_async_publish_waits_on_the_loop_until_a_slot_frees():
+    transport = InMemoryTransport(auto_ack=False)
+    publisher = _publisher(transport, max_in_flight=1, backpressure_timeout=5.0)
+    publisher.publish("t", "a", {})
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    ticking = asyncio.ensure_future(ticker())
+    threading.Timer(0.05, transport.ack_pending).start()
+    ack = await publisher.publish_async("t", "b", {})
+    ticking.cancel()
+
+    assert ticks > 1  # the loop kept running while the publish waited
+    assert [m.attributes["event_type"] for m in transport.messages] == ["a", "b"]
+    transport.ack_pending()
+    assert await ack == transport.messages[1].message_id
+
+
+async def test_async_publish_gives_up_after_the_backpressure_timeout():
+    transport = InMemoryTransport(auto_ack=False)
+    publisher = _publisher(transport, max_in_flight=1, backpressure_timeout=0.05)
+    publisher.publish("t", "a", {})
+
+    with pytest.raises(PublishBackpressureError):
+        await publisher.publish_async("t", "b", {})
+    assert len(transport.messages) == 1
+    assert publisher._waiters == []
+
+
+def test_shutdown_flushes_in_flight_messages(monkeypatch):
+    transport = InMemoryTransport(auto_ack=False)
+    publisher = _publisher(transport)
+    monkeypatch.setattr(pubsub, "_publisher", publisher)
+    future = pubsub.publish_notification_event("welcome", {})
+
+    pubsub.shutdown_publisher(timeout=1.0)
+
+    assert future.result() == "1"
+    assert publisher.in_flight == 0
+    assert pubsub._publisher is None
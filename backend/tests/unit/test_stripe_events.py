@@ -0,0 +1,273 @@
+"""
+Unit tests for the Stripe webhook inbox and its worker.
+
+Mocks the database sessions and the event handlers — no Postgres or Stripe
+needed. Covers queueing on the webhook (de-duplicated, unhandled types
+dropped), per-object ordering when claiming and processing, retry backoff and
+giving up, and the worker's push-envelope handling.
+"""
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from httpx import ASGITransport
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1.endpoints.payments import stripe_webhook
+from app.db.models.stripe_event import StripeEvent
+from app.services import stripe_events
+from app.services.stripe_events import (
+    ClaimedEvent,
+    claim_batch,
+    ordering_key,
+    process_batch,
+    process_event,
+    record_event,
+)
+from app.workers import stripe_event_worker as worker
+
+
+def _event(event_type="payment_intent.succeeded", event_id="evt_1", obj=None):
+    return {"id": event_id, "type": event_type, "data": {"object": obj or {"id": "pi_1"}}}
+
+
+def _request(event: dict):
+    req = MagicMock()
+    req.body = AsyncMock(return_value=json.dumps(event).encode())
+    req.headers = {"stripe-signature": "t=1,v1=abc"}
+    return req
+
+
+def _insert_db(rowcount=1):
+    db = AsyncMock()
+    db.execute = AsyncMock(return_value=MagicMock(rowcount=rowcount))
+    return db
+
+
+# ---------------------------------------------------------------------------
+# Webhook → inbox
+# ---------------------------------------------------------------------------
+
+
+async def test_webhook_queues_event_without_running_its_handler():
+    event = _event()
+    db = _insert_db()
+
+    with patch("app.api.v1.endpoints.payments.stripe.Webhook.construct_event", return_value=event), \
+         patch("app.services.payment_service.PaymentService.confirm_payment") as confirm:
+        out = await stripe_webhook(_request(event), db)
+
+    assert out == {"received": True}
+    confirm.assert_not_called()
+    stmt = db.execute.await_args.args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("INSERT INTO stripe_events")
+    assert sql.endswith("ON CONFLICT (id) DO NOTHING")
+    assert stmt.compile().params["ordering_key"] == "pi_1"
+    db.commit.assert_awaited_once()
+
+
+async def test_redelivered_event_is_a_no_op():
+    event = _event()
+    db = _insert_db(rowcount=0)
+
+    with patch("app.api.v1.endpoints.payments.stripe.Webhook.construct_event", return_value=event):
+        out = await stripe_webhook(_request(event), db)
+
+    assert out == {"received": True}
+    db.commit.assert_not_awaited()
+
+
+async def test_unhandled_event_type_is_not_queued():
+    db = _insert_db()
+
+    assert await record_event(db, _event("customer.created")) is False
+    db.execute.assert_not_awaited()
+
+
+@pytest.mark.parametrize("event, key", [
+    (_event("invoice.payment_succeeded", obj={"id": "in_1", "subscription": "sub_1"}), "sub_1"),
+    (_event("invoice.payment_failed", obj={"id": "in_1", "subscription": None}), "in_1"),
+    (_event("customer.subscription.deleted", obj={"id": "sub_1"}), "sub_1"),
+    (_event("payout.paid", obj={"id": "po_1"}), "po_1"),
+])
+def test_events_are_keyed_by_the_object_they_concern(event, key):
+    assert ordering_key(event) == key
+
+
+# ---------------------------------------------------------------------------
+# Claiming
+# ---------------------------------------------------------------------------
+
+
+def _row(seq, key=None):
+    return StripeEvent(
+        id=f"evt_{seq}", seq=seq, event_type="payment_intent.succeeded",
+        ordering_key=key, payload=_event(event_id=f"evt_{seq}"), attempts=0,
+        available_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+def _results(*results):
+    db = AsyncMock()
+    db.execute = AsyncMock(side_effect=list(results))
+    return db
+
+
+async def test_claim_leases_rows_and_defers_keys_blocked_by_an_older_event():
+    # evt_3 for pi_a sits behind evt_1, which another run holds or is backing off.
+    rows = [_row(3, "pi_a"), _row(4, "pi_b"), _row(5)]
+    claimed_rows = MagicMock()
+    claimed_rows.scalars.return_value.all.return_value = rows
+    oldest = MagicMock()
+    oldest.all.return_value = [("pi_a", 1), ("pi_b", 4)]
+    db = _results(claimed_rows, oldest)
+
+    claimed, deferred = await claim_batch(db, batch_size=10, lease=timedelta(minutes=5))
+
+    assert [e.id for e in claimed] == ["evt_4", "evt_5"]
+    assert deferred == 1
+    assert rows[1].available_at > datetime.now(timezone.utc) + timedelta(minutes=4)
+    assert rows[0].available_at.year == 2026 and rows[0].available_at.month == 1
+    db.commit.assert_awaited_once()
+
+
+# ---------------------------------------------------------------------------
+# Processing
+# ---------------------------------------------------------------------------
+
+
+class _Sessions:
+    """Session factory handing out a fresh AsyncMock session per ``async with``."""
+
+    def __init__(self):
+        self.sessions = []
+
+    def __call__(self):
+        db = AsyncMock()
+        self.sessions.append(db)
+        factory = MagicMock()
+        factory.__aenter__ = AsyncMock(return_value=db)
+        factory.__aexit__ = AsyncMock(return_value=False)
+        return factory
+
+
+def _claimed(event_id, key=None, attempts=0):
+    return ClaimedEvent(event_id, key, _event(event_id=event_id), attempts)
+
+
+def _updates(sessions):
+    """Values of every UPDATE stripe_events issued, in order."""
+    out = []
+    for db in sessions.sessions:
+        for call in db.execute.await_args_list:
+            stmt = call.args[0]
+            if str(stmt).startswith("UPDATE stripe_events"):
+                out.append(stmt.compile().params)
+    return out
+
+
+async def test_process_event_marks_processed_in_the_handlers_transaction():
+    sessions = _Sessions()
+
+    with patch.object(stripe_events, "dispatch_event", AsyncMock()) as dispatch:
+        assert await process_event(sessions, _claimed("evt_1")) is True
+
+    db = sessions.sessions[0]
+    dispatch.assert_awaited_once_with(db, _event(event_id="evt_1"))
+    assert "processed_at=now()" in str(db.execute.await_args.args[0])
+    db.commit.assert_awaited_once()
+
+
+async def test_failed_event_is_rolled_back_and_backed_off():
+    sessions = _Sessions()
+
+    with patch.object(stripe_events, "dispatch_event", AsyncMock(side_effect=RuntimeError("stripe down"))):
+        assert await process_event(sessions, _claimed("evt_1", attempts=2)) is False
+
+    db = sessions.sessions[0]
+    db.rollback.assert_awaited_once()
+    failure = _updates(sessions)[-1]
+    assert failure["attempts"] == 3
+    assert failure["last_error"] == "stripe down"
+    assert failure["processed_at"] is None
+    # 30s base doubled per earlier attempt.
+    delay = failure["available_at"] - datetime.now(timezone.utc)
+    assert timedelta(seconds=100) < delay <= timedelta(seconds=120)
+    assert "dead_at" not in failure
+
+
+async def test_event_is_given_up_after_max_attempts():
+    sessions = _Sessions()
+
+    with patch.object(stripe_events, "dispatch_event", AsyncMock(side_effect=RuntimeError("bad payload"))):
+        await process_event(sessions, _claimed("evt_1", attempts=9))
+
+    failure = _updates(sessions)[-1]
+    assert failure["attempts"] == 10
+    assert failure["dead_at"] is not None
+
+
+async def test_batch_runs_each_key_in_order_and_stops_a_key_at_its_first_failure():
+    claimed = [
+        _claimed("evt_1", "sub_a"),
+        _claimed("evt_2", "pi_b"),
+        _claimed("evt_3", "sub_a"),
+        _claimed("evt_4", "sub_a"),
+        _claimed("evt_5", "pi_b"),
+    ]
+    seen = []
+
+    async def dispatch(db, event):
+        seen.append(event["id"])
+        if event["id"] == "evt_3":
+            raise RuntimeError("boom")
+
+    sessions = _Sessions()
+    with patch.object(stripe_events, "claim_batch", AsyncMock(return_value=(claimed, 2))), \
+         patch.object(stripe_events, "dispatch_event", dispatch):
+        result = await process_batch(sessions, batch_size=10, concurrency=4)
+
+    assert result == {"claimed": 7, "processed": 3, "failed": 1, "deferred": 2}
+    assert [e for e in seen if e in ("evt_1", "evt_3")] == ["evt_1", "evt_3"]
+    assert [e for e in seen if e in ("evt_2", "evt_5")] == ["evt_2", "evt_5"]
+    assert "evt_4" not in seen
+    # evt_4's lease is handed back so it waits only on evt_3's retry.
+    released = [p for p in _updates(sessions) if ["evt_4"] in p.values()]
+    assert len(released) == 1
+
+
+# ---------------------------------------------------------------------------
+# Worker
+# ---------------------------------------------------------------------------
+
+
+def _envelope(event_type: str) -> dict:
+    data = base64.b64encode(json.dumps({"event_type": event_type}).encode()).decode()
+    return {"message": {"data": data}}
+
+
+async def _post(envelope: dict) -> httpx.Response:
+    transport = ASGITransport(app=worker.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://worker") as client:
+        return await client.post("/pubsub", json=envelope)
+
+
+async def test_worker_processes_events():
+    result = {"batches": 2, "processed": 40, "failed": 0, "pruned": 5}
+    with patch.object(worker, "process", AsyncMock(return_value=result)) as mock_process:
+        resp = await _post(_envelope("stripe_events.process"))
+
+    mock_process.assert_awaited_once()
+    assert resp.json() == {"status": "ok", **result}
+
+
+async def test_worker_ignores_unexpected_event_type():
+    with patch.object(worker, "process", AsyncMock()) as mock_process:
+        resp = await _post(_envelope("outbox.relay"))
+
+    mock_process.assert_not_called()
+    assert resp.json()["status"] == "ignored"
@@ -0,0 +1,233 @@
+"""
+Unit tests for the shared async Stripe client and the per-club fan-out.
+
+Stripe calls go through the real SDK against the in-process ``FakeStripe``
+(``fake_stripe`` fixture); the database is mocked. Covers per-account pacing,
+retries that reuse the idempotency key, and ``settle_wallet_debts`` /
+``reconcile_all_payouts`` running clubs concurrently within the
+``STRIPE_CLUB_CONCURRENCY`` bound.
+"""
+import asyncio
+import time
+import uuid
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+import stripe
+from fastapi import HTTPException
+
+from app.core.stripe_clients import AccountRateLimiter, StripeHTTPClient
+from app.db.models.club import Club
+from app.db.models.payment import Payment, Payout
+from app.services import payment_service
+from app.services.payment_service import PaymentService
+from tests.fake_stripe import FakeStripe
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+def test_rate_limiter_allows_a_burst_then_paces_each_account():
+    limiter = AccountRateLimiter(rate=10, burst=3)
+    key = ("Bearer sk_test", "acct_a")
+
+    delays = [limiter.reserve(key) for _ in range(4)]
+
+    assert delays[:3] == [0.0, 0.0, 0.0]
+    assert delays[3] == pytest.approx(0.1, abs=0.01)
+    assert limiter.reserve(("Bearer sk_test", "acct_b")) == 0.0
+
+
+def test_rate_limiter_disabled_at_zero_rate():
+    limiter = AccountRateLimiter(rate=0, burst=1)
+    assert all(limiter.reserve(("k", None)) == 0.0 for _ in range(100))
+
+
+async def test_async_calls_use_the_shared_client(fake_stripe):
+    pi = await stripe.PaymentIntent.create_async(amount=1000, currency="gbp")
+
+    assert pi.id.startswith("pi_")
+    [request] = fake_stripe.requests_to("POST", "/v1/payment_intents")
+    assert request.params["amount"] == "1000"
+    assert request.idempotency_key  # stamped by the SDK because retries are on
+
+
+async def test_retry_reuses_the_idempotency_key(fake_stripe):
+    fake_stripe.fail_next(503)
+
+    transfer = await stripe.Transfer.create_async(
+        amount=500, currency="gbp", destination="acct_a", idempotency_key="settle-abc",
+    )
+
+    attempts = fake_stripe.requests_to("POST", "/v1/transfers")
+    assert len(attempts) == 2
+    assert {a.idempotency_key for a in attempts} == {"settle-abc"}
+    assert [o["id"] for o in fake_stripe.objects.values()] == [transfer.id]
+
+
+async def test_requests_are_paced_per_connected_account():
+    fake = FakeStripe()
+    client = StripeHTTPClient(
+        timeout=5.0,
+        max_connections=10,
+        limiter=AccountRateLimiter(rate=20, burst=1),
+        transport=httpx.MockTransport(fake.handle),
+    )
+    headers = {"Authorization": "Bearer sk_test"}
+
+    async def timed(account):
+        started = time.monotonic()
+        await client.request_async(
+            "get", "https://api.stripe.com/v1/payouts", {**headers, "Stripe-Account": account},
+        )
+        return time.monotonic() - started
+
+    waits = await asyncio.gather(timed("acct_a"), timed("acct_a"), timed("acct_a"), timed("acct_b"))
+
+    assert max(waits[:3]) >= 0.09  # third call to acct_a waits two 50ms slots
+    assert waits[3] < 0.05         # acct_b has its own budget
+
+
+# ---------------------------------------------------------------------------
+# settle_wallet_debts fan-out
+# ---------------------------------------------------------------------------
+
+def _club(account):
+    return SimpleNamespace(id=uuid.uuid4(), stripe_connect_account_id=account, currency="GBP")
+
+
+def _debt(club, amount="10.00"):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        club_id=club.id,
+        amount=Decimal(amount),
+        platform_fee_amount=Decimal("0"),
+        stripe_transfer_id=None,
+        settled_at=None,
+    )
+
+
+def _settle_db(rows):
+    db = AsyncMock()
+    result = MagicMock()
+    result.all.return_value = rows
+    db.execute = AsyncMock(return_value=result)
+    db.add = MagicMock()
+    db.commit = AsyncMock()
+    return db
+
+
+@pytest.fixture
+def club_concurrency(monkeypatch):
+    monkeypatch.setattr(payment_service.settings, "STRIPE_CLUB_CONCURRENCY", 2)
+    return 2
+
+
+async def test_settlement_transfers_run_concurrently_within_the_bound(fake_stripe, club_concurrency):
+    fake_stripe.latency = 0.02
+    clubs = [_club(f"acct_{i}") for i in range(5)]
+    debts = [_debt(club) for club in clubs]
+    db = _settle_db(list(zip(debts, clubs)))
+
+    result = await PaymentService(db).settle_wallet_debts()
+
+    assert result["settled_count"] == 5
+    assert fake_stripe.max_concurrency == club_concurrency
+    destinations = {r.params["destination"] for r in fake_stripe.requests_to("POST", "/v1/transfers")}
+    assert destinations == {club.stripe_connect_account_id for club in clubs}
+    assert all(d.stripe_transfer_id and d.settled_at for d in debts)
+    db.commit.assert_awaited_once()
+
+
+async def test_settlement_commits_successful_clubs_before_raising(fake_stripe, club_concurrency):
+    fake_stripe.fail_next(400)  # not retried; hits the first club's transfer
+    failing, ok = _club("acct_fail"), _club("acct_ok")
+    failing_debt, ok_debt = _debt(failing), _debt(ok)
+    db = _settle_db([(failing_debt, failing), (ok_debt, ok)])
+
+    with pytest.raises(HTTPException) as exc_info:
+        await PaymentService(db).settle_wallet_debts()
+
+    assert exc_info.value.status_code == 502
+    assert str(failing.id) in exc_info.value.detail
+    assert failing_debt.settled_at is None
+    assert ok_debt.settled_at is not None
+    db.commit.assert_awaited_once()
+
+
+# ---------------------------------------------------------------------------
+# reconcile_all_payouts fan-out
+# ---------------------------------------------------------------------------
+
+class _ReconcileDB:
+    """Answers by what each statement selects; fails if statements overlap."""
+
+    def __init__(self, clubs):
+        self._clubs = clubs
+        self._busy = False
+        self.added = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def execute(self, stmt, *a, **k):
+        assert not self._busy, "concurrent statements on one session"
+        self._busy = True
+        try:
+            await asyncio.sleep(0.001)
+        finally:
+            self._busy = False
+        first = stmt.column_descriptions[0]
+        result = MagicMock()
+        if first["entity"] is Club:
+            result.all.return_value = self._clubs
+        elif first["entity"] is Payment:
+            result.scalars.return_value.all.return_value = []
+        elif first["entity"] is Payout and first["name"] == "stripe_payout_id":
+            result.scalars.return_value.all.return_value = []  # nothing matched yet
+        else:
+            result.scalar_one_or_none.return_value = None      # no existing payout row
+        return result
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+async def test_payout_sweep_reconciles_clubs_concurrently(fake_stripe, club_concurrency):
+    fake_stripe.latency = 0.02
+    clubs = [(uuid.uuid4(), f"acct_{i}") for i in range(4)]
+    for i, (_, account) in enumerate(clubs):
+        fake_stripe.add_payout(
+            account,
+            {"id": f"po_{i}", "amount": 971, "currency": "gbp"},
+            [{"id": f"txn_{i}", "source": f"py_{i}", "amount": 1000, "fee": 29}],
+        )
+    db = _ReconcileDB(clubs)
+
+    result = await PaymentService(db).reconcile_all_payouts()
+
+    assert result == {"clubs_processed": 4, "clubs_failed": 0, "payouts_reconciled": 4}
+    assert fake_stripe.max_concurrency == club_concurrency
+    assert db.commits == 4
+    assert sorted(p.stripe_payout_id for p in db.added) == ["po_0", "po_1", "po_2", "po_3"]
+
+
+async def test_payout_sweep_isolates_a_failing_club(fake_stripe, club_concurrency):
+    fake_stripe.fail_next(400)  # the first club's payout listing
+    clubs = [(uuid.uuid4(), "acct_fail"), (uuid.uuid4(), "acct_ok")]
+    fake_stripe.add_payout("acct_ok", {"id": "po_ok", "amount": 100}, [])
+    db = _ReconcileDB(clubs)
+
+    result = await PaymentService(db).reconcile_all_payouts()
+
+    assert result == {"clubs_processed": 1, "clubs_failed": 1, "payouts_reconciled": 1}
+    assert [p.stripe_payout_id for p in db.added] == ["po_ok"]
@@ -0,0 +1,156 @@
+"""
+Unit tests for the TenantMiddleware resolution cache.
+
+Covers hits and snapshots, negative entries, invalidation (including the
+generation guard and the after-commit session hook) and the middleware's use
+of the cache. No database needed — fetch helpers are patched.
+"""
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core import tenant_cache as cache_module
+from app.core.tenant_cache import TenantCache, mark_tenant_dirty
+from app.db.models.tenant import Tenant
+from app.middleware.tenant import _resolve_tenant
+
+TENANT_ID = uuid.uuid4()
+
+
+def _tenant(**overrides):
+    params = dict(
+        id=TENANT_ID,
+        name="Raquet Club",
+        trading_name="Raquet Club Ltd",
+        player_subdomain="raquetclub",
+        staff_subdomain="raquetclub-staff",
+        is_active=True,
+    )
+    params.update(overrides)
+    return Tenant(**params)
+
+
+def _cache(**overrides):
+    params = dict(ttl_seconds=60, negative_ttl_seconds=60, max_entries=8)
+    params.update(overrides)
+    return TenantCache(**params)
+
+
+def _request(headers):
+    return SimpleNamespace(url=SimpleNamespace(path="/api/v1/courts"), headers=headers, state=SimpleNamespace())
+
+
+# ---------------------------------------------------------------------------
+# TenantCache
+# ---------------------------------------------------------------------------
+
+
+def test_hit_returns_fresh_copy_of_snapshot():
+    cache = _cache()
+    cache.put(("subdomain", "raquetclub"), _tenant(), "player", cache.generation)
+
+    first = cache.get(("subdomain", "raquetclub"))
+    first.tenant.name = "mutated by a handler"
+    second = cache.get(("subdomain", "raquetclub"))
+
+    assert second.portal == "player"
+    assert second.tenant.id == TENANT_ID
+    assert second.tenant.name == "Raquet Club"
+
+
+def test_negative_entry_is_a_hit_with_no_tenant():
+    cache = _cache()
+    cache.put(("domain", "unknown.example.com"), None, None, cache.generation)
+    hit = cache.get(("domain", "unknown.example.com"))
+    assert hit is not None and hit.tenant is None
+
+
+def test_expired_entry_is_a_miss():
+    cache = _cache(negative_ttl_seconds=0)
+    cache.put(("domain", "unknown.example.com"), None, None, cache.generation)
+    assert cache.get(("domain", "unknown.example.com")) is None
+
+
+def test_disabled_cache_never_hits():
+    cache = _cache(ttl_seconds=0)
+    cache.put(("id", TENANT_ID), _tenant(), None, cache.generation)
+    assert cache.get(("id", TENANT_ID)) is None
+
+
+def test_lru_bound_evicts_oldest():
+    cache = _cache(max_entries=2)
+    for name in ("a", "b", "c"):
+        cache.put(("domain", name), None, None, cache.generation)
+    assert cache.get(("domain", "a")) is None
+    assert cache.get(("domain", "c")) is not None
+
+
+def test_invalidate_drops_every_key_for_tenant_and_all_negatives():
+    cache = _cache()
+    other = _tenant(id=uuid.uuid4(), player_subdomain="other", staff_subdomain="other-staff")
+    cache.put(("id", TENANT_ID), _tenant(), None, cache.generation)
+    cache.put(("subdomain", "raquetclub"), _tenant(), "player", cache.generation)
+    cache.put(("subdomain", "other"), other, "player", cache.generation)
+    cache.put(("subdomain", "newclub"), None, None, cache.generation)
+
+    cache.invalidate_tenant(TENANT_ID)
+
+    assert cache.get(("id", TENANT_ID)) is None
+    assert cache.get(("subdomain", "raquetclub")) is None
+    assert cache.get(("subdomain", "newclub")) is None
+    assert cache.get(("subdomain", "other")) is not None
+
+
+def test_lookup_started_before_invalidation_is_not_stored():
+    cache = _cache()
+    generation = cache.generation
+    cache.invalidate_tenant(TENANT_ID)  # a tenant write commits mid-lookup
+    cache.put(("id", TENANT_ID), _tenant(is_active=True), None, generation)
+    assert cache.get(("id", TENANT_ID)) is None
+
+
+# ---------------------------------------------------------------------------
+# Session hook + middleware
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def enabled_cache(monkeypatch):
+    cache = _cache()
+    monkeypatch.setattr(cache_module, "get_tenant_cache", lambda: cache)
+    monkeypatch.setattr("app.middleware.tenant.get_tenant_cache", lambda: cache)
+    return cache
+
+
+def test_tenant_is_invalidated_after_commit(enabled_cache):
+    enabled_cache.put(("id", TENANT_ID), _tenant(), None, enabled_cache.generation)
+    session = Session()
+    session.begin()
+    mark_tenant_dirty(session, TENANT_ID)
+
+    assert enabled_cache.get(("id", TENANT_ID)) is not None
+    session.commit()
+    assert enabled_cache.get(("id", TENANT_ID)) is None
+
+
+async def test_middleware_resolves_from_cache_on_repeat_requests(enabled_cache):
+    fetch = AsyncMock(return_value=(_tenant(), "staff"))
+    with patch("app.middleware.tenant._fetch_by_subdomain", fetch):
+        for _ in range(3):
+            tenant, portal = await _resolve_tenant(_request({"host": "raquetclub-staff.smashbook.app"}))
+
+    fetch.assert_awaited_once()
+    assert tenant.id == TENANT_ID
+    assert portal == "staff"
+
+
+async def test_middleware_negative_caches_unknown_custom_domain(enabled_cache):
+    fetch = AsyncMock(return_value=None)
+    with patch("app.middleware.tenant._fetch_by_custom_domain", fetch):
+        for _ in range(2):
+            assert await _resolve_tenant(_request({"host": "bot.example.com"})) == (None, None)
+
+    fetch.assert_awaited_once()
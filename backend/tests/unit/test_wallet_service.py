@@ -224,7 +224,7 @@ class TestTopUpWallet:
     async def test_returns_client_secret_and_pi_id(self):
         user = _user(customer_id=STRIPE_CUSTOMER_ID, default_pm_id=STRIPE_PM_ID)
         db = _db_for_top_up(_wallet_obj())
-        with patch("stripe.PaymentIntent.create", return_value=_mock_pi(2000)):
+        with patch("stripe.PaymentIntent.create_async", return_value=_mock_pi(2000)):
             result = await PaymentService(db).top_up_wallet(user, 2000, STRIPE_PM_ID)
         assert result["client_secret"] == STRIPE_PI_SECRET
         assert result["payment_intent_id"] == STRIPE_PI_ID
@@ -235,7 +235,7 @@ class TestTopUpWallet:
     async def test_falls_back_to_default_payment_method(self):
         user = _user(customer_id=STRIPE_CUSTOMER_ID, default_pm_id=STRIPE_PM_ID)
         db = _db_for_top_up(_wallet_obj())
-        with patch("stripe.PaymentIntent.create", return_value=_mock_pi()) as mock_create:
+        with patch("stripe.PaymentIntent.create_async", return_value=_mock_pi()) as mock_create:
             await PaymentService(db).top_up_wallet(user, 1000, None)
         call_kwargs = mock_create.call_args[1]
         assert call_kwargs["payment_method"] == STRIPE_PM_ID
@@ -261,7 +261,7 @@ class TestTopUpWallet:
     async def test_creates_wallet_when_none_exists(self):
         user = _user(customer_id=STRIPE_CUSTOMER_ID, default_pm_id=STRIPE_PM_ID)
         db = _db_for_top_up(None)
-        with patch("stripe.PaymentIntent.create", return_value=_mock_pi()):
+        with patch("stripe.PaymentIntent.create_async", return_value=_mock_pi()):
             await PaymentService(db).top_up_wallet(user, 1000, STRIPE_PM_ID)
         db.add.assert_called()
         db.flush.assert_called_once()
@@ -271,7 +271,7 @@ class TestTopUpWallet:
         user = _user(customer_id=STRIPE_CUSTOMER_ID, default_pm_id=STRIPE_PM_ID)
         wallet = _wallet_obj()
         db = _db_for_top_up(wallet)
-        with patch("stripe.PaymentIntent.create", return_value=_mock_pi()) as mock_create:
+        with patch("stripe.PaymentIntent.create_async", return_value=_mock_pi()) as mock_create:
             await PaymentService(db).top_up_wallet(user, 1500, STRIPE_PM_ID)
         metadata = mock_create.call_args[1]["metadata"]
         assert metadata["purpose"] == "wallet_top_up"
@@ -381,6 +381,11 @@ def _bp_obj(*, user_id=None, payment_status=None):
     )
 
 
+def _outbox_rows(db):
+    from app.db.models.outbox import EventOutbox
+    return [c.args[0] for c in db.add.call_args_list if isinstance(c.args[0], EventOutbox)]
+
+
 def _db_for_deduct(wallet, club_row, *, plan=None, booking=None, bp=None, all_bps=None, user=None):
     """
     plan: fee source; defaults to _plan_obj(fee_pct="0") when None.
@@ -667,7 +672,7 @@ class TestDeductWalletBookingPath:
         assert len(payments) == 0
 
     @pytest.mark.asyncio
-    async def test_publishes_send_payment_receipt_after_commit(self):
+    async def test_enqueues_send_payment_receipt_in_payment_transaction(self):
         wallet = _wallet_obj(balance="50.00")
         wallet.id = WALLET_ID
         bp = _bp_obj()
@@ -676,14 +681,14 @@ class TestDeductWalletBookingPath:
         db = _db_for_deduct(
             wallet, (_club_obj(), _tenant_obj()), booking=booking, bp=bp, user=user
         )
-        with patch("app.services.payment_service.publish_notification_event") as mock_publish:
-            await PaymentService(db).deduct_wallet(
-                USER_ID, CLUB_ID, Decimal("20.00"), WalletTransactionSource.booking, SOURCE_ID
-            )
-        mock_publish.assert_called_once()
-        args, _kwargs = mock_publish.call_args
-        assert args[0] == "send_payment_receipt"
-        payload = args[1]
+        await PaymentService(db).deduct_wallet(
+            USER_ID, CLUB_ID, Decimal("20.00"), WalletTransactionSource.booking, SOURCE_ID
+        )
+        events = _outbox_rows(db)
+        assert len(events) == 1
+        assert events[0].event_type == "send_payment_receipt"
+        assert events[0].ordering_key == f"user:{USER_ID}"
+        payload = events[0].payload
         assert payload["user_id"] == str(USER_ID)
         assert payload["email"] == "player@example.com"
         assert payload["full_name"] == "Test Player"
@@ -692,33 +697,33 @@ class TestDeductWalletBookingPath:
         assert payload["payment_method"] == "wallet"
 
     @pytest.mark.asyncio
-    async def test_non_booking_source_does_not_publish_receipt(self):
+    async def test_non_booking_source_does_not_enqueue_receipt(self):
         wallet = _wallet_obj(balance="50.00")
         wallet.id = WALLET_ID
         db = _db_for_deduct(wallet, (_club_obj(), _tenant_obj()))
-        with patch("app.services.payment_service.publish_notification_event") as mock_publish:
-            await PaymentService(db).deduct_wallet(
-                USER_ID, CLUB_ID, Decimal("20.00"), WalletTransactionSource.membership, SOURCE_ID
-            )
-        mock_publish.assert_not_called()
+        await PaymentService(db).deduct_wallet(
+            USER_ID, CLUB_ID, Decimal("20.00"), WalletTransactionSource.membership, SOURCE_ID
+        )
+        assert _outbox_rows(db) == []
 
     @pytest.mark.asyncio
-    async def test_notification_failure_does_not_break_payment(self):
+    async def test_receipt_is_enqueued_before_the_single_commit(self):
+        """The receipt commits atomically with the debit — no publish after commit to lose."""
         wallet = _wallet_obj(balance="50.00")
         wallet.id = WALLET_ID
         bp = _bp_obj()
         booking = _booking_obj()
         db = _db_for_deduct(wallet, (_club_obj(), _tenant_obj()), booking=booking, bp=bp)
-        with patch(
-            "app.services.payment_service.publish_notification_event",
-            side_effect=RuntimeError("pubsub down"),
-        ):
-            # Must not raise; wallet has already been debited and committed.
-            result = await PaymentService(db).deduct_wallet(
-                USER_ID, CLUB_ID, Decimal("20.00"), WalletTransactionSource.booking, SOURCE_ID
-            )
+        calls = []
+        db.add = MagicMock(side_effect=lambda obj: calls.append(type(obj).__name__))
+        db.commit = AsyncMock(side_effect=lambda: calls.append("commit"))
+
+        result = await PaymentService(db).deduct_wallet(
+            USER_ID, CLUB_ID, Decimal("20.00"), WalletTransactionSource.booking, SOURCE_ID
+        )
         assert result["balance_after"] == Decimal("30.00")
-        db.commit.assert_called_once()
+        assert calls.count("commit") == 1
+        assert calls.index("EventOutbox") < calls.index("commit")
 
 
 # ---------------------------------------------------------------------------
@@ -755,7 +760,7 @@ class TestSupersedePendingStripePayment:
     @pytest.mark.asyncio
     async def test_no_pending_payment_is_noop(self):
         db = _db_with_pending_payment(None)
-        with patch("stripe.PaymentIntent.cancel") as mock_cancel:
+        with patch("stripe.PaymentIntent.cancel_async", new_callable=AsyncMock) as mock_cancel:
             await PaymentService(db).supersede_pending_stripe_payment(BOOKING_ID, USER_ID)
         mock_cancel.assert_not_called()
         db.add.assert_not_called()
@@ -764,7 +769,7 @@ class TestSupersedePendingStripePayment:
     async def test_cancels_pi_and_marks_payment_failed(self):
         payment = _pending_payment()
         db = _db_with_pending_payment(payment)
-        with patch("stripe.PaymentIntent.cancel") as mock_cancel:
+        with patch("stripe.PaymentIntent.cancel_async", new_callable=AsyncMock) as mock_cancel:
             await PaymentService(db).supersede_pending_stripe_payment(BOOKING_ID, USER_ID)
         mock_cancel.assert_called_once_with(EXISTING_PI_ID)
         assert payment.state == PaymentState.failed
@@ -774,7 +779,7 @@ class TestSupersedePendingStripePayment:
     async def test_pending_payment_without_pi_just_marks_failed(self):
         payment = _pending_payment(pi_id=None)
         db = _db_with_pending_payment(payment)
-        with patch("stripe.PaymentIntent.cancel") as mock_cancel:
+        with patch("stripe.PaymentIntent.cancel_async", new_callable=AsyncMock) as mock_cancel:
             await PaymentService(db).supersede_pending_stripe_payment(BOOKING_ID, USER_ID)
         mock_cancel.assert_not_called()
         assert payment.state == PaymentState.failed
@@ -785,8 +790,8 @@ class TestSupersedePendingStripePayment:
         db = _db_with_pending_payment(payment)
         succeeded_pi = MagicMock()
         succeeded_pi.status = "succeeded"
-        with patch("stripe.PaymentIntent.cancel", side_effect=stripe.InvalidRequestError("bad state", "param")):
-            with patch("stripe.PaymentIntent.retrieve", return_value=succeeded_pi):
+        with patch("stripe.PaymentIntent.cancel_async", new_callable=AsyncMock, side_effect=stripe.InvalidRequestError("bad state", "param")):
+            with patch("stripe.PaymentIntent.retrieve_async", return_value=succeeded_pi):
                 with pytest.raises(HTTPException) as exc_info:
                     await PaymentService(db).supersede_pending_stripe_payment(BOOKING_ID, USER_ID)
         assert exc_info.value.status_code == 409
@@ -798,8 +803,8 @@ class TestSupersedePendingStripePayment:
         db = _db_with_pending_payment(payment)
         cancelled_pi = MagicMock()
         cancelled_pi.status = "canceled"
-        with patch("stripe.PaymentIntent.cancel", side_effect=stripe.InvalidRequestError("bad state", "param")):
-            with patch("stripe.PaymentIntent.retrieve", return_value=cancelled_pi):
+        with patch("stripe.PaymentIntent.cancel_async", new_callable=AsyncMock, side_effect=stripe.InvalidRequestError("bad state", "param")):
+            with patch("stripe.PaymentIntent.retrieve_async", return_value=cancelled_pi):
                 # Must not raise
                 await PaymentService(db).supersede_pending_stripe_payment(BOOKING_ID, USER_ID)
         assert payment.state == PaymentState.failed
@@ -808,7 +813,7 @@ class TestSupersedePendingStripePayment:
     async def test_swallows_network_error_on_cancel(self):
         payment = _pending_payment()
         db = _db_with_pending_payment(payment)
-        with patch("stripe.PaymentIntent.cancel", side_effect=stripe.APIConnectionError("network")):
+        with patch("stripe.PaymentIntent.cancel_async", new_callable=AsyncMock, side_effect=stripe.APIConnectionError("network")):
             # Must not raise; we still mark the payment failed locally
             await PaymentService(db).supersede_pending_stripe_payment(BOOKING_ID, USER_ID)
         assert payment.state == PaymentState.failed
@@ -867,7 +872,7 @@ class TestSettleWalletDebts:
         club = _club_obj()
         debt = _debt_obj(amount="15.00", fee="0.75")
         db = _db_for_settle([(debt, club)])
-        with patch("stripe.Transfer.create", return_value=_mock_transfer()):
+        with patch("stripe.Transfer.create_async", return_value=_mock_transfer()):
             await PaymentService(db).settle_wallet_debts()
         assert debt.stripe_transfer_id == STRIPE_TRANSFER_ID
         assert debt.settled_at is not None
@@ -877,7 +882,7 @@ class TestSettleWalletDebts:
         club = _club_obj()
         debt = _debt_obj(amount="20.00", fee="1.00")  # net = £19.00 = 1900p
         db = _db_for_settle([(debt, club)])
-        with patch("stripe.Transfer.create", return_value=_mock_transfer()) as mock_transfer:
+        with patch("stripe.Transfer.create_async", return_value=_mock_transfer()) as mock_transfer:
             await PaymentService(db).settle_wallet_debts()
         call_kwargs = mock_transfer.call_args[1]
         assert call_kwargs["amount"] == 1900
@@ -889,7 +894,7 @@ class TestSettleWalletDebts:
         debt1 = _debt_obj(amount="10.00", fee="0.50")
         debt2 = _debt_obj(amount="15.00", fee="0.75")
         db = _db_for_settle([(debt1, club), (debt2, club)])
-        with patch("stripe.Transfer.create", return_value=_mock_transfer()) as mock_transfer:
+        with patch("stripe.Transfer.create_async", return_value=_mock_transfer()) as mock_transfer:
             result = await PaymentService(db).settle_wallet_debts()
         assert mock_transfer.call_count == 1  # one transfer for both debts
         assert result["settled_count"] == 2
@@ -901,7 +906,7 @@ class TestSettleWalletDebts:
         club = _club_obj(connect_account=None)
         debt = _debt_obj()
         db = _db_for_settle([(debt, club)])
-        with patch("stripe.Transfer.create") as mock_transfer:
+        with patch("stripe.Transfer.create_async") as mock_transfer:
             result = await PaymentService(db).settle_wallet_debts()
         mock_transfer.assert_not_called()
         assert result["skipped_count"] == 1
@@ -915,7 +920,7 @@ class TestSettleWalletDebts:
         debt1 = _debt_obj(amount="10.00", fee="0", club_id=club_with_account.id)
         debt2 = _debt_obj(amount="5.00", fee="0", club_id=club_without_account.id)
         db = _db_for_settle([(debt1, club_with_account), (debt2, club_without_account)])
-        with patch("stripe.Transfer.create", return_value=_mock_transfer()):
+        with patch("stripe.Transfer.create_async", return_value=_mock_transfer()):
             result = await PaymentService(db).settle_wallet_debts()
         assert result["settled_count"] == 1
         assert result["skipped_count"] == 1
@@ -925,7 +930,7 @@ class TestSettleWalletDebts:
         club = _club_obj()
         debt = _debt_obj()
         db = _db_for_settle([(debt, club)])
-        with patch("stripe.Transfer.create", side_effect=stripe.StripeError("network error")):
+        with patch("stripe.Transfer.create_async", side_effect=stripe.StripeError("network error")):
             with pytest.raises(HTTPException) as exc_info:
                 await PaymentService(db).settle_wallet_debts()
         assert exc_info.value.status_code == 502
@@ -935,7 +940,7 @@ class TestSettleWalletDebts:
         club = _club_obj()
         debt = _debt_obj()
         db = _db_for_settle([(debt, club)])
-        with patch("stripe.Transfer.create", return_value=_mock_transfer()):
+        with patch("stripe.Transfer.create_async", return_value=_mock_transfer()):
             await PaymentService(db).settle_wallet_debts()
         db.commit.assert_called_once()
 
@@ -946,7 +951,7 @@ class TestSettleWalletDebts:
         debt1 = _debt_obj(amount="10.00", fee="0")
         debt2 = _debt_obj(amount="15.00", fee="0")
         db = _db_for_settle([(debt1, club), (debt2, club)])
-        with patch("stripe.Transfer.create", return_value=_mock_transfer()) as mock_transfer:
+        with patch("stripe.Transfer.create_async", return_value=_mock_transfer()) as mock_transfer:
             await PaymentService(db).settle_wallet_debts()
         call_kwargs = mock_transfer.call_args[1]
         assert "idempotency_key" in call_kwargs
@@ -959,7 +964,7 @@ class TestSettleWalletDebts:
         debt2_again = _debt_obj(amount="15.00", fee="0")
         debt2_again.id = debt2.id
         db2 = _db_for_settle([(debt1_again, club), (debt2_again, club)])
-        with patch("stripe.Transfer.create", return_value=_mock_transfer()) as mock_transfer2:
+        with patch("stripe.Transfer.create_async", return_value=_mock_transfer()) as mock_transfer2:
             await PaymentService(db2).settle_wallet_debts()
         assert mock_transfer2.call_args[1]["idempotency_key"] == key
 
@@ -968,13 +973,13 @@ class TestSettleWalletDebts:
         club = _club_obj()
         debt_a = _debt_obj(amount="10.00", fee="0")
         db_a = _db_for_settle([(debt_a, club)])
-        with patch("stripe.Transfer.create", return_value=_mock_transfer()) as mock_a:
+        with patch("stripe.Transfer.create_async", return_value=_mock_transfer()) as mock_a:
             await PaymentService(db_a).settle_wallet_debts()
         key_a = mock_a.call_args[1]["idempotency_key"]
 
         debt_b = _debt_obj(amount="10.00", fee="0")
         db_b = _db_for_settle([(debt_b, club)])
-        with patch("stripe.Transfer.create", return_value=_mock_transfer()) as mock_b:
+        with patch("stripe.Transfer.create_async", return_value=_mock_transfer()) as mock_b:
             await PaymentService(db_b).settle_wallet_debts()
         key_b = mock_b.call_args[1]["idempotency_key"]
 